@@ -0,0 +1,61 @@
+"""
+Measure how long a large script takes to start with and without the caches.
+
+The script defines many small functions and calls each once, so running it
+is cheap and the time goes to getting it ready: lexing, parsing and, for the
+engines that need it, compiling. Each engine is timed on a cold run, which
+fills the cache, and on a warm run, which loads from it. A warm aot run
+loads marshalled Python code and does no lexing or parsing at all.
+
+Usage:
+    python benchmarks/aot_startup.py [functions]
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from xbasic.init_interp import run, ENGINES
+
+
+def make_source(functions: int) -> str:
+    """Build a script defining and calling functions small functions."""
+    lines = []
+    for i in range(functions):
+        lines.append(f'FN f{i}(a, b) -> IF a > b THEN a * {i} - b ELSE b - a + {i}')
+        lines.append(f'num r = f{i}({i}, 3) + 1')
+    return '\n'.join(lines)
+
+
+def time_run(fn: str, text: str, engine: str) -> float:
+    """Return the wall-clock time of running a script."""
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        _, error = run(fn, text, engine)
+    assert error is None, error.as_string()
+    return time.perf_counter() - start
+
+
+def main():
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    text = make_source(functions)
+    print(f'{len(text) // 1024} kb script, {functions} functions')
+    print(f"{'engine':8}{'cold':>10}{'warm':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['XBASIC_CACHE_DIR'] = os.path.join(tmp, 'cache')
+        fn = os.path.join(tmp, 'script.bsx')
+        with open(fn, 'w') as f:
+            f.write(text)
+        for engine in ENGINES:
+            cold = time_run(fn, text, engine)
+            warm = min(time_run(fn, text, engine) for _ in range(3))
+            print(f'{engine:8}{cold:9.3f}s{warm:9.3f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Measure the memory taken by the AST of a large generated program.
+
+Reports the memory still held by the tree once parsing is done and the peak
+reached while parsing, not counting the source text and the token buffer.
+
+Usage:
+    python benchmarks/ast_memory.py [statements]
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from xbasic.fast_lexer import FastLexer
+from xbasic.parser import Parser
+
+STATEMENTS = [
+    'num a{i} = {i} * (b + 2.5) - c / 4',
+    'text s{i} = "item {i}"',
+    'IF a{i} > {i} THEN print(a{i}) ELSE print("no")',
+    'FOR j = 0 TO {i} THEN num t = t + j',
+    'FN f{i}(x, y) -> x ^ 2 + y * {i}',
+    'list l{i} = [1, 2, {i}, "x"]',
+]
+
+
+def make_source(statements: int) -> str:
+    """Build a program cycling through STATEMENTS."""
+    return '\n'.join(STATEMENTS[i % len(STATEMENTS)].format(i=i) for i in range(statements))
+
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    text = make_source(statements)
+    tokens, error = FastLexer('<bench>', text).make_token_buffer()
+    assert error is None
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = Parser(tokens).parse()
+    seconds = time.perf_counter() - start
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert result.error is None
+
+    mb = 1024 * 1024
+    print(f'source:   {len(text) / mb:.2f} MB, {statements} statements, {len(tokens)} tokens')
+    print(f'AST:      {retained / mb:8.2f} MB retained, {retained / statements:6.0f} bytes per statement')
+    print(f'peak:     {peak / mb:8.2f} MB while parsing')
+    print(f'parse:    {seconds:.3f}s (under tracemalloc)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Compare the execution engines on loop- and call-heavy programs.
+
+Every program is run with each engine of init_interp.ENGINES, and the best
+of a few runs is reported with the speedup over the tree-walking
+interpreter. The time includes compiling the program for the engines that
+compile it first.
+
+Usage:
+    python benchmarks/engines.py [repeats]
+"""
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from xbasic.init_interp import run, ENGINES
+from xbasic.optimizer.memoizer import memo_size
+
+PROGRAMS = {
+    'for loop': '''
+num total = 0
+FOR i = 0 TO 30000 THEN
+    num total = total + i * 2 - 1
+END
+''',
+    'while loop': '''
+num i = 0
+WHILE i < 20000 THEN
+    num i = i + 1
+END
+''',
+    'calls': '''
+FN fib(n) -> IF n < 2 THEN n ELSE fib(n - 1) + fib(n - 2)
+fib(18)
+''',
+    'nested': '''
+FN add(a, b) -> a + b
+num total = 0
+FOR i = 0 TO 100 THEN
+    FOR j = 0 TO 100 THEN
+        num total = add(total, i * j)
+    END
+END
+''',
+}
+
+
+def best_time(text: str, engine: str, repeats: int) -> float:
+    """Return the best time of running a program repeats times."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            _, error = run('<bench>', text, engine)
+        best = min(best, time.perf_counter() - start)
+        assert error is None, error.as_string()
+    return best
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    # Measure the calls fib makes, not the few a memo leaves.
+    memo_size.set(0)
+    print(f"{'program':12}" + ''.join(f'{engine:>18}' for engine in ENGINES))
+    for name, text in PROGRAMS.items():
+        times = [best_time(text, engine, repeats) for engine in ENGINES]
+        print(f'{name:12}' + ''.join(f'{seconds:9.3f}s ({times[0] / seconds:4.2f}x)' for seconds in times))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Compare re-parsing a whole program with Document.edit after a one-character edit.
+
+Usage:
+    python benchmarks/incremental_edit.py [size_in_kb]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from xbasic.fast_lexer import FastLexer
+from xbasic.incremental import Document
+from xbasic.parser import Parser
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'example.bsx')
+
+
+def make_source(size_kb: int) -> str:
+    """Repeat example.bsx until the source is at least size_kb kilobytes long."""
+    with open(EXAMPLE) as f:
+        chunk = f.read() + '\n'
+    return chunk * (size_kb * 1024 // len(chunk) + 1)
+
+
+def full_parse(text: str) -> float:
+    """Return the wall-clock time of lexing and parsing text from scratch."""
+    start = time.perf_counter()
+    tokens, error = FastLexer('<bench>', text).make_token_buffer()
+    assert error is None
+    res = Parser(tokens).parse()
+    assert res.error is None
+    return time.perf_counter() - start
+
+
+def main():
+    size_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    text = make_source(size_kb)
+    middle = text.index('print("Table', len(text) // 2)
+
+    start = time.perf_counter()
+    document = Document('<bench>', text)
+    initial = time.perf_counter() - start
+
+    # Type a new top-level statement in the middle of the program, one character at a time.
+    edits = []
+    for i, char in enumerate('PRINT(1)\n'):
+        start = time.perf_counter()
+        document.edit(middle + i, middle + i, char)
+        edits.append(time.perf_counter() - start)
+    assert document.error is None
+    assert len(document.nodes) == len(Parser(FastLexer('<bench>', document.text).make_token_buffer()[0])
+                                      .parse().node.element_nodes)
+
+    full = full_parse(document.text)
+    edit = sum(edits) / len(edits)
+    print(f'source:     {len(text) / 1024:.0f} KB, {len(document.nodes)} statements')
+    print(f'Document:   {initial:.3f}s initial parse')
+    print(f'full parse: {full * 1000:9.2f} ms')
+    print(f'edit:       {edit * 1000:9.2f} ms per keystroke')
+    print(f'speedup:    {full / edit:.0f}x')
+
+
+if __name__ == '__main__':
+    main()
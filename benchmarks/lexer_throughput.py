@@ -0,0 +1,52 @@
+"""
+Compare the throughput of Lexer and FastLexer on a synthetic program.
+
+Usage:
+    python benchmarks/lexer_throughput.py [size_in_kb]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from xbasic.lexer import Lexer
+from xbasic.fast_lexer import FastLexer
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'example.bsx')
+
+
+def make_source(size_kb: int) -> str:
+    """Repeat example.bsx until the source is at least size_kb kilobytes long."""
+    with open(EXAMPLE) as f:
+        chunk = f.read() + '\n'
+    return chunk * (size_kb * 1024 // len(chunk) + 1)
+
+
+def measure(lexer_class, text: str) -> float:
+    """Return the best of three wall-clock timings for lexing text."""
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        tokens, error = lexer_class('<bench>', text).make_tokens()
+        best = min(best, time.perf_counter() - start)
+        assert error is None
+    return best
+
+
+def main():
+    size_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    text = make_source(size_kb)
+    mb = len(text) / (1024 * 1024)
+
+    old = measure(Lexer, text)
+    new = measure(FastLexer, text)
+
+    print(f'source: {mb:.2f} MB')
+    print(f'Lexer:     {old:.3f}s  {mb / old:7.2f} MB/s')
+    print(f'FastLexer: {new:.3f}s  {mb / new:7.2f} MB/s')
+    print(f'speedup:   {old / new:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
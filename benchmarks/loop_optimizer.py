@@ -0,0 +1,77 @@
+"""
+Measure what the loop optimizer saves on loops with invariant and repeated work.
+
+Every program is run with each engine of init_interp.ENGINES, once with the
+trees left as parsed and once optimized, and the best of a few runs is
+reported with the speedup of the optimized run.
+
+Usage:
+    python benchmarks/loop_optimizer.py [repeats]
+"""
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import xbasic.optimizer
+from xbasic.init_interp import run, ENGINES
+
+PROGRAMS = {
+    'invariants': '''
+num scale = 3
+num offset = 7
+num total = 0
+FOR i = 0 TO 20000 THEN
+    num total = total + i * (scale * scale + offset * 2) + len([1, 2, 3])
+END
+''',
+    'common': '''
+num base = 2
+num total = 0
+FOR i = 0 TO 20000 THEN
+    num total = total + (base + i) * (base + i) - (base + i)
+END
+''',
+    'powers': '''
+num total = 0
+FOR i = 0 TO 20000 THEN
+    num total = total + i ^ 2 - i
+END
+''',
+}
+
+
+def best_time(text: str, engine: str, repeats: int) -> float:
+    """Return the best time of running a program repeats times."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            _, error = run('<bench>', text, engine)
+        best = min(best, time.perf_counter() - start)
+        assert error is None, error.as_string()
+    return best
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    optimize = xbasic.optimizer.optimize
+    print(f"{'program':12}" + ''.join(f'{engine:>26}' for engine in ENGINES))
+    for name, text in PROGRAMS.items():
+        row = f'{name:12}'
+        for engine in ENGINES:
+            xbasic.optimizer.optimize = lambda node, value_used=True: node
+            try:
+                plain = best_time(text, engine, repeats)
+            finally:
+                xbasic.optimizer.optimize = optimize
+            optimized = best_time(text, engine, repeats)
+            row += f'{plain:7.3f}s ->{optimized:7.3f}s ({plain / optimized:4.2f}x)'
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
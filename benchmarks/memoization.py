@@ -0,0 +1,74 @@
+"""
+Measure what memoizing pure functions saves.
+
+Every program is run with each engine of init_interp.ENGINES, once with
+memo_size 0, leaving every function unmemoized, and once with the default
+memo size, and the best of a few runs is reported with the speedup of the
+second run. The 'unique' program never repeats a call, so it shows what
+keeping the memos costs.
+
+Usage:
+    python benchmarks/memoization.py [repeats]
+"""
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from xbasic.init_interp import run, ENGINES
+from xbasic.optimizer.memoizer import memo_size
+
+PROGRAMS = {
+    'fib': '''
+FN fib(n) -> IF n < 2 THEN n ELSE fib(n - 1) + fib(n - 2)
+fib(20)
+''',
+    'paths': '''
+FN paths(x, y) -> IF x == 0 or y == 0 THEN 1 ELSE paths(x - 1, y) + paths(x, y - 1)
+paths(8, 8)
+''',
+    'unique': '''
+FN total(n)
+    num t = 0
+    FOR j = 0 TO 10 THEN num t = t + n * j
+    RETURN t
+END
+FOR i = 0 TO 3000 THEN total(i)
+''',
+}
+
+
+def best_time(text: str, engine: str, repeats: int) -> float:
+    """Return the best time of running a program repeats times."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            _, error = run('<bench>', text, engine)
+        best = min(best, time.perf_counter() - start)
+        assert error is None, error.as_string()
+    return best
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 20000))
+    print(f"{'program':12}" + ''.join(f'{engine:>26}' for engine in ENGINES))
+    for name, text in PROGRAMS.items():
+        row = f'{name:12}'
+        for engine in ENGINES:
+            token = memo_size.set(0)
+            try:
+                plain = best_time(text, engine, repeats)
+            finally:
+                memo_size.reset(token)
+            memoized = best_time(text, engine, repeats)
+            row += f'{plain:7.3f}s ->{memoized:7.3f}s ({plain / memoized:4.2f}x)'
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Count the objects the parser creates per token, and time it.
+
+Every class the parser instantiates (the nodes, ParseResult, ParseError and
+InvalidSyntaxError) is counted while parsing an expression-heavy program, so
+bookkeeping objects can be told apart from the tree itself. Then the parse is
+timed without the counting. Both the expression-heavy program of
+parse_throughput.py and the statement mix of ast_memory.py are measured.
+
+Usage:
+    python benchmarks/parse_allocations.py [size_in_kb]
+"""
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from xbasic.fast_lexer import FastLexer
+from xbasic.parser import Parser
+from xbasic.error_handler.error import InvalidSyntaxError
+from xbasic.utils import nodes, parse_result
+
+import ast_memory
+import parse_throughput
+
+
+def counted_classes():
+    """List the classes whose instances are counted."""
+    classes = [InvalidSyntaxError]
+    for module in (nodes, parse_result):
+        classes.extend(value for value in vars(module).values()
+                       if isinstance(value, type) and value.__module__ == module.__name__)
+    return classes
+
+
+def count(tokens) -> Counter:
+    """Parse tokens, counting the instances created of each counted class."""
+    counts = Counter()
+    originals = {}
+
+    def counting(cls, init):
+        def __init__(self, *args, **kwargs):
+            counts[cls.__name__] += 1
+            init(self, *args, **kwargs)
+        return __init__
+
+    for cls in counted_classes():
+        originals[cls] = cls.__dict__.get('__init__')
+        cls.__init__ = counting(cls, cls.__init__)
+    try:
+        Parser(tokens).parse()
+    finally:
+        for cls, init in originals.items():
+            if init is None:
+                del cls.__init__
+            else:
+                cls.__init__ = init
+    return counts
+
+
+def measure(name: str, text: str):
+    """Print the objects created per token and the parse time for text."""
+    tokens, error = FastLexer('<bench>', text).make_token_buffer()
+    assert error is None
+
+    counts = count(tokens)
+    node_names = {cls.__name__ for cls in vars(nodes).values() if isinstance(cls, type)}
+    tree = sum(n for name, n in counts.items() if name in node_names)
+    bookkeeping = {name: n for name, n in counts.items() if name not in node_names}
+
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        Parser(tokens).parse()
+        best = min(best, time.perf_counter() - start)
+
+    print(f'{name}: {len(text) / (1024 * 1024):.2f} MB, {len(tokens)} tokens')
+    print(f'  nodes:       {tree / len(tokens):.3f} per token')
+    print(f'  bookkeeping: {sum(bookkeeping.values()) / len(tokens):.3f} per token {bookkeeping}')
+    print(f'  parse:       {best:.3f}s, {best / len(tokens) * 1e9:.0f} ns per token')
+
+
+def main():
+    size_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    measure('expressions', parse_throughput.make_source(size_kb))
+    text = ast_memory.make_source(size_kb * 32)
+    measure('statements', text[:text.rfind('\n', 0, size_kb * 1024)])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Measure how StackParser's parse time and peak memory grow with nesting depth.
+
+Parses parenthesised expressions, unary operator chains and nested IF blocks
+at increasing depths. Both columns should grow linearly: ten times the depth
+takes about ten times the time and memory.
+
+Usage:
+    python benchmarks/parse_depth.py [max_depth]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from xbasic.fast_lexer import FastLexer
+from xbasic.stack_parser import StackParser
+
+SHAPES = {
+    'parentheses': lambda depth: '(' * depth + '1' + ')' * depth,
+    'unary': lambda depth: '-' * depth + '1',
+    'IF blocks': lambda depth: 'IF 1 THEN\n' * depth + '1\n' + 'END\n' * depth,
+}
+
+
+def measure(text: str):
+    """Return the wall-clock time and the peak memory of parsing text."""
+    tokens, error = FastLexer('<bench>', text).make_token_buffer()
+    assert error is None
+
+    start = time.perf_counter()
+    result = StackParser(tokens, max_depth=len(tokens)).parse()
+    seconds = time.perf_counter() - start
+    assert result.error is None
+
+    tracemalloc.start()
+    StackParser(tokens, max_depth=len(tokens)).parse()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main():
+    max_depth = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    depths = []
+    depth = 1000
+    while depth <= max_depth:
+        depths.append(depth)
+        depth *= 10
+
+    for name, shape in SHAPES.items():
+        print(name)
+        for depth in depths:
+            seconds, peak = measure(shape(depth))
+            print(f'  depth {depth:>8}: {seconds:7.3f}s {seconds / depth * 1e6:6.2f} us/level'
+                  f'  {peak / (1024 * 1024):8.2f} MB {peak / depth:6.0f} bytes/level')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Measure parser throughput on expression-heavy input, and the deepest
+parenthesised expression that parses under the default recursion limit.
+
+Usage:
+    python benchmarks/parse_throughput.py [size_in_kb]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from xbasic.fast_lexer import FastLexer
+from xbasic.parser import Parser
+
+OPERATORS = ['+', '-', '*', '/', '^', '==', '!=', '<', '>', '<=', '>=', 'and', 'or']
+OPERANDS = ['1', '2.5', 'x', 'y_1', '"s"', 'f(a, 2)', '(b + 3)', '-c', '(not d)']
+
+
+def make_source(size_kb: int) -> str:
+    """Build lines of long operator chains until the source is size_kb kilobytes long."""
+    rnd = random.Random(0)
+    lines = []
+    size = 0
+    while size < size_kb * 1024:
+        parts = [rnd.choice(OPERANDS)]
+        for _ in range(rnd.randint(4, 20)):
+            parts.append(rnd.choice(OPERATORS))
+            parts.append(rnd.choice(OPERANDS))
+        line = 'num v = ' + ' '.join(parts)
+        lines.append(line)
+        size += len(line) + 1
+    return '\n'.join(lines)
+
+
+def measure(text: str):
+    """Return the best of three wall-clock timings for parsing text, and its token count."""
+    tokens, error = FastLexer('<bench>', text).make_token_buffer()
+    assert error is None
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        result = Parser(tokens).parse()
+        best = min(best, time.perf_counter() - start)
+        assert result.error is None
+    return best, len(tokens)
+
+
+def max_depth() -> int:
+    """Return the deepest nesting of parentheses that parses without a RecursionError."""
+    low, high = 1, 10000
+    while low < high:
+        depth = (low + high + 1) // 2
+        tokens, _ = FastLexer('<bench>', '(' * depth + '1' + ')' * depth).make_token_buffer()
+        try:
+            Parser(tokens).parse()
+            low = depth
+        except RecursionError:
+            high = depth - 1
+    return low
+
+
+def main():
+    size_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    text = make_source(size_kb)
+    mb = len(text) / (1024 * 1024)
+
+    seconds, count = measure(text)
+
+    print(f'source:   {mb:.2f} MB, {count} tokens')
+    print(f'parse:    {seconds:.3f}s  {mb / seconds:6.2f} MB/s  {count / seconds / 1e6:.2f}M tokens/s')
+    print(f'nesting:  {max_depth()} parentheses at recursion limit {sys.getrecursionlimit()}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Measure what a call of a user-defined function costs: recursive programs
+that do little but call.
+
+Each program is run with each engine of init_interp.ENGINES, and the best
+time of a few runs is divided by the number of calls it makes. Memoization
+is turned off, since it would answer most of the calls of fib from its
+memo. The recursion is kept shallow enough for the default recursion
+limit of the tree engine.
+
+Usage:
+    python benchmarks/recursion.py [repeats]
+"""
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from xbasic.init_interp import run, ENGINES
+from xbasic.optimizer.memoizer import memo_size
+
+
+def fib_calls(n: int) -> int:
+    """Count the calls fib(n) makes, itself included."""
+    return 1 if n < 2 else 1 + fib_calls(n - 1) + fib_calls(n - 2)
+
+
+# Each program, and the number of calls it makes.
+PROGRAMS = {
+    'fib': ('''
+FN fib(n) -> IF n < 2 THEN n ELSE fib(n - 1) + fib(n - 2)
+fib(18)
+''', fib_calls(18)),
+    'depth': ('''
+FN down(n) -> IF n == 0 THEN 0 ELSE 1 + down(n - 1)
+FOR i = 0 TO 100 THEN down(60)
+''', 100 * 61),
+    'mutual': ('''
+FN is_even(n)
+    IF n == 0 THEN RETURN 1
+    RETURN is_odd(n - 1)
+END
+FN is_odd(n)
+    IF n == 0 THEN RETURN 0
+    RETURN is_even(n - 1)
+END
+FOR i = 0 TO 20 THEN is_even(300)
+''', 20 * 301),
+}
+
+
+def measure(text: str, engine: str, repeats: int) -> float:
+    """Return the best time of a few runs of a program."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            _, error = run('<bench>', text, engine)
+        best = min(best, time.perf_counter() - start)
+        assert error is None, error.as_string()
+    return best
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    memo_size.set(0)
+    print(f"{'program':10}{'calls':>8}" + ''.join(f'{engine:>12}' for engine in ENGINES))
+    for name, (text, calls) in PROGRAMS.items():
+        times = [measure(text, engine, repeats) for engine in ENGINES]
+        print(f'{name:10}{calls:8}' + ''.join(f'{best / calls * 1e6:9.2f} us' for best in times))
+
+
+if __name__ == '__main__':
+    main()
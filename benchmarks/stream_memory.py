@@ -0,0 +1,79 @@
+"""
+Compare run and run_stream on a large generated program: peak memory while
+running it and the time until the first line of output.
+
+Usage:
+    python benchmarks/stream_memory.py [statements]
+"""
+import io
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from xbasic.init_interp import run, run_stream
+
+
+class FirstWrite(io.StringIO):
+    """Records the time of the first write to stdout and drops the output."""
+
+    def __init__(self):
+        super().__init__()
+        self.first = None
+
+    def write(self, s: str) -> int:
+        if self.first is None:
+            self.first = time.perf_counter()
+        return len(s)
+
+
+def make_source(statements: int) -> str:
+    """Build a program of simple top-level statements that prints as it goes."""
+    lines = ['FN square(x) -> x * x']
+    for i in range(statements):
+        lines.append(f'num v{i % 100} = square({i}) + {i} * 2 - 1')
+        if i % 1000 == 0:
+            lines.append(f'print(v{i % 100})')
+    return '\n'.join(lines) + '\n'
+
+
+def measure(path: str, streaming: bool):
+    """Return the peak traced memory in MB and the seconds to first output."""
+    out = FirstWrite()
+    tracemalloc.start()
+    start = time.perf_counter()
+    with redirect_stdout(out):
+        if streaming:
+            with open(path) as f:
+                _, error = run_stream(path, f)
+        else:
+            with open(path) as f:
+                _, error = run(path, f.read())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert error is None
+    return peak / (1024 * 1024), out.first - start
+
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stream_memory.bsx')
+    with open(path, 'w') as f:
+        f.write(make_source(statements))
+    try:
+        size = os.path.getsize(path) / (1024 * 1024)
+        whole_peak, whole_first = measure(path, False)
+        stream_peak, stream_first = measure(path, True)
+    finally:
+        os.remove(path)
+
+    print(f'source: {size:.2f} MB, {statements} statements')
+    print(f'run:        peak {whole_peak:8.2f} MB  first output after {whole_first:.3f}s')
+    print(f'run_stream: peak {stream_peak:8.2f} MB  first output after {stream_first:.3f}s')
+
+
+if __name__ == '__main__':
+    main()
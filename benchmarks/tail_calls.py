@@ -0,0 +1,79 @@
+"""
+Measure what running calls in tail position in the frame of the caller saves.
+
+Every program is run with each engine of init_interp.ENGINES, once with
+full_tracebacks set, making every call like any other, and once with tail
+calls, and the best of a few runs is reported with the speedup of the
+second run.
+
+Usage:
+    python benchmarks/tail_calls.py [repeats]
+"""
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from xbasic.function import full_tracebacks
+from xbasic.init_interp import run, ENGINES
+from xbasic.optimizer.memoizer import memo_size
+
+PROGRAMS = {
+    'accumulate': '''
+FN accumulate(n, total)
+    IF n == 0 THEN RETURN total
+    RETURN accumulate(n - 1, total + n)
+END
+FOR i = 0 TO 20 THEN accumulate(1000, 0)
+''',
+    'mutual': '''
+FN is_even(n)
+    IF n == 0 THEN RETURN 1
+    RETURN is_odd(n - 1)
+END
+FN is_odd(n)
+    IF n == 0 THEN RETURN 0
+    RETURN is_even(n - 1)
+END
+FOR i = 0 TO 20 THEN is_even(1000)
+''',
+}
+
+
+def best_time(text: str, engine: str, repeats: int) -> float:
+    """Return the best time of running a program repeats times."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            _, error = run('<bench>', text, engine)
+        best = min(best, time.perf_counter() - start)
+        assert error is None, error.as_string()
+    return best
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    # Without tail calls, every call of the tree engine recurses in Python.
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 20000))
+    # The programs repeat the same calls, which memoized functions would look up.
+    memo_size.set(0)
+    print(f"{'program':12}" + ''.join(f'{engine:>26}' for engine in ENGINES))
+    for name, text in PROGRAMS.items():
+        row = f'{name:12}'
+        for engine in ENGINES:
+            token = full_tracebacks.set(True)
+            try:
+                full = best_time(text, engine, repeats)
+            finally:
+                full_tracebacks.reset(token)
+            tail = best_time(text, engine, repeats)
+            row += f'{full:7.3f}s ->{tail:7.3f}s ({full / tail:4.2f}x)'
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
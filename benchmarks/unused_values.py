@@ -0,0 +1,67 @@
+"""
+Measure what not building unused values saves: peak memory and time of a
+loop run only for its effects.
+
+The program is run with each engine of init_interp.ENGINES, once with its
+value used, which keeps the list of every value of the loop, and once
+without, as RUN and the file command run scripts.
+
+Usage:
+    python benchmarks/unused_values.py [iterations]
+"""
+import io
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from xbasic.init_interp import run, ENGINES
+
+
+def make_source(iterations: int) -> str:
+    """Build a program summing in a loop, and in a loop in a function."""
+    return f'''
+num total = 0
+FOR i = 0 TO {iterations} THEN num total = total + i
+FN count(n)
+    num j = 0
+    WHILE j < n THEN
+        num j = j + 1
+    END
+    RETURN j
+END
+count({iterations})
+'''
+
+
+def measure(text: str, engine: str, value_used: bool):
+    """Return the peak traced memory in MB and the seconds the program took untraced."""
+    tracemalloc.start()
+    with redirect_stdout(io.StringIO()):
+        _, error = run('<bench>', text, engine, value_used)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert error is None, error.as_string()
+
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        run('<bench>', text, engine, value_used)
+    return peak / (1024 * 1024), time.perf_counter() - start
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    text = make_source(iterations)
+    print(f'{iterations} iterations, peak memory and time with the value used -> unused')
+    for engine in ENGINES:
+        used_peak, used_time = measure(text, engine, True)
+        unused_peak, unused_time = measure(text, engine, False)
+        print(f'{engine:8} {used_peak:8.2f} MB -> {unused_peak:6.2f} MB'
+              f'  {used_time:7.3f}s -> {unused_time:7.3f}s')
+
+
+if __name__ == '__main__':
+    main()
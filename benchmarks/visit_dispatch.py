@@ -0,0 +1,110 @@
+"""
+Measure what Interpreter.visit costs per node to find the handler of a node.
+
+A subclass whose visit methods do nothing is timed three ways on the nodes
+of a parsed program: calling each handler directly, going through visit, and
+going through the name lookup visit used before the dispatch table. The
+difference to the direct calls is the dispatch cost per node. A loop-heavy
+program is then run with the real interpreter.
+
+Usage:
+    python benchmarks/visit_dispatch.py [rounds]
+"""
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from xbasic.fast_lexer import FastLexer
+from xbasic.parser import Parser
+from xbasic.Interpreter import Interpreter
+from xbasic.init_interp import run
+from xbasic.utils import nodes
+
+SOURCE = '''
+FN fib(n) -> IF n < 2 THEN n ELSE fib(n - 1) + fib(n - 2)
+num total = 0
+FOR i = 0 TO 20 THEN num total = total + fib(i) * 2 - [1, "a"] / 1
+WHILE total > 0 THEN num total = total - 1
+RETURN not total
+'''
+
+PROGRAM = '''
+num total = 0
+FOR i = 0 TO 30000 THEN
+    num total = total + i * 2 - 1
+END
+'''
+
+
+class NullInterpreter(Interpreter):
+    pass
+
+
+for _node_type in vars(nodes).values():
+    if isinstance(_node_type, type) and issubclass(_node_type, nodes.Node):
+        setattr(NullInterpreter, f'visit_{_node_type.__name__}', lambda self, node, context: None)
+NullInterpreter.dispatch = NullInterpreter.build_dispatch()
+
+
+def collect(node, found):
+    """Gather every node of a tree."""
+    if isinstance(node, (list, tuple)):
+        for item in node:
+            collect(item, found)
+    elif isinstance(node, nodes.Node):
+        found.append(node)
+        for cls in type(node).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                if name != 'source':
+                    collect(getattr(node, name), found)
+
+
+def by_name(interpreter, node, context):
+    """The lookup visit made before the dispatch table."""
+    method_name = f'visit_{type(node).__name__}'
+    method = getattr(interpreter, method_name, interpreter.no_visit_method)
+    return method(node, context)
+
+
+def time_calls(calls, rounds: int) -> float:
+    """Return the best time per call of running every call rounds times."""
+    best = float('inf')
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for call, node in calls:
+                call(node, None)
+        best = min(best, time.perf_counter() - start)
+    return best / (rounds * len(calls))
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    tokens, error = FastLexer('<bench>', SOURCE).make_token_buffer()
+    found = []
+    collect(Parser(tokens).parse().node, found)
+
+    interpreter = NullInterpreter()
+    direct = time_calls([(getattr(interpreter, f'visit_{type(node).__name__}'), node) for node in found], rounds)
+    table = time_calls([(interpreter.visit, node) for node in found], rounds)
+    named = time_calls([(lambda node, context: by_name(interpreter, node, context), node) for node in found], rounds)
+    named_direct = time_calls([(lambda node, context, call=getattr(interpreter, f'visit_{type(node).__name__}'):
+                                call(node, context), node) for node in found], rounds)
+
+    print(f'nodes:        {len(found)} of {len({type(node) for node in found})} types')
+    print(f'table:        {(table - direct) * 1e9:6.1f} ns dispatch per node')
+    print(f'by name:      {(named - named_direct) * 1e9:6.1f} ns dispatch per node')
+
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        _, error = run('<bench>', PROGRAM)
+    assert error is None
+    print(f'loop program: {time.perf_counter() - start:.3f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Measure what the Interpreter spends per node it visits.
+
+Each program is parsed and optimized once, then its nodes are visited with
+the Interpreter a few times and the best time is divided by the number of
+visits a run makes, counted by a subclass. The programs define no functions,
+since calls visit their bodies with an Interpreter of their own. Run it
+before and after a change to the visit methods to see the cost per node.
+
+Usage:
+    python benchmarks/visit_protocol.py [repeats]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from xbasic.context_handler.context import Context
+from xbasic.init_interp import parse, global_symbol_table
+from xbasic.Interpreter import Interpreter
+
+PROGRAMS = {
+    'arithmetic': '''
+FOR i = 0 TO 20000 THEN i * 3 - i / 2 + (i - 1) * (i + 1) - -i
+''',
+    'loops': '''
+FOR i = 0 TO 300 THEN
+    FOR j = 0 TO 60 THEN
+        IF j < 30 THEN i + j ELSE i - j
+    END
+END
+''',
+    'continue': '''
+FOR i = 0 TO 20000 THEN
+    IF i - i / 2 * 2 == 0 THEN CONTINUE
+    i
+END
+''',
+}
+
+
+class CountingInterpreter(Interpreter):
+    """Counts the nodes it visits."""
+
+    def __init__(self):
+        self.visits = 0
+
+    def visit(self, node, context):
+        self.visits += 1
+        return super().visit(node, context)
+
+
+def new_context() -> Context:
+    """Make a context for a program, like init_interp.run does."""
+    context = Context('<program>')
+    context.symbol_table = global_symbol_table
+    return context
+
+
+def measure(text: str, repeats: int) -> tuple:
+    """Return the number of visits a run of a program makes and the best time of a run."""
+    node, error = parse('<bench>', text)
+    assert error is None, error.as_string()
+
+    counter = CountingInterpreter()
+    counter.visit(node, new_context())
+
+    best = float('inf')
+    for _ in range(repeats):
+        context = new_context()
+        start = time.perf_counter()
+        Interpreter().visit(node, context)
+        best = min(best, time.perf_counter() - start)
+    return counter.visits, best
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'program':12}{'visits':>10}{'best':>10}{'per visit':>12}")
+    for name, text in PROGRAMS.items():
+        visits, best = measure(text, repeats)
+        print(f'{name:12}{visits:10}{best:9.3f}s{best / visits * 1e9:9.0f} ns')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+import unittest
+from xbasic.init_interp import run, global_symbol_table
+from xbasic.optimizer.memoizer import memo_size
+
+
+def run_tree(test, text):
+    token = memo_size.set(0)
+    try:
+        value, error = run('<test>', text, 'tree')
+    finally:
+        memo_size.reset(token)
+    test.assertIsNone(error, error and error.as_string())
+    return repr(value)
+
+
+class TestFrame(unittest.TestCase):
+    def test_reuses_frames_of_recursive_calls(self):
+        value = run_tree(self, 'FN fr_fib(n) -> IF n < 2 THEN n ELSE fr_fib(n - 1) + fr_fib(n - 2)\nfr_fib(12)')
+        self.assertEqual(value, '[<function fr_fib>, 144]')
+        # One frame per level of the recursion, not one per call.
+        self.assertEqual(len(global_symbol_table.get('fr_fib').frames), 12)
+
+    def test_unsets_the_variables_of_earlier_calls(self):
+        text = '''num fr_local = 7
+FN fr_f(n)
+    IF n > 0 THEN num fr_local = n
+    RETURN fr_local
+END
+[fr_f(3), fr_f(0)]'''
+        self.assertEqual(run_tree(self, text), '[7, <function fr_f>, [3, 7]]')
+
+    def test_keeps_frames_functions_made_in_them_refer_to(self):
+        text = '''list fr_kept = [0, 0]
+FN fr_make(n)
+    num twice = n * 2
+    append(fr_kept, FN () -> twice)
+    RETURN twice
+END
+[fr_make(1), fr_make(2), (fr_kept / 2)(), (fr_kept / 3)()]'''
+        self.assertEqual(run_tree(self, text), '[[0, 0, <function <anonymous>>, <function <anonymous>>], '
+                                               '<function fr_make>, [2, 4, 2, 4]]')
+        self.assertEqual(global_symbol_table.get('fr_make').frames, [])
+
+    def test_keeps_frames_functions_looked_up_in_them_refer_to(self):
+        text = '''list fr_saved = [0, 0]
+FN fr_get() -> fr_v
+FN fr_save(fr_v) -> append(fr_saved, fr_get)
+[fr_save(5), fr_save(6), (fr_saved / 2)(), (fr_saved / 3)()]'''
+        self.assertEqual(run_tree(self, text), '[[0, 0, <function fr_get>, <function fr_get>], '
+                                               '<function fr_get>, <function fr_save>, [0, 0, 5, 6]]')
+        self.assertEqual(global_symbol_table.get('fr_save').frames, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,24 @@
+import unittest
+from xbasic.init_interp import run, current_engine
+from tests.Interpreter.engines import PROGRAMS, run_with
+
+
+class TestClosureCompiler(unittest.TestCase):
+    def test_same_as_interpreter(self):
+        for text in PROGRAMS:
+            with self.subTest(text=text):
+                self.assertEqual(run_with('closure', text), run_with('tree', text))
+
+    def test_recursion(self):
+        text = 'FN count(n) -> IF n == 0 THEN 0 ELSE 1 + count(n - 1)\ncount(100)'
+        self.assertEqual(run_with('closure', text)[0], '[<function count>, 100]')
+
+    def test_engine_is_restored(self):
+        run_with('closure', '1')
+        self.assertEqual(current_engine.get(), 'tree')
+        with self.assertRaisesRegex(ValueError, "Unknown engine 'jit'"):
+            run('<test>', '1', 'jit')
+
+
+if __name__ == '__main__':
+    unittest.main()
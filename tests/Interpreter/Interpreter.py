@@ -0,0 +1,61 @@
+import unittest
+from xbasic.Interpreter import Interpreter
+from xbasic.context_handler.context import Context
+from xbasic.init_interp import run, ENGINES
+from xbasic.utils import nodes
+from xbasic.utils.source_file import SourceFile
+
+
+def number(value):
+    return nodes.NumberNode(value, SourceFile('<test>', str(value)), 0, len(str(value)))
+
+
+class TestDispatch(unittest.TestCase):
+    def test_table_covers_nodes(self):
+        for node_type in (nodes.NumberNode, nodes.BinOpNode, nodes.CallNode, nodes.ReturnNode):
+            self.assertIn(node_type, Interpreter.dispatch)
+
+        result = Interpreter().visit(number(3), Context('<test>'))
+        self.assertEqual(result.value, 3)
+
+    def test_subclass_overrides(self):
+        class Doubling(Interpreter):
+            def visit_NumberNode(self, node, context):
+                return node.value * 2
+
+        self.assertEqual(Doubling().visit(number(3), None), 6)
+        self.assertIsNot(Doubling.dispatch, Interpreter.dispatch)
+        self.assertEqual(Interpreter().visit(number(3), Context('<test>')).value, 3)
+
+    def test_unknown_node(self):
+        class UnknownNode(nodes.Node):
+            pass
+
+        with self.assertRaisesRegex(Exception, 'No visit_UnknownNode method defined'):
+            Interpreter().visit(UnknownNode(), None)
+
+
+class TestForLoop(unittest.TestCase):
+    def test_counts_like_written(self):
+        self.assertEqual(list(Interpreter.for_range(0, 5, 2)), [0, 2, 4])
+        self.assertEqual(list(Interpreter.for_range(3, 0, -1)), [3, 2, 1])
+        self.assertEqual(list(Interpreter.for_range(0, 1, 0.25)), [0, 0.25, 0.5, 0.75])
+        self.assertEqual(list(Interpreter.for_range(3, 0, 0)), [])
+
+    def test_continue_break_and_assignment(self):
+        text = '''list seen = [-2, -1]
+FOR i = 0 TO 10 THEN
+    IF i == 3 THEN CONTINUE
+    IF i == 6 THEN BREAK
+    num i = i * 10
+    append(seen, i)
+END
+[seen, i, FOR j = 0 TO 4 THEN j * 2]'''
+        for engine in ENGINES:
+            value, error = run('<test>', text, engine)
+            self.assertIsNone(error, engine)
+            self.assertEqual(repr(value.elements[-1]), '[[-2, -1, 0, 10, 20, 40, 50], 6, [0, 2, 4, 6]]', engine)
+
+
+if __name__ == '__main__':
+    unittest.main()
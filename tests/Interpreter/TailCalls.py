@@ -0,0 +1,44 @@
+import unittest
+from xbasic.function import full_tracebacks
+from xbasic.init_interp import run, ENGINES
+
+ACCUMULATE = '''
+FN tc_acc(n, total)
+    IF n == 0 THEN RETURN total
+    RETURN tc_acc(n - 1, total + n)
+END
+tc_acc(5000, 0)
+'''
+
+FAILING = 'FN tc_d(x)\nnum y = x\nRETURN 1 / x\nEND\nFN tc_e(x)\nRETURN tc_d(x)\nEND\ntc_e(0)'
+
+
+class TestTailCalls(unittest.TestCase):
+    def test_runs_in_constant_stack(self):
+        for engine in ENGINES:
+            value, error = run('<test>', ACCUMULATE, engine)
+            self.assertIsNone(error, engine)
+            self.assertEqual(repr(value), '[<function tc_acc>, 12502500]', engine)
+
+    def test_sees_the_variables_of_the_caller(self):
+        text = 'FN tc_get() -> tc_local\nFN tc_set()\nnum tc_local = 5\nRETURN tc_get()\nEND\ntc_set()'
+        for engine in ENGINES:
+            value, error = run('<test>', text, engine)
+            self.assertEqual(repr(value), '[<function tc_get>, <function tc_set>, 5]', engine)
+
+    def test_tracebacks(self):
+        for engine in ENGINES:
+            _, error = run('<test>', FAILING, engine)
+            self.assertIn('line 8, in <program>\n  File <test>, line 3, in tc_d', error.as_string(), engine)
+
+            token = full_tracebacks.set(True)
+            try:
+                _, error = run('<test>', FAILING, engine)
+            finally:
+                full_tracebacks.reset(token)
+            self.assertIn('line 8, in <program>\n  File <test>, line 6, in tc_e\n  File <test>, line 3, in tc_d',
+                          error.as_string(), engine)
+
+
+if __name__ == '__main__':
+    unittest.main()
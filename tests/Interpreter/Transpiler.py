@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from xbasic.aot import CodeCache, Transpiler, execute, load_module
+from xbasic.context_handler.context import Context
+from xbasic.fast_lexer import FastLexer
+from xbasic.init_interp import global_symbol_table
+from xbasic.parser import Parser
+from tests.Interpreter.engines import PROGRAMS, run_with
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def transpile_text(text, fn='<test>'):
+    tokens, error = FastLexer(fn, text).make_token_buffer()
+    return Transpiler().transpile_program(Parser(tokens).parse().node)
+
+
+class TestTranspiler(unittest.TestCase):
+    def test_same_as_interpreter(self):
+        for text in PROGRAMS:
+            with self.subTest(text=text):
+                self.assertEqual(run_with('aot', text), run_with('tree', text))
+
+    def test_exceptions_point_at_source(self):
+        code = compile(transpile_text('num a = 1\n\nFOR i = "a" TO "c" THEN i'), '<test> (transpiled)', 'exec')
+        context = Context('<program>')
+        context.symbol_table = global_symbol_table
+        with self.assertRaises(TypeError) as cm:
+            execute(load_module(code), context)
+        self.assertIn('  File <test>, line 3, in the xbasic source', cm.exception.__notes__)
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = CodeCache(tmp)
+            code = compile(transpile_text('1 + 2'), 'a.bsx (transpiled)', 'exec')
+            cache.store('a.bsx', '1 + 2', code)
+            self.assertEqual(os.listdir(tmp)[0][-4:], '.bpc')
+            self.assertEqual(cache.load('a.bsx', '1 + 2'), code)
+            self.assertIsNone(cache.load('a.bsx', '1 + 3'))
+
+    def test_module_runs_as_script(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'a.py')
+            with open(path, 'w') as f:
+                f.write(transpile_text('FN f(x) -> x * 2\nprint(f(21))', 'a.bsx'))
+            out = subprocess.run(
+                [sys.executable, path], capture_output=True, text=True,
+                env={**os.environ, 'PYTHONPATH': ROOT}
+            )
+        self.assertEqual(out.stdout, '42\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
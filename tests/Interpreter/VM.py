@@ -0,0 +1,54 @@
+import os
+import pickle
+import tempfile
+import unittest
+from xbasic.context_handler.context import Context
+from xbasic.fast_lexer import FastLexer
+from xbasic.init_interp import global_symbol_table
+from xbasic.parser import Parser
+from xbasic.vm import BytecodeCache, Compiler, VM, disassemble
+from tests.Interpreter.engines import PROGRAMS, run_with
+
+
+def compile_text(text):
+    tokens, error = FastLexer('<test>', text).make_token_buffer()
+    return Compiler().compile_program(Parser(tokens).parse().node)
+
+
+class TestVM(unittest.TestCase):
+    def test_same_as_interpreter(self):
+        for text in PROGRAMS:
+            with self.subTest(text=text):
+                self.assertEqual(run_with('vm', text), run_with('tree', text))
+
+    def test_calls_do_not_recurse(self):
+        text = 'FN count(n) -> IF n == 0 THEN 0 ELSE 1 + count(n - 1)\ncount(3000)'
+        self.assertEqual(run_with('vm', text)[0], '[<function count>, 3000]')
+
+    def test_disassemble(self):
+        listing = disassemble(compile_text('FN f(n) -> n + 1\n\nf(2)'))
+        self.assertIn('   1      0 MAKE_FUNCTION        0  <code f>', listing)
+        self.assertIn('   3      2 LOAD_NAME            0  f', listing)
+        self.assertIn('Disassembly of <code f>:', listing)
+        self.assertIn('BINARY_OP            0  added_to', listing)
+
+    def test_pickled_code_points_at_source(self):
+        code = pickle.loads(pickle.dumps(compile_text('num a = 1\n\na / 0')))
+        context = Context('<program>')
+        context.symbol_table = global_symbol_table
+        value, error = VM().execute(code, context)
+        self.assertIsNone(value)
+        self.assertIn('File <test>, line 3, in <program>', error.as_string())
+        self.assertTrue(error.as_string().endswith('a / 0\n    ^'))
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = BytecodeCache(tmp)
+            cache.store('a.bsx', '1 + 2', compile_text('1 + 2'))
+            self.assertEqual(os.listdir(tmp)[0][-4:], '.bxc')
+            self.assertEqual(disassemble(cache.load('a.bsx', '1 + 2')), disassemble(compile_text('1 + 2')))
+            self.assertIsNone(cache.load('a.bsx', '1 + 3'))
+
+
+if __name__ == '__main__':
+    unittest.main()
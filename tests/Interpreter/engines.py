@@ -0,0 +1,29 @@
+import io
+from contextlib import redirect_stdout
+from xbasic.init_interp import run
+
+# Programs every engine should run like the Interpreter
+PROGRAMS = [
+    '1 + 2 * 3 - -4 / 2',
+    'num a = 5\n[a ^ 2, -a, not 0, 1 == 1 and 0, "ab" * 2]',
+    'FN fib(n) -> IF n < 2 THEN n ELSE fib(n - 1) + fib(n - 2)\nfib(10)',
+    'FN f(x)\n    FOR i = 0 TO 10 THEN\n        IF i == x THEN RETURN i * 10\n    END\n    RETURN -1\nEND\n[f(3), f(20)]',
+    'FN f(x)\n    FOR i = 0 TO 10 THEN\n        IF i == x THEN RETURN i * 10\n    END\n    RETURN\nEND\n[f(3), f(20)]',
+    'FOR i = 10 TO 0 STEP -2 THEN print(i)',
+    'num i = 0\nWHILE i < 3 THEN num i = i + 1\ni',
+    'text s = "ab" * 2\nprint(s)\nlen([1, 2] + 3)',
+    '[1, 1.0, 0.0, -0.0]',
+    'FN g(x) -> x / 0\nFN h(x) -> g(x) + 1\nh(3)',
+    'FN f(a) -> a\nf(1, 2)',
+    'num a = "x"',
+    'undefined + 1',
+    '1 / 0',
+    'RETURN 5',
+]
+
+
+def run_with(engine, text):
+    out = io.StringIO()
+    with redirect_stdout(out):
+        result, error = run('<test>', text, engine)
+    return repr(result), error.as_string() if error else None, out.getvalue()
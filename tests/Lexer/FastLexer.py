@@ -0,0 +1,61 @@
+import os
+import unittest
+from xbasic.lexer import Lexer
+from xbasic.fast_lexer import FastLexer
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'example.bsx')
+
+
+def dump(tokens, error):
+    # Flatten tokens and errors so that positions are compared field by field
+    if error:
+        return (error.as_string(),
+                (error.pos_start.idx, error.pos_start.ln, error.pos_start.col),
+                (error.pos_end.idx, error.pos_end.ln, error.pos_end.col))
+    return [(tok.type, tok.value, type(tok.value),
+             (tok.pos_start.idx, tok.pos_start.ln, tok.pos_start.col),
+             (tok.pos_end.idx, tok.pos_end.ln, tok.pos_end.col)) for tok in tokens]
+
+
+class TestFastLexer(unittest.TestCase):
+    def assertSameTokens(self, text):
+        expected = dump(*Lexer('<test>', text).make_tokens())
+        actual = dump(*FastLexer('<test>', text).make_tokens())
+        self.assertEqual(actual, expected, repr(text))
+
+    def test_example_program(self):
+        with open(EXAMPLE) as f:
+            self.assertSameTokens(f.read())
+
+    def test_numbers_and_identifiers(self):
+        self.assertSameTokens('num x = 12 + 3.5 - 7. * a_b1 / 2 ^ 3')
+        self.assertSameTokens('x = 1.2.3')
+        self.assertSameTokens('IF x THEN y ELIF z THEN w ELSE v END')
+
+    def test_operators(self):
+        self.assertSameTokens('a == b != c <= d >= e < f > g = h -> i - j')
+        self.assertSameTokens('f(a, [1, 2], (3))')
+
+    def test_strings(self):
+        self.assertSameTokens('text s = "hello\\nworld" + "a\\"')
+        self.assertSameTokens('"first line\nsecond line" 1')
+        self.assertSameTokens('"unterminated')
+        self.assertSameTokens('"')
+
+    def test_newlines_and_comments(self):
+        self.assertSameTokens('a; b\n\nc # comment\nd\n')
+        self.assertSameTokens('# only a comment\n')
+
+    def test_illegal_character(self):
+        self.assertSameTokens('a = 1\nb = $')
+        self.assertSameTokens('a\r\nb')
+        self.assertSameTokens('_a')
+
+    def test_expected_character(self):
+        self.assertSameTokens('a ! b')
+        self.assertSameTokens('a !\nb')
+        self.assertSameTokens('a !')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+from xbasic.fast_lexer import FastLexer
+from xbasic.stream_lexer import StreamLexer
+from xbasic.init_interp import run, run_stream
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'example.bsx')
+
+
+def dump(tokens, error):
+    # Flatten tokens and errors so that positions are compared field by field
+    if error:
+        return error.as_string()
+    return [(tok.type, tok.value,
+             (tok.pos_start.idx, tok.pos_start.ln, tok.pos_start.col),
+             (tok.pos_end.idx, tok.pos_end.ln, tok.pos_end.col)) for tok in tokens]
+
+
+def stream_tokens(text):
+    lexer = StreamLexer('<test>', io.StringIO(text))
+    tokens = []
+    while len(tokens) < len(lexer):
+        tokens.append(lexer[len(tokens)])
+    return tokens, lexer.error
+
+
+class TestStreamLexer(unittest.TestCase):
+    def assertSameTokens(self, text):
+        expected = dump(*FastLexer('<test>', text).make_tokens())
+        actual = dump(*stream_tokens(text))
+        self.assertEqual(actual, expected, repr(text))
+
+    def test_example_program(self):
+        with open(EXAMPLE) as f:
+            self.assertSameTokens(f.read())
+
+    def test_strings_over_several_lines(self):
+        self.assertSameTokens('a = "one\ntwo\nthree" + b\nc')
+        self.assertSameTokens('a = "never closed\nb\n')
+
+    def test_comments_and_line_ends(self):
+        self.assertSameTokens('a # comment\nb')
+        self.assertSameTokens('a\n# last line')
+        self.assertSameTokens('a\n\n;b\n')
+
+    def test_errors(self):
+        self.assertSameTokens('a = 1\nb = $\nc')
+        self.assertSameTokens('a = 1\nb = !\nc')
+        self.assertSameTokens('a = 1\nb = !')
+
+    def test_release(self):
+        lexer = StreamLexer('<test>', io.StringIO('a\nb\nc'))
+        lexer[2]
+        lexer.release(2)
+        self.assertEqual(lexer[2].value, 'b')
+        self.assertEqual(lexer[4].value, 'c')
+
+
+class TestRunStream(unittest.TestCase):
+    def run_both(self, text):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            result, error = run_stream('<test>', io.StringIO(text))
+        return result, error, out.getvalue()
+
+    def test_same_result_as_run(self):
+        text = 'num a = 2\nFN f(x) -> x * a\nprint(f(3))\n[f(1), f(2)]'
+        result, error, output = self.run_both(text)
+        self.assertIsNone(error)
+        self.assertEqual(output, '6\n')
+        with redirect_stdout(io.StringIO()):
+            expected, _ = run('<test>', text)
+        self.assertEqual(repr(result), repr(expected))
+
+    def test_statements_run_before_syntax_error(self):
+        result, error, output = self.run_both('print(1)\nprint(2)\n1 +\n')
+        self.assertEqual(output, '1\n2\n')
+        self.assertEqual(error.error_name, 'Invalid Syntax')
+        self.assertEqual(error.pos_start.ln, 2)
+
+    def test_runtime_error_position(self):
+        result, error, output = self.run_both('print(1)\n\n"a" - 1\nprint(2)')
+        self.assertEqual(output, '1\n')
+        self.assertEqual((error.pos_start.ln, error.pos_start.col), (2, 0))
+        self.assertIn('"a" - 1', error.as_string())
+
+
+if __name__ == '__main__':
+    unittest.main()
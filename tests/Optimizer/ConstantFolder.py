@@ -0,0 +1,60 @@
+import unittest
+from xbasic.init_interp import run
+from xbasic.optimizer import optimize
+from xbasic.utils.nodes import BinOpNode, IfNode, NumberNode, StringNode
+from tests.Optimizer.helpers import parsed, optimized
+
+
+class TestConstantFolder(unittest.TestCase):
+    def test_folds_constant_operations(self):
+        node, = optimized('2 * (3 + 4) ^ 2 - -1')
+        self.assertIsInstance(node, NumberNode)
+        self.assertEqual(node.value, 99)
+        self.assertEqual((node.idx_start, node.idx_end), (0, 20))
+
+        node, = optimized('"ab" * 2 + "c"')
+        self.assertIsInstance(node, StringNode)
+        self.assertEqual(node.value, 'ababc')
+
+    def test_keeps_failing_operations(self):
+        node, = optimized('1 / (2 - 2)')
+        self.assertIsInstance(node, BinOpNode)
+        self.assertIsInstance(node.right_node, NumberNode)
+        _, error = run('<test>', '1 / (2 - 2)')
+        self.assertIn('Division by zero', error.as_string())
+
+    def test_prunes_if_cases(self):
+        node, = optimized('IF 0 THEN 1 ELIF 2 > 1 THEN "b" ELSE 3')
+        self.assertIsInstance(node, StringNode)
+
+        node, = optimized('IF 0 THEN 1 ELIF a THEN 2 ELIF 1 THEN 3 ELSE 4')
+        self.assertIsInstance(node, IfNode)
+        self.assertEqual(len(node.cases), 1)
+        self.assertEqual(node.else_case[0].value, 3)
+
+    def test_drops_statements_without_effect(self):
+        _, function = optimized('print(1)\nFN f()\n    1\n    print(2)\n    RETURN 3\n    print(4)\nEND')
+        self.assertEqual(len(function.body_node.element_nodes), 2)
+        self.assertEqual(repr(run('<test>', 'FN f()\n    "x"\n    RETURN 3\n    print(4)\nEND\nf()')[0]),
+                         '[<function f>, 3]')
+
+
+    def test_optimizes_deep_trees_or_leaves_them(self):
+        node, = optimized('1' + ' + 1' * 200)
+        self.assertIsInstance(node, NumberNode)
+        self.assertEqual(node.value, 201)
+
+        # Too deep to optimize, and left as it was parsed.
+        program = parsed('1' + ' + 1' * 5000)
+        self.assertIs(optimize(program), program)
+        node, = program.element_nodes
+        operations = 0
+        while isinstance(node, BinOpNode):
+            self.assertIsInstance(node.right_node, NumberNode)
+            node = node.left_node
+            operations += 1
+        self.assertEqual(operations, 5000)
+
+
+if __name__ == '__main__':
+    unittest.main()
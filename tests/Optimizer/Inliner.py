@@ -0,0 +1,57 @@
+import unittest
+from unittest import mock
+from xbasic.init_interp import run, ENGINES
+from xbasic.number import Number
+from xbasic.utils.nodes import BinOpNode, CallNode, FuncDefNode, InlineNode, SaveNode
+from tests.Optimizer.helpers import optimized, run_everywhere
+
+
+class TestInliner(unittest.TestCase):
+    def test_inlines_small_functions(self):
+        definition, call = optimized('FN in_sq(x) -> x * x\nin_sq(3)')
+        self.assertIsInstance(definition, SaveNode)
+        self.assertIsInstance(definition.node, FuncDefNode)
+        self.assertIsInstance(call, InlineNode)
+        self.assertEqual(call.save_name, definition.var_name)
+        self.assertIsInstance(call.body_node, BinOpNode)
+        self.assertEqual(call.body_node.left_node.var_name, call.param_names[0])
+        self.assertEqual(run_everywhere(self, 'FN in_sq(x) -> x * x\nin_sq(3) + in_sq(in_sq(2))'),
+                         ('[<function in_sq>, 25]', ''))
+
+    def test_keeps_other_calls(self):
+        for text in ('FN in_f(x) -> in_f(x)\nin_f(1)',
+                     'FN in_f(x) -> print(x)\nin_f(1)',
+                     'FN in_f(x) -> x\nFN in_f(x) -> x + 1\nin_f(1)',
+                     'FN in_f(x) -> x\nin_f(1, 2)'):
+            self.assertIsInstance(optimized(text)[-1], CallNode, text)
+
+    def test_calls_rebound_functions(self):
+        self.assertEqual(run_everywhere(self, 'FN in_g(x) -> x * 2\nFN in_h(in_g) -> in_g(3)\nin_h(FN (y) -> y + 1)'),
+                         ('[<function in_g>, <function in_h>, 4]', ''))
+        # Functions see the variables of their caller.
+        self.assertEqual(run_everywhere(self, 'FN in_n(x) -> len(x)\nFN in_k(len) -> in_n([1, 2])\nin_k(FN (y) -> 7)'),
+                         ('[<function in_n>, <function in_k>, 7]', ''))
+
+    def test_reports_errors_from_the_function(self):
+        error, output = run_everywhere(self, 'FN in_d(x) -> x / 0\nFN in_e(y) -> in_d(y)\nin_e(1)')
+        self.assertIn('line 3, in <program>\n  File <test>, line 2, in in_e\n  File <test>, line 1, in in_d', error)
+        self.assertIn('Division by zero', error)
+
+    def test_raises_exceptions_that_are_not_errors(self):
+        multed_by = Number.multed_by
+        for engine in ENGINES:
+            # Fails the first multiplication, which is the inlined body, only.
+            calls = iter([KeyError('in_m')])
+
+            def failing(self, other):
+                error = next(calls, None)
+                if error:
+                    raise error
+                return multed_by(self, other)
+
+            with mock.patch.object(Number, 'multed_by', failing), self.assertRaises(KeyError, msg=engine):
+                run('<test>', 'FN in_m(x) -> x * 2\nin_m(3)', engine)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from xbasic.init_interp import run
+from xbasic.optimizer.loop_optimizer import walk
+from xbasic.utils.nodes import BinOpNode, HoistNode, SaveNode, VarAccessNode
+from xbasic.utils.token_list import TT_MUL
+from tests.Optimizer.helpers import optimized, run_everywhere
+
+
+class TestLoopOptimizer(unittest.TestCase):
+    def test_hoists_invariants(self):
+        _, loop = optimized('num lo_a = 3\nFOR i = 0 TO 4 THEN lo_a * 2 + i')
+        self.assertIsInstance(loop, HoistNode)
+        (var_name, expr), = loop.invariants
+        self.assertIsInstance(expr, BinOpNode)
+        self.assertIsInstance(loop.loop_node.body_node.left_node, VarAccessNode)
+        self.assertEqual(loop.loop_node.body_node.left_node.var_name, var_name)
+        self.assertEqual(run_everywhere(self, 'num lo_a = 3\nFOR i = 0 TO 4 THEN lo_a * 2 + i'), ('[3, [6, 7, 8, 9]]', ''))
+
+    def test_falls_back_when_guards_fail(self):
+        # a + 1 appends to a list, and len is only hoisted while it is the builtin.
+        self.assertEqual(run_everywhere(self, 'FN lo_f(a) -> FOR i = 0 TO 3 THEN len(a + 1)\nlo_f([1])'),
+                         ('[<function lo_f>, [2, 3, 4]]', ''))
+        self.assertEqual(run_everywhere(self, 'FN lo_g(len) -> FOR i = 0 TO 2 THEN len([1])\nlo_g(FN (x) -> 7)'),
+                         ('[<function lo_g>, [7, 7]]', ''))
+
+    def test_reuses_common_subexpressions(self):
+        _, _, loop = optimized('num lo_b = 2\nnum lo_t = 0\n'
+                               'FOR i = 0 TO 5 THEN; num lo_t = lo_t + (lo_b + i) * (lo_b + i); END')
+        product = loop.loop_node.body_node.element_nodes[0].value_node.right_node
+        self.assertIsInstance(product.left_node, SaveNode)
+        self.assertEqual(product.right_node.var_name, product.left_node.var_name)
+        self.assertEqual(run_everywhere(self, 'num lo_b = 2\nnum lo_t = 0\n'
+                                              'FOR i = 0 TO 5 THEN; num lo_t = lo_t + (lo_b + i) * (lo_b + i); END\n'
+                                              'lo_t'), ('[2, 0, 0, 90]', ''))
+
+    def test_reduces_integer_powers(self):
+        loop, = optimized('FOR i = 0 TO 5 THEN i ^ 2')
+        self.assertEqual(loop.body_node.op_type, TT_MUL)
+        self.assertEqual(run_everywhere(self, 'FOR i = 0 TO 5 THEN i ^ 2'), ('[[0, 1, 4, 9, 16]]', ''))
+
+        loop, = optimized('FOR i = 0.5 TO 5 THEN i ^ 2')
+        self.assertNotEqual(loop.body_node.op_type, TT_MUL)
+
+    def test_failing_invariants_fail_in_the_loop(self):
+        self.assertEqual(run_everywhere(self, 'num lo_z = 0\nFOR i = 0 TO 0 THEN 1 / lo_z'), ('[0, []]', ''))
+        _, error = run('<test>', 'num lo_z = 0\nFOR i = 0 TO 2 THEN 1 / lo_z')
+        self.assertIn('Division by zero', error.as_string())
+
+
+    def test_falls_back_to_inner_loops_as_written(self):
+        text = 'num lo_x = 3\n' + ''.join(f'FOR lo_i{i} = 0 TO 1 THEN ' for i in range(12)) + 'lo_x * 2'
+        _, loop = optimized(text)
+        self.assertIsInstance(loop, HoistNode)
+        self.assertIsInstance(loop.loop_node.body_node, HoistNode)
+        self.assertFalse(any(type(node) is HoistNode for node in walk(loop.original_node)))
+        self.assertEqual(run_everywhere(self, text), ('[3, ' + '[' * 12 + '6' + ']' * 12 + ']', ''))
+
+
+    def test_tells_signed_zeros_apart(self):
+        self.assertEqual(run_everywhere(self, 'FOR lo_i = 1 TO 2 THEN [print_ret(0.0), print_ret(-0.0)]'),
+                         ('[[["0.0", "-0.0"]]]', ''))
+
+if __name__ == '__main__':
+    unittest.main()
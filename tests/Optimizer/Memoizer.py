@@ -0,0 +1,52 @@
+import unittest
+from xbasic.optimizer.memoizer import memo_size
+from xbasic.utils.nodes import FuncDefNode, MemoNode, SaveNode
+from tests.Optimizer.helpers import optimized, run_everywhere
+
+
+def memoized(text):
+    nodes = [node.node if isinstance(node, SaveNode) else node for node in optimized(text)]
+    return [node.node.var_name for node in nodes if isinstance(node, MemoNode)]
+
+
+class TestMemoizer(unittest.TestCase):
+    def test_memoizes_pure_functions(self):
+        text = 'FN me_fib(n) -> IF n < 2 THEN n ELSE me_fib(n - 1) + me_fib(n - 2)\n'
+        definition, call = optimized(text + 'me_fib(20)')
+        # Saved for the guard of the recursive calls.
+        self.assertIsInstance(definition, SaveNode)
+        self.assertIsInstance(definition.node, MemoNode)
+        self.assertIsInstance(definition.node.node, FuncDefNode)
+        value, output = run_everywhere(self, text + 'me_fib(20)\nmemo_info(me_fib)')
+        self.assertEqual(value, '[<function me_fib>, 6765, [18, 21]]')
+
+    def test_keeps_other_functions(self):
+        for text in ('FN me_f(n) -> n + offset',
+                     'FN me_f(n) -> print(n)',
+                     'FN me_f(n) -> n\nFN me_g(n) -> me_f(n) + 1\nFN me_f(n) -> n * 2'):
+            self.assertEqual(memoized(text + '\nFN me_r(n) -> IF n THEN me_r(n - 1) ELSE 0'), ['me_r'], text)
+
+    def test_sees_the_variables_of_the_caller(self):
+        value, output = run_everywhere(self, '''FN me_g(n) -> n * 2
+FN me_f(n) -> IF n <= 0 THEN 0 ELSE me_g(n) + me_f(n - 1)
+FN me_h(me_g, k) -> k(3)
+[me_f(3), me_h(FN (y) -> 100, me_f), me_f(3)]''')
+        self.assertTrue(value.endswith('[12, 300, 12]]'), value)
+
+    def test_tells_signed_zeros_apart(self):
+        text = 'FN me_z(x, n) -> IF n THEN me_z(x, n - 1) ELSE print_ret(x)\n[me_z(0.0, 1), me_z(-0.0, 1)]'
+        self.assertEqual(memoized(text), ['me_z'])
+        self.assertEqual(run_everywhere(self, text), ('[<function me_z>, ["0.0", "-0.0"]]', ''))
+
+    def test_memoizes_on_request(self):
+        text = 'FN me_slow(n)\n    print(n)\n    RETURN n * 2\nEND\nmemoize("me_slow")\n[me_slow(4), me_slow(4)]'
+        self.assertEqual(run_everywhere(self, text), ('[<function me_slow>, 0, [8, 8]]', '4\n'))
+        token = memo_size.set(0)
+        try:
+            self.assertEqual(run_everywhere(self, text)[1], '4\n4\n')
+        finally:
+            memo_size.reset(token)
+
+
+if __name__ == '__main__':
+    unittest.main()
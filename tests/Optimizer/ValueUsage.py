@@ -0,0 +1,46 @@
+import unittest
+from xbasic.optimizer import optimize
+from xbasic.utils.nodes import MemoNode, SaveNode
+from tests.Optimizer.helpers import parsed, optimized, run_everywhere
+
+
+def definition(node):
+    while isinstance(node, (SaveNode, MemoNode)):
+        node = node.node
+    return node
+
+
+class TestValueUsage(unittest.TestCase):
+    def test_marks_statements_of_unused_blocks(self):
+        program = optimize(parsed('FOR vu_i = 0 TO 3 THEN vu_i\n[1, 2]'), value_used=False)
+        self.assertTrue(program.should_return_null)
+        loop, literal = program.element_nodes
+        self.assertTrue(loop.should_return_null)
+        self.assertTrue(literal.should_return_null)
+
+        function = definition(optimized('FN vu_f()\n    FOR vu_i = 0 TO 3 THEN vu_i\nEND')[0])
+        self.assertTrue(function.body_node.should_return_null)
+        self.assertTrue(function.body_node.element_nodes[0].should_return_null)
+
+    def test_keeps_used_values(self):
+        program = optimize(parsed('list vu_a = [FOR vu_i = 0 TO 3 THEN vu_i]\nFN vu_f(n) -> FOR vu_i = 0 TO n THEN vu_i'))
+        self.assertFalse(program.should_return_null)
+        assign, function = program.element_nodes
+        function = definition(function)
+        self.assertFalse(assign.value_node.should_return_null)
+        self.assertFalse(assign.value_node.element_nodes[0].should_return_null)
+        self.assertFalse(function.body_node.should_return_null)
+
+    def test_runs_unused_values_for_their_effects(self):
+        text = '''FN vu_f(n)
+    list out = [0, 0]
+    FOR vu_i = 0 TO n THEN
+        IF vu_i == 2 THEN append(out, vu_i)
+        [print(vu_i), vu_i]
+    END
+    RETURN [out, FOR vu_i = 0 TO 3 THEN vu_i * vu_i]
+END
+vu_f(4)'''
+        value, output = run_everywhere(self, text)
+        self.assertEqual(value, '[<function vu_f>, [[0, 0, 2], [0, 1, 4]]]')
+        self.assertEqual(run_everywhere(self, text, value_used=False), ('0', output))
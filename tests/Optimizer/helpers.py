@@ -0,0 +1,28 @@
+import io
+from contextlib import redirect_stdout
+from xbasic.fast_lexer import FastLexer
+from xbasic.init_interp import run, ENGINES
+from xbasic.optimizer import optimize
+from xbasic.parser import Parser
+
+
+def parsed(text):
+    tokens, error = FastLexer('<test>', text).make_token_buffer()
+    return Parser(tokens).parse().node
+
+
+def optimized(text):
+    # The statements of the program, as the optimizer leaves them
+    return optimize(parsed(text)).element_nodes
+
+
+def run_everywhere(test, text, value_used=True):
+    # Run a program with every engine, check that they give the same value or
+    # error and print the same, and return both as the tree engine gives them
+    results = {}
+    for engine in ENGINES:
+        with redirect_stdout(io.StringIO()) as output:
+            value, error = run('<test>', text, engine, value_used)
+        results[engine] = (error.as_string() if error else repr(value), output.getvalue())
+    test.assertEqual(len(set(results.values())), 1, results)
+    return results['tree']
@@ -0,0 +1,80 @@
+import unittest
+from xbasic.fast_lexer import FastLexer
+from xbasic.incremental import Document
+from xbasic.parser import Parser
+
+PROGRAM = 'num a = 1\nFN f(x)\n  RETURN x * 2\nEND\nprint(f(a))\nnum b = a + 2\n'
+
+
+def full_parse(text):
+    tokens, error = FastLexer('<test>', text).make_token_buffer()
+    if error:
+        return None, error
+    res = Parser(tokens).parse()
+    return res.node, res.error
+
+
+def positions(node):
+    return [(n.pos_start.idx, n.pos_start.ln, n.pos_start.col, n.pos_end.idx, n.pos_end.ln, n.pos_end.col)
+            for n in node.element_nodes]
+
+
+class TestDocument(unittest.TestCase):
+    def assertMatchesFullParse(self, document):
+        node, error = full_parse(document.text)
+        res = document.parse_result()
+        if error:
+            self.assertEqual(res.error.as_string(), error.as_string())
+        else:
+            self.assertIsNone(res.error)
+            self.assertEqual(positions(res.node), positions(node))
+            self.assertEqual([type(n) for n in res.node.element_nodes], [type(n) for n in node.element_nodes])
+
+    def test_edit_reparses_only_changed_statement(self):
+        document = Document('<test>', PROGRAM)
+        before = document.nodes
+        changes = document.edit(PROGRAM.index('1'), PROGRAM.index('1') + 1, '10')
+        self.assertEqual((changes.index, changes.removed, len(changes.added)), (0, 1, 1))
+        self.assertEqual(changes.added[0].value_node.value, 10)
+        self.assertIs(document.nodes[1], before[1])
+        self.assertIs(document.nodes[3], before[3])
+        self.assertMatchesFullParse(document)
+
+    def test_inserted_statement(self):
+        document = Document('<test>', PROGRAM)
+        changes = document.edit(len(PROGRAM), len(PROGRAM), 'print(b)\n')
+        self.assertEqual((changes.index, changes.removed, len(changes.added)), (4, 0, 1))
+        self.assertMatchesFullParse(document)
+
+    def test_syntax_error_and_fix(self):
+        document = Document('<test>', PROGRAM)
+        before = document.nodes
+        end = PROGRAM.index('END')
+        document.edit(end, end + 3, 'EN')
+        self.assertMatchesFullParse(document)
+        self.assertIsNotNone(document.error)
+
+        changes = document.update(PROGRAM)
+        self.assertIsNone(document.error)
+        self.assertIs(document.nodes[3], before[3])
+        self.assertEqual(changes.index, 1)
+        self.assertMatchesFullParse(document)
+
+    def test_illegal_character(self):
+        document = Document('<test>', PROGRAM)
+        document.edit(3, 3, '$')
+        self.assertEqual(document.error.as_string(), full_parse(document.text)[1].as_string())
+        document.edit(3, 4, '')
+        self.assertIsNone(document.error)
+        self.assertMatchesFullParse(document)
+
+    def test_tokens_match_fast_lexer(self):
+        document = Document('<test>', PROGRAM)
+        document.update(PROGRAM.replace('"', '').replace('a + 2', 'a + "two"  # comment'))
+        tokens, _ = FastLexer('<test>', document.text).make_tokens()
+        self.assertEqual([(repr(t), t.pos_start.idx, t.pos_end.idx) for t in document.tokens()],
+                         [(repr(t), t.pos_start.idx, t.pos_end.idx) for t in tokens])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+from xbasic.fast_lexer import FastLexer
+from xbasic.parser import Parser
+from xbasic.utils.nodes import BinOpNode
+from xbasic.utils.parse_result import ParseError
+
+
+class CountingParser(Parser):
+    # Counts every token the parser moves onto
+    def __init__(self, tokens):
+        self.advances = 0
+        super().__init__(tokens)
+
+    def advance(self):
+        self.advances += 1
+        return super().advance()
+
+
+def parse(text):
+    tokens, error = FastLexer('<test>', text).make_tokens()
+    return Parser(tokens).parse()
+
+
+class TestParserOperators(unittest.TestCase):
+    def assertTree(self, text, expected):
+        result = parse(text)
+        self.assertIsNone(result.error)
+        self.assertEqual(repr(result.node.element_nodes[0]), expected)
+
+    def test_precedence(self):
+        self.assertTree('1 + 2 * 3', '(INT:1, PLUS, (INT:2, MUL, INT:3))')
+        self.assertTree('1 * 2 + 3 < 4 and 5', '((((INT:1, MUL, INT:2), PLUS, INT:3), LT, INT:4), KEYWORD:and, INT:5)')
+        self.assertTree('2 ^ 3 * 4', '((INT:2, POW, INT:3), MUL, INT:4)')
+
+    def test_associativity(self):
+        self.assertTree('1 - 2 - 3', '((INT:1, MINUS, INT:2), MINUS, INT:3)')
+        self.assertTree('1 < 2 == 3', '((INT:1, LT, INT:2), EE, INT:3)')
+        self.assertTree('2 ^ 3 ^ 4', '(INT:2, POW, (INT:3, POW, INT:4))')
+
+    def test_unary_operators(self):
+        self.assertTree('-2 ^ 3', '(MINUS, (INT:2, POW, INT:3))')
+        self.assertTree('-2 * 3', '((MINUS, INT:2), MUL, INT:3)')
+        self.assertTree('2 ^ -3', '(INT:2, POW, (MINUS, INT:3))')
+        self.assertTree('not 1 == 2 or 3', '((KEYWORD:not, (INT:1, EE, INT:2)), KEYWORD:or, INT:3)')
+
+    def test_errors(self):
+        self.assertIn("Expected 'RETURN'", parse(')').error.as_string())
+        self.assertIn("'FN' or 'not'", parse('1 and )').error.as_string())
+        self.assertIn("Expected int, float, identifier, '+', '-', '(', '[', IF'", parse('1 == not 2').error.as_string())
+        self.assertIn("Expected ',' or ')'", parse('f(1 2)').error.as_string())
+
+
+class TestParserRules(unittest.TestCase):
+    def parser(self, text):
+        tokens, error = FastLexer('<test>', text).make_tokens()
+        return Parser(tokens)
+
+    def test_rules_return_nodes(self):
+        self.assertIsInstance(self.parser('1 + 2').expr(), BinOpNode)
+
+    def test_rules_raise_parse_error(self):
+        with self.assertRaises(ParseError) as cm:
+            self.parser('FOR i = 1 2').expr()
+        self.assertEqual(cm.exception.error.details, "Expected 'TO'")
+        self.assertEqual(cm.exception.error.pos_start.col, 10)
+
+    def test_override_only_without_progress(self):
+        # A rule that fails on its first token is reported by its caller;
+        # one that failed further on keeps its own error
+        self.assertIn("Expected ')', 'VAR'", parse('f(THEN)').error.as_string())
+        self.assertIn("Expected ')'\n", parse('f((1 2)').error.as_string())
+        self.assertIn("Expected ']', 'VAR'", parse('[)').error.as_string())
+
+
+class TestParserLinear(unittest.TestCase):
+    def parse_counting(self, text):
+        tokens, error = FastLexer('<test>', text).make_tokens()
+        parser = CountingParser(tokens)
+        return parser, parser.parse(), len(tokens)
+
+    def test_long_statement_list(self):
+        for count in (100, 1000, 10000):
+            parser, result, token_count = self.parse_counting('num x = 1 + 2\n' * count)
+            self.assertIsNone(result.error)
+            self.assertEqual(len(result.node.element_nodes), count)
+            self.assertEqual(parser.advances, token_count)
+
+    def test_nested_blocks(self):
+        text = 'FOR i = 1 TO 3 THEN\n' + 'WHILE x THEN\nIF y THEN\nRETURN 1\nEND\nEND\n' * 1000 + 'END'
+        parser, result, token_count = self.parse_counting(text)
+        self.assertIsNone(result.error)
+        self.assertEqual(parser.advances, token_count)
+
+    def test_errors_do_not_backtrack(self):
+        # The parser stops at the error, having read every token before it once
+        for text in ('a\n' * 1000 + 'b +', 'FN f()\n' + 'a\n' * 1000 + '1 +\nEND', 'RETURN ' + '1 + ' * 1000):
+            parser, result, _ = self.parse_counting(text)
+            self.assertIsNotNone(result.error)
+            self.assertEqual(parser.advances, parser.tok_idx + 1)
+            self.assertEqual(result.error.pos_start.idx, parser.current_tok.idx_start)
+
+    def test_statement_errors(self):
+        self.assertIn('Token cannot appear after previous tokens', parse('1\nEND').error.as_string())
+        error = parse('1\n2 + )').error
+        self.assertEqual((error.pos_start.ln, error.pos_start.col), (1, 4))
+
+    def test_loop_control_outside_loops(self):
+        self.assertIsNone(parse('FOR i = 0 TO 3 THEN\n  IF i THEN CONTINUE\n  WHILE 1 THEN BREAK\nEND').error)
+        for text in ('CONTINUE', 'WHILE 1 THEN 2\nBREAK', 'FOR i = 0 TO 3 THEN\n  FN f()\n    BREAK\n  END\nEND'):
+            error = parse(text).error
+            self.assertIn('outside of a loop', error.as_string(), text)
+
+
+if __name__ == '__main__':
+    unittest.main()
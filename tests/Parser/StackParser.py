@@ -0,0 +1,101 @@
+import unittest
+from xbasic.fast_lexer import FastLexer
+from xbasic.init_interp import parse, run, max_depth
+from xbasic.parser import Parser
+from xbasic.stack_parser import StackParser
+
+PROGRAMS = [
+    'num a = 1 + 2 * -3 ^ 2 ^ 2\nprint(a, [1, (2), "x"])',
+    'FN f(x, y) -> IF x > y THEN x ELIF not x THEN y ELSE x - y\nf(1, 2)(3)',
+    'FOR i = 0 TO 10 STEP 2 THEN\n  IF i == 4 THEN CONTINUE\n  WHILE i < 3 THEN BREAK\nEND',
+    'FN g()\n  RETURN\nEND\nRETURN g() or 1 and 0',
+    'num = 1',
+    '1 + (2 * 3',
+    'print(1, )',
+    'IF 1 THEN\n2\nELSE\n3',
+    '1 2',
+    'WHILE 1 THEN 2\nBREAK',
+    'FOR i = 0 TO 3 THEN\n  FN f()\n    CONTINUE\n  END\nEND',
+]
+
+
+def tokens(text):
+    tokens, error = FastLexer('<test>', text).make_token_buffer()
+    return tokens
+
+
+def dump(node):
+    # Flatten a tree into nested lists of node types and fields
+    if isinstance(node, (list, tuple)):
+        return [dump(item) for item in node]
+    if not hasattr(node, 'idx_start'):
+        return node
+    names = [name for cls in type(node).__mro__ for name in getattr(cls, '__slots__', ()) if name != 'source']
+    return [type(node).__name__] + [dump(getattr(node, name)) for name in names]
+
+
+class TestStackParser(unittest.TestCase):
+    def test_same_as_parser(self):
+        for text in PROGRAMS:
+            expected = Parser(tokens(text)).parse()
+            result = StackParser(tokens(text)).parse()
+            if expected.error:
+                self.assertEqual(result.error.as_string(), expected.error.as_string())
+            else:
+                self.assertIsNone(result.error)
+                self.assertEqual(dump(result.node), dump(expected.node))
+
+    def test_deep_nesting(self):
+        depth = 5000
+        result = StackParser(tokens('(' * depth + '1' + ')' * depth)).parse()
+        self.assertIsNone(result.error)
+
+        result = StackParser(tokens('IF 1 THEN\n' * depth + '2\n' + 'END\n' * depth)).parse()
+        self.assertIsNone(result.error)
+        node = result.node
+        for _ in range(depth):
+            node = node.element_nodes[0].cases[0][1]
+        self.assertEqual(node.element_nodes[0].value, 2)
+
+    def test_nesting_limit(self):
+        # The statement and the right operand of '+' are two levels, each parenthesis one more
+        text = '1 + ' + '(' * 10 + '1' + ')' * 10
+        self.assertIsNone(StackParser(tokens(text), max_depth=12).parse().error)
+
+        error = StackParser(tokens(text), max_depth=11).parse().error
+        self.assertEqual(error.error_name, 'Invalid Syntax')
+        self.assertEqual(error.details, 'Nesting exceeds the maximum depth of 11')
+        self.assertEqual(error.pos_start.col, 14)
+
+    def test_siblings_do_not_nest(self):
+        text = ' + '.join(['(1)'] * 2000) + '\n' + '\n'.join(['f(1, 2)'] * 2000)
+        self.assertIsNone(StackParser(tokens(text), max_depth=3).parse().error)
+
+    def test_parse_at_run_time(self):
+        text = 'IF 1 THEN\n' * 2000 + '2\n' + 'END\n' * 2000
+
+        # Parser runs out of recursion, which is reported like the limit of a StackParser
+        node, error = parse('<test>', text)
+        self.assertIsNone(node)
+        self.assertIn('Nesting exceeds the recursion limit of the parser', error.as_string())
+
+        token = max_depth.set(100)
+        try:
+            node, error = parse('<test>', text)
+            self.assertIn('Nesting exceeds the maximum depth of 100', error.as_string())
+            self.assertIsNone(run('<test>', 'IF 1 THEN\n' * 50 + '2\n' + 'END\n' * 50)[1])
+        finally:
+            max_depth.reset(token)
+
+        # Nesting parsed with a StackParser, but too deep to run, fails cleanly
+        token = max_depth.set(5000)
+        try:
+            value, error = run('<test>', text)
+        finally:
+            max_depth.reset(token)
+        self.assertIsNone(value)
+        self.assertIn('Maximum recursion depth exceeded', error.as_string())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import io
+import os
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+from xbasic.fast_lexer import FastLexer
+from xbasic.parser import Parser
+from xbasic.utils.ast_cache import AstCache, CACHE_DIR_NAME
+from xbasic.init_interp import run
+
+TEXT = 'FN add(a, b) -> a + b\nprint(add(1, 2))\n"a" - 1'
+
+
+def dump(node):
+    # Flatten a tree into nested lists of node types, token values and offsets
+    if isinstance(node, (list, tuple)):
+        return [dump(item) for item in node]
+    if not hasattr(node, 'idx_start'):
+        return node
+    fields = getattr(node, '__dict__', {})
+    return [type(node).__name__, node.idx_start, node.idx_end,
+            getattr(node, 'value', None)] + [dump(fields[name]) for name in sorted(fields) if name != 'source']
+
+
+def parse(fn, text):
+    tokens, error = FastLexer(fn, text).make_token_buffer()
+    return Parser(tokens).parse().node
+
+
+class TestAstCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = AstCache(os.path.join(self.tmp.name, CACHE_DIR_NAME))
+
+    def test_round_trip(self):
+        node = parse('a.bsx', TEXT)
+        self.assertIsNone(self.cache.load('a.bsx', TEXT))
+        self.cache.store('a.bsx', TEXT, node)
+
+        loaded = self.cache.load('a.bsx', TEXT)
+        self.assertEqual(dump(loaded), dump(node))
+        last = loaded.element_nodes[-1]
+        self.assertEqual((last.pos_start.ln, last.pos_start.col, last.pos_end.col), (2, 0, 7))
+        self.assertEqual(last.pos_start.ftxt, TEXT)
+
+    def test_key_covers_text_and_name(self):
+        self.cache.store('a.bsx', TEXT, parse('a.bsx', TEXT))
+        self.assertIsNone(self.cache.load('a.bsx', TEXT + ' '))
+        self.assertIsNone(self.cache.load('b.bsx', TEXT))
+
+    def test_damaged_entry_is_a_miss(self):
+        self.cache.store('a.bsx', TEXT, parse('a.bsx', TEXT))
+        with open(self.cache.path(self.cache.key('a.bsx', TEXT)), 'wb') as f:
+            f.write(b'not a pickle')
+        self.assertIsNone(self.cache.load('a.bsx', TEXT))
+
+    def test_eviction(self):
+        texts = [f'num x = {i}' for i in range(6)]
+        for i, text in enumerate(texts):
+            self.cache.store('a.bsx', text, parse('a.bsx', text))
+            path = self.cache.path(self.cache.key('a.bsx', text))
+            os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+        size = os.path.getsize(path)
+
+        self.cache.max_bytes = size * 3
+        self.cache.load('a.bsx', texts[0])
+        self.cache.evict()
+        kept = [text for text in texts if os.path.exists(self.cache.path(self.cache.key('a.bsx', text)))]
+        self.assertEqual(kept, [texts[0], texts[4], texts[5]])
+
+    def test_run_uses_cache(self):
+        path = os.path.join(self.tmp.name, 'script.bsx')
+        with open(path, 'w') as f:
+            f.write(TEXT)
+
+        outputs = []
+        for _ in range(2):
+            out = io.StringIO()
+            with redirect_stdout(out):
+                _, error = run(path, TEXT)
+            outputs.append((out.getvalue(), error.as_string()))
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(len(os.listdir(os.path.join(self.tmp.name, CACHE_DIR_NAME))), 1)
+
+        with mock.patch('xbasic.parser.Parser.parse', side_effect=AssertionError('parsed again')):
+            with redirect_stdout(io.StringIO()):
+                run(path, TEXT)
+
+    def test_cache_can_be_turned_off(self):
+        path = os.path.join(self.tmp.name, 'script.bsx')
+        with open(path, 'w') as f:
+            f.write(TEXT)
+        with mock.patch.dict(os.environ, {'XBASIC_NO_CACHE': '1'}):
+            self.assertIsNone(AstCache.for_file(path))
+        self.assertIsNone(AstCache.for_file('<stdin>'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from xbasic.check import find_scripts, check_file, check_files
+from xbasic.init_interp import parse
+
+SCRIPTS = {
+    'ok.bsx': 'FN add(a, b) -> a + b\nprint(add(1, 2))\n',
+    'sub/syntax.bsx': 'num x = (1 +\n',
+    'sub/char.bsx': 'num x = 1 $\n',
+    'sub/deep.bsx': '(' * 20000 + '1' + ')' * 20000,
+    'sub/notes.txt': 'not a script',
+}
+
+
+class TestCheck(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        for name, text in SCRIPTS.items():
+            path = os.path.join(self.tmp.name, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(text)
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_find_scripts(self):
+        self.assertEqual(find_scripts([self.tmp.name, self.path('sub/notes.txt')]), [
+            self.path('ok.bsx'), self.path('sub/char.bsx'), self.path('sub/deep.bsx'),
+            self.path('sub/syntax.bsx'), self.path('sub/notes.txt'),
+        ])
+
+    def test_check_file(self):
+        fn, error, seconds = check_file(self.path('ok.bsx'))
+        self.assertEqual(fn, self.path('ok.bsx'))
+        self.assertIsNone(error)
+        self.assertGreaterEqual(seconds, 0)
+
+        self.assertTrue(check_file(self.path('sub/syntax.bsx'))[1].startswith('Invalid Syntax'))
+        self.assertTrue(check_file(self.path('sub/char.bsx'))[1].startswith('Illegal Character'))
+        self.assertTrue(check_file(self.path('sub/deep.bsx'))[1].startswith('Invalid Syntax: Nesting exceeds'))
+
+    def test_parses_like_run(self):
+        with open(self.path('sub/deep.bsx')) as f:
+            text = f.read()
+        self.assertEqual(check_file(self.path('sub/deep.bsx'))[1], parse(self.path('sub/deep.bsx'), text)[1].as_string())
+
+        # A deeper max_depth parses it with an explicit stack, like `xbasic file --max-depth` would
+        self.assertIsNone(check_file(self.path('sub/deep.bsx'), max_depth=30000)[1])
+        self.assertTrue(check_file(self.path('sub/deep.bsx'), max_depth=100)[1].startswith(
+            'Invalid Syntax: Nesting exceeds the maximum depth of 100'))
+
+    def test_does_not_run_scripts(self):
+        with open(self.path('side_effect.bsx'), 'w') as f:
+            f.write('RUN("%s")\n' % self.path('missing.bsx'))
+        self.assertIsNone(check_file(self.path('side_effect.bsx'))[1])
+
+    def test_pool_matches_serial(self):
+        scripts = find_scripts([self.tmp.name])
+        serial = [(fn, error) for fn, error, _ in check_files(scripts, jobs=1)]
+        pooled = [(fn, error) for fn, error, _ in check_files(scripts, jobs=2)]
+        self.assertEqual(pooled, serial)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from xbasic.utils.source_file import MAX_CACHED_POSITIONS, SourceFile
+
+
+class TestSourceFile(unittest.TestCase):
+    def test_line_col(self):
+        source = SourceFile('file.bsx', 'ab\ncd\n\nef')
+        self.assertEqual(source.line_starts, [0, 3, 6, 7])
+        self.assertEqual(source.line_col(0), (0, 0))
+        self.assertEqual(source.line_col(2), (0, 2))
+        self.assertEqual(source.line_col(3), (1, 0))
+        self.assertEqual(source.line_col(6), (2, 0))
+        self.assertEqual(source.line_col(9), (3, 2))
+        # Offsets past the end stay on the last line
+        self.assertEqual(source.line_col(11), (3, 4))
+
+    def test_position(self):
+        source = SourceFile('file.bsx', 'ab\ncd')
+        pos = source.position(4)
+        self.assertEqual((pos.idx, pos.ln, pos.col, pos.fn, pos.ftxt), (4, 1, 1, 'file.bsx', 'ab\ncd'))
+        self.assertIs(source.position(4), pos)
+
+    def test_cached_positions_are_bounded(self):
+        source = SourceFile('file.bsx', 'a\n' * MAX_CACHED_POSITIONS)
+        for idx in range(2 * MAX_CACHED_POSITIONS + 1):
+            source.position(idx)
+            source.end_position(idx)
+        self.assertLessEqual(len(source.positions), MAX_CACHED_POSITIONS)
+        self.assertLessEqual(len(source.end_positions), MAX_CACHED_POSITIONS)
+        pos = source.position(5)
+        self.assertEqual((pos.idx, pos.ln, pos.col), (5, 2, 1))
+
+    def test_end_position(self):
+        source = SourceFile('file.bsx', 'ab\ncd # c\nef')
+        # A token ending on a newline stays on the newline's line
+        pos = source.end_position(3)
+        self.assertEqual((pos.idx, pos.ln, pos.col), (3, 0, 3))
+        self.assertEqual(source.end_position(2), source.position(2))
+
+        # The newline closing a comment moves on to the next line
+        source.comment_newlines.add(9)
+        pos = source.end_position(10)
+        self.assertEqual((pos.idx, pos.ln, pos.col), (10, 2, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
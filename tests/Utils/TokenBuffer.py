@@ -0,0 +1,31 @@
+import unittest
+from xbasic.fast_lexer import FastLexer
+from xbasic.lexer import Lexer
+from xbasic.utils.token_list import TT_IDENTIFIER, TT_KEYWORD, TT_INT, TT_EOF, KW_IF, KW_THEN
+
+
+class TestTokenBuffer(unittest.TestCase):
+    def test_views_match_lexer(self):
+        text = 'IF abc THEN\n  num x = 1.5 + abc\nEND'
+        buffer, error = FastLexer('<test>', text).make_token_buffer()
+        self.assertIsNone(error)
+        tokens, error = Lexer('<test>', text).make_tokens()
+        self.assertEqual(len(buffer), len(tokens))
+        for view, tok in zip(buffer, tokens):
+            self.assertEqual((view.type, view.keyword, view.value, view.idx_start, view.idx_end),
+                             (tok.type, tok.keyword, tok.value, tok.idx_start, tok.idx_end))
+            self.assertEqual(repr(view), repr(tok))
+
+    def test_integer_kinds_and_keywords(self):
+        buffer, _ = FastLexer('<test>', 'IF x THEN 1').make_token_buffer()
+        self.assertEqual(list(buffer.kinds), [TT_KEYWORD, TT_IDENTIFIER, TT_KEYWORD, TT_INT, TT_EOF])
+        self.assertEqual(list(buffer.keywords), [KW_IF, 0, KW_THEN, 0, 0])
+        self.assertEqual(repr(buffer[0]), 'KEYWORD:IF')
+
+    def test_identifiers_are_interned(self):
+        buffer, _ = FastLexer('<test>', 'total + total').make_token_buffer()
+        self.assertIs(buffer.values[0], buffer.values[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,94 @@
+import inspect
+
 from .string_value import String
-from .error_handler.rtresult import RTResult
+from .error_handler.rtresult import RuntimeFailure, FunctionReturn, LoopContinue, LoopBreak, unwrap
 from .utils.token_list import *
 from .number import Number
 from .list import List
 from .error_handler.rterror import RTError
+from .utils.nodes import CallNode, VarAccessNode
+from .function import Function, TailCall
+
+# The method of the left operand a binary operator calls.
+OPERATOR_METHODS = {
+    TT_PLUS: 'added_to',
+    TT_MINUS: 'subbed_by',
+    TT_MUL: 'multed_by',
+    TT_DIV: 'dived_by',
+    TT_POW: 'powed_by',
+    TT_EE: 'get_comparison_eq',
+    TT_NE: 'get_comparison_ne',
+    TT_LT: 'get_comparison_lt',
+    TT_GT: 'get_comparison_gt',
+    TT_LTE: 'get_comparison_lte',
+    TT_GTE: 'get_comparison_gte',
+}
+
+KEYWORD_METHODS = {
+    KW_AND: 'anded_by',
+    KW_OR: 'ored_by',
+}
 
 
 class Interpreter:
+    """
+    Runs an AST by visiting its nodes.
+
+    Each visit method returns the value of its node. Errors, RETURN, CONTINUE
+    and BREAK are rare, so they are raised as RuntimeFailure, FunctionReturn,
+    LoopContinue and LoopBreak instead of being checked for after every
+    child. They are caught where they end: RETURN in Function.call, CONTINUE
+    and BREAK in their loop, and errors in execute, which gives the result
+    of a program.
+    """
+
+    # Maps each node class to the function visiting it. Every subclass gets
+    # its own table, filled in for the classes of utils/nodes.py when the
+    # class is created and for any other class when it is first visited.
+    dispatch = {}
+
+    # Whether a RETURN of a call gives the call for Function.execute to make
+    # in place of the function, instead of making it. Set for function bodies.
+    tail_calls = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.dispatch = cls.build_dispatch()
+
+    @classmethod
+    def build_dispatch(cls) -> dict:
+        """
+        Build the dispatch table for the node classes of utils/nodes.py.
+
+        Returns:
+            dict: The handler of each node class.
+        """
+        from .utils import nodes
+        return {
+            node_type: cls.find_handler(node_type)
+            for node_type in vars(nodes).values()
+            if isinstance(node_type, type) and issubclass(node_type, nodes.Node) and node_type is not nodes.Node
+        }
+
+    @classmethod
+    def find_handler(cls, node_type: type):
+        """
+        Find the function visiting a node class, by the name of its visit method.
+
+        Args:
+            node_type (type): The class of the node.
+
+        Returns:
+            Callable: A function taking the interpreter, the node and the context.
+        """
+        method = inspect.getattr_static(cls, f'visit_{node_type.__name__}', None)
+        if method is None:
+            return cls.no_visit_method
+        if isinstance(method, staticmethod):
+            function = method.__func__
+            return lambda self, node, context: function(node, context)
+        return method
+
     def visit(self, node, context):
         """
         Visit a node and execute it in the provided context.
@@ -16,11 +98,35 @@ class Interpreter:
             context: The context in which to execute the node.
 
         Returns:
-            RTResult: The result of executing the node.
+            Value: The value of the node.
+
+        Raises:
+            RuntimeFailure: If running the node failed.
+            FunctionReturn: If the node returned from the function it is in.
+        """
+        handler = self.dispatch.get(type(node))
+        if handler is None:
+            handler = self.dispatch[type(node)] = self.find_handler(type(node))
+        return handler(self, node, context)
+
+    def execute(self, node, context) -> tuple:
+        """
+        Run a program.
+
+        Args:
+            node (ListNode): The program.
+            context (Context): The context to run the program in.
+
+        Returns:
+            tuple: A tuple containing the result value and error, if any.
         """
-        method_name = f'visit_{type(node).__name__}'
-        method = getattr(self, method_name, self.no_visit_method)
-        return method(node, context)
+        try:
+            return self.visit(node, context), None
+        except RuntimeFailure as e:
+            return None, e.error
+        except FunctionReturn:
+            # A RETURN outside of any function ends the program without a value.
+            return None, None
 
     def no_visit_method(self, node, context):
         """
@@ -30,15 +136,14 @@ class Interpreter:
             node: The node for which the visit method is not defined.
             context: The context in which the node was being executed.
 
-        Returns:
-            RTResult: An RTResult with a failure indicating the lack of defined visit method.
+        Raises:
+            Exception: Always.
         """
         raise Exception(f'No visit_{type(node).__name__} method defined')
 
     ###################################
 
-    @staticmethod
-    def visit_NumberNode(node, context):
+    def visit_NumberNode(self, node, context):
         """
         Visit a NumberNode and evaluate its value.
 
@@ -47,14 +152,11 @@ class Interpreter:
             context (Context): The context in which to execute the node.
 
         Returns:
-            RTResult: The result of evaluating the NumberNode.
+            Value: The value of evaluating the NumberNode.
         """
-        return RTResult().success(
-            Number(node.tok.value).set_context(context).set_pos(node.pos_start, node.pos_end)
-        )
+        return Number(node.value).set_context(context).set_pos(node.pos_start, node.pos_end)
 
-    @staticmethod
-    def visit_StringNode(node, context):
+    def visit_StringNode(self, node, context):
         """
         Visit a StringNode and evaluate its value.
 
@@ -63,12 +165,10 @@ class Interpreter:
             context (Context): The context in which to execute the node.
 
         Returns:
-            RTResult: The result of evaluating the StringNode.
+            Value: The value of evaluating the StringNode.
         """
         # from .string_value import String
-        return RTResult().success(
-            String(node.tok.value).set_context(context).set_pos(node.pos_start, node.pos_end)
-        )
+        return String(node.value).set_context(context).set_pos(node.pos_start, node.pos_end)
 
     def visit_ListNode(self, node, context):
         """
@@ -79,22 +179,20 @@ class Interpreter:
             context (Context): The context in which to execute the node.
 
         Returns:
-            RTResult: The result of evaluating the ListNode.
+            Value: The value of evaluating the ListNode.
         """
-        res = RTResult()
-        elements = []
+        visit = self.visit
 
-        for element_node in node.element_nodes:
-            elements.append(res.register(self.visit(element_node, context)))
-            if res.should_return():
-                return res
+        # A block whose value is never used only runs its statements.
+        if node.should_return_null:
+            for element_node in node.element_nodes:
+                visit(element_node, context)
+            return Number.null
 
-        return res.success(
-            List(elements).set_context(context).set_pos(node.pos_start, node.pos_end)
-        )
+        elements = [visit(element_node, context) for element_node in node.element_nodes]
+        return List(elements).set_context(context).set_pos(node.pos_start, node.pos_end)
 
-    @staticmethod
-    def visit_VarAccessNode(node, context):
+    def visit_VarAccessNode(self, node, context):
         """
         Visit a VarAccessNode and retrieve its value from the symbol table.
 
@@ -103,21 +201,19 @@ class Interpreter:
             context (Context): The context in which to execute the node.
 
         Returns:
-            RTResult: The result of evaluating the VarAccessNode.
+            Value: The value of evaluating the VarAccessNode.
         """
-        res = RTResult()
-        var_name = node.var_name_tok.value
+        var_name = node.var_name
         value = context.symbol_table.get(var_name)
 
         if not value:
-            return res.failure(RTError(
+            raise RuntimeFailure(RTError(
                 node.pos_start, node.pos_end,
                 f"'{var_name}' is not defined",
                 context
             ))
 
-        value = value.copy().set_pos(node.pos_start, node.pos_end).set_context(context)
-        return res.success(value)
+        return value.copy().set_pos(node.pos_start, node.pos_end).set_context(context)
 
     def visit_VarAssignNode(self, node, context):
         """
@@ -128,36 +224,93 @@ class Interpreter:
             context (Context): The context in which to execute the node.
 
         Returns:
-            RTResult: The result of evaluating the VarAssignNode.
+            Value: The value of evaluating the VarAssignNode.
         """
-        res = RTResult()
-        var_name = node.var_name_tok.value
-        value = res.register(self.visit(node.value_node, context))
-        if res.should_return():
-            return res
+        var_name = node.var_name
+        value = self.visit(node.value_node, context)
 
-        from .lexer import Lexer
-        obj = Lexer("fn", str(value))
+        error = self.check_dtype(value, node.dtype)
+        if error:
+            raise RuntimeFailure(RTError(
+                node.pos_start, node.pos_end,
+                error,
+                context
+            ))
+
+        context.symbol_table.set(var_name, value)
+        return value
+
+    @staticmethod
+    def check_dtype(value, dtype: str):
+        """
+        Check that a value can be assigned to a variable of a data type.
+
+        Args:
+            value (Value): The value being assigned.
+            dtype (str): The data type the variable is declared with.
+
+        Returns:
+            Optional[str]: The details of the error if the value does not fit, None otherwise.
+        """
+        from .fast_lexer import FastLexer
+        obj = FastLexer("fn", str(value))
 
         a = str(obj.make_tokens()).lower()
         if ((("int" in a or "float" in a or "minus" in a) and "comma" not in a)
-                and (str(node.dtype).lower() == "num")):
-            context.symbol_table.set(var_name, value)
-            return res.success(value)
+                and (str(dtype).lower() == "num")):
+            return None
         if isinstance(value, String) and "comma" not in a:
-            if str(node.dtype).lower() == "text":
-                context.symbol_table.set(var_name, value)
-                return res.success(value)
-        if str(node.dtype).lower() == "list":
+            if str(dtype).lower() == "text":
+                return None
+        if str(dtype).lower() == "list":
             if "comma" in a:
-                context.symbol_table.set(var_name, value)
-                return res.success(value)
+                return None
+
+        return f"Error: no viable conversion from '{a}' to '{str(dtype).lower()}'"
+
+    @staticmethod
+    def for_range(start, end, step):
+        """
+        Get the values the variable of a FOR loop takes, in order.
 
-        return res.failure(RTError(
-            node.pos_start, node.pos_end,
-            f"Error: no viable conversion from '{a}' to '{str(node.dtype).lower()}'",
-            context
-        ))
+        Integers count in a native range. Anything else counts the way the
+        loop is written: up while below end if step is not negative, down
+        while above end otherwise.
+
+        Args:
+            start: The value of the start of the loop.
+            end: The value of the end of the loop, which it stops before.
+            step: The value added to the variable after each iteration.
+
+        Returns:
+            Iterable: The values of the loop variable.
+        """
+        if type(start) is int and type(end) is int and type(step) is int and step:
+            return range(start, end, step)
+        return Interpreter.count(start, end, step)
+
+    @staticmethod
+    def count(start, end, step):
+        """
+        Count from start to end by step, like for_range does without a range.
+
+        Args:
+            start: The first value.
+            end: The value to stop before.
+            step: The value to add each time.
+
+        Yields:
+            The values counted.
+        """
+        i = start
+        if step >= 0:
+            while i < end:
+                yield i
+                i += step
+        else:
+            while i > end:
+                yield i
+                i += step
 
     def visit_BinOpNode(self, node, context):
         """
@@ -168,42 +321,17 @@ class Interpreter:
             context (Context): The context in which to execute the node.
 
         Returns:
-            RTResult: The result of evaluating the BinOpNode.
-        """
-        res = RTResult()
-        left = res.register(self.visit(node.left_node, context))
-        if res.should_return():
-            return res
-        right = res.register(self.visit(node.right_node, context))
-        if res.should_return():
-            return res
-
-        operations = {
-            TT_PLUS: left.added_to,
-            TT_MINUS: left.subbed_by,
-            TT_MUL: left.multed_by,
-            TT_DIV: left.dived_by,
-            TT_POW: left.powed_by,
-            TT_EE: left.get_comparison_eq,
-            TT_NE: left.get_comparison_ne,
-            TT_LT: left.get_comparison_lt,
-            TT_GT: left.get_comparison_gt,
-            TT_LTE: left.get_comparison_lte,
-            TT_GTE: left.get_comparison_gte,
-        }
-
-        op_type = node.op_tok.type
+            Value: The value of evaluating the BinOpNode.
+        """
+        left = self.visit(node.left_node, context)
+        right = self.visit(node.right_node, context)
 
-        if node.op_tok.matches(TT_KEYWORD, 'and'):
-            result, error = left.anded_by(right)
-        elif node.op_tok.matches(TT_KEYWORD, 'or'):
-            result, error = left.ored_by(right)
-        else:
-            result, error = operations[op_type](right)
+        method_name = KEYWORD_METHODS.get(node.op_keyword) or OPERATOR_METHODS[node.op_type]
+        result, error = getattr(left, method_name)(right)
 
         if error:
-            return res.failure(error)
-        return res.success(result.set_pos(node.pos_start, node.pos_end))
+            raise RuntimeFailure(error)
+        return result.set_pos(node.pos_start, node.pos_end)
 
     def visit_UnaryOpNode(self, node, context):
         """
@@ -214,23 +342,20 @@ class Interpreter:
             context (Context): The context in which to execute the node.
 
         Returns:
-            RTResult: The result of evaluating the UnaryOpNode.
+            Value: The value of evaluating the UnaryOpNode.
         """
-        res = RTResult()
-        number = res.register(self.visit(node.node, context))
-        if res.should_return():
-            return res
+        number = self.visit(node.node, context)
 
         error = None
 
-        if node.op_tok.type == TT_MINUS:
+        if node.op_type == TT_MINUS:
             number, error = number.multed_by(Number(-1))
-        elif node.op_tok.matches(TT_KEYWORD, 'not'):
+        elif node.op_keyword == KW_NOT:
             number, error = number.notted()
 
         if error:
-            return res.failure(error)
-        return res.success(number.set_pos(node.pos_start, node.pos_end))
+            raise RuntimeFailure(error)
+        return number.set_pos(node.pos_start, node.pos_end)
 
     def visit_IfNode(self, node, context):
         """
@@ -241,29 +366,19 @@ class Interpreter:
             context (Context): The context in which to execute the node.
 
         Returns:
-            RTResult: The result of evaluating the IfNode.
+            Value: The value of evaluating the IfNode.
         """
-        res = RTResult()
-
         for condition, expr, should_return_null in node.cases:
-            condition_value = res.register(self.visit(condition, context))
-            if res.should_return():
-                return res
-
-            if condition_value.is_true():
-                expr_value = res.register(self.visit(expr, context))
-                if res.should_return():
-                    return res
-                return res.success(Number.null if should_return_null else expr_value)
+            if self.visit(condition, context).is_true():
+                expr_value = self.visit(expr, context)
+                return Number.null if should_return_null else expr_value
 
         if node.else_case:
             expr, should_return_null = node.else_case
-            expr_value = res.register(self.visit(expr, context))
-            if res.should_return():
-                return res
-            return res.success(Number.null if should_return_null else expr_value)
+            expr_value = self.visit(expr, context)
+            return Number.null if should_return_null else expr_value
 
-        return res.success(Number.null)
+        return Number.null
 
     def visit_ForNode(self, node, context):
         """
@@ -274,50 +389,43 @@ class Interpreter:
             context (Context): The context in which to execute the node.
 
         Returns:
-            RTResult: The result of evaluating the ForNode.
+            Value: The value of evaluating the ForNode.
         """
-        res = RTResult()
         elements = []
 
-        start_value = res.register(self.visit(node.start_value_node, context))
-        if res.should_return():
-            return res
-
-        end_value = res.register(self.visit(node.end_value_node, context))
-        if res.should_return():
-            return res
-
+        start_value = self.visit(node.start_value_node, context)
+        end_value = self.visit(node.end_value_node, context)
         if node.step_value_node:
-            step_value = res.register(self.visit(node.step_value_node, context))
-            if res.should_return():
-                return res
+            step_value = self.visit(node.step_value_node, context)
         else:
             step_value = Number(1)
 
-        i = start_value.value
-
-        if step_value.value >= 0:
-            condition = lambda: i < end_value.value
-        else:
-            condition = lambda: i > end_value.value
-
-        while condition():
-            context.symbol_table.set(node.var_name_tok.value, Number(i))
-            i += step_value.value
-
-            value = res.register(self.visit(node.body_node, context))
-            if res.should_return() and res.loop_should_continue is False and res.loop_should_break is False:
-                return res
-
-            if res.loop_should_continue:
+        symbols = context.symbol_table.symbols
+        var_name = node.var_name
+        body_node = node.body_node
+        visit = self.visit
+        collect = not node.should_return_null
+        append = elements.append
+        # Every read of a variable copies its value, so the loop variable can
+        # be a single Number counting in place. It is stored again each time
+        # in case the body assigned the variable.
+        counter = Number(start_value.value)
+
+        for i in self.for_range(start_value.value, end_value.value, step_value.value):
+            counter.value = i
+            symbols[var_name] = counter
+
+            try:
+                value = visit(body_node, context)
+            except LoopContinue:
                 continue
-
-            if res.loop_should_break:
+            except LoopBreak:
                 break
 
-            elements.append(value)
+            if collect:
+                append(value)
 
-        return res.success(
+        return (
             Number.null if node.should_return_null else
             List(elements).set_context(context).set_pos(node.pos_start, node.pos_end)
         )
@@ -331,38 +439,28 @@ class Interpreter:
             context (Context): The context in which to execute the node.
 
         Returns:
-            RTResult: The result of evaluating the WhileNode.
+            Value: The value of evaluating the WhileNode.
         """
-        res = RTResult()
         elements = []
+        collect = not node.should_return_null
 
-        while True:
-            condition = res.register(self.visit(node.condition_node, context))
-            if res.should_return():
-                return res
-
-            if not condition.is_true():
-                break
-
-            value = res.register(self.visit(node.body_node, context))
-            if res.should_return() and res.loop_should_continue is False and res.loop_should_break is False:
-                return res
-
-            if res.loop_should_continue:
+        while self.visit(node.condition_node, context).is_true():
+            try:
+                value = self.visit(node.body_node, context)
+            except LoopContinue:
                 continue
-
-            if res.loop_should_break:
+            except LoopBreak:
                 break
 
-            elements.append(value)
+            if collect:
+                elements.append(value)
 
-        return res.success(
+        return (
             Number.null if node.should_return_null else
             List(elements).set_context(context).set_pos(node.pos_start, node.pos_end)
         )
 
-    @staticmethod
-    def visit_FuncDefNode(node, context):
+    def visit_FuncDefNode(self, node, context):
         """
         Visit a FuncDefNode and define a new function in the symbol table.
 
@@ -371,22 +469,19 @@ class Interpreter:
             context (Context): The context in which to execute the node.
 
         Returns:
-            RTResult: The result of evaluating the FuncDefNode.
+            Value: The value of evaluating the FuncDefNode.
         """
-        res = RTResult()
-
-        func_name = node.var_name_tok.value if node.var_name_tok else None
+        func_name = node.var_name
         body_node = node.body_node
-        arg_names = [arg_name.value for arg_name in node.arg_name_toks]
+        arg_names = node.arg_names
 
-        from .function import Function
         func_value = Function(func_name, body_node, arg_names, node.should_auto_return).set_context(context).set_pos(
             node.pos_start, node.pos_end)
 
-        if node.var_name_tok:
+        if node.var_name:
             context.symbol_table.set(func_name, func_value)
 
-        return res.success(func_value)
+        return func_value
 
     def visit_CallNode(self, node, context):
         """
@@ -397,26 +492,61 @@ class Interpreter:
             context (Context): The context in which to execute the node.
 
         Returns:
-            RTResult: The result of evaluating the CallNode.
+            Value: The value of evaluating the CallNode.
         """
-        res = RTResult()
-        args = []
+        value_to_call = self.callee(node, context)
+        args = [self.visit(arg_node, context) for arg_node in node.arg_nodes]
 
-        value_to_call = res.register(self.visit(node.node_to_call, context))
-        if res.should_return():
-            return res
-        value_to_call = value_to_call.copy().set_pos(node.pos_start, node.pos_end)
+        # Like call, without a frame of its own, which deep recursion would feel.
+        if type(value_to_call) is Function:
+            return_value = value_to_call.call(args)
+        else:
+            return_value = unwrap(value_to_call.execute(args))
+        return return_value.copy().set_pos(node.pos_start, node.pos_end).set_context(context)
 
-        for arg_node in node.arg_nodes:
-            args.append(res.register(self.visit(arg_node, context)))
-            if res.should_return():
-                return res
+    def callee(self, node, context):
+        """
+        Evaluate the value a CallNode calls, positioned at the call.
 
-        return_value = res.register(value_to_call.execute(args))
-        if res.should_return():
-            return res
-        return_value = return_value.copy().set_pos(node.pos_start, node.pos_end).set_context(context)
-        return res.success(return_value)
+        A variable is looked up like visit_VarAccessNode does, but the copy
+        is only called, not kept, so it is given the context without
+        set_context, which would capture a Frame.
+
+        Args:
+            node (CallNode): The call.
+            context (Context): The context in which to execute the node.
+
+        Returns:
+            Value: The value to call, a copy of its own.
+        """
+        node_to_call = node.node_to_call
+        if type(node_to_call) is VarAccessNode:
+            value_to_call = context.symbol_table.get(node_to_call.var_name)
+            if value_to_call:
+                value_to_call = value_to_call.copy()
+                value_to_call.context = context
+                return value_to_call.set_pos(node.pos_start, node.pos_end)
+        # Reports the variable that is not defined, or evaluates a node that may not give a copy.
+        return self.visit(node_to_call, context).copy().set_pos(node.pos_start, node.pos_end)
+
+    @staticmethod
+    def call(value_to_call, args: list):
+        """
+        Call a value with evaluated arguments.
+
+        Args:
+            value_to_call (Value): The value to call.
+            args (List[Value]): The arguments to pass to it.
+
+        Returns:
+            Value: The value the call returns.
+
+        Raises:
+            RuntimeFailure: If the call failed.
+        """
+        if type(value_to_call) is Function:
+            return value_to_call.call(args)
+        return unwrap(value_to_call.execute(args))
 
     def visit_ReturnNode(self, node, context):
         """
@@ -427,22 +557,33 @@ class Interpreter:
             node (ReturnNode): The ReturnNode to visit.
             context (Context): The context in which to execute the node.
 
-        Returns:
-            RTResult: The result of evaluating the ReturnNode.
+        Raises:
+            FunctionReturn: With the value returned.
         """
-        res = RTResult()
+        if self.tail_calls and type(node.node_to_return) is CallNode:
+            return self.visit_tail_call(node.node_to_return, context)
 
-        if node.node_to_return:
-            value = res.register(self.visit(node.node_to_return, context))
-            if res.should_return():
-                return res
-        else:
-            value = Number.null
+        value = self.visit(node.node_to_return, context) if node.node_to_return else Number.null
+        raise FunctionReturn(value)
+
+    def visit_tail_call(self, node, context):
+        """
+        Evaluate the function and the arguments of a call in tail position, without making the call.
 
-        return res.success_return(value)
+        Args:
+            node (CallNode): The call returned.
+            context (Context): The context in which to execute the node.
+
+        Raises:
+            FunctionReturn: With the TailCall.
+        """
+        value_to_call = self.callee(node, context)
+        args = [self.visit(arg_node, context) for arg_node in node.arg_nodes]
+
+        raise FunctionReturn(TailCall(value_to_call, args))
 
     @staticmethod
-    def visit_ContinueNode():
+    def visit_ContinueNode(node, context):
         """
         Visit a ContinueNode and signal a continue in a loop.
 
@@ -450,13 +591,13 @@ class Interpreter:
             node (ContinueNode): The ContinueNode to visit.
             context (Context): The context in which to execute the node.
 
-        Returns:
-            RTResult: An RTResult indicating a loop should continue.
+        Raises:
+            LoopContinue: Always.
         """
-        return RTResult().success_continue()
+        raise LoopContinue()
 
     @staticmethod
-    def visit_BreakNode():
+    def visit_BreakNode(node, context):
         """
         Visit a BreakNode and signal a break in a loop.
 
@@ -464,7 +605,86 @@ class Interpreter:
             node (BreakNode): The BreakNode to visit.
             context (Context): The context in which to execute the node.
 
+        Raises:
+            LoopBreak: Always.
+        """
+        raise LoopBreak()
+
+    def visit_HoistNode(self, node, context):
+        """
+        Visit a HoistNode and run the optimized loop if its invariants could be computed.
+
+        Args:
+            node (HoistNode): The HoistNode to visit.
+            context (Context): The context in which to execute the node.
+
         Returns:
-            RTResult: An RTResult indicating a loop should break.
+            Value: The value of evaluating the loop.
         """
-        return RTResult().success_break()
+        return self.visit(node.loop_node if prepare(node, context) else node.original_node, context)
+
+    def visit_SaveNode(self, node, context):
+        """
+        Visit a SaveNode and store the value of its expression.
+
+        Args:
+            node (SaveNode): The SaveNode to visit.
+            context (Context): The context in which to execute the node.
+
+        Returns:
+            Value: The value of evaluating the expression.
+        """
+        value = self.visit(node.node, context)
+        context.symbol_table.set(node.var_name, value)
+        return value
+
+    def visit_MemoNode(self, node, context):
+        """
+        Visit a MemoNode and define a function remembering the results of its calls.
+
+        Args:
+            node (MemoNode): The MemoNode to visit.
+            context (Context): The context in which to execute the node.
+
+        Returns:
+            Value: The value of evaluating the definition.
+        """
+        from .optimizer.memoizer import memoize
+        return memoize(self.visit(node.node, context), node.builtins, node.functions)
+
+    def visit_InlineNode(self, node, context):
+        """
+        Visit an InlineNode and evaluate the body of the function called, or call it.
+
+        Args:
+            node (InlineNode): The InlineNode to visit.
+            context (Context): The context in which to execute the node.
+
+        Returns:
+            Value: The value of evaluating the call.
+        """
+        call_node = node.call_node
+        symbols = context.symbol_table
+        inline = inlinable(symbols, call_node.node_to_call.var_name, node.save_name)
+
+        value_to_call = self.callee(call_node, context)
+        args = [self.visit(arg_node, context) for arg_node in call_node.arg_nodes]
+
+        if inline and bind(symbols, node.param_names, args, node.builtins, node.operands):
+            try:
+                value = self.visit(node.body_node, context)
+            except RuntimeFailure:
+                # Raised again by the call.
+                value = None
+            if value is not None:
+                return value.copy().set_pos(node.pos_start, node.pos_end).set_context(context)
+
+        return self.call(value_to_call, args).copy().set_pos(node.pos_start, node.pos_end).set_context(context)
+
+
+Interpreter.dispatch = Interpreter.build_dispatch()
+
+# The optimizer builds on the Interpreter, so the helpers the nodes it adds
+# run with can only be imported once the class exists.
+from .optimizer.inliner import inlinable, bind  # noqa: E402
+from .optimizer.loop_optimizer import prepare  # noqa: E402
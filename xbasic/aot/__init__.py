@@ -0,0 +1,3 @@
+from .cache import CodeCache
+from .runtime import AotFunction, execute, load_module
+from .transpiler import Transpiler
@@ -0,0 +1,27 @@
+import importlib.util
+import marshal
+
+from ..utils.ast_cache import AstCache
+
+
+class CodeCache(AstCache):
+    """
+    A directory of transpiled programs, kept next to the cached trees.
+
+    Entries hold the marshalled Python code of the module a program was
+    transpiled to, so running an unchanged script skips lexing, parsing,
+    transpiling and compiling. Marshalled code only loads into the Python
+    version that wrote it, so the magic includes that of the interpreter.
+    """
+    suffix = '.bpc'
+
+    # Bump whenever the generated modules or the runtime library change.
+    magic = f'5-{importlib.util.MAGIC_NUMBER.hex()}'
+
+    @staticmethod
+    def dumps(code) -> bytes:
+        return marshal.dumps(code)
+
+    @staticmethod
+    def loads(data: bytes):
+        return marshal.loads(data)
@@ -0,0 +1,245 @@
+"""
+The runtime library of transpiled programs.
+
+Modules written by the Transpiler star-import this module, so everything
+public here is a name the generated code may use. The helpers keep the
+Number, String and List semantics of the Interpreter and raise
+RuntimeFailure where the Interpreter would return an error.
+"""
+from ..closure_compiler import CompiledFunction
+from ..error_handler.rterror import RTError
+from ..error_handler.rtresult import RuntimeFailure
+from ..function import TailCall, full_tracebacks
+from ..Interpreter import Interpreter
+from ..list import List
+from ..optimizer.inliner import inlinable, bind
+from ..optimizer.loop_optimizer import guarded
+from ..optimizer.memoizer import memoize
+from ..number import Number
+from ..string_value import String
+from ..utils.nodes import ContinueNode, BreakNode
+from ..utils.source_file import SourceFile
+
+__all__ = [
+    'Number', 'String', 'List', 'ContinueNode', 'BreakNode', 'TailCall', 'RuntimeFailure', 'null',
+    'positions', 'load', 'assign', 'checked', 'define', 'call', 'interpret', 'guarded', 'inlinable', 'bind',
+    'memoize', 'for_range', 'main',
+]
+
+null = Number.null
+check_dtype = Interpreter.check_dtype
+for_range = Interpreter.for_range
+
+
+class AotFunction(CompiledFunction):
+    """
+    A function defined by a transpiled program.
+
+    Its body is a generated Python function taking the execution context. It
+    returns what the call gives: the value of RETURN, the value of the body
+    if the function returns automatically, or null. A RETURN of a call
+    returns the call as a TailCall instead, for run to make.
+    """
+
+    def run(self, args: list, memo=None):
+        """
+        Execute the function without looking the result up in its memo.
+
+        Args:
+            args (List[Value]): The arguments to pass to the function.
+            memo (Memo, optional): The memo the call was checked against, if any.
+
+        Returns:
+            Value: The value the function returns.
+        """
+        exec_ctx = self.generate_new_context()
+        exec_ctx.symbol_table.memo = memo
+        if len(args) != len(self.arg_names):
+            raise RuntimeFailure(self.check_args(self.arg_names, args).error)
+        self.populate_args(self.arg_names, args, exec_ctx)
+        value = self.body(exec_ctx)
+
+        while type(value) is TailCall:
+            # Run the function called in tail position in this frame.
+            function, args = value.value_to_call, value.args
+            if type(function) is not AotFunction or full_tracebacks.get():
+                if type(function) is AotFunction:
+                    return function.call(args)
+                res = function.execute(args)
+                if res.error:
+                    raise RuntimeFailure(res.error)
+                return res.value
+            exec_ctx = function.generate_tail_context(exec_ctx)
+            if len(args) != len(function.arg_names):
+                raise RuntimeFailure(function.check_args(function.arg_names, args).error)
+            function.populate_args(function.arg_names, args, exec_ctx)
+            value = function.body(exec_ctx)
+        return value
+
+    def copy(self) -> 'AotFunction':
+        """
+        Create a copy of the function.
+
+        Returns:
+            AotFunction: The copy of the function.
+        """
+        copy = AotFunction(self.name, self.body_node, self.arg_names, self.should_auto_return, self.body)
+        copy.memo = self.memo
+        copy.set_context(self.context)
+        copy.set_pos(self.pos_start, self.pos_end)
+        return copy
+
+
+def positions(fn: str, text: str, comment_newlines: set, spans: list) -> tuple:
+    """
+    Resolves the spans of the nodes of a program into positions.
+
+    Args:
+        fn (str): The name of the file the program was transpiled from.
+        text (str): The source of the program.
+        comment_newlines (set): The offsets of the newlines that close comments.
+        spans (list): The start and end offset of each node.
+
+    Returns:
+        tuple: The SourceFile, the start positions and the end positions.
+    """
+    source = SourceFile(fn, text)
+    source.comment_newlines = set(comment_newlines)
+    return (
+        source,
+        [source.position(idx_start) for idx_start, _ in spans],
+        [source.end_position(idx_end) for _, idx_end in spans],
+    )
+
+
+def load(symbols, var_name: str, pos_start, pos_end, context):
+    """Get a copy of a variable, like visit_VarAccessNode."""
+    value = symbols.get(var_name)
+    if not value:
+        raise RuntimeFailure(RTError(pos_start, pos_end, f"'{var_name}' is not defined", context))
+    return value.copy().set_pos(pos_start, pos_end).set_context(context)
+
+
+def assign(symbols, var_name: str, value, dtype: str, pos_start, pos_end, context):
+    """Assign a value to a variable of a data type, like visit_VarAssignNode."""
+    error = check_dtype(value, dtype)
+    if error:
+        raise RuntimeFailure(RTError(pos_start, pos_end, error, context))
+    symbols.set(var_name, value)
+
+
+def checked(result: tuple, pos_start, pos_end):
+    """Unpack the result of an operator method, raising its error."""
+    value, error = result
+    if error:
+        raise RuntimeFailure(error)
+    return value.set_pos(pos_start, pos_end)
+
+
+def define(body, func_name, arg_names: tuple, should_auto_return: bool, pos_start, pos_end, context, symbols):
+    """Create a function, like visit_FuncDefNode."""
+    func_value = AotFunction(
+        func_name, None, list(arg_names), should_auto_return, body
+    ).set_context(context).set_pos(pos_start, pos_end)
+    if func_name:
+        symbols.set(func_name, func_value)
+    return func_value
+
+
+def call(value_to_call, args: list, pos_start, pos_end, context):
+    """Call a value with evaluated arguments, like visit_CallNode."""
+    if type(value_to_call) is AotFunction:
+        return_value = value_to_call.call(args)
+    else:
+        res = value_to_call.execute(args)
+        if res.error:
+            raise RuntimeFailure(res.error)
+        return_value = res.value
+    return return_value.copy().set_pos(pos_start, pos_end).set_context(context)
+
+
+def interpret(node, context):
+    """Evaluate a node with the Interpreter."""
+    return Interpreter().visit(node, context)
+
+
+def locate(exc: BaseException, namespace: dict):
+    """
+    Notes the source position of the innermost generated line an exception passed through.
+
+    Python before 3.11 has no add_note, so there the note is appended to
+    __notes__ the way add_note would, though tracebacks do not show it.
+
+    Args:
+        exc (BaseException): The exception.
+        namespace (dict): The globals of the transpiled module.
+    """
+    line = None
+    tb = exc.__traceback__
+    while tb:
+        if tb.tb_frame.f_globals is namespace:
+            line = tb.tb_lineno
+        tb = tb.tb_next
+
+    span = namespace['SOURCE_MAP'].get(line)
+    if span is not None:
+        pos = namespace['S'][span]
+        note = f'  File {pos.fn}, line {pos.ln + 1}, in the xbasic source'
+        if hasattr(exc, 'add_note'):
+            exc.add_note(note)
+        else:
+            exc.__notes__ = [*getattr(exc, '__notes__', ()), note]
+
+
+def load_module(code) -> dict:
+    """
+    Execute the code of a transpiled module.
+
+    Args:
+        code (CodeType): The code of the module.
+
+    Returns:
+        dict: The globals of the module.
+    """
+    namespace = {'__name__': '__xbasic__'}
+    exec(code, namespace)
+    return namespace
+
+
+def execute(namespace: dict, context) -> tuple:
+    """
+    Run the program of a transpiled module.
+
+    Args:
+        namespace (dict): The globals of the module, after it was executed.
+        context (Context): The context to run the program in.
+
+    Returns:
+        tuple: A tuple containing the result value and error, if any.
+    """
+    try:
+        return namespace['program'](context), None
+    except RuntimeFailure as e:
+        return None, e.error
+    except Exception as e:
+        locate(e, namespace)
+        raise
+
+
+def main(namespace: dict):
+    """
+    Run a transpiled module as a script.
+
+    Args:
+        namespace (dict): The globals of the module.
+    """
+    from ..context_handler.context import Context
+    from ..init_interp import global_symbol_table, current_engine
+
+    context = Context('<program>')
+    context.symbol_table = global_symbol_table
+    current_engine.set('aot')
+    _, error = execute(namespace, context)
+    if error:
+        print(error.as_string())
+        raise SystemExit(1)
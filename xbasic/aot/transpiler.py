@@ -0,0 +1,488 @@
+import gc
+from typing import Dict, List, Tuple
+
+from .. import __version__
+from ..Interpreter import KEYWORD_METHODS, OPERATOR_METHODS
+from ..utils.nodes import CallNode
+from ..utils.token_list import *
+
+HEADER = '''\
+# Generated by xbasic {version} from {fn}. Do not edit.
+from xbasic.aot.runtime import *
+
+FILENAME = {fn!r}
+SOURCE = {text!r}
+COMMENT_NEWLINES = {comment_newlines!r}
+SPANS = {spans!r}
+SOURCE_FILE, S, E = positions(FILENAME, SOURCE, COMMENT_NEWLINES, SPANS)
+
+
+def program(context):
+    symbols = context.symbol_table
+'''
+
+FOOTER = '''
+
+# The index into SPANS of the node each line of program was generated from.
+SOURCE_MAP = {source_map!r}
+
+if __name__ == '__main__':
+    main(globals())
+'''
+
+
+class Transpiler:
+    """
+    Transpiles the AST from Parser.parse into the source of a Python module.
+
+    Each node becomes statements storing its value in a local, in the order
+    the Interpreter evaluates them. Locals are numbered by how many values
+    are pending, like the slots of an evaluation stack, so a function uses
+    only as many as its deepest expression needs. FOR and WHILE become
+    Python loops, FN becomes a nested def taking the execution context and
+    RETURN a Python return. Values stay Number, String and List objects, created and
+    combined through the helpers of xbasic.aot.runtime, so the program
+    behaves exactly like it does in the Interpreter.
+
+    Positions are looked up in the lists S and E of the generated module,
+    built from the spans of the nodes when it is loaded. SOURCE_MAP maps
+    every generated line back to the span of its node, so Python exceptions
+    escaping the program can be reported against the .bsx source.
+    """
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.indent = 1
+        self.function_depth = 0
+        # Whether the statements emitted are in the Python loop of the
+        # innermost FOR or WHILE, where CONTINUE and BREAK are its own.
+        self.loop_body = False
+        self.depth = 0
+        self.spans: List[Tuple[int, int]] = []
+        self.span_indexes: Dict[Tuple[int, int], int] = {}
+        self.source_map: Dict[int, int] = {}
+        self.header_lines = 0
+
+    def transpile_program(self, node) -> str:
+        """
+        Transpile a program into the source of a module.
+
+        Args:
+            node (ListNode): The program.
+
+        Returns:
+            str: The source of the module.
+        """
+        source = node.source
+        self.header_lines = HEADER.count('\n')
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            value = self.transpile(node)
+            self.emit(f'return {value}', node)
+        finally:
+            if enabled:
+                gc.enable()
+
+        return HEADER.format(
+            version=__version__,
+            fn=source.fn,
+            text=source.text,
+            comment_newlines=sorted(source.comment_newlines),
+            spans=self.spans,
+        ) + '\n'.join(self.lines) + FOOTER.format(source_map=self.source_map)
+
+    def compile_program(self, node):
+        """
+        Transpile a program and compile the module.
+
+        Args:
+            node (ListNode): The program.
+
+        Returns:
+            CodeType: The code of the module.
+        """
+        return compile(self.transpile_program(node), f'{node.source.fn} (transpiled)', 'exec')
+
+    def transpile(self, node) -> str:
+        """
+        Emit the statements evaluating a node.
+
+        Args:
+            node: The node to transpile.
+
+        Returns:
+            str: The name of the local holding the value of the node. It stays
+                valid until the depth is reset below where it was.
+        """
+        method = getattr(self, f'transpile_{type(node).__name__}', self.no_transpile_method)
+        return method(node)
+
+    def no_transpile_method(self, node):
+        raise Exception(f'No transpile_{type(node).__name__} method defined')
+
+    def emit(self, line: str, node):
+        """
+        Append a line to the body of the program.
+
+        Args:
+            line (str): The line, without indentation.
+            node: The node the line was generated from.
+        """
+        self.lines.append('    ' * self.indent + line)
+        self.source_map[self.header_lines + len(self.lines)] = self.span(node)
+
+    def span(self, node) -> int:
+        """
+        Return the index of the span of a node in S and E, adding it if it is new.
+
+        Args:
+            node: The node.
+
+        Returns:
+            int: The index of the span.
+        """
+        key = (node.idx_start, node.idx_end)
+        if key not in self.span_indexes:
+            self.span_indexes[key] = len(self.spans)
+            self.spans.append(key)
+        return self.span_indexes[key]
+
+    def pos(self, node) -> str:
+        """The arguments giving the start and end position of a node."""
+        index = self.span(node)
+        return f'S[{index}], E[{index}]'
+
+    def temp(self, prefix: str = '_t') -> str:
+        """Return the name of the local at the current depth and move past it."""
+        self.depth += 1
+        return f'{prefix}{self.depth - 1}'
+
+    ###################################
+
+    def transpile_NumberNode(self, node) -> str:
+        value = self.temp()
+        self.emit(f'{value} = Number({node.value!r}).set_context(context).set_pos({self.pos(node)})', node)
+        return value
+
+    def transpile_StringNode(self, node) -> str:
+        value = self.temp()
+        self.emit(f'{value} = String({node.value!r}).set_context(context).set_pos({self.pos(node)})', node)
+        return value
+
+    def transpile_ListNode(self, node) -> str:
+        base = self.depth
+        if node.should_return_null:
+            # A block whose value is never used only runs its statements.
+            for element_node in node.element_nodes:
+                self.transpile(element_node)
+                self.depth = base
+            return 'null'
+
+        elements = self.temp('_elements')
+        self.emit(f'{elements} = []', node)
+        for element_node in node.element_nodes:
+            self.emit(f'{elements}.append({self.transpile(element_node)})', node)
+            self.depth = base + 1
+
+        self.depth = base
+        value = self.temp()
+        self.emit(f'{value} = List({elements}).set_context(context).set_pos({self.pos(node)})', node)
+        return value
+
+    def transpile_VarAccessNode(self, node) -> str:
+        value = self.temp()
+        self.emit(f'{value} = load(symbols, {node.var_name!r}, {self.pos(node)}, context)', node)
+        return value
+
+    def transpile_VarAssignNode(self, node) -> str:
+        value = self.transpile(node.value_node)
+        self.emit(f'assign(symbols, {node.var_name!r}, {value}, {node.dtype!r}, {self.pos(node)}, context)', node)
+        return value
+
+    def transpile_BinOpNode(self, node) -> str:
+        base = self.depth
+        left = self.transpile(node.left_node)
+        right = self.transpile(node.right_node)
+        method_name = KEYWORD_METHODS.get(node.op_keyword) or OPERATOR_METHODS[node.op_type]
+        self.depth = base
+        value = self.temp()
+        self.emit(f'{value} = checked({left}.{method_name}({right}), {self.pos(node)})', node)
+        return value
+
+    def transpile_UnaryOpNode(self, node) -> str:
+        base = self.depth
+        number = self.transpile(node.node)
+        self.depth = base
+        value = self.temp()
+        if node.op_type == TT_MINUS:
+            self.emit(f'{value} = checked({number}.multed_by(Number(-1)), {self.pos(node)})', node)
+        elif node.op_keyword == KW_NOT:
+            self.emit(f'{value} = checked({number}.notted(), {self.pos(node)})', node)
+        else:
+            self.emit(f'{value} = {number}.set_pos({self.pos(node)})', node)
+        return value
+
+    def transpile_IfNode(self, node) -> str:
+        # Each case runs only while no earlier one has set the value, which
+        # keeps ELIF chains from nesting.
+        value = self.temp()
+        base = self.depth
+        self.emit(f'{value} = None', node)
+
+        for condition, expr, should_return_null in node.cases:
+            self.emit(f'if {value} is None:', node)
+            self.indent += 1
+            condition_value = self.transpile(condition)
+            self.emit(f'if {condition_value}.is_true():', node)
+            self.indent += 1
+            self.depth = base
+            expr_value = self.transpile(expr)
+            self.emit(f"{value} = {'null' if should_return_null else expr_value}", node)
+            self.indent -= 2
+            self.depth = base
+
+        self.emit(f'if {value} is None:', node)
+        self.indent += 1
+        if node.else_case:
+            expr, should_return_null = node.else_case
+            expr_value = self.transpile(expr)
+            self.emit(f"{value} = {'null' if should_return_null else expr_value}", node)
+            self.depth = base
+        else:
+            self.emit(f'{value} = null', node)
+        self.indent -= 1
+        return value
+
+    def transpile_ForNode(self, node) -> str:
+        base = self.depth
+        start_value = self.transpile(node.start_value_node)
+        end_value = self.transpile(node.end_value_node)
+        if node.step_value_node:
+            step_value = self.transpile(node.step_value_node)
+        else:
+            step_value = self.temp()
+            self.emit(f'{step_value} = Number(1)', node)
+
+        # One Number counts in place, like in visit_ForNode.
+        i, counter, elements = self.temp('_i'), self.temp('_counter'), self.temp('_elements')
+        self.collect_values(node, elements)
+        self.emit(f'{counter} = Number({start_value}.value)', node)
+        self.emit(f'for {i} in for_range({start_value}.value, {end_value}.value, {step_value}.value):', node)
+        self.indent += 1
+        self.emit(f'{counter}.value = {i}', node)
+        self.emit(f'symbols.symbols[{node.var_name!r}] = {counter}', node)
+        body_value = self.transpile_loop_body(node.body_node)
+        self.collect_values(node, elements, body_value)
+        self.indent -= 1
+
+        self.depth = base
+        return self.loop_value(node, elements)
+
+    def transpile_WhileNode(self, node) -> str:
+        base = self.depth
+        elements = self.temp('_elements')
+        self.collect_values(node, elements)
+        self.emit('while True:', node)
+        self.indent += 1
+        loop_body, self.loop_body = self.loop_body, False
+        condition_value = self.transpile(node.condition_node)
+        self.loop_body = loop_body
+        self.emit(f'if not {condition_value}.is_true():', node)
+        self.emit('    break', node)
+        self.depth = base + 1
+        body_value = self.transpile_loop_body(node.body_node)
+        self.collect_values(node, elements, body_value)
+        self.indent -= 1
+
+        self.depth = base
+        return self.loop_value(node, elements)
+
+    def transpile_loop_body(self, node) -> str:
+        """
+        Emit the statements of the body of a FOR or WHILE loop, in its Python loop.
+
+        Args:
+            node: The body.
+
+        Returns:
+            str: The name of the local holding the value of the body.
+        """
+        loop_body, self.loop_body = self.loop_body, True
+        value = self.transpile(node)
+        self.loop_body = loop_body
+        return value
+
+    def collect_values(self, node, elements: str, body_value: str = None):
+        """
+        Emit the list of the values of the body of a FOR or WHILE loop, or the append of one to it.
+
+        Nothing is emitted for a loop that gives null, whose values are never used.
+
+        Args:
+            node (Union[ForNode, WhileNode]): The loop.
+            elements (str): The local holding the values of the body.
+            body_value (str, optional): The value to append. Defaults to None, for the empty list.
+        """
+        if node.should_return_null:
+            return
+        if body_value is None:
+            self.emit(f'{elements} = []', node)
+        else:
+            self.emit(f'{elements}.append({body_value})', node)
+
+    def loop_value(self, node, elements: str) -> str:
+        """
+        Emit the value of a FOR or WHILE loop.
+
+        Args:
+            node (Union[ForNode, WhileNode]): The loop, with the depth reset to where it started.
+            elements (str): The local holding the values of the body.
+
+        Returns:
+            str: The name of the local holding the value of the loop.
+        """
+        if node.should_return_null:
+            return 'null'
+        value = self.temp()
+        self.emit(f'{value} = List({elements}).set_context(context).set_pos({self.pos(node)})', node)
+        return value
+
+    def transpile_HoistNode(self, node) -> str:
+        # The invariants are computed like prepare computes them, falling
+        # back to the loop as it was written when a guard or one of them fails.
+        value = self.temp()
+        ok = self.temp('_ok')
+        base = self.depth
+        self.emit(f'{ok} = guarded(symbols, {node.builtins!r}, {node.operands!r})', node)
+        if node.invariants:
+            self.emit(f'if {ok}:', node)
+            self.indent += 1
+            self.emit('try:', node)
+            self.indent += 1
+            for var_name, expr in node.invariants:
+                self.emit(f'symbols.set({var_name!r}, {self.transpile(expr)})', expr)
+                self.depth = base
+            self.indent -= 1
+            self.emit('except Exception:', node)
+            self.emit(f'    {ok} = False', node)
+            self.indent -= 1
+
+        for condition, loop_node in ((f'if {ok}:', node.loop_node), ('else:', node.original_node)):
+            self.emit(condition, node)
+            self.indent += 1
+            self.emit(f'{value} = {self.transpile(loop_node)}', node)
+            self.indent -= 1
+            self.depth = base
+        return value
+
+    def transpile_SaveNode(self, node) -> str:
+        value = self.transpile(node.node)
+        self.emit(f'symbols.set({node.var_name!r}, {value})', node)
+        return value
+
+    def transpile_MemoNode(self, node) -> str:
+        value = self.transpile(node.node)
+        self.emit(f'{value} = memoize({value}, {node.builtins!r}, {node.functions!r})', node)
+        return value
+
+    def transpile_FuncDefNode(self, node) -> str:
+        base = self.depth
+        body = self.temp('_fn')
+        self.emit(f'def {body}(context):', node)
+        self.indent += 1
+        self.function_depth += 1
+        loop_body, self.loop_body = self.loop_body, False
+        self.depth = 0
+        self.emit('symbols = context.symbol_table', node)
+        body_value = self.transpile(node.body_node)
+        self.emit(f"return {body_value if node.should_auto_return else 'null'}", node.body_node)
+        self.loop_body = loop_body
+        self.function_depth -= 1
+        self.indent -= 1
+
+        self.depth = base
+        value = self.temp()
+        self.emit(
+            f'{value} = define({body}, {node.var_name!r}, {tuple(node.arg_names)!r}, {node.should_auto_return!r}, '
+            f'{self.pos(node)}, context, symbols)',
+            node
+        )
+        return value
+
+    def transpile_CallNode(self, node) -> str:
+        base = self.depth
+        callee = self.transpile(node.node_to_call)
+        self.depth = base
+        value_to_call = self.temp()
+        self.emit(f'{value_to_call} = {callee}.copy().set_pos({self.pos(node)})', node)
+        args = [self.transpile(arg_node) for arg_node in node.arg_nodes]
+        self.depth = base
+        value = self.temp()
+        self.emit(f"{value} = call({value_to_call}, [{', '.join(args)}], {self.pos(node)}, context)", node)
+        return value
+
+    def transpile_InlineNode(self, node) -> str:
+        call_node = node.call_node
+        value = self.temp()
+        inline = self.temp('_ok')
+        base = self.depth
+        self.emit(f'{inline} = inlinable(symbols, {call_node.node_to_call.var_name!r}, {node.save_name!r})', node)
+        value_to_call = self.transpile(call_node.node_to_call)
+        self.emit(f'{value_to_call} = {value_to_call}.copy().set_pos({self.pos(node)})', node)
+        args = ', '.join(self.transpile(arg_node) for arg_node in call_node.arg_nodes)
+
+        self.emit(f'{value} = None', node)
+        self.emit(
+            f'if {inline} and bind(symbols, {node.param_names!r}, [{args}], {node.builtins!r}, {node.operands!r}):',
+            node
+        )
+        self.indent += 1
+        self.emit('try:', node)
+        self.indent += 1
+        body_value = self.transpile(node.body_node)
+        self.emit(f'{value} = {body_value}.copy().set_pos({self.pos(node)}).set_context(context)', node)
+        self.indent -= 1
+        self.emit('except RuntimeFailure:', node)
+        self.emit('    pass  # Raised again by the call.', node)
+        self.indent -= 1
+        self.emit(f'if {value} is None:', node)
+        self.emit(f'    {value} = call({value_to_call}, [{args}], {self.pos(node)}, context)', node)
+
+        self.depth = base
+        return value
+
+    def transpile_ReturnNode(self, node) -> str:
+        base = self.depth
+        if self.function_depth and type(node.node_to_return) is CallNode:
+            call_node = node.node_to_return
+            callee = self.transpile(call_node.node_to_call)
+            self.depth = base
+            value_to_call = self.temp()
+            self.emit(f'{value_to_call} = {callee}.copy().set_pos({self.pos(call_node)})', call_node)
+            args = [self.transpile(arg_node) for arg_node in call_node.arg_nodes]
+            self.emit(f"return TailCall({value_to_call}, [{', '.join(args)}])", node)
+            self.depth = base
+            return 'null'
+        value = self.transpile(node.node_to_return) if node.node_to_return else 'null'
+        # A RETURN outside of any function ends the program without a value.
+        self.emit(f"return {value if self.function_depth else 'None'}", node)
+        self.depth = base
+        return 'null'
+
+    def transpile_ContinueNode(self, node) -> str:
+        if self.loop_body:
+            # The rest of the body is skipped, so its value is never used.
+            self.emit('continue', node)
+            return 'null'
+        value = self.temp()
+        self.emit(f'{value} = interpret(ContinueNode(SOURCE_FILE, {node.idx_start}, {node.idx_end}), context)', node)
+        return value
+
+    def transpile_BreakNode(self, node) -> str:
+        if self.loop_body:
+            self.emit('break', node)
+            return 'null'
+        value = self.temp()
+        self.emit(f'{value} = interpret(BreakNode(SOURCE_FILE, {node.idx_start}, {node.idx_end}), context)', node)
+        return value
@@ -1,11 +1,18 @@
 import os
-from .function import BaseFunction
+from .function import BaseFunction, Function
 from .error_handler.rtresult import RTResult
 from .number import Number
 from .string_value import String
 from .list import List
 from .error_handler.rterror import RTError
 
+# What calling a built-in function does besides returning a value, for the
+# optimizer. PURE functions only read their arguments, IO functions also use
+# the terminal, and WRITES functions can change lists or variables.
+PURE = 'pure'
+IO = 'io'
+WRITES = 'writes'
+
 
 class BuiltInFunction(BaseFunction):
     def __init__(self, name):
@@ -86,6 +93,7 @@ class BuiltInFunction(BaseFunction):
         return RTResult().success(Number.null)
 
     execute_print.arg_names = ['value']
+    execute_print.effects = IO
 
     def execute_print_ret(self, exec_ctx):
         """
@@ -100,6 +108,7 @@ class BuiltInFunction(BaseFunction):
         return RTResult().success(String(str(exec_ctx.symbol_table.get('value'))))
 
     execute_print_ret.arg_names = ['value']
+    execute_print_ret.effects = PURE
 
     def execute_input(self, exec_ctx):
         """
@@ -115,6 +124,7 @@ class BuiltInFunction(BaseFunction):
         return RTResult().success(String(text))
 
     execute_input.arg_names = []
+    execute_input.effects = IO
 
     def execute_input_int(self, exec_ctx):
         """
@@ -136,6 +146,7 @@ class BuiltInFunction(BaseFunction):
         return RTResult().success(Number(number))
 
     execute_input_int.arg_names = []
+    execute_input_int.effects = IO
 
     def execute_clear(self, exec_ctx):
         """
@@ -151,6 +162,7 @@ class BuiltInFunction(BaseFunction):
         return RTResult().success(Number.null)
 
     execute_clear.arg_names = []
+    execute_clear.effects = IO
 
     def execute_is_number(self, exec_ctx):
         """
@@ -166,6 +178,7 @@ class BuiltInFunction(BaseFunction):
         return RTResult().success(Number.true if is_number else Number.false)
 
     execute_is_number.arg_names = ["value"]
+    execute_is_number.effects = PURE
 
     def execute_is_string(self, exec_ctx):
         """
@@ -181,6 +194,7 @@ class BuiltInFunction(BaseFunction):
         return RTResult().success(Number.true if is_string else Number.false)
 
     execute_is_string.arg_names = ["value"]
+    execute_is_string.effects = PURE
 
     def execute_is_list(self, exec_ctx):
         """
@@ -196,6 +210,7 @@ class BuiltInFunction(BaseFunction):
         return RTResult().success(Number.true if is_list else Number.false)
 
     execute_is_list.arg_names = ["value"]
+    execute_is_list.effects = PURE
 
     def execute_is_function(self, exec_ctx):
         """
@@ -211,6 +226,7 @@ class BuiltInFunction(BaseFunction):
         return RTResult().success(Number.true if is_function else Number.false)
 
     execute_is_function.arg_names = ["value"]
+    execute_is_function.effects = PURE
 
     def execute_append(self, exec_ctx):
         """
@@ -236,6 +252,7 @@ class BuiltInFunction(BaseFunction):
         return RTResult().success(Number.null)
 
     execute_append.arg_names = ["list", "value"]
+    execute_append.effects = WRITES
 
     def execute_pop(self, exec_ctx):
         """
@@ -277,6 +294,7 @@ class BuiltInFunction(BaseFunction):
         return RTResult().success(element)
 
     execute_pop.arg_names = ["list", "index"]
+    execute_pop.effects = WRITES
 
     def execute_extend(self, exec_ctx):
         """
@@ -311,6 +329,7 @@ class BuiltInFunction(BaseFunction):
         return RTResult().success(Number.null)
 
     execute_extend.arg_names = ["list_a", "list_b"]
+    execute_extend.effects = WRITES
 
     def execute_len(self, exec_ctx):
         """
@@ -334,6 +353,7 @@ class BuiltInFunction(BaseFunction):
         return RTResult().success(Number(len(list_.elements)))
 
     execute_len.arg_names = ["list"]
+    execute_len.effects = PURE
 
     def execute_run(self, exec_ctx):
         """
@@ -367,7 +387,7 @@ class BuiltInFunction(BaseFunction):
             ))
 
         from .init_interp import run
-        _, error = run(fn, script)
+        _, error = run(fn, script, value_used=False)
 
         if error:
             return RTResult().failure(RTError(
@@ -379,6 +399,69 @@ class BuiltInFunction(BaseFunction):
         return RTResult().success(Number.null)
 
     execute_run.arg_names = ["fn"]
+    execute_run.effects = WRITES
+
+    def execute_memoize(self, exec_ctx):
+        """
+        Execute the built-in memoize function, which makes the function a variable holds remember the results of its calls.
+
+        The optimizer memoizes the functions it can tell only compute a value
+        from their arguments. This memoizes any other, trusting that it does.
+
+        Args:
+            exec_ctx (Context): The execution context.
+
+        Returns:
+            RTResult: The result of executing the memoize function.
+        """
+        var_name = exec_ctx.symbol_table.get("var_name")
+
+        if not isinstance(var_name, String):
+            return RTResult().failure(RTError(
+                self.pos_start, self.pos_end,
+                "Argument must be string",
+                exec_ctx
+            ))
+
+        # The function itself, not the copy reading the variable gives.
+        function = exec_ctx.symbol_table.parent.get(var_name.value)
+        if not isinstance(function, Function):
+            return RTResult().failure(RTError(
+                self.pos_start, self.pos_end,
+                f"'{var_name.value}' is not a function defined with FN",
+                exec_ctx
+            ))
+
+        from .optimizer.memoizer import memoize
+        memoize(function, [], [])
+        return RTResult().success(Number.null)
+
+    execute_memoize.arg_names = ["var_name"]
+    execute_memoize.effects = WRITES
+
+    def execute_memo_info(self, exec_ctx):
+        """
+        Execute the built-in memo_info function, which returns how many calls of a memoized function were looked up.
+
+        Args:
+            exec_ctx (Context): The execution context.
+
+        Returns:
+            RTResult: The result of executing the memo_info function, a list of the hits and the misses.
+        """
+        function = exec_ctx.symbol_table.get("function")
+
+        if not isinstance(function, Function) or function.memo is None:
+            return RTResult().failure(RTError(
+                self.pos_start, self.pos_end,
+                "Argument must be a memoized function",
+                exec_ctx
+            ))
+
+        return RTResult().success(List([Number(function.memo.hits), Number(function.memo.misses)]))
+
+    execute_memo_info.arg_names = ["function"]
+    execute_memo_info.effects = WRITES
 
 
 BuiltInFunction.print = BuiltInFunction("print")
@@ -395,3 +478,5 @@ BuiltInFunction.pop = BuiltInFunction("pop")
 BuiltInFunction.extend = BuiltInFunction("extend")
 BuiltInFunction.len = BuiltInFunction("len")
 BuiltInFunction.run = BuiltInFunction("run")
+BuiltInFunction.memoize = BuiltInFunction("memoize")
+BuiltInFunction.memo_info = BuiltInFunction("memo_info")
@@ -0,0 +1,92 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Iterator, List, Optional, Tuple
+
+SCRIPT_SUFFIX = '.bsx'
+
+
+def find_scripts(paths: List[str]) -> List[str]:
+    """
+    Lists the scripts to check.
+
+    Files named directly are always included; directories are searched
+    recursively for files ending in '.bsx'.
+
+    Args:
+        paths (List[str]): The files and directories to search.
+
+    Returns:
+        List[str]: The scripts, in a stable order.
+    """
+    scripts = []
+    for path in paths:
+        if not os.path.isdir(path):
+            scripts.append(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            scripts.extend(os.path.join(root, name) for name in sorted(files) if name.endswith(SCRIPT_SUFFIX))
+    return scripts
+
+
+def check_file(fn: str, max_depth: Optional[int] = None) -> Tuple[str, Optional[str], float]:
+    """
+    Lexes and parses a script without running it.
+
+    The script is parsed like run parses it, by init_interp.parse_source
+    with the same max_depth, so a script nested too deeply for it is
+    reported as a syntax error instead of crashing the worker.
+
+    Args:
+        fn (str): The path of the script.
+        max_depth (int, optional): The deepest nesting accepted, as run's
+            max_depth setting. Defaults to None, parsing with Parser.
+
+    Returns:
+        Tuple[str, Optional[str], float]: The path, the error as a string or
+            None, and the seconds taken.
+    """
+    from . import init_interp
+
+    start = time.perf_counter()
+    try:
+        with open(fn, "r") as f:
+            text = f.read()
+    except Exception as e:
+        return fn, f'Failed to load script "{fn}"\n{e}', time.perf_counter() - start
+
+    token = init_interp.max_depth.set(max_depth)
+    try:
+        _, error = init_interp.parse_source(fn, text)
+    finally:
+        init_interp.max_depth.reset(token)
+    return fn, error.as_string() if error else None, time.perf_counter() - start
+
+
+def check_files(scripts: List[str], jobs: Optional[int] = None,
+                max_depth: Optional[int] = None) -> Iterator[Tuple[str, Optional[str], float]]:
+    """
+    Checks scripts across a pool of processes.
+
+    Args:
+        scripts (List[str]): The paths of the scripts.
+        jobs (int, optional): The number of processes. Defaults to the number of CPUs.
+        max_depth (int, optional): The deepest nesting accepted, passed to check_file. Defaults to None.
+
+    Returns:
+        Iterator[Tuple[str, Optional[str], float]]: The result of check_file
+            for each script, in the order given.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    check = partial(check_file, max_depth=max_depth)
+    if jobs == 1 or len(scripts) <= 1:
+        yield from map(check, scripts)
+        return
+
+    # Hand out scripts in batches so that small files do not cost a round
+    # trip to a worker each.
+    chunksize = max(1, min(64, len(scripts) // (jobs * 4)))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(check, scripts, chunksize=chunksize)
@@ -0,0 +1,487 @@
+import gc
+from typing import Callable
+
+from .error_handler.rterror import RTError
+from .error_handler.rtresult import RuntimeFailure, FunctionReturn, unwrap
+from .function import Function, TailCall, full_tracebacks
+from .Interpreter import Interpreter, OPERATOR_METHODS, KEYWORD_METHODS
+from .list import List
+from .number import Number
+from .string_value import String
+from .utils.nodes import CallNode
+from .utils.token_list import *
+
+
+class CompiledFunction(Function):
+    def __init__(self, name: str, body_node, arg_names: list, should_auto_return: bool, body: Callable):
+        """
+        A function whose body was compiled by the ClosureCompiler.
+
+        Args:
+            name (str): The name of the function.
+            body_node: The body node of the function.
+            arg_names (List[str]): List of argument names.
+            should_auto_return (bool): Whether the function should automatically return.
+            body (Callable): The compiled body, taking the execution context.
+        """
+        super().__init__(name, body_node, arg_names, should_auto_return)
+        self.body = body
+
+    def call(self, args: list):
+        """
+        Execute the function, raising RuntimeFailure instead of returning an error.
+
+        Args:
+            args (List[Value]): The arguments to pass to the function.
+
+        Returns:
+            Value: The value the function returns.
+        """
+        memo = self.memo
+        key = memo and memo.key(args, self.context.symbol_table)
+        if key is None:
+            return self.run(args)
+
+        value = memo.get(key)
+        if value is None:
+            value = self.run(args, memo)
+            memo.put(key, value)
+        return value
+
+    def run(self, args: list, memo=None):
+        """
+        Execute the function without looking the result up in its memo.
+
+        Args:
+            args (List[Value]): The arguments to pass to the function.
+            memo (Memo, optional): The memo the call was checked against, if any.
+
+        Returns:
+            Value: The value the function returns.
+        """
+        exec_ctx = self.generate_new_context()
+        exec_ctx.symbol_table.memo = memo
+        if len(args) != len(self.arg_names):
+            raise RuntimeFailure(self.check_args(self.arg_names, args).error)
+        self.populate_args(self.arg_names, args, exec_ctx)
+
+        function = self
+        while True:
+            try:
+                value = function.body(exec_ctx)
+            except FunctionReturn as ret:
+                if type(ret.value) is not TailCall:
+                    return ret.value
+
+                # Run the function called in tail position in this frame.
+                function, args = ret.value.value_to_call, ret.value.args
+                if type(function) is not CompiledFunction or full_tracebacks.get():
+                    if type(function) is CompiledFunction:
+                        return function.call(args)
+                    return unwrap(function.execute(args))
+                exec_ctx = function.generate_tail_context(exec_ctx)
+                if len(args) != len(function.arg_names):
+                    raise RuntimeFailure(function.check_args(function.arg_names, args).error)
+                function.populate_args(function.arg_names, args, exec_ctx)
+                continue
+            return (value if function.should_auto_return else None) or Number.null
+
+    def copy(self) -> 'CompiledFunction':
+        """
+        Create a copy of the function.
+
+        Returns:
+            CompiledFunction: The copy of the function.
+        """
+        copy = CompiledFunction(self.name, self.body_node, self.arg_names, self.should_auto_return, self.body)
+        copy.memo = self.memo
+        copy.set_context(self.context)
+        copy.set_pos(self.pos_start, self.pos_end)
+        return copy
+
+
+class ClosureCompiler:
+    """
+    Compiles an AST into nested Python closures, one per node.
+
+    Each closure takes the context to run in and returns the value of its
+    node. Everything known before running, like the closures of the
+    children, the positions of the node and the method an operator calls,
+    is looked up once when compiling instead of on every evaluation. Errors
+    and RETURN are raised as RuntimeFailure and FunctionReturn, so no
+    RTResult is allocated per node. A RETURN of a call in a function raises
+    the call as a TailCall instead, for CompiledFunction.call to make.
+
+    The closures behave exactly like the Interpreter. Node classes without a
+    compile method are run by the Interpreter.
+    """
+
+    def __init__(self):
+        self.function_depth = 0
+
+    def compile(self, node) -> Callable:
+        """
+        Compile a node.
+
+        Args:
+            node: The node to compile.
+
+        Returns:
+            Callable: The closure evaluating the node in a context.
+        """
+        method = getattr(self, f'compile_{type(node).__name__}', self.compile_with_interpreter)
+        return method(node)
+
+    def execute(self, node, context) -> tuple:
+        """
+        Compile a program and run it.
+
+        Args:
+            node (ListNode): The program.
+            context (Context): The context to run the program in.
+
+        Returns:
+            tuple: A tuple containing the result value and error, if any.
+        """
+        # Closures do not form cycles, but the collector would keep rescanning
+        # the tree and the closures piling up while a large program compiles.
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            program = self.compile(node)
+        finally:
+            if enabled:
+                gc.enable()
+
+        try:
+            return program(context), None
+        except RuntimeFailure as e:
+            return None, e.error
+        except FunctionReturn:
+            return None, None
+
+    ###################################
+
+    @staticmethod
+    def compile_with_interpreter(node) -> Callable:
+        def interpret(context):
+            return Interpreter().visit(node, context)
+        return interpret
+
+    @staticmethod
+    def compile_NumberNode(node) -> Callable:
+        value = node.value
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def number(context):
+            return Number(value).set_context(context).set_pos(pos_start, pos_end)
+        return number
+
+    @staticmethod
+    def compile_StringNode(node) -> Callable:
+        value = node.value
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def string(context):
+            return String(value).set_context(context).set_pos(pos_start, pos_end)
+        return string
+
+    def compile_ListNode(self, node) -> Callable:
+        elements = [self.compile(element_node) for element_node in node.element_nodes]
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        if node.should_return_null:
+            # A block whose value is never used only runs its statements.
+            null = Number.null
+
+            def block(context):
+                for element in elements:
+                    element(context)
+                return null
+            return block
+
+        def list_(context):
+            return List([element(context) for element in elements]).set_context(context).set_pos(pos_start, pos_end)
+        return list_
+
+    @staticmethod
+    def compile_VarAccessNode(node) -> Callable:
+        var_name = node.var_name
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def var_access(context):
+            value = context.symbol_table.get(var_name)
+            if not value:
+                raise RuntimeFailure(RTError(
+                    pos_start, pos_end,
+                    f"'{var_name}' is not defined",
+                    context
+                ))
+            return value.copy().set_pos(pos_start, pos_end).set_context(context)
+        return var_access
+
+    def compile_VarAssignNode(self, node) -> Callable:
+        var_name = node.var_name
+        dtype = node.dtype
+        value_of = self.compile(node.value_node)
+        pos_start, pos_end = node.pos_start, node.pos_end
+        check_dtype = Interpreter.check_dtype
+
+        def var_assign(context):
+            value = value_of(context)
+            error = check_dtype(value, dtype)
+            if error:
+                raise RuntimeFailure(RTError(pos_start, pos_end, error, context))
+            context.symbol_table.set(var_name, value)
+            return value
+        return var_assign
+
+    def compile_BinOpNode(self, node) -> Callable:
+        left_of = self.compile(node.left_node)
+        right_of = self.compile(node.right_node)
+        method_name = KEYWORD_METHODS.get(node.op_keyword) or OPERATOR_METHODS[node.op_type]
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def bin_op(context):
+            left = left_of(context)
+            right = right_of(context)
+            result, error = getattr(left, method_name)(right)
+            if error:
+                raise RuntimeFailure(error)
+            return result.set_pos(pos_start, pos_end)
+        return bin_op
+
+    def compile_UnaryOpNode(self, node) -> Callable:
+        operand_of = self.compile(node.node)
+        op_type, op_keyword = node.op_type, node.op_keyword
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def unary_op(context):
+            number = operand_of(context)
+            error = None
+
+            if op_type == TT_MINUS:
+                number, error = number.multed_by(Number(-1))
+            elif op_keyword == KW_NOT:
+                number, error = number.notted()
+
+            if error:
+                raise RuntimeFailure(error)
+            return number.set_pos(pos_start, pos_end)
+        return unary_op
+
+    def compile_IfNode(self, node) -> Callable:
+        cases = [
+            (self.compile(condition), self.compile(expr), should_return_null)
+            for condition, expr, should_return_null in node.cases
+        ]
+        if node.else_case:
+            else_expr, else_returns_null = node.else_case
+            else_of = self.compile(else_expr)
+        else:
+            else_of = else_returns_null = None
+        null = Number.null
+
+        def if_(context):
+            for condition_of, expr_of, should_return_null in cases:
+                if condition_of(context).is_true():
+                    expr_value = expr_of(context)
+                    return null if should_return_null else expr_value
+
+            if else_of:
+                expr_value = else_of(context)
+                return null if else_returns_null else expr_value
+
+            return null
+        return if_
+
+    def compile_ForNode(self, node) -> Callable:
+        from .optimizer.loop_optimizer import breaks_loop
+        if breaks_loop(node.body_node):
+            # CONTINUE and BREAK are left to the Interpreter, with their loop.
+            return self.compile_with_interpreter(node)
+        var_name = node.var_name
+        start_of = self.compile(node.start_value_node)
+        end_of = self.compile(node.end_value_node)
+        step_of = self.compile(node.step_value_node) if node.step_value_node else None
+        body_of = self.compile(node.body_node)
+        pos_start, pos_end = node.pos_start, node.pos_end
+        for_range = Interpreter.for_range
+
+        if node.should_return_null:
+            null = Number.null
+
+            def for_statement(context):
+                start_value = start_of(context)
+                end_value = end_of(context)
+                step_value = step_of(context) if step_of else Number(1)
+
+                symbols = context.symbol_table.symbols
+                counter = Number(start_value.value)
+                for i in for_range(start_value.value, end_value.value, step_value.value):
+                    counter.value = i
+                    symbols[var_name] = counter
+                    body_of(context)
+                return null
+            return for_statement
+
+        def for_(context):
+            elements = []
+            append = elements.append
+
+            start_value = start_of(context)
+            end_value = end_of(context)
+            step_value = step_of(context) if step_of else Number(1)
+
+            # One Number counts in place, like in visit_ForNode.
+            symbols = context.symbol_table.symbols
+            counter = Number(start_value.value)
+            for i in for_range(start_value.value, end_value.value, step_value.value):
+                counter.value = i
+                symbols[var_name] = counter
+                append(body_of(context))
+
+            return List(elements).set_context(context).set_pos(pos_start, pos_end)
+        return for_
+
+    def compile_WhileNode(self, node) -> Callable:
+        from .optimizer.loop_optimizer import breaks_loop
+        if breaks_loop(node.body_node):
+            return self.compile_with_interpreter(node)
+        condition_of = self.compile(node.condition_node)
+        body_of = self.compile(node.body_node)
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        if node.should_return_null:
+            null = Number.null
+
+            def while_statement(context):
+                while condition_of(context).is_true():
+                    body_of(context)
+                return null
+            return while_statement
+
+        def while_(context):
+            elements = []
+
+            while condition_of(context).is_true():
+                elements.append(body_of(context))
+
+            return List(elements).set_context(context).set_pos(pos_start, pos_end)
+        return while_
+
+    def compile_FuncDefNode(self, node) -> Callable:
+        func_name = node.var_name
+        body_node = node.body_node
+        arg_names = node.arg_names
+        should_auto_return = node.should_auto_return
+        self.function_depth += 1
+        try:
+            body = self.compile(body_node)
+        finally:
+            self.function_depth -= 1
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def func_def(context):
+            func_value = CompiledFunction(
+                func_name, body_node, arg_names, should_auto_return, body
+            ).set_context(context).set_pos(pos_start, pos_end)
+
+            if func_name:
+                context.symbol_table.set(func_name, func_value)
+
+            return func_value
+        return func_def
+
+    def compile_CallNode(self, node) -> Callable:
+        callee_of = self.compile(node.node_to_call)
+        args_of = [self.compile(arg_node) for arg_node in node.arg_nodes]
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def call(context):
+            value_to_call = callee_of(context).copy().set_pos(pos_start, pos_end)
+            args = [arg_of(context) for arg_of in args_of]
+
+            if type(value_to_call) is CompiledFunction:
+                return_value = value_to_call.call(args)
+            else:
+                return_value = unwrap(value_to_call.execute(args))
+            return return_value.copy().set_pos(pos_start, pos_end).set_context(context)
+        return call
+
+    def compile_ReturnNode(self, node) -> Callable:
+        if self.function_depth and type(node.node_to_return) is CallNode:
+            return self.compile_tail_call(node.node_to_return)
+        value_of = self.compile(node.node_to_return) if node.node_to_return else None
+
+        def return_(context):
+            raise FunctionReturn(value_of(context) if value_of else Number.null)
+        return return_
+
+    def compile_tail_call(self, node) -> Callable:
+        callee_of = self.compile(node.node_to_call)
+        args_of = [self.compile(arg_node) for arg_node in node.arg_nodes]
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def tail_call(context):
+            value_to_call = callee_of(context).copy().set_pos(pos_start, pos_end)
+            raise FunctionReturn(TailCall(value_to_call, [arg_of(context) for arg_of in args_of]))
+        return tail_call
+
+    def compile_HoistNode(self, node) -> Callable:
+        from .optimizer.loop_optimizer import prepare
+        loop_of = self.compile(node.loop_node)
+        original_of = self.compile(node.original_node)
+
+        def hoist(context):
+            return loop_of(context) if prepare(node, context) else original_of(context)
+        return hoist
+
+    def compile_SaveNode(self, node) -> Callable:
+        var_name = node.var_name
+        value_of = self.compile(node.node)
+
+        def save(context):
+            value = value_of(context)
+            context.symbol_table.set(var_name, value)
+            return value
+        return save
+
+    def compile_MemoNode(self, node) -> Callable:
+        from .optimizer.memoizer import memoize
+        func_def_of = self.compile(node.node)
+        builtins, functions = node.builtins, node.functions
+
+        def memo(context):
+            return memoize(func_def_of(context), builtins, functions)
+        return memo
+
+    def compile_InlineNode(self, node) -> Callable:
+        from .optimizer.inliner import inlinable, bind
+        call_node = node.call_node
+        func_name = call_node.node_to_call.var_name
+        save_name, param_names, builtins, operands = node.save_name, node.param_names, node.builtins, node.operands
+        callee_of = self.compile(call_node.node_to_call)
+        args_of = [self.compile(arg_node) for arg_node in call_node.arg_nodes]
+        body_of = self.compile(node.body_node)
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def inline(context):
+            symbols = context.symbol_table
+            inline_body = inlinable(symbols, func_name, save_name)
+            value_to_call = callee_of(context).copy().set_pos(pos_start, pos_end)
+            args = [arg_of(context) for arg_of in args_of]
+
+            if inline_body and bind(symbols, param_names, args, builtins, operands):
+                try:
+                    return body_of(context).copy().set_pos(pos_start, pos_end).set_context(context)
+                except RuntimeFailure:
+                    # Raised again by the call.
+                    pass
+
+            if type(value_to_call) is CompiledFunction:
+                return_value = value_to_call.call(args)
+            else:
+                return_value = unwrap(value_to_call.execute(args))
+            return return_value.copy().set_pos(pos_start, pos_end).set_context(context)
+        return inline
@@ -11,6 +11,7 @@ class Context:
         parent_entry_pos (Position, optional): The position where the parent context was entered.
         symbol_table (dict, optional): The symbol table containing variable names and their corresponding values.
     """
+    __slots__ = ('display_name', 'parent', 'parent_entry_pos', 'symbol_table')
 
     def __init__(self, display_name: str, parent: Optional['Context'] = None, parent_entry_pos=None):
         self.display_name = display_name
@@ -0,0 +1,77 @@
+from .context import Context
+from .symbol_table import SymbolTable
+
+
+class Frame(Context):
+    __slots__ = ('blank', 'captured')
+
+    def __init__(self, display_name: str, parent: Context, parent_entry_pos=None):
+        """
+        The context of a call of a user-defined function, kept by the function for its later calls.
+
+        Variables are scoped dynamically, so the functions a call makes look
+        the variables up by name. The frame therefore keeps them in the dict
+        of a symbol table like any context, rather than in an array indexed
+        by parameter position. The dict keeps its entries between calls: the
+        parameters first, in their order, then the locals the body assigned.
+        clear sets them to None, which reads as unset, and the next call
+        fills the parameters in by position, so the table is built once per
+        frame rather than once per call.
+
+        Function.release gives the frame back to the function when the call
+        ends, unless it was captured: a function value was given it as its
+        context, and may look variables up in it later.
+
+        Args:
+            display_name (str): The name of the function.
+            parent (Context): The context the function is called from.
+            parent_entry_pos (Position, optional): The position of the call.
+        """
+        super().__init__(display_name, parent, parent_entry_pos)
+        self.symbol_table = SymbolTable(parent.symbol_table)
+        # The entries of the table, all None, to clear it with.
+        self.blank = {}
+        # Whether a function value refers to the frame, directly or through the frames of the calls it made.
+        self.captured = False
+
+    def enter(self, display_name: str, parent: Context, parent_entry_pos, arg_names: list, args: list):
+        """
+        Set the frame up for a call.
+
+        Args:
+            display_name (str): The name of the function.
+            parent (Context): The context the function is called from.
+            parent_entry_pos (Position): The position of the call.
+            arg_names (List[str]): The names of the parameters.
+            args (List[Value]): The arguments, as many as there are parameters.
+        """
+        self.display_name = display_name
+        self.parent = parent
+        self.parent_entry_pos = parent_entry_pos
+        symbol_table = self.symbol_table
+        symbol_table.parent = parent.symbol_table
+        symbol_table.memo = None
+        symbol_table.symbols.update(zip(arg_names, args))
+
+    def capture(self) -> None:
+        """
+        Keep the frame, and the frames of the calls it was made in, from being reused.
+        """
+        context = self
+        while context is not None:
+            if type(context) is Frame:
+                if context.captured:
+                    # So are the frames it was made in.
+                    break
+                context.captured = True
+            context = context.parent
+
+    def clear(self) -> None:
+        """
+        Unset the variables of the frame and let go of its caller, to keep it for a later call.
+        """
+        symbols = self.symbol_table.symbols
+        if len(symbols) != len(self.blank):
+            self.blank = dict.fromkeys(symbols)
+        symbols.update(self.blank)
+        self.parent = self.symbol_table.parent = None
@@ -8,11 +8,15 @@ class SymbolTable:
     Attributes:
         symbols (dict): A dictionary mapping variable names to their values.
         parent (SymbolTable, optional): The parent symbol table in the scope hierarchy.
+        memo (Memo, optional): The memo of the function call the table is for, if the
+            variables the function relies on were checked when it was called.
     """
+    __slots__ = ('symbols', 'parent', 'memo')
 
     def __init__(self, parent: Optional['SymbolTable'] = None):
         self.symbols: Dict[str, Any] = {}
         self.parent: Optional['SymbolTable'] = parent
+        self.memo = None
 
     def get(self, name: str) -> Any:
         """
@@ -25,9 +29,13 @@ class SymbolTable:
             Any: The value associated with the variable, or None if not found.
         """
 
-        value = self.symbols.get(name, None)
-        if value is None and self.parent:
-            return self.parent.get(name)
+        # Walk up the scopes in a loop, since the chain grows with every
+        # call in progress and would overflow the Python stack otherwise.
+        table = self
+        value = table.symbols.get(name, None)
+        while value is None and table.parent:
+            table = table.parent
+            value = table.symbols.get(name, None)
         return value
 
     def set(self, name: str, value: Any):
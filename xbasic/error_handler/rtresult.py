@@ -124,3 +124,52 @@ class RTResult:
                 self.loop_should_continue or
                 self.loop_should_break
         )
+
+
+class RuntimeFailure(Exception):
+    def __init__(self, error):
+        """
+        Raised by compiled code to abandon execution with a runtime error.
+
+        Args:
+            error (RTError): The error to report.
+        """
+        super().__init__(error)
+        self.error = error
+
+
+class FunctionReturn(Exception):
+    def __init__(self, value):
+        """
+        Raised by compiled code to return from the function being executed.
+
+        Args:
+            value (Value): The value returned.
+        """
+        super().__init__(value)
+        self.value = value
+
+
+class LoopContinue(Exception):
+    """Raised by CONTINUE to skip to the next iteration of the loop it is in."""
+
+
+class LoopBreak(Exception):
+    """Raised by BREAK to leave the loop it is in."""
+
+
+def unwrap(res: RTResult):
+    """
+    Turn an RTResult into a value or a raised signal.
+
+    Args:
+        res (RTResult): The result.
+
+    Returns:
+        Value: The value of the result.
+    """
+    if res.error:
+        raise RuntimeFailure(res.error)
+    if res.func_return_value:
+        raise FunctionReturn(res.func_return_value)
+    return res.value
@@ -0,0 +1,224 @@
+import gc
+import re
+from sys import intern
+
+from .utils.source_file import SourceFile
+from .utils.token_buffer import TokenBuffer
+from .utils.token_list import *
+
+# One alternation per token class. The catch-all group at the end guarantees
+# that every character is claimed by exactly one match, so illegal characters
+# surface as an 'illegal' match instead of a gap between matches.
+TOKEN_PATTERN = re.compile(r'''
+    (?P<space>[ \t]+)
+  | (?P<comment>\#[^\n]*\n?)
+  | (?P<newline>[;\n])
+  | (?P<number>[0-9]+(?:\.[0-9]*)?)
+  | (?P<identifier>[A-Za-z][A-Za-z0-9_]*)
+  | (?P<string>"[^"]*"?)
+  | (?P<operator>->|==|<=|>=|!=?|[-+*/^()\[\]=<>,])
+  | (?P<illegal>[\s\S])
+''', re.VERBOSE)
+
+OPERATORS = {
+    '+': TT_PLUS,
+    '-': TT_MINUS,
+    '*': TT_MUL,
+    '/': TT_DIV,
+    '^': TT_POW,
+    '(': TT_LPAREN,
+    ')': TT_RPAREN,
+    '[': TT_LSQUARE,
+    ']': TT_RSQUARE,
+    '=': TT_EQ,
+    '<': TT_LT,
+    '>': TT_GT,
+    ',': TT_COMMA,
+    '->': TT_ARROW,
+    '==': TT_EE,
+    '!=': TT_NE,
+    '<=': TT_LTE,
+    '>=': TT_GTE,
+}
+
+class FastLexer:
+    def __init__(self, fn: str, text: str, source: SourceFile = None, offset: int = 0):
+        """
+        Initialize the FastLexer object.
+
+        FastLexer is a drop-in replacement for Lexer: it produces the same tokens
+        and the same errors, but scans whole runs of characters with a single
+        precompiled pattern instead of advancing one character at a time.
+
+        Args:
+            fn (str): The name of the file being lexed.
+            text (str): The text to be lexed.
+            source (SourceFile, optional): An already indexed SourceFile for the text.
+                Defaults to indexing the text.
+            offset (int, optional): The offset of the text in the source, when it is
+                only a part of it. Defaults to 0.
+        """
+        self.fn = fn
+        self.text = text
+        self.source = SourceFile(fn, text) if source is None else source
+        self.offset = offset
+
+    def make_tokens(self):
+        """
+        Convert the input text into a list of tokens.
+
+        Returns:
+            Tuple[List[Token], Optional[Error]]: A tuple containing the list of tokens
+            and an optional error encountered during tokenization.
+        """
+        buffer, error = self.make_token_buffer()
+        if error:
+            return [], error
+        return buffer.tokens(), None
+
+    def make_token_buffer(self):
+        """
+        Convert the input text into a TokenBuffer.
+
+        Returns:
+            Tuple[TokenBuffer, Optional[Error]]: A tuple containing the token buffer
+            and an optional error encountered during tokenization.
+        """
+        # Identifier strings and number values never form reference cycles,
+        # but allocating millions of them triggers a full collection every few
+        # thousand tokens. Pausing the collector for the scan avoids that.
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            buffer = TokenBuffer(self.source)
+            error, _ = self.scan(buffer)
+            return buffer, error
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def scan(self, buffer: TokenBuffer, pos: int = 0, base: int = 0, stop: int = None, limit: int = None,
+             final: bool = True):
+        """
+        Scan the input text with TOKEN_PATTERN, appending the tokens to a buffer.
+
+        The scan can start at any index where a match starts: the start of a
+        token, of a run of spaces or of a comment. Tokens are stored with their
+        offsets in the source relative to base. When the scan runs to the end of
+        the text an EOF token is appended, unless more text is still to come.
+
+        Args:
+            buffer (TokenBuffer): The buffer to append the tokens to.
+            pos (int, optional): The index in the text to start scanning at. Defaults to 0.
+            base (int, optional): The offset token offsets are stored relative to. Defaults to 0.
+            stop (int, optional): Stop before the first match starting at or after this index.
+            limit (int, optional): Stop after the first newline token once the buffer
+                holds this many tokens.
+            final (bool, optional): Whether the text runs to the end of the input. If not,
+                the scan stops before a string that is not closed yet. Defaults to True.
+
+        Returns:
+            Tuple[Optional[Error], Optional[int]]: The error that stopped the scan, if any,
+            and the index the scan stopped at, or None if it reached the end of the input.
+        """
+        source = self.source
+        text = self.text
+        offset = self.offset
+        shift = offset - base
+        kinds = buffer.kinds.append
+        keywords = buffer.keywords.append
+        values = buffer.values.append
+        starts = buffer.starts.append
+        ends = buffer.ends.append
+        eof = offset + len(text)
+
+        for match in TOKEN_PATTERN.finditer(text, pos):
+            if stop is not None and match.start() >= stop:
+                return None, match.start()
+
+            kind = match.lastgroup
+
+            if kind == 'space':
+                continue
+
+            if kind == 'identifier':
+                value = match.group()
+                keyword = KEYWORD_IDS.get(value, 0)
+                kinds(TT_KEYWORD if keyword else TT_IDENTIFIER)
+                keywords(keyword)
+                values(intern(value))
+            elif kind == 'operator':
+                value = match.group()
+                if value == '!':
+                    return self.expected_equals(offset + match.start()), match.start()
+                kinds(OPERATORS[value])
+                keywords(0)
+                values(None)
+            elif kind == 'newline':
+                kinds(TT_NEWLINE)
+                keywords(0)
+                values(None)
+                if limit is not None and len(buffer) >= limit:
+                    starts(match.start() + shift)
+                    ends(match.end() + shift)
+                    return None, match.end()
+            elif kind == 'number':
+                value = match.group()
+                if '.' in value:
+                    kinds(TT_FLOAT)
+                    values(float(value))
+                else:
+                    kinds(TT_INT)
+                    values(int(value))
+                keywords(0)
+            elif kind == 'string':
+                value = match.group()
+                if len(value) > 1 and value[-1] == '"':
+                    kinds(TT_STRING)
+                    keywords(0)
+                    values(value[1:-1].replace('\\', ''))
+                elif not final:
+                    return None, match.start()
+                else:
+                    # Lexer steps once past the end of an unterminated string.
+                    eof = offset + match.end() + 1
+                    kinds(TT_STRING)
+                    keywords(0)
+                    values(value[1:].replace('\\', ''))
+                    starts(match.start() + shift)
+                    ends(eof - base)
+                    continue
+            elif kind == 'comment':
+                if match.group()[-1] == '\n':
+                    source.comment_newlines.add(offset + match.end() - 1)
+                continue
+            else:
+                from .error_handler.error import IllegalCharError
+                idx = offset + match.start()
+                return IllegalCharError(
+                    source.position(idx), source.position(idx + 1),
+                    "'" + match.group() + "'"
+                ), match.start()
+            starts(match.start() + shift)
+            ends(match.end() + shift)
+
+        if not final:
+            return None, len(text)
+        buffer.append(TT_EOF, 0, None, eof - base, eof + 1 - base)
+        return None, None
+
+    def expected_equals(self, idx: int):
+        """
+        Build the error for a '!' that is not followed by '='.
+
+        Lexer consumes the character after the '!' before reporting, so the
+        error spans two characters and may end at the start of the next line.
+
+        Args:
+            idx (int): The index of the '!' character.
+
+        Returns:
+            ExpectedCharError: The error to report.
+        """
+        from .error_handler.error import ExpectedCharError
+        return ExpectedCharError(self.source.position(idx), self.source.position(idx + 2), "'=' (after '!')")
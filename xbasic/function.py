@@ -1,6 +1,32 @@
+from contextvars import ContextVar
+
 from .value import Value
+from .number import Number
+from .context_handler.frame import Frame
 from .error_handler.rterror import RTError
-from .error_handler.rtresult import RTResult
+from .error_handler.rtresult import RTResult, RuntimeFailure, FunctionReturn
+
+# Whether calls in tail position are made like any other call, keeping the
+# frame of the function making them in tracebacks, instead of replacing it.
+full_tracebacks = ContextVar('full_tracebacks', default=False)
+
+# The most frames a function keeps for its later calls.
+MAX_POOLED_FRAMES = 32
+
+
+class TailCall:
+    __slots__ = ('value_to_call', 'args')
+
+    def __init__(self, value_to_call, args: list):
+        """
+        A call in tail position, returned by a function body for the function to make in its place.
+
+        Args:
+            value_to_call (Value): The value to call, positioned at the call.
+            args (List[Value]): The arguments to pass to it.
+        """
+        self.value_to_call = value_to_call
+        self.args = args
 
 
 class BaseFunction(Value):
@@ -14,6 +40,24 @@ class BaseFunction(Value):
         super().__init__()
         self.name = name or "<anonymous>"
 
+    def set_context(self, context=None) -> 'BaseFunction':
+        """
+        Sets the context of the function, which its calls look variables up from.
+
+        A Frame given to a function is captured, so that it is not reused
+        while the function may still be called.
+
+        Args:
+            context (Optional[Context]): The context of the function.
+
+        Returns:
+            BaseFunction: The instance of the function.
+        """
+        self.context = context
+        if type(context) is Frame and not context.captured:
+            context.capture()
+        return self
+
     def generate_new_context(self):
         """
         Generate a new context for the function.
@@ -28,6 +72,32 @@ class BaseFunction(Value):
         new_context.symbol_table = SymbolTable(new_context.parent.symbol_table)
         return new_context
 
+    def generate_tail_context(self, context):
+        """
+        Generate a new context for the function called in tail position, in place of the context of the caller.
+
+        The function sees the variables of the caller like it would from a
+        context of its own, but they are copied into its symbol table, so that
+        neither the contexts nor the symbol tables pile up over tail calls.
+
+        Args:
+            context (Context): The context of the function making the call.
+
+        Returns:
+            Context: The newly generated context.
+        """
+        if self.context is not context:
+            # Not looked up in the caller, so it never saw the caller's variables.
+            return self.generate_new_context()
+
+        from .context_handler.context import Context
+        from .context_handler.symbol_table import SymbolTable
+
+        new_context = Context(self.name, context.parent, context.parent_entry_pos)
+        new_context.symbol_table = SymbolTable(context.symbol_table.parent)
+        new_context.symbol_table.symbols.update(context.symbol_table.symbols)
+        return new_context
+
     def check_args(self, arg_names: list, args: list):
         """
         Check if the correct number of arguments are passed.
@@ -94,6 +164,9 @@ class BaseFunction(Value):
 
 
 class Function(BaseFunction):
+    # The Interpreter that runs the bodies of functions, made by make_interpreter.
+    interpreter = None
+
     def __init__(self, name: str, body_node, arg_names: list, should_auto_return: bool):
         """
         Initialize a Function object with name, body node, argument names, and auto return flag.
@@ -108,6 +181,10 @@ class Function(BaseFunction):
         self.body_node = body_node
         self.arg_names = arg_names
         self.should_auto_return = should_auto_return
+        # The Memo of the results of its calls, shared by its copies, if it is memoized.
+        self.memo = None
+        # The Frames of its calls that ended, shared by its copies, to reuse.
+        self.frames = []
 
     def execute(self, args: list):
         """
@@ -119,23 +196,130 @@ class Function(BaseFunction):
         Returns:
             RTResult: The result of executing the function.
         """
-        res = RTResult()
+        try:
+            return RTResult().success(self.call(args))
+        except RuntimeFailure as e:
+            return RTResult().failure(e.error)
 
-        from .Interpreter import Interpreter
-        interpreter = Interpreter()
-        exec_ctx = self.generate_new_context()
+    def call(self, args: list):
+        """
+        Execute the function, raising RuntimeFailure instead of returning an error.
 
-        res.register(self.check_and_populate_args(self.arg_names, args, exec_ctx))
-        if res.should_return():
-            return res
+        Args:
+            args (List[Value]): The arguments to pass to the function.
 
-        value = res.register(interpreter.visit(self.body_node, exec_ctx))
-        if res.should_return() and res.func_return_value is None:
-            return res
+        Returns:
+            Value: The value the function returns.
+        """
+        memo = self.memo
+        key = memo and memo.key(args, self.context.symbol_table)
+        if key is not None:
+            value = memo.get(key)
+            if value is not None:
+                return value
+
+        if len(args) != len(self.arg_names):
+            raise RuntimeFailure(self.check_args(self.arg_names, args).error)
+        interpreter = Function.interpreter or Function.make_interpreter()
+        exec_ctx = self.frame(self.context, self.pos_start, args)
+        exec_ctx.symbol_table.memo = key is not None and memo or None
+
+        function = self
+        while True:
+            try:
+                value = interpreter.visit(function.body_node, exec_ctx)
+            except FunctionReturn as ret:
+                value = ret.value
+                if type(value) is TailCall:
+                    # Run the function called in tail position in this frame.
+                    function, args = value.value_to_call, value.args
+                    if type(function) is Function and not full_tracebacks.get():
+                        if len(args) != len(function.arg_names):
+                            raise RuntimeFailure(function.check_args(function.arg_names, args).error)
+                        exec_ctx = function.tail_frame(exec_ctx, args)
+                        continue
+                    value = interpreter.call(function, args)
+            else:
+                value = (value if function.should_auto_return else None) or Number.null
+            break
+
+        if key is not None:
+            memo.put(key, value)
+        else:
+            self.release(exec_ctx)
+        return value
+
+    def frame(self, parent, parent_entry_pos, args: list) -> Frame:
+        """
+        Take a frame for a call of the function, from the ones its calls left or a new one.
+
+        Args:
+            parent (Context): The context the function is called from.
+            parent_entry_pos (Position): The position of the call.
+            args (List[Value]): The arguments, as many as there are parameters.
+
+        Returns:
+            Frame: The frame, with the arguments set.
+        """
+        frames = self.frames
+        frame = frames.pop() if frames else Frame(self.name, parent)
+        frame.enter(self.name, parent, parent_entry_pos, self.arg_names, args)
+        return frame
+
+    def tail_frame(self, context, args: list) -> Frame:
+        """
+        Take a frame for the function called in tail position, in place of the context of the caller.
+
+        Like generate_tail_context, the function sees the variables of the
+        caller copied into its frame.
+
+        Args:
+            context (Context): The context of the function making the call.
+            args (List[Value]): The arguments, as many as there are parameters.
+
+        Returns:
+            Frame: The frame, with the arguments set.
+        """
+        if self.context is not context:
+            # Not looked up in the caller, so it never saw the caller's variables.
+            return self.frame(self.context, self.pos_start, args)
+
+        frame = self.frame(context.parent, context.parent_entry_pos, ())
+        symbols = frame.symbol_table.symbols
+        symbols.update(context.symbol_table.symbols)
+        symbols.update(zip(self.arg_names, args))
+        return frame
+
+    def release(self, frame: Frame) -> None:
+        """
+        Keep the frame of a call that ended for a later call, unless it was captured.
+
+        Other values made in the call refer to the frame as their context
+        too, but only their tracebacks use it once the call ended. A
+        function value may look variables up in it later, so a frame given
+        to one, or to one made in a call it made, is left as it is.
+
+        Args:
+            frame (Frame): The frame of the call.
+        """
+        frames = self.frames
+        if not frame.captured and len(frames) < MAX_POOLED_FRAMES:
+            frame.clear()
+            frames.append(frame)
+
+    @staticmethod
+    def make_interpreter():
+        """
+        Make the Interpreter that runs the bodies of functions, the first time a function is called.
+
+        Returns:
+            Interpreter: The Interpreter, which makes calls in tail position in the frame of the caller.
+        """
+        from .Interpreter import Interpreter
 
-        from .number import Number
-        ret_value = (value if self.should_auto_return else None) or res.func_return_value or Number.null
-        return res.success(ret_value)
+        Function.interpreter = Interpreter()
+        Function.interpreter.tail_calls = True
+        return Function.interpreter
 
     def copy(self) -> 'Function':
         """
@@ -145,6 +329,8 @@ class Function(BaseFunction):
             Function: The copy of the function.
         """
         copy = Function(self.name, self.body_node, self.arg_names, self.should_auto_return)
+        copy.memo = self.memo
+        copy.frames = self.frames
         copy.set_context(self.context)
         copy.set_pos(self.pos_start, self.pos_end)
         return copy
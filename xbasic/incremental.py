@@ -0,0 +1,569 @@
+from bisect import bisect_left, bisect_right
+from typing import List, Optional
+
+from .error_handler.error import InvalidSyntaxError
+from .fast_lexer import FastLexer
+from .parser import Parser
+from .utils.nodes import ListNode
+from .utils.parse_result import ParseResult, ParseError
+from .utils.position import Position
+from .utils.source_file import SourceFile
+from .utils.token import Token
+from .utils.token_buffer import TokenBuffer, TOKEN_TYPES, KEYWORD_TYPES
+from .utils.token_list import TT_NEWLINE, TT_EOF
+
+# A segment is closed at the first newline after this many tokens, which
+# bounds how much text has to be re-lexed around an edit.
+SEGMENT_TOKENS = 256
+
+
+class DocumentSlice:
+    __slots__ = ('document', 'base')
+
+    def __init__(self, document: 'Document', base: int):
+        """
+        Stands in for the SourceFile of the tokens and nodes of one statement.
+
+        Offsets in the statement are relative to base, so when an edit earlier
+        in the document shifts the statement only base has to change. Positions
+        are taken from the current text of the document.
+
+        Args:
+            document (Document): The document the statement belongs to.
+            base (int): The offset in the document that offsets in the statement are relative to.
+        """
+        self.document = document
+        self.base = base
+
+    def position(self, idx: int) -> Position:
+        return self.document.source.position(self.base + idx)
+
+    def end_position(self, idx: int) -> Position:
+        return self.document.source.end_position(self.base + idx)
+
+
+class Segment:
+    __slots__ = ('base', 'buffer', 'error')
+
+    def __init__(self, base: int):
+        """
+        A run of tokens of a document, stored relative to the offset of the first one.
+
+        Args:
+            base (int): The offset in the document the segment starts at.
+        """
+        self.base = base
+        self.buffer = TokenBuffer(None)
+        self.error = None
+
+
+class Statement:
+    __slots__ = ('slice', 'node', 'error', 'end', 'horizon', 'joined')
+
+    def __init__(self, slice_: DocumentSlice, node, error, end: int, horizon: int):
+        """
+        A parsed top-level statement of a document.
+
+        Args:
+            slice_ (DocumentSlice): The source of the statement, based at its first token.
+            node: The node of the statement, or None if it could not be parsed.
+            error (InvalidSyntaxError): The syntax error parsing stopped at, if any.
+            end (int): The offset, relative to the slice, of the token after the statement.
+            horizon (int): The offset, relative to the slice, just past the last token
+                the parser looked at. Edits after it cannot change the statement.
+
+        Attributes:
+            joined (bool): Whether parsing reached the statement from the one before it,
+                as opposed to it being kept from before a syntax error.
+        """
+        self.slice = slice_
+        self.node = node
+        self.error = error
+        self.end = end
+        self.horizon = horizon
+        self.joined = True
+
+
+class StatementChanges:
+    def __init__(self, index: int, removed: int, added: list):
+        """
+        Describes how an edit changed the top-level statements of a document.
+
+        The statements from index on were replaced: removed old statements
+        were taken out and the nodes in added put in their place. Statements
+        after them are unchanged, although their positions may have moved.
+
+        Args:
+            index (int): The index of the first changed statement.
+            removed (int): The number of old statements that were replaced.
+            added (list): The nodes of the new statements.
+        """
+        self.index = index
+        self.removed = removed
+        self.added = added
+
+    @staticmethod
+    def between(old: list, new: list) -> 'StatementChanges':
+        """
+        Describes the change between two lists of statement nodes.
+
+        Nodes of statements that were kept are the same objects in both lists.
+
+        Args:
+            old (list): The nodes before the edit.
+            new (list): The nodes after the edit.
+
+        Returns:
+            StatementChanges: The changed run of statements.
+        """
+        index = 0
+        while index < min(len(old), len(new)) and old[index] is new[index]:
+            index += 1
+        same = 0
+        while same < min(len(old), len(new)) - index and old[-1 - same] is new[-1 - same]:
+            same += 1
+        return StatementChanges(index, len(old) - index - same, new[index:len(new) - same])
+
+    def __repr__(self) -> str:
+        return f'StatementChanges({self.index}, {self.removed}, {self.added})'
+
+
+class SegmentTokens:
+    def __init__(self, document: 'Document', seg_idx: int, tok_idx: int):
+        """
+        Presents the tokens of a document, from a given token on, as one sequence for the Parser.
+
+        Tokens are built relative to the slice of the statement being parsed, and
+        the highest index the parser has looked at is recorded.
+
+        Args:
+            document (Document): The document to read tokens from.
+            seg_idx (int): The index of the segment holding the first token.
+            tok_idx (int): The index of the first token in that segment.
+        """
+        self.segments = document.segments[seg_idx:]
+        self.firsts = []
+        count = -tok_idx
+        for segment in self.segments:
+            self.firsts.append(count)
+            count += len(segment.buffer)
+        self.length = count
+        self.slice: Optional[DocumentSlice] = None
+        self.max_index = -1
+
+    def __len__(self) -> int:
+        return self.length
+
+    def locate(self, i: int):
+        """
+        Finds the segment holding the token at an index.
+
+        Args:
+            i (int): The index of the token in the sequence.
+
+        Returns:
+            Tuple[Segment, int]: The segment and the index of the token in it.
+        """
+        k = bisect_right(self.firsts, i) - 1
+        return self.segments[k], i - self.firsts[k]
+
+    def __getitem__(self, i: int) -> Token:
+        if i > self.max_index:
+            self.max_index = i
+        segment, j = self.locate(i)
+        buffer = segment.buffer
+        shift = segment.base - self.slice.base
+        tok = Token.__new__(Token)
+        tok.type = TOKEN_TYPES[buffer.kinds[j]]
+        tok.keyword = KEYWORD_TYPES[buffer.keywords[j]]
+        tok.value = buffer.values[j]
+        tok.source = self.slice
+        tok.idx_start = buffer.starts[j] + shift
+        tok.idx_end = buffer.ends[j] + shift
+        return tok
+
+    def start(self, i: int) -> int:
+        segment, j = self.locate(i)
+        return segment.base + segment.buffer.starts[j]
+
+    def end(self, i: int) -> int:
+        segment, j = self.locate(i)
+        return segment.base + segment.buffer.ends[j]
+
+
+class Document:
+    def __init__(self, fn: str, text: str):
+        """
+        Keeps the tokens and top-level statements of a text that is edited in place.
+
+        An editor or shell applies edits with edit() or update(). Only the
+        tokens around the edit are lexed again, and only the top-level
+        statements whose tokens changed are parsed again; the rest are kept,
+        with their positions shifted. The tokens, nodes and errors are the same
+        as FastLexer and Parser would produce for the whole new text.
+
+        Args:
+            fn (str): The name of the file.
+            text (str): The initial text of the file.
+        """
+        self.fn = fn
+        self.source = SourceFile(fn, text)
+        self.segments: List[Segment] = self.lex(0, [])[0]
+        self.statements: List[Statement] = []
+        self.pending: List[Statement] = []
+        self.parse(0, 0, [], 0)
+
+    @property
+    def text(self) -> str:
+        """str: The current text of the document."""
+        return self.source.text
+
+    @property
+    def nodes(self) -> list:
+        """list: The nodes of the top-level statements parsed so far."""
+        return [statement.node for statement in self.statements if statement.node is not None]
+
+    @property
+    def error(self):
+        """Error: The first lexing error, else the syntax error parsing stopped at, else None."""
+        for segment in self.segments:
+            if segment.error:
+                error_type, details, idx_start, idx_end = segment.error
+                return error_type(
+                    self.source.position(segment.base + idx_start),
+                    self.source.position(segment.base + idx_end),
+                    details
+                )
+        if self.statements:
+            return self.statements[-1].error
+        return None
+
+    def tokens(self) -> List[Token]:
+        """
+        Builds the tokens of the whole document.
+
+        Returns:
+            List[Token]: The tokens, with offsets into the current text.
+        """
+        tokens = SegmentTokens(self, 0, 0)
+        tokens.slice = DocumentSlice(self, 0)
+        return [tokens[i] for i in range(len(tokens))]
+
+    def parse_result(self) -> ParseResult:
+        """
+        Builds the result Parser.parse would return for the current text.
+
+        Returns:
+            ParseResult: The program as a ListNode of its statements, or the error.
+        """
+        res = ParseResult()
+        error = self.error
+        if error:
+            return res.failure(error)
+        tokens = SegmentTokens(self, 0, 0)
+        return res.success(ListNode(
+            self.nodes,
+            self.source,
+            tokens.start(0),
+            tokens.end(len(tokens) - 1)
+        ))
+
+    def update(self, text: str) -> StatementChanges:
+        """
+        Replaces the text of the document, editing only the part that differs.
+
+        Args:
+            text (str): The new text of the document.
+
+        Returns:
+            StatementChanges: How the top-level statements changed.
+        """
+        old = self.source.text
+        limit = min(len(old), len(text))
+        lo, hi = 0, limit
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if old[:mid] == text[:mid]:
+                lo = mid
+            else:
+                hi = mid - 1
+        prefix = lo
+        lo, hi = 0, limit - prefix
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if old[len(old) - mid:] == text[len(text) - mid:]:
+                lo = mid
+            else:
+                hi = mid - 1
+        return self.edit(prefix, len(old) - lo, text[prefix:len(text) - lo])
+
+    def edit(self, idx_start: int, idx_end: int, text: str) -> StatementChanges:
+        """
+        Replaces a range of the text of the document.
+
+        Args:
+            idx_start (int): The offset of the first replaced character.
+            idx_end (int): The offset just past the last replaced character.
+            text (str): The text to insert in place of the range.
+
+        Returns:
+            StatementChanges: How the top-level statements changed.
+        """
+        delta = len(text) - (idx_end - idx_start)
+        self.source = self.source.replace(idx_start, idx_end, text)
+        old_tokens, new_tokens = self.relex(idx_start, idx_end, delta)
+
+        # The damaged range, in old offsets, covers the edit and every token
+        # that was lexed differently.
+        lo, hi = idx_start, idx_end
+        same = 0
+        for old, new in zip(old_tokens, new_tokens):
+            if old != new:
+                break
+            same += 1
+        tail = 0
+        while tail < min(len(old_tokens), len(new_tokens)) - same:
+            old, new = old_tokens[-1 - tail], new_tokens[-1 - tail]
+            if old[:3] != new[:3] or old[3] + delta != new[3] or old[4] + delta != new[4]:
+                break
+            tail += 1
+        for tok in old_tokens[same:len(old_tokens) - tail]:
+            lo, hi = min(lo, tok[3]), max(hi, tok[4])
+        for tok in new_tokens[same:len(new_tokens) - tail]:
+            lo, hi = min(lo, tok[3]), max(hi, tok[4] - delta)
+
+        # Keep the statements whose tokens all lie before the damage, and the
+        # ones starting after it, shifted. Parse the ones in between again. A
+        # statement with a syntax error is always parsed again, since its
+        # error refers to the old text; the statements kept after it may be
+        # reached again once it is fixed.
+        previous_nodes = self.nodes
+        old = self.statements
+        limit = len(old)
+        if old and old[-1].error is not None:
+            limit -= 1
+            old = old[:-1]
+        old = old + self.pending
+        index = 0
+        while index < limit and old[index].slice.base + old[index].horizon <= lo:
+            index += 1
+        bases = [statement.slice.base for statement in old]
+        resume = bisect_left(bases, hi, index)
+        for statement in old[resume:]:
+            statement.slice.base += delta
+
+        self.statements = old[:index]
+        if index:
+            seg_idx, tok_idx = self.find(old[index - 1].slice.base + old[index - 1].end)
+        else:
+            seg_idx, tok_idx = 0, 0
+        self.parse(seg_idx, tok_idx, old, resume)
+
+        return StatementChanges.between(previous_nodes, self.nodes)
+
+    def relex(self, idx_start: int, idx_end: int, delta: int):
+        """
+        Lexes the text around an edit again and splices the result into the segments.
+
+        Lexing restarts at the end of the last token that ends before the edit,
+        and stops at the first old segment boundary after the edit that the
+        lexer passes through again: the tokens are the same from there on.
+
+        Args:
+            idx_start (int): The offset of the first replaced character.
+            idx_end (int): The offset, in the old text, just past the last replaced character.
+            delta (int): How far the edit moved the text after it.
+
+        Returns:
+            Tuple[list, list]: The replaced and the new tokens, as flatten() lists them.
+        """
+        segments = self.segments
+        bases = [segment.base for segment in segments]
+        first = max(bisect_right(bases, idx_start - 1) - 1, 0)
+        damaged = segments[first]
+        keep = bisect_left(damaged.buffer.ends, idx_start - damaged.base)
+        restart = damaged.base + damaged.buffer.ends[keep - 1] if keep else damaged.base
+        targets = [base + delta for base in bases[first + 1:] if base >= idx_end]
+
+        comment_newlines = self.source.comment_newlines
+        self.source.comment_newlines = set()
+        relexed, synced = self.lex(restart, targets)
+        last = len(segments) if synced is None else len(segments) - len(targets) + synced
+        stop = len(self.source.text) + 1 if synced is None else targets[synced]
+        self.source.comment_newlines.update(
+            idx for idx in comment_newlines if idx < restart or idx >= stop
+        )
+
+        kept = []
+        if keep:
+            prefix = Segment(damaged.base)
+            for name in ('kinds', 'keywords', 'values', 'starts', 'ends'):
+                setattr(prefix.buffer, name, getattr(damaged.buffer, name)[:keep])
+            if damaged.error and damaged.base + damaged.error[2] < restart:
+                prefix.error = damaged.error
+            kept.append(prefix)
+        for segment in segments[last:]:
+            segment.base += delta
+        self.segments = segments[:first] + kept + relexed + segments[last:]
+        return self.flatten(segments[first:last], restart), self.flatten(relexed, restart)
+
+    @staticmethod
+    def flatten(segments: List[Segment], idx_start: int) -> list:
+        """
+        Lists the tokens of segments from an offset on as comparable tuples.
+
+        Args:
+            segments (List[Segment]): The segments.
+            idx_start (int): The offset of the first token to list.
+
+        Returns:
+            list: A (kind, keyword, value, start, end) tuple per token, with document offsets.
+        """
+        tokens = []
+        for segment in segments:
+            buffer = segment.buffer
+            base = segment.base
+            for j in range(len(buffer)):
+                start = base + buffer.starts[j]
+                if start >= idx_start:
+                    tokens.append((buffer.kinds[j], buffer.keywords[j], buffer.values[j], start, base + buffer.ends[j]))
+        return tokens
+
+    def find(self, idx: int):
+        """
+        Finds the token starting at an offset.
+
+        Args:
+            idx (int): The offset of the token.
+
+        Returns:
+            Tuple[int, int]: The index of the segment holding the token and its index in the segment.
+        """
+        seg_idx = bisect_right([segment.base for segment in self.segments], idx) - 1
+        segment = self.segments[seg_idx]
+        return seg_idx, bisect_left(segment.buffer.starts, idx - segment.base)
+
+    def lex(self, pos: int, targets: List[int]):
+        """
+        Lexes the text from an offset on into segments.
+
+        Lexing stops at the first target offset a match starts at, or at the end
+        of the text. Illegal characters are recorded on their segment and
+        skipped, so the tokens after them stay available.
+
+        Args:
+            pos (int): The offset to start lexing at; a match must start there.
+            targets (List[int]): Increasing offsets lexing may stop at.
+
+        Returns:
+            Tuple[List[Segment], Optional[int]]: The segments, and the index of the target
+            lexing stopped at, or None if it reached the end of the text.
+        """
+        lexer = FastLexer(self.fn, self.source.text, self.source)
+        segments = []
+        segment = Segment(pos)
+        target = 0
+        while True:
+            stop = targets[target] if target < len(targets) else None
+            error, end = lexer.scan(segment.buffer, pos, segment.base, stop, SEGMENT_TOKENS)
+            if error:
+                if not segment.error:
+                    segment.error = (
+                        type(error), error.details,
+                        error.pos_start.idx - segment.base, error.pos_end.idx - segment.base
+                    )
+                pos = end + 1
+            elif end is None:
+                segments.append(segment)
+                return segments, None
+            elif stop is not None and end == stop:
+                segments.append(segment)
+                return segments, target
+            elif stop is not None and end > stop:
+                while target < len(targets) and targets[target] < end:
+                    target += 1
+                pos = end
+            else:
+                segments.append(segment)
+                segment = Segment(end)
+                pos = end
+
+    def parse(self, seg_idx: int, tok_idx: int, old: List[Statement], resume: int):
+        """
+        Parses top-level statements from a token on, appending them to self.statements.
+
+        Parsing stops at the end of the program or at a syntax error. When it
+        reaches the start of an old statement that can be kept, that statement
+        and the old statements parsed on from it are appended as they are, and
+        parsing goes on after them.
+
+        Args:
+            seg_idx (int): The index of the segment holding the first token.
+            tok_idx (int): The index of the first token in that segment.
+            old (List[Statement]): The statements before the edit.
+            resume (int): The index of the first old statement that may be kept.
+        """
+        statements = self.statements
+        self.pending = []
+
+        while True:
+            tokens = SegmentTokens(self, seg_idx, tok_idx)
+            tokens.slice = DocumentSlice(self, tokens.start(0))
+            parser = Parser(tokens)
+
+            while True:
+                while parser.current_tok.type == TT_NEWLINE:
+                    parser.advance()
+                tok = parser.current_tok
+                if statements and tok.type == TT_EOF:
+                    return
+
+                start = tokens.start(parser.tok_idx)
+                while resume < len(old) and old[resume].slice.base < start:
+                    resume += 1
+                if resume < len(old) and old[resume].slice.base == start:
+                    break
+
+                tokens.slice = DocumentSlice(self, start)
+                tokens.max_index = parser.tok_idx
+                parser.update_current_tok()
+                node = error = None
+                if statements and not parser.starts_statement():
+                    error = InvalidSyntaxError(
+                        tok.pos_start, tok.pos_end,
+                        "Token cannot appear after previous tokens"
+                    )
+                else:
+                    try:
+                        node = parser.statement()
+                    except ParseError as e:
+                        error = e.error
+                    if not error and parser.current_tok.type not in (TT_NEWLINE, TT_EOF):
+                        error = InvalidSyntaxError(
+                            parser.current_tok.pos_start, parser.current_tok.pos_end,
+                            "Token cannot appear after previous tokens"
+                        )
+                statement = Statement(
+                    tokens.slice, node, error,
+                    tokens.start(parser.tok_idx) - start, tokens.end(tokens.max_index) - start
+                )
+                statements.append(statement)
+
+                if statement.error:
+                    # Parse will not reach the old statements after the error,
+                    # but they are kept in case a later edit fixes it.
+                    self.pending = old[resume:]
+                    if self.pending:
+                        self.pending[0].joined = False
+                    return
+
+            # Keep the old statements that were parsed on from this one. If
+            # the run ends before the end of the program, go on parsing after it.
+            end = resume + 1
+            while end < len(old) and old[end].joined:
+                end += 1
+            old[resume].joined = True
+            statements.extend(old[resume:end])
+            last = old[end - 1]
+            seg_idx, tok_idx = self.find(last.slice.base + last.end)
+            old, resume = old[end:], 0
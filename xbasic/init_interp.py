@@ -1,3 +1,5 @@
+from contextvars import ContextVar
+
 from .context_handler.symbol_table import SymbolTable
 from .builtinfunction import BuiltInFunction
 from .number import Number
@@ -21,41 +23,349 @@ global_symbol_table.set("pop", BuiltInFunction.pop)
 global_symbol_table.set("extend", BuiltInFunction.extend)
 global_symbol_table.set("len", BuiltInFunction.len)
 global_symbol_table.set("RUN", BuiltInFunction.run)
+global_symbol_table.set("memoize", BuiltInFunction.memoize)
+global_symbol_table.set("memo_info", BuiltInFunction.memo_info)
+
+# The engines a program can be run with: 'tree' walks the AST with the
+# Interpreter, 'closure' compiles it with the ClosureCompiler first, 'vm'
+# compiles it to bytecode for the VM and 'aot' transpiles it to Python.
+ENGINES = ('tree', 'closure', 'vm', 'aot')
+
+# The engines that can run a program one statement at a time.
+STREAM_ENGINES = ('tree', 'closure', 'vm')
+DEFAULT_ENGINE = 'tree'
+
+# The engine of the program being run, inherited by scripts it RUNs.
+current_engine = ContextVar('current_engine', default=DEFAULT_ENGINE)
 
+# The deepest nesting programs may have. None parses them with Parser, which
+# recurses and so is bounded by the recursion limit; a number parses them
+# with a StackParser of that max_depth.
+max_depth = ContextVar('max_depth', default=None)
 
-def run(fn: str, text: str) -> tuple:
+
+def make_parser(tokens):
     """
-    Run the program with the given filename and text.
+    Make the parser programs are parsed with, as max_depth says.
+
+    Args:
+        tokens (TokenBuffer): The tokens to be parsed.
+
+    Returns:
+        Parser: A Parser, or a StackParser if max_depth is set.
+    """
+    depth = max_depth.get()
+    if depth is None:
+        from .parser import Parser
+        return Parser(tokens)
+
+    from .stack_parser import StackParser
+    return StackParser(tokens, depth)
+
+
+def nesting_error(tok):
+    """
+    Make the error for a program nested too deeply for Parser, which raised a RecursionError.
+
+    How deep Parser got depends on the stack of whoever called it, so the
+    error is at the start of the program or statement, to be the same for
+    every caller.
+
+    Args:
+        tok (Token): The first token of the program or statement.
+
+    Returns:
+        InvalidSyntaxError: The error, at that token.
+    """
+    from .error_handler.error import InvalidSyntaxError
+    return InvalidSyntaxError(tok.pos_start, tok.pos_end, "Nesting exceeds the recursion limit of the parser")
+
+
+def parse_source(fn: str, text: str) -> tuple:
+    """
+    Lex and parse a program, without optimizing it or using the cache.
 
     Args:
         fn (str): The filename.
         text (str): The text of the program.
 
     Returns:
-        tuple: A tuple containing the result value and error, if any.
+        tuple: A tuple containing the AST and error, if any.
     """
-    # Generate tokens
-
-    from .lexer import Lexer
-    lexer = Lexer(fn, text)
-    tokens, error = lexer.make_tokens()
+    from .fast_lexer import FastLexer
+    lexer = FastLexer(fn, text)
+    tokens, error = lexer.make_token_buffer()
     if error:
         return None, error
 
-    # Generate AST
-    from .parser import Parser
-    parser = Parser(tokens)
-    ast = parser.parse()
+    parser = make_parser(tokens)
+    first_tok = parser.current_tok
+    try:
+        ast = parser.parse()
+    except RecursionError:
+        return None, nesting_error(first_tok)
     if ast.error:
         return None, ast.error
+    return ast.node, None
 
-    # Run program
-    from .Interpreter import Interpreter
-    interpreter = Interpreter()
+
+def parse(fn: str, text: str, value_used: bool = True) -> tuple:
+    """
+    Parse and optimize a program, loading the AST of an unchanged script from the cache.
+
+    Args:
+        fn (str): The filename.
+        text (str): The text of the program.
+        value_used (bool, optional): Whether the value of the program is used. Defaults to True.
+
+    Returns:
+        tuple: A tuple containing the AST and error, if any.
+    """
+    from .utils.ast_cache import AstCache
+    cache = AstCache.for_file(fn)
+    node = cache.load(fn, text, value_used) if cache else None
+    if node is not None:
+        return node, None
+
+    node, error = parse_source(fn, text)
+    if error:
+        return None, error
+
+    from .optimizer import optimize
+    node = optimize(node, value_used)
+    if cache:
+        cache.store(fn, text, node, value_used)
+    return node, None
+
+
+def compile_program(fn: str, text: str, value_used: bool = True) -> tuple:
+    """
+    Compile a program to bytecode, loading the code of an unchanged script from the cache.
+
+    Args:
+        fn (str): The filename.
+        text (str): The text of the program.
+        value_used (bool, optional): Whether the value of the program is used. Defaults to True.
+
+    Returns:
+        tuple: A tuple containing the CodeObject and error, if any.
+    """
+    from .vm import BytecodeCache, Compiler
+    cache = BytecodeCache.for_file(fn)
+    code = cache.load(fn, text, value_used) if cache else None
+    if code is not None:
+        return code, None
+
+    node, error = parse(fn, text, value_used)
+    if error:
+        return None, error
+
+    code = Compiler().compile_program(node)
+    if cache:
+        cache.store(fn, text, code, value_used)
+    return code, None
+
+
+def transpile_program(fn: str, text: str, value_used: bool = True) -> tuple:
+    """
+    Transpile a program to Python, loading the code of an unchanged script from the cache.
+
+    Args:
+        fn (str): The filename.
+        text (str): The text of the program.
+        value_used (bool, optional): Whether the value of the program is used. Defaults to True.
+
+    Returns:
+        tuple: A tuple containing the code of the module and error, if any.
+    """
+    from .aot import CodeCache, Transpiler
+    cache = CodeCache.for_file(fn)
+    code = cache.load(fn, text, value_used) if cache else None
+    if code is not None:
+        return code, None
+
+    node, error = parse(fn, text, value_used)
+    if error:
+        return None, error
+
+    code = Transpiler().compile_program(node)
+    if cache:
+        cache.store(fn, text, code, value_used)
+    return code, None
+
+
+def run(fn: str, text: str, engine: str = None, value_used: bool = True) -> tuple:
+    """
+    Run the program with the given filename and text.
+
+    Args:
+        fn (str): The filename.
+        text (str): The text of the program.
+        engine (str, optional): One of ENGINES. Defaults to the engine of the
+            program running this one, or DEFAULT_ENGINE.
+        value_used (bool, optional): Whether the value of the program is used.
+            If not, the value is null and the lists of its statements are not built.
+            Defaults to True.
+
+    Returns:
+        tuple: A tuple containing the result value and error, if any.
+    """
+    engine = engine or current_engine.get()
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {', '.join(ENGINES)}")
 
     from .context_handler.context import Context
     context = Context('<program>')
     context.symbol_table = global_symbol_table
-    result = interpreter.visit(ast.node, context)
 
-    return result.value, result.error
+    token = current_engine.set(engine)
+    try:
+        if engine == 'vm':
+            program, error = compile_program(fn, text, value_used)
+        elif engine == 'aot':
+            program, error = transpile_program(fn, text, value_used)
+        else:
+            program, error = parse(fn, text, value_used)
+        if error:
+            return None, error
+
+        # Run program
+        if engine == 'vm':
+            from .vm import VM
+            return VM().execute(program, context)
+
+        if engine == 'aot':
+            from .aot import execute, load_module
+            return execute(load_module(program), context)
+
+        if engine == 'closure':
+            from .closure_compiler import ClosureCompiler
+            return ClosureCompiler().execute(program, context)
+
+        from .Interpreter import Interpreter
+        return Interpreter().execute(program, context)
+    except RecursionError:
+        from .utils.position import Position
+        return None, recursion_error(Position(0, 0, 0, fn, text), context)
+    finally:
+        current_engine.reset(token)
+
+
+def recursion_error(pos, context):
+    """
+    Make the error for a program that ran out of Python's stack, nested or recursing too deeply.
+
+    Which node was being compiled or run is lost with the stack, so the
+    error is at the start of the program or statement.
+
+    Args:
+        pos (Position): The start of the program or statement.
+        context (Context): The context of the program.
+
+    Returns:
+        RTError: The error.
+    """
+    from .error_handler.rterror import RTError
+    return RTError(pos, pos.copy(), "Maximum recursion depth exceeded", context)
+
+
+def run_stream(fn: str, file, engine: str = DEFAULT_ENGINE, value_used: bool = True) -> tuple:
+    """
+    Run a program read from a file object, one top-level statement at a time.
+
+    Each statement is parsed and executed as soon as its tokens have been
+    read, and its tokens are freed once it has run, so output starts before
+    the whole file is read. Statements before a syntax or lexing error have
+    already run when the error is reported.
+
+    Args:
+        fn (str): The filename.
+        file (TextIO): The file object to read the program from.
+        engine (str, optional): One of STREAM_ENGINES. Defaults to DEFAULT_ENGINE.
+        value_used (bool, optional): Whether the value of the program is used.
+            If not, the value is null and the values of the statements are not kept.
+            Defaults to True.
+
+    Returns:
+        tuple: A tuple containing the result value and error, if any.
+    """
+    from .stream_lexer import StreamLexer
+    from .stack_parser import StackParser
+    from .Interpreter import Interpreter
+    from .context_handler.context import Context
+    from .error_handler.error import InvalidSyntaxError
+    from .utils.parse_result import ParseError
+    from .list import List
+    from .utils.token_list import TT_NEWLINE, TT_EOF
+    from .optimizer import optimize
+
+    if engine not in STREAM_ENGINES:
+        raise ValueError(f"Engine '{engine}' cannot run a stream, expected one of {', '.join(STREAM_ENGINES)}")
+
+    tokens = StreamLexer(fn, file)
+    parser = make_parser(tokens)
+    context = Context('<program>')
+    context.symbol_table = global_symbol_table
+
+    if engine == 'vm':
+        from .vm import Compiler, VM
+        compiler, vm = Compiler(), VM()
+        execute = lambda node: vm.execute(compiler.compile_program(node), context)
+    elif engine == 'closure':
+        from .closure_compiler import ClosureCompiler
+        compiler = ClosureCompiler()
+        execute = lambda node: compiler.execute(node, context)
+    else:
+        interpreter = Interpreter()
+        execute = lambda node: interpreter.execute(node, context)
+
+    # Mirrors Parser.statements, executing each statement as it is parsed.
+    pos_start = parser.current_tok.pos_start
+    elements = []
+    statement_count = 0
+    while True:
+        newline_count = 0
+        while parser.current_tok.type == TT_NEWLINE:
+            parser.advance()
+            newline_count += 1
+        if statement_count and (newline_count == 0 or not parser.starts_statement()):
+            break
+
+        first_tok = parser.current_tok
+        try:
+            if isinstance(parser, StackParser):
+                node = parser.drive(parser.statement())
+            else:
+                node = parser.statement()
+        except ParseError as e:
+            return None, tokens.error or e.error
+        except RecursionError:
+            return None, tokens.error or nesting_error(first_tok)
+        if tokens.error:
+            return None, tokens.error
+
+        node = optimize(node, value_used)
+        tokens.release(parser.tok_idx)
+        tokens.source.positions.clear()
+        tokens.source.end_positions.clear()
+        token = current_engine.set(engine)
+        try:
+            value, error = execute(node)
+        except RecursionError:
+            value, error = None, recursion_error(node.pos_start, context)
+        finally:
+            current_engine.reset(token)
+        if value is None:
+            return None, error
+        statement_count += 1
+        if value_used:
+            elements.append(value)
+
+    if parser.current_tok.type != TT_EOF:
+        return None, InvalidSyntaxError(
+            parser.current_tok.pos_start, parser.current_tok.pos_end,
+            "Token cannot appear after previous tokens"
+        )
+    if not value_used:
+        return Number.null, None
+    return List(elements).set_context(context).set_pos(pos_start, parser.current_tok.pos_end), None
@@ -1,4 +1,5 @@
 from .utils.position import Position
+from .utils.source_file import SourceFile
 from .utils.token import Token
 from .utils.token_list import *
 
@@ -15,6 +16,7 @@ class Lexer:
 
         self.fn = fn
         self.text = text
+        self.source = SourceFile(fn, text)
         self.pos = Position(-1, 0, -1, fn, text)
         self.current_char = None
         self.advance()
@@ -40,7 +42,7 @@ class Lexer:
             elif self.current_char == '#':
                 self.skip_comment()
             elif self.current_char in ';\n':
-                tokens.append(Token(TT_NEWLINE, pos_start=self.pos))
+                tokens.append(Token(TT_NEWLINE, None, self.source, self.pos.idx))
                 self.advance()
             elif self.current_char in DIGITS:
                 tokens.append(self.make_number())
@@ -49,30 +51,30 @@ class Lexer:
             elif self.current_char == '"':
                 tokens.append(self.make_string())
             elif self.current_char == '+':
-                tokens.append(Token(TT_PLUS, pos_start=self.pos))
+                tokens.append(Token(TT_PLUS, None, self.source, self.pos.idx))
                 self.advance()
             elif self.current_char == '-':
                 tokens.append(self.make_minus_or_arrow())
             elif self.current_char == '*':
-                tokens.append(Token(TT_MUL, pos_start=self.pos))
+                tokens.append(Token(TT_MUL, None, self.source, self.pos.idx))
                 self.advance()
             elif self.current_char == '/':
-                tokens.append(Token(TT_DIV, pos_start=self.pos))
+                tokens.append(Token(TT_DIV, None, self.source, self.pos.idx))
                 self.advance()
             elif self.current_char == '^':
-                tokens.append(Token(TT_POW, pos_start=self.pos))
+                tokens.append(Token(TT_POW, None, self.source, self.pos.idx))
                 self.advance()
             elif self.current_char == '(':
-                tokens.append(Token(TT_LPAREN, pos_start=self.pos))
+                tokens.append(Token(TT_LPAREN, None, self.source, self.pos.idx))
                 self.advance()
             elif self.current_char == ')':
-                tokens.append(Token(TT_RPAREN, pos_start=self.pos))
+                tokens.append(Token(TT_RPAREN, None, self.source, self.pos.idx))
                 self.advance()
             elif self.current_char == '[':
-                tokens.append(Token(TT_LSQUARE, pos_start=self.pos))
+                tokens.append(Token(TT_LSQUARE, None, self.source, self.pos.idx))
                 self.advance()
             elif self.current_char == ']':
-                tokens.append(Token(TT_RSQUARE, pos_start=self.pos))
+                tokens.append(Token(TT_RSQUARE, None, self.source, self.pos.idx))
                 self.advance()
             elif self.current_char == '!':
                 token, error = self.make_not_equals()
@@ -86,7 +88,7 @@ class Lexer:
             elif self.current_char == '>':
                 tokens.append(self.make_greater_than())
             elif self.current_char == ',':
-                tokens.append(Token(TT_COMMA, pos_start=self.pos))
+                tokens.append(Token(TT_COMMA, None, self.source, self.pos.idx))
                 self.advance()
             else:
                 pos_start = self.pos.copy()
@@ -95,7 +97,7 @@ class Lexer:
 
                 from .error_handler.error import IllegalCharError
                 return [], IllegalCharError(pos_start, self.pos, "'" + char + "'")
-        tokens.append(Token(TT_EOF, pos_start=self.pos))
+        tokens.append(Token(TT_EOF, None, self.source, self.pos.idx))
         return tokens, None
 
     def make_number(self) -> Token:
@@ -119,7 +121,7 @@ class Lexer:
 
         tok_type = TT_INT if dot_count == 0 else TT_FLOAT
         value = int(num_str) if tok_type == TT_INT else float(num_str)
-        return Token(tok_type, value, pos_start, self.pos)
+        return Token(tok_type, value, self.source, pos_start.idx, self.pos.idx)
 
     def make_string(self) -> Token:
         """
@@ -150,7 +152,7 @@ class Lexer:
             escape_character = False
 
         self.advance()
-        return Token(TT_STRING, text, pos_start, self.pos)
+        return Token(TT_STRING, text, self.source, pos_start.idx, self.pos.idx)
 
     def make_identifier(self) -> Token:
         """
@@ -167,7 +169,7 @@ class Lexer:
             self.advance()
 
         tok_type = TT_KEYWORD if id_str in KEYWORDS else TT_IDENTIFIER
-        return Token(tok_type, id_str, pos_start, self.pos)
+        return Token(tok_type, id_str, self.source, pos_start.idx, self.pos.idx)
 
     def make_minus_or_arrow(self) -> Token:
         """
@@ -184,7 +186,7 @@ class Lexer:
             self.advance()
             tok_type = TT_ARROW
 
-        return Token(tok_type, pos_start=pos_start, pos_end=self.pos)
+        return Token(tok_type, None, self.source, pos_start.idx, self.pos.idx)
 
     def make_not_equals(self):
         """
@@ -199,7 +201,7 @@ class Lexer:
 
         if self.current_char == '=':
             self.advance()
-            return Token(TT_NE, pos_start=pos_start, pos_end=self.pos), None
+            return Token(TT_NE, None, self.source, pos_start.idx, self.pos.idx), None
 
         self.advance()
 
@@ -221,7 +223,7 @@ class Lexer:
             self.advance()
             tok_type = TT_EE
 
-        return Token(tok_type, pos_start=pos_start, pos_end=self.pos)
+        return Token(tok_type, None, self.source, pos_start.idx, self.pos.idx)
 
     def make_less_than(self) -> Token:
         """
@@ -238,7 +240,7 @@ class Lexer:
             self.advance()
             tok_type = TT_LTE
 
-        return Token(tok_type, pos_start=pos_start, pos_end=self.pos)
+        return Token(tok_type, None, self.source, pos_start.idx, self.pos.idx)
 
     def make_greater_than(self) -> Token:
         """
@@ -255,7 +257,7 @@ class Lexer:
             self.advance()
             tok_type = TT_GTE
 
-        return Token(tok_type, pos_start=pos_start, pos_end=self.pos)
+        return Token(tok_type, None, self.source, pos_start.idx, self.pos.idx)
 
     def skip_comment(self):
         """
@@ -266,4 +268,5 @@ class Lexer:
         while self.current_char != '\n':
             self.advance()
 
+        self.source.comment_newlines.add(self.pos.idx)
         self.advance()
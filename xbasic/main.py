@@ -2,7 +2,11 @@ import click
 import webbrowser
 import platform
 import datetime
-from .init_interp import run
+import time
+from . import __version__
+from .function import full_tracebacks
+from .init_interp import run, run_stream, max_depth, ENGINES, STREAM_ENGINES, DEFAULT_ENGINE
+from .optimizer.memoizer import memo_size
 
 
 @click.group()
@@ -17,13 +21,13 @@ def report():
     webbrowser.open("https://github.com/vivekkdagar/xbasic")
 
 
-def entry_shell():
+def entry_shell(engine=DEFAULT_ENGINE):
     """Starts an interactive shell."""
     while True:
         text = input('>> ')
         if text.strip() == "":
             continue
-        result, error = run('<stdin>', text)
+        result, error = run('<stdin>', text, engine)
 
         if error:
             print(error.as_string())
@@ -32,30 +36,128 @@ def entry_shell():
 
 
 @cli.command()
-def shell():
+@click.option('--engine', type=click.Choice(ENGINES), default=DEFAULT_ENGINE, show_default=True,
+              help='Walk the syntax tree, or compile it to closures, bytecode or Python first.')
+@click.option('--full-tracebacks', 'full_tracebacks_', is_flag=True, default=False,
+              help='Keep the functions that returned a call of another function in tracebacks.')
+@click.option('--memo-size', 'memo_size_', type=click.IntRange(min=0), default=memo_size.get(), show_default=True,
+              help='The most results each memoized function keeps, or 0 to memoize none.')
+@click.option('--max-depth', 'max_depth_', type=click.IntRange(min=1), default=None,
+              help='Parse with an explicit stack, accepting nesting up to this depth instead of up to the recursion limit.')
+def shell(engine, full_tracebacks_, memo_size_, max_depth_):
     """Start an interactive shell"""
+    full_tracebacks.set(full_tracebacks_)
+    memo_size.set(memo_size_)
+    max_depth.set(max_depth_)
     print_intro()
-    entry_shell()
+    entry_shell(engine)
 
 
 @cli.command()
 @click.option('-f', type=click.Path(exists=True), required=True, default=None,
               help='Specify a file to execute within the shell.')
-def file(f):
+@click.option('--stream', is_flag=True, default=False,
+              help='Read and run the file one statement at a time.')
+@click.option('--engine', type=click.Choice(ENGINES), default=DEFAULT_ENGINE, show_default=True,
+              help='Walk the syntax tree, or compile it to closures, bytecode or Python first.')
+@click.option('--full-tracebacks', 'full_tracebacks_', is_flag=True, default=False,
+              help='Keep the functions that returned a call of another function in tracebacks.')
+@click.option('--memo-size', 'memo_size_', type=click.IntRange(min=0), default=memo_size.get(), show_default=True,
+              help='The most results each memoized function keeps, or 0 to memoize none.')
+@click.option('--max-depth', 'max_depth_', type=click.IntRange(min=1), default=None,
+              help='Parse with an explicit stack, accepting nesting up to this depth instead of up to the recursion limit.')
+def file(f, stream, engine, full_tracebacks_, memo_size_, max_depth_):
     """Execute a file within the shell"""
+    full_tracebacks.set(full_tracebacks_)
+    memo_size.set(memo_size_)
+    max_depth.set(max_depth_)
     if not f.endswith('.bsx'):
         click.echo("Error: File must end with '.bsx'.")
         return
-    result, error = run('<stdin>', f'RUN("{f}")')
+    if stream:
+        if engine not in STREAM_ENGINES:
+            click.echo(f"Error: The {engine} engine cannot run a file with --stream.")
+            return
+        with open(f) as source:
+            _, error = run_stream(f, source, engine, value_used=False)
+        if error:
+            print(error.as_string())
+        return
+    result, error = run('<stdin>', f'RUN("{f}")', engine)
     if error:
         print(error.as_string())
     elif result:
         print("The process returned ", result)
 
 
+@cli.command()
+@click.option('-f', type=click.Path(exists=True), required=True, default=None,
+              help='Specify a file to disassemble.')
+def dis(f):
+    """Show the bytecode a file compiles to"""
+    from .init_interp import compile_program
+    from .vm import disassemble
+
+    with open(f) as source:
+        code, error = compile_program(f, source.read())
+    if error:
+        print(error.as_string())
+        raise SystemExit(1)
+    click.echo(disassemble(code))
+
+
+@cli.command('compile')
+@click.option('-f', type=click.Path(exists=True), required=True, default=None,
+              help='Specify a file to transpile.')
+@click.option('-o', 'output', type=click.Path(dir_okay=False), default=None,
+              help='The module to write. Defaults to the file with a .py extension.')
+def compile_file(f, output):
+    """Transpile a file to a Python module"""
+    from .init_interp import parse
+    from .aot import Transpiler
+
+    if not f.endswith('.bsx'):
+        click.echo("Error: File must end with '.bsx'.")
+        return
+    with open(f) as source:
+        node, error = parse(f, source.read())
+    if error:
+        print(error.as_string())
+        raise SystemExit(1)
+
+    output = output or f[:-len('.bsx')] + '.py'
+    with open(output, 'w') as module:
+        module.write(Transpiler().transpile_program(node))
+    click.echo(f"Wrote {output}")
+
+
+@cli.command()
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True))
+@click.option('-j', '--jobs', type=click.IntRange(min=1), default=None,
+              help='Number of processes to check with. Defaults to the number of CPUs.')
+@click.option('--max-depth', 'max_depth_', type=click.IntRange(min=1), default=None,
+              help='Parse with an explicit stack, accepting nesting up to this depth instead of up to the recursion limit.')
+def check(paths, jobs, max_depth_):
+    """Lex and parse scripts without running them"""
+    from .check import find_scripts, check_files
+
+    start = time.perf_counter()
+    scripts = find_scripts(paths)
+    failed = 0
+    for fn, error, seconds in check_files(scripts, jobs, max_depth_):
+        click.echo(f"{'error' if error else 'ok':5} {seconds * 1000:8.1f}ms  {fn}")
+        if error:
+            failed += 1
+            click.echo(error)
+    total = time.perf_counter() - start
+    click.echo(f"Checked {len(scripts)} files in {total:.2f}s: {failed} with errors")
+    if failed:
+        raise SystemExit(1)
+
+
 def print_intro():
     """Print introductory information."""
-    version = "1.2.2"
+    version = __version__
     current_date_time = datetime.datetime.now().strftime("%b %d %Y, %H:%M:%S")
     os_name = platform.system()
     intro = f"XBasic {version} ({current_date_time}) on {os_name.lower()}"
@@ -0,0 +1,72 @@
+import sys
+
+from .constant_folder import ConstantFolder
+from .inliner import Inliner
+from .loop_optimizer import LoopOptimizer, height
+from .memoizer import Memoizer
+from .value_usage import ValueUsage
+from ..utils.nodes import copy_tree
+
+# Bump whenever a pass changes, so that programs cached with trees
+# optimized by an older version are optimized again.
+VERSION = 8
+
+# The most frames the passes recurse through for each level of the tree,
+# twice what the deepest programs of each kind were measured to need.
+FRAMES_PER_LEVEL = 16
+
+
+def stack_depth() -> int:
+    """
+    Returns the number of frames on the stack of the caller.
+    """
+    depth = 0
+    frame = sys._getframe(1)
+    while frame:
+        depth += 1
+        frame = frame.f_back
+    return depth
+
+
+def run_passes(node, value_used: bool):
+    """
+    Run each pass over a tree, changing it in place.
+
+    Args:
+        node: The tree.
+        value_used (bool): Whether the value of the tree is used.
+
+    Returns:
+        The optimized tree.
+    """
+    node = ConstantFolder().fold(node)
+    node = Inliner().inline(node)
+    node = Memoizer().memoize(node)
+    node = LoopOptimizer().optimize(node)
+    ValueUsage().mark(node, value_used)
+    return node
+
+
+def optimize(node, value_used: bool = True):
+    """
+    Optimize the AST from Parser.parse before it is run or compiled.
+
+    The passes recurse down the tree and change it in place. A tree deep
+    enough that they might exceed the recursion limit is copied first, and
+    given back as it was if optimizing the copy exceeds it.
+
+    Args:
+        node: The program, or a statement of it. It may be changed in place.
+        value_used (bool, optional): Whether the value of the node is used. Defaults to True.
+
+    Returns:
+        The optimized node.
+    """
+    if stack_depth() + height(node) * FRAMES_PER_LEVEL < sys.getrecursionlimit():
+        return run_passes(node, value_used)
+    try:
+        return run_passes(copy_tree(node), value_used)
+    except RecursionError:
+        # Every rewrite keeps the meaning of the tree, so a tree too deep to
+        # optimize still runs as it is.
+        return node
@@ -0,0 +1,244 @@
+import math
+from typing import Optional, Union
+
+from ..Interpreter import KEYWORD_METHODS, OPERATOR_METHODS
+from ..number import Number
+from ..string_value import String
+from ..utils.nodes import NumberNode, StringNode, ListNode, FuncDefNode, ReturnNode
+from ..utils.token_list import TT_MINUS, TT_MUL, TT_POW, KW_NOT
+
+# Folded values are stored in the tree and in the caches of compiled
+# programs, so results larger than this are computed when they run instead.
+MAX_INT_BITS = 128
+MAX_STRING_LENGTH = 1024
+MAX_EXPONENT = 64
+
+
+def constant(node) -> Optional[Union[Number, String]]:
+    """
+    Returns the value of a literal.
+
+    Args:
+        node: The node.
+
+    Returns:
+        Optional[Union[Number, String]]: The value, or None if the node is not a NumberNode or StringNode.
+    """
+    if type(node) is NumberNode:
+        return Number(node.value)
+    if type(node) is StringNode:
+        return String(node.value)
+    return None
+
+
+def has_effect(node) -> bool:
+    """
+    Checks whether evaluating a node can do anything besides giving a value.
+
+    Args:
+        node: The node.
+
+    Returns:
+        bool: False if the node is a literal, a list of them or an anonymous FN.
+    """
+    if type(node) is NumberNode or type(node) is StringNode:
+        return False
+    if type(node) is ListNode:
+        return any(has_effect(element_node) for element_node in node.element_nodes)
+    if type(node) is FuncDefNode:
+        return node.var_name is not None
+    return True
+
+
+class ConstantFolder:
+    """
+    Folds constant expressions and prunes code that can never run.
+
+    An operator whose operands are NumberNodes and StringNodes is evaluated
+    at compile time with the methods of Number and String, and replaced by a
+    literal spanning the operation, which is the span the Interpreter gives
+    the value it computes. An operation that fails, like a division by zero,
+    or whose result is too large to store is left in the tree, so it fails or
+    is computed when it runs, just like before.
+
+    IF cases whose condition is a constant are dropped when it is false and
+    end the IF when it is true. Statements after a RETURN are dropped, and so
+    are literals in bodies whose value is thrown away: those of multi-line
+    FNs, and of loops and IF cases that give null.
+    """
+
+    def fold(self, node):
+        """
+        Fold a node and the nodes below it.
+
+        Args:
+            node: The node to fold. It may be changed in place.
+
+        Returns:
+            The node to use in its place.
+        """
+        method = getattr(self, f'fold_{type(node).__name__}', None)
+        return method(node) if method else node
+
+    def discard(self, node):
+        """
+        Fold a node whose value is not used.
+
+        Args:
+            node: The node to fold.
+
+        Returns:
+            The node to use in its place.
+        """
+        node = self.fold(node)
+        if type(node) is ListNode:
+            node.element_nodes = [element_node for element_node in node.element_nodes if has_effect(element_node)]
+        return node
+
+    @staticmethod
+    def literal(value: Union[Number, String], node):
+        """
+        Create the literal a constant operation is replaced by.
+
+        Args:
+            value (Union[Number, String]): The value of the operation.
+            node: The operation.
+
+        Returns:
+            Optional[Union[NumberNode, StringNode]]: The literal, or None if the value should not be stored.
+        """
+        if type(value) is String:
+            if len(value.value) > MAX_STRING_LENGTH:
+                return None
+            return StringNode(value.value, node.source, node.idx_start, node.idx_end)
+
+        if type(value) is not Number:
+            return None
+        if type(value.value) is int:
+            if value.value.bit_length() > MAX_INT_BITS:
+                return None
+        elif type(value.value) is not float or not math.isfinite(value.value):
+            return None
+        return NumberNode(value.value, node.source, node.idx_start, node.idx_end)
+
+    ###################################
+
+    def fold_ListNode(self, node):
+        element_nodes = []
+        for element_node in node.element_nodes:
+            element_node = self.fold(element_node)
+            element_nodes.append(element_node)
+            if type(element_node) is ReturnNode:
+                # Nothing after a RETURN runs.
+                break
+        node.element_nodes = element_nodes
+        return node
+
+    def fold_VarAssignNode(self, node):
+        node.value_node = self.fold(node.value_node)
+        return node
+
+    def fold_BinOpNode(self, node):
+        node.left_node = self.fold(node.left_node)
+        node.right_node = self.fold(node.right_node)
+        left, right = constant(node.left_node), constant(node.right_node)
+        if left is None or right is None:
+            return node
+
+        if type(right) is Number:
+            if node.op_type == TT_POW and not abs(right.value) <= MAX_EXPONENT:
+                return node
+            if node.op_type == TT_MUL and type(left) is String and \
+                    not len(left.value) * right.value <= MAX_STRING_LENGTH:
+                return node
+
+        method_name = KEYWORD_METHODS.get(node.op_keyword) or OPERATOR_METHODS[node.op_type]
+        try:
+            value, error = getattr(left, method_name)(right)
+        except Exception:
+            # Raised again when the operation runs.
+            return node
+        if error:
+            return node
+        return self.literal(value, node) or node
+
+    def fold_UnaryOpNode(self, node):
+        node.node = self.fold(node.node)
+        value = constant(node.node)
+        if value is None:
+            return node
+
+        error = None
+        try:
+            if node.op_type == TT_MINUS:
+                value, error = value.multed_by(Number(-1))
+            elif node.op_keyword == KW_NOT:
+                value, error = value.notted()
+        except Exception:
+            return node
+        if error:
+            return node
+        return self.literal(value, node) or node
+
+    def fold_IfNode(self, node):
+        cases = []
+        else_case = node.else_case
+        for condition, expr, should_return_null in node.cases:
+            condition = self.fold(condition)
+            condition_value = constant(condition)
+            if condition_value is None:
+                cases.append((condition, self.fold_case(expr, should_return_null), should_return_null))
+            elif condition_value.is_true():
+                # Later cases and the ELSE can never run.
+                else_case = (expr, should_return_null)
+                break
+
+        if else_case:
+            expr, should_return_null = else_case
+            else_case = (self.fold_case(expr, should_return_null), should_return_null)
+            if not cases and not should_return_null:
+                return expr
+
+        node.cases = cases
+        node.else_case = else_case
+        return node
+
+    def fold_case(self, expr, should_return_null: bool):
+        """
+        Fold the body of a case of an IF.
+
+        Args:
+            expr: The body.
+            should_return_null (bool): Whether the IF gives null instead of the value of the body.
+
+        Returns:
+            The node to use in place of the body.
+        """
+        return self.discard(expr) if should_return_null else self.fold(expr)
+
+    def fold_ForNode(self, node):
+        node.start_value_node = self.fold(node.start_value_node)
+        node.end_value_node = self.fold(node.end_value_node)
+        if node.step_value_node:
+            node.step_value_node = self.fold(node.step_value_node)
+        node.body_node = self.discard(node.body_node) if node.should_return_null else self.fold(node.body_node)
+        return node
+
+    def fold_WhileNode(self, node):
+        node.condition_node = self.fold(node.condition_node)
+        node.body_node = self.discard(node.body_node) if node.should_return_null else self.fold(node.body_node)
+        return node
+
+    def fold_FuncDefNode(self, node):
+        node.body_node = self.fold(node.body_node) if node.should_auto_return else self.discard(node.body_node)
+        return node
+
+    def fold_CallNode(self, node):
+        node.node_to_call = self.fold(node.node_to_call)
+        node.arg_nodes = [self.fold(arg_node) for arg_node in node.arg_nodes]
+        return node
+
+    def fold_ReturnNode(self, node):
+        if node.node_to_return:
+            node.node_to_return = self.fold(node.node_to_return)
+        return node
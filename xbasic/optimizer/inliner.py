@@ -0,0 +1,236 @@
+import copy
+import hashlib
+from typing import Dict, List, Optional
+
+from ..utils.nodes import (
+    NumberNode, StringNode, ListNode, VarAccessNode, BinOpNode, UnaryOpNode, IfNode, FuncDefNode, CallNode,
+    ReturnNode, SaveNode, InlineNode
+)
+from .loop_optimizer import PURE, Region, builtin_effects, builtin_names, guarded, hidden_access, map_children, walk
+
+# Functions whose body has more nodes than this are always called.
+MAX_INLINED_NODES = 16
+
+# The nodes the body of an inlined function may be made of.
+INLINABLE_NODES = (NumberNode, StringNode, VarAccessNode, BinOpNode, UnaryOpNode, IfNode, CallNode)
+
+
+def inlinable(symbols, func_name: str, save_name: str) -> bool:
+    """
+    Checks whether a call is of the function an InlineNode was created for.
+
+    Args:
+        symbols (SymbolTable): The symbol table the call runs with.
+        func_name (str): The variable called.
+        save_name (str): The name the function inlined was stored as when it was defined.
+
+    Returns:
+        bool: Whether the variable holds that function.
+    """
+    value = symbols.get(func_name)
+    return value is not None and value is symbols.get(save_name)
+
+
+def bind(symbols, param_names: List[str], args: list, builtins, operands) -> bool:
+    """
+    Stores the arguments of an inlined call and checks the assumptions its body was inlined under.
+
+    Args:
+        symbols (SymbolTable): The symbol table the call runs with.
+        param_names (List[str]): The name each argument is stored as.
+        args (List[Value]): The arguments.
+        builtins (List[Tuple[str, str]]): Each variable assumed to be a built-in function, and the name of the function.
+        operands (List[str]): The variables assumed not to hold lists.
+
+    Returns:
+        bool: Whether the body can be evaluated in place of the call.
+    """
+    for param_name, arg in zip(param_names, args):
+        symbols.set(param_name, arg)
+    return guarded(symbols, builtins, operands)
+
+
+def shape(node) -> tuple:
+    """
+    Describes the body of an inlinable function, so that equal ones compare equal.
+
+    Args:
+        node: The body, made of INLINABLE_NODES.
+
+    Returns:
+        tuple: The description.
+    """
+    node_type = type(node)
+    if node_type is NumberNode:
+        return 'number', type(node.value).__name__, node.value
+    if node_type is StringNode:
+        return 'string', node.value
+    if node_type is VarAccessNode:
+        return 'var', node.var_name
+    if node_type is BinOpNode:
+        return 'binary', node.op_type, node.op_keyword, shape(node.left_node), shape(node.right_node)
+    if node_type is UnaryOpNode:
+        return 'unary', node.op_type, node.op_keyword, shape(node.node)
+    if node_type is IfNode:
+        cases = tuple((shape(condition), shape(expr), should_return_null)
+                      for condition, expr, should_return_null in node.cases)
+        else_case = (shape(node.else_case[0]), node.else_case[1]) if node.else_case else None
+        return 'if', cases, else_case
+    return ('call', shape(node.node_to_call), *map(shape, node.arg_nodes))
+
+
+class Inlinable:
+    __slots__ = ('func_def', 'body_node', 'save_name', 'region')
+
+    def __init__(self, func_def: FuncDefNode, body_node, save_name: str, region: Region):
+        """
+        A function whose calls can be replaced by its body.
+
+        Args:
+            func_def (FuncDefNode): The definition of the function.
+            body_node: The expression the function returns.
+            save_name (str): The name the function is stored as when it is defined.
+            region (Region): What evaluating the body relies on.
+        """
+        self.func_def = func_def
+        self.body_node = body_node
+        self.save_name = save_name
+        self.region = region
+
+
+class Inliner:
+    """
+    Replaces calls of small functions by their bodies.
+
+    A named FN is inlined when it is the only definition of its name in the
+    program and its body is a small expression made of literals, variables,
+    operators, IFs and calls of PURE built-in functions: it cannot call
+    itself, and evaluating it again has no effect. Each call is replaced by
+    an InlineNode evaluating a copy of the body in the context of the call,
+    with the parameters read from variables no program can name, and the FN
+    stores the function it defines under a name made from its body, which
+    the call checks it is calling.
+
+    Every value of the body that is not an error is the value of the call.
+    When the body fails, the function is called with the same arguments to
+    report the error exactly like the call would have.
+    """
+
+    def __init__(self):
+        self.builtins = builtin_names()
+        self.functions: Dict[str, Inlinable] = {}
+        self.inlined = set()
+
+    def inline(self, node):
+        """
+        Inline the calls of small functions in a node.
+
+        Args:
+            node: The node. It may be changed in place.
+
+        Returns:
+            The node to use in its place.
+        """
+        definitions: Dict[str, list] = {}
+
+        def collect(child):
+            if type(child) is FuncDefNode and child.var_name:
+                definitions.setdefault(child.var_name, []).append(child)
+            map_children(child, collect, functions=True)
+            return child
+        collect(node)
+
+        for func_name, func_defs in definitions.items():
+            function = self.inlinable(func_defs[0]) if len(func_defs) == 1 else None
+            if function:
+                self.functions[func_name] = function
+        if not self.functions:
+            return node
+
+        node = self.replace_calls(node)
+        return self.save_functions(node)
+
+    def inlinable(self, func_def: FuncDefNode) -> Optional[Inlinable]:
+        """
+        Check whether the calls of a function can be inlined.
+
+        Args:
+            func_def (FuncDefNode): The definition of the function.
+
+        Returns:
+            Optional[Inlinable]: The function, or None if it is always called.
+        """
+        body_node = func_def.body_node
+        if not func_def.should_auto_return:
+            # A body of a single RETURN gives the same value.
+            if type(body_node) is not ListNode or len(body_node.element_nodes) != 1 or \
+                    type(body_node.element_nodes[0]) is not ReturnNode:
+                return None
+            body_node = body_node.element_nodes[0].node_to_return
+            if body_node is None:
+                return None
+
+        nodes = list(walk(body_node))
+        if len(nodes) > MAX_INLINED_NODES or any(type(node) not in INLINABLE_NODES for node in nodes):
+            return None
+        region = Region(body_node, self.builtins)
+        if not region.eligible or any(builtin_effects(builtin_name) != PURE for builtin_name in region.builtins.values()):
+            return None
+        if any(var_name in region.builtins for var_name in func_def.arg_names):
+            return None
+
+        description = repr((tuple(func_def.arg_names), shape(body_node))).encode()
+        save_name = f'@{func_def.var_name}#{hashlib.sha1(description).hexdigest()[:16]}'
+        return Inlinable(func_def, body_node, save_name, region)
+
+    def replace_calls(self, node):
+        """
+        Replace the calls of inlinable functions in a node and below it.
+
+        Args:
+            node: The node.
+
+        Returns:
+            The node to use in its place.
+        """
+        map_children(node, self.replace_calls, functions=True)
+        if type(node) is not CallNode or type(node.node_to_call) is not VarAccessNode:
+            return node
+        function = self.functions.get(node.node_to_call.var_name)
+        if function is None or len(node.arg_nodes) != len(function.func_def.arg_names):
+            return node
+
+        func_name = function.func_def.var_name
+        param_names = {arg_name: f'@{func_name}.{arg_name}' for arg_name in function.func_def.arg_names}
+
+        def rename(child):
+            if type(child) is VarAccessNode and child.var_name in param_names:
+                return hidden_access(param_names[child.var_name], child)
+            map_children(child, rename)
+            return child
+        body_node = rename(copy.deepcopy(function.body_node, {id(function.body_node.source): function.body_node.source}))
+
+        self.inlined.add(func_name)
+        return InlineNode(
+            node, function.save_name,
+            [param_names[arg_name] for arg_name in function.func_def.arg_names],
+            body_node,
+            sorted(function.region.builtins.items()),
+            sorted(param_names.get(var_name, var_name) for var_name in function.region.operands)
+        )
+
+    def save_functions(self, node):
+        """
+        Make the definitions of inlined functions store the function they define.
+
+        Args:
+            node: The node.
+
+        Returns:
+            The node to use in its place.
+        """
+        map_children(node, self.save_functions, functions=True)
+        if type(node) is FuncDefNode and node.var_name in self.inlined and \
+                self.functions[node.var_name].func_def is node:
+            return SaveNode(self.functions[node.var_name].save_name, node)
+        return node
@@ -0,0 +1,682 @@
+import copy
+import math
+from typing import Dict, Optional, Set
+
+from ..builtinfunction import BuiltInFunction, PURE, IO, WRITES
+from ..Interpreter import Interpreter
+from ..list import List
+from ..utils.nodes import (
+    NumberNode, StringNode, ListNode, VarAccessNode, VarAssignNode, BinOpNode, UnaryOpNode, IfNode, ForNode,
+    WhileNode, FuncDefNode, CallNode, ReturnNode, ContinueNode, BreakNode, HoistNode, SaveNode, InlineNode, MemoNode
+)
+from ..utils.token_list import TT_PLUS, TT_MINUS, TT_MUL, TT_POW
+
+# Exponentiation by an integer up to this is replaced by multiplications.
+# Every operation costs about the same to dispatch whatever it computes, so
+# only squares, which take one multiplication, come out ahead.
+MAX_REDUCED_EXPONENT = 2
+
+# The operators that change a list on their left instead of creating a new one.
+LIST_WRITING_OPERATORS = (TT_PLUS, TT_MINUS, TT_MUL)
+
+
+def number_key(value) -> tuple:
+    """
+    Describes a number, so that only numbers that always give the same results compare equal.
+
+    1 and 1.0 compare equal, and so do 0.0 and -0.0, but they print
+    differently and 1 / -0.0 is not 1 / 0.0.
+
+    Args:
+        value (Union[int, float]): The number.
+
+    Returns:
+        tuple: The description.
+    """
+    if type(value) is float:
+        return float, value, math.copysign(1.0, value)
+    return type(value), value
+
+
+def builtin_effects(builtin_name: str) -> str:
+    """
+    Returns what calling a built-in function can do.
+
+    Args:
+        builtin_name (str): The name of the BuiltInFunction.
+
+    Returns:
+        str: PURE, IO or WRITES.
+    """
+    method = getattr(BuiltInFunction, f'execute_{builtin_name}', None)
+    return getattr(method, 'effects', WRITES)
+
+
+def builtin_names() -> Dict[str, str]:
+    """
+    Returns the variables the built-in functions are bound to when a program starts.
+
+    Returns:
+        Dict[str, str]: The name of the BuiltInFunction each variable holds.
+    """
+    from ..init_interp import global_symbol_table
+    return {
+        var_name: value.name for var_name, value in global_symbol_table.symbols.items()
+        if isinstance(value, BuiltInFunction)
+    }
+
+
+def map_children(node, function, functions: bool = False):
+    """
+    Replace each node evaluated by a node with what a function returns for it.
+
+    Args:
+        node: The node.
+        function (Callable): Takes a child and returns the node to put in its place.
+        functions (bool, optional): Whether to include the bodies of FNs,
+            which are not evaluated where they are defined. Defaults to False.
+    """
+    node_type = type(node)
+    if node_type is ListNode:
+        node.element_nodes = [function(element_node) for element_node in node.element_nodes]
+    elif node_type is VarAssignNode:
+        node.value_node = function(node.value_node)
+    elif node_type is BinOpNode:
+        node.left_node = function(node.left_node)
+        node.right_node = function(node.right_node)
+    elif node_type is UnaryOpNode:
+        node.node = function(node.node)
+    elif node_type is IfNode:
+        node.cases = [
+            (function(condition), function(expr), should_return_null)
+            for condition, expr, should_return_null in node.cases
+        ]
+        if node.else_case:
+            node.else_case = (function(node.else_case[0]), node.else_case[1])
+    elif node_type is ForNode:
+        node.start_value_node = function(node.start_value_node)
+        node.end_value_node = function(node.end_value_node)
+        if node.step_value_node:
+            node.step_value_node = function(node.step_value_node)
+        node.body_node = function(node.body_node)
+    elif node_type is WhileNode:
+        node.condition_node = function(node.condition_node)
+        node.body_node = function(node.body_node)
+    elif node_type is CallNode:
+        node.node_to_call = function(node.node_to_call)
+        node.arg_nodes = [function(arg_node) for arg_node in node.arg_nodes]
+    elif node_type is ReturnNode:
+        if node.node_to_return:
+            node.node_to_return = function(node.node_to_return)
+    elif node_type is FuncDefNode:
+        if functions:
+            node.body_node = function(node.body_node)
+    elif node_type is HoistNode:
+        node.loop_node = function(node.loop_node)
+        node.original_node = function(node.original_node)
+        node.invariants = [(var_name, function(expr)) for var_name, expr in node.invariants]
+    elif node_type is SaveNode or node_type is MemoNode:
+        node.node = function(node.node)
+    elif node_type is InlineNode:
+        node.call_node.arg_nodes = [function(arg_node) for arg_node in node.call_node.arg_nodes]
+
+
+def children(node, functions: bool = False) -> list:
+    """
+    Returns the nodes evaluated by a node, in the order they are evaluated.
+
+    A loop the optimizer rewrote gives the loop as it was written.
+
+    Args:
+        node: The node.
+        functions (bool, optional): Whether to include the bodies of FNs,
+            which are not evaluated where they are defined. Defaults to False.
+
+    Returns:
+        list: The nodes.
+    """
+    node_type = type(node)
+    if node_type is ListNode:
+        return node.element_nodes
+    if node_type is VarAssignNode:
+        return [node.value_node]
+    if node_type is BinOpNode:
+        return [node.left_node, node.right_node]
+    if node_type is UnaryOpNode or node_type is SaveNode or node_type is MemoNode:
+        return [node.node]
+    if node_type is IfNode:
+        nodes = [node for case in node.cases for node in case[:2]]
+        return nodes + [node.else_case[0]] if node.else_case else nodes
+    if node_type is ForNode:
+        return [node.start_value_node, node.end_value_node] + \
+            ([node.step_value_node] if node.step_value_node else []) + [node.body_node]
+    if node_type is WhileNode:
+        return [node.condition_node, node.body_node]
+    if node_type is CallNode:
+        return [node.node_to_call] + node.arg_nodes
+    if node_type is InlineNode:
+        return [node.call_node.node_to_call] + node.call_node.arg_nodes
+    if node_type is ReturnNode:
+        return [node.node_to_return] if node.node_to_return else []
+    if node_type is HoistNode:
+        return [node.original_node]
+    if node_type is FuncDefNode and functions:
+        return [node.body_node]
+    return []
+
+
+def as_written(node):
+    """
+    Puts the loops the optimizer rewrote in a node back as they were written.
+
+    Args:
+        node: The node. It is changed in place.
+
+    Returns:
+        The node to use in its place.
+    """
+    if type(node) is HoistNode:
+        return node.original_node
+    map_children(node, as_written, functions=True)
+    return node
+
+
+def breaks_loop(node) -> bool:
+    """
+    Returns whether a loop body has a CONTINUE or BREAK of the loop, and not of one inside it.
+
+    Args:
+        node: The body.
+
+    Returns:
+        bool: Whether it does.
+    """
+    node_type = type(node)
+    if node_type is ContinueNode or node_type is BreakNode:
+        return True
+    if node_type is ForNode or node_type is WhileNode or node_type is HoistNode:
+        return False
+    return any(breaks_loop(child) for child in children(node))
+
+
+def walk(node):
+    """
+    Yields a node and every node below it that children gives, depth first in evaluation order.
+
+    Args:
+        node: The node to start at.
+    """
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack += reversed(children(node))
+
+
+def height(node) -> int:
+    """
+    Returns the number of levels of a tree, FN bodies included, counted without recursing.
+
+    Args:
+        node: The root of the tree.
+
+    Returns:
+        int: The number of nodes on the longest path down from the root.
+    """
+    levels = 0
+    level = [node]
+    while level:
+        levels += 1
+        level = [child for node in level for child in children(node, functions=True)]
+    return levels
+
+
+def unconditional_children(node) -> list:
+    """
+    Returns the nodes that are evaluated every time a node is, in the order they are evaluated.
+
+    Args:
+        node: The node.
+
+    Returns:
+        list: The nodes.
+    """
+    node_type = type(node)
+    if node_type is IfNode:
+        return [node.cases[0][0]] if node.cases else []
+    if node_type is ForNode:
+        return [node.start_value_node, node.end_value_node] + ([node.step_value_node] if node.step_value_node else [])
+    if node_type is WhileNode:
+        return [node.condition_node]
+    if node_type is HoistNode:
+        return []
+    return children(node)
+
+
+def hidden_access(var_name: str, node) -> VarAccessNode:
+    """
+    Creates an access of a variable the optimizer introduced, spanning the node it stands for.
+
+    Args:
+        var_name (str): The name of the variable.
+        node: The node whose value the variable holds.
+
+    Returns:
+        VarAccessNode: The access.
+    """
+    access = VarAccessNode.__new__(VarAccessNode)
+    access.var_name = var_name
+    access.source, access.idx_start, access.idx_end = node.source, node.idx_start, node.idx_end
+    return access
+
+
+def multiplication(left_node, right_node, node) -> BinOpNode:
+    """
+    Creates a multiplication spanning another node.
+
+    Args:
+        left_node: The left operand.
+        right_node: The right operand.
+        node: The node the multiplication replaces.
+
+    Returns:
+        BinOpNode: The multiplication.
+    """
+    bin_op = BinOpNode.__new__(BinOpNode)
+    bin_op.left_node, bin_op.op_type, bin_op.op_keyword, bin_op.right_node = left_node, TT_MUL, 0, right_node
+    bin_op.source, bin_op.idx_start, bin_op.idx_end = node.source, node.idx_start, node.idx_end
+    return bin_op
+
+
+def guarded(symbols, builtins, operands) -> bool:
+    """
+    Checks the assumptions a loop was optimized under when it starts.
+
+    Args:
+        symbols (SymbolTable): The symbol table the loop runs with.
+        builtins (List[Tuple[str, str]]): Each variable assumed to be a built-in function, and the name of the function.
+        operands (List[str]): The variables assumed not to hold lists.
+
+    Returns:
+        bool: Whether the assumptions hold.
+    """
+    for var_name, builtin_name in builtins:
+        value = symbols.get(var_name)
+        if type(value) is not BuiltInFunction or value.name != builtin_name:
+            return False
+    for var_name in operands:
+        if isinstance(symbols.get(var_name), List):
+            return False
+    return True
+
+
+def prepare(node: HoistNode, context) -> bool:
+    """
+    Computes the invariants of an optimized loop about to start.
+
+    Invariants have no effects, so they are computed even if the loop does
+    not run and, when one fails, the loop is run as it was written to report
+    the error where it happens.
+
+    Args:
+        node (HoistNode): The loop.
+        context (Context): The context the loop runs in.
+
+    Returns:
+        bool: Whether the optimized loop can be run.
+    """
+    symbols = context.symbol_table
+    if not guarded(symbols, node.builtins, node.operands):
+        return False
+
+    interpreter = Interpreter()
+    for var_name, expr in node.invariants:
+        try:
+            value = interpreter.visit(expr, context)
+        except Exception:
+            return False
+        symbols.set(var_name, value)
+    return True
+
+
+class Region:
+    def __init__(self, loop, builtins: Dict[str, str]):
+        """
+        What running a loop, or another piece of code, can change, as far as the optimizer can tell.
+
+        A loop is eligible for hoisting and reusing expressions when nothing
+        it does can change a list or rebind a variable it does not assign
+        itself: every call is to a built-in function that is PURE or IO, and
+        the left operand of every operator that would change a list is not
+        one. The variables this relies on are recorded, to be checked when
+        the loop starts.
+
+        Args:
+            loop: The loop, or other code.
+            builtins (Dict[str, str]): The built-in function each variable is assumed to hold.
+        """
+        self.writes: Dict[str, list] = {}
+        self.builtins: Dict[str, str] = {}
+        self.operands: Set[str] = set()
+        self.eligible = True
+
+        left_nodes = []
+        for node in walk(loop):
+            node_type = type(node)
+            if node_type is VarAssignNode:
+                self.writes.setdefault(node.var_name, []).append(node.value_node)
+            elif node_type is ForNode:
+                self.writes.setdefault(node.var_name, []).append(None)
+            elif node_type is FuncDefNode:
+                if node.var_name:
+                    self.writes.setdefault(node.var_name, []).append(None)
+            elif node_type is CallNode:
+                var_name = node.node_to_call.var_name if type(node.node_to_call) is VarAccessNode else None
+                if var_name in builtins and builtin_effects(builtins[var_name]) in (PURE, IO):
+                    self.builtins[var_name] = builtins[var_name]
+                else:
+                    self.eligible = False
+            elif node_type is InlineNode:
+                # The function may not be the one inlined by the time the call runs.
+                self.eligible = False
+            elif node_type is BinOpNode:
+                if node.op_type in LIST_WRITING_OPERATORS:
+                    left_nodes.append(node.left_node)
+
+        if any(var_name in self.writes for var_name in self.builtins):
+            self.eligible = False
+
+        # The variables that cannot hold a list while the loop runs, if they
+        # do not when it starts: assume all of them can't, then drop those
+        # assigned something that could be one until nothing changes.
+        self.non_lists = set(self.writes)
+        changed = True
+        while changed:
+            changed = False
+            for var_name in list(self.non_lists):
+                if not all(value_node is None or self.non_list(value_node) for value_node in self.writes[var_name]):
+                    self.non_lists.discard(var_name)
+                    changed = True
+
+        if not all(self.non_list(left_node) for left_node in left_nodes):
+            self.eligible = False
+
+    def non_list(self, node) -> bool:
+        """
+        Checks whether a node evaluates to something other than a list, noting the variables that takes.
+
+        Args:
+            node: The node.
+
+        Returns:
+            bool: Whether the node is known not to give a list.
+        """
+        node_type = type(node)
+        if node_type is NumberNode or node_type is StringNode or node_type is CallNode:
+            # The only functions an eligible loop calls never return lists.
+            return True
+        if node_type is BinOpNode:
+            # Numbers and strings never give lists, whatever they are combined with.
+            return self.non_list(node.left_node)
+        if node_type is UnaryOpNode:
+            return self.non_list(node.node)
+        if node_type is VarAccessNode:
+            if node.var_name in self.writes and node.var_name not in self.non_lists:
+                return False
+            self.operands.add(node.var_name)
+            return True
+        return False
+
+
+class LoopOptimizer:
+    """
+    Speeds up the bodies of FOR and WHILE loops.
+
+    Strength reduction replaces the exponentiation of a FOR variable that only
+    takes integers by a small integer constant with multiplications, which
+    give exactly the same numbers.
+
+    Loops that cannot change lists or rebind variables they do not assign
+    (see Region) are also rewritten into a HoistNode: expressions that do not
+    depend on anything the loop assigns are computed once before it starts,
+    and an expression computed again later in the same pass through the body
+    is stored the first time and then reused. Only expressions made of
+    literals, variables, operators and PURE built-in functions are considered.
+    """
+
+    def __init__(self):
+        self.builtins = builtin_names()
+        self.count = 0
+
+    def optimize(self, node):
+        """
+        Optimize the loops in a node, innermost first.
+
+        Args:
+            node: The node. It may be changed in place.
+
+        Returns:
+            The node to use in its place.
+        """
+        map_children(node, self.optimize, functions=True)
+        if type(node) is ForNode or type(node) is WhileNode:
+            return self.optimize_loop(node)
+        return node
+
+    def hidden_name(self) -> str:
+        """Returns a new variable name no program can write."""
+        self.count += 1
+        return f'@{self.count}'
+
+    def key(self, node, region: Region) -> Optional[tuple]:
+        """
+        Describes an expression without effects, so that equal ones compare equal.
+
+        Args:
+            node: The expression.
+            region (Region): The loop the expression is in.
+
+        Returns:
+            Optional[tuple]: The description, or None if the node is not such an expression.
+        """
+        node_type = type(node)
+        if node_type is NumberNode:
+            return 'number', number_key(node.value)
+        if node_type is StringNode:
+            return 'string', node.value
+        if node_type is VarAccessNode:
+            return 'var', node.var_name
+        if node_type is BinOpNode:
+            left, right = self.key(node.left_node, region), self.key(node.right_node, region)
+            if left and right:
+                return 'binary', node.op_type, node.op_keyword, left, right
+        elif node_type is UnaryOpNode:
+            operand = self.key(node.node, region)
+            if operand:
+                return 'unary', node.op_type, node.op_keyword, operand
+        elif node_type is CallNode:
+            if type(node.node_to_call) is VarAccessNode and \
+                    builtin_effects(region.builtins.get(node.node_to_call.var_name, '')) == PURE:
+                args = [self.key(arg_node, region) for arg_node in node.arg_nodes]
+                if all(args):
+                    return ('call', node.node_to_call.var_name, *args)
+        return None
+
+    @staticmethod
+    def key_names(key: tuple) -> Set[str]:
+        """Returns the variables an expression described by key reads."""
+        if key[0] == 'var':
+            return {key[1]}
+        names = set()
+        for part in key:
+            if type(part) is tuple:
+                names |= LoopOptimizer.key_names(part)
+        return names
+
+    def optimize_loop(self, loop):
+        """
+        Optimize a loop whose inner loops are already optimized.
+
+        Args:
+            loop (Union[ForNode, WhileNode]): The loop.
+
+        Returns:
+            The node to use in its place.
+        """
+        region = Region(loop, self.builtins)
+        if type(loop) is ForNode:
+            self.reduce_strength(loop, region)
+        if not region.eligible:
+            return loop
+
+        invariants = self.find_invariants(loop, region)
+        optimized = copy.deepcopy(loop, {id(loop.source): loop.source})
+
+        hidden_names = {key: self.hidden_name() for key in invariants}
+
+        def hoist(node):
+            if type(node) is not FuncDefNode:
+                key = self.key(node, region)
+                if key in hidden_names:
+                    return hidden_access(hidden_names[key], node)
+                map_children(node, hoist)
+            return node
+        map_children(optimized, hoist)
+
+        if not self.eliminate(optimized, region) and not invariants:
+            return loop
+        # The loop falls back to the loops in it as they were written: with
+        # their HoistNodes it would hold both versions of each, doubling the
+        # tree with each level of nesting. The optimized loop keeps them.
+        return HoistNode(
+            optimized, as_written(loop),
+            [(hidden_names[key], expr) for key, expr in invariants.items()],
+            sorted(region.builtins.items()),
+            sorted(region.operands)
+        )
+
+    def reduce_strength(self, loop: ForNode, region: Region):
+        """
+        Replace the exponentiation of the variable of a FOR loop that only takes integers.
+
+        Args:
+            loop (ForNode): The loop.
+            region (Region): What the loop changes.
+        """
+        var_name = loop.var_name
+        if type(loop.start_value_node) is not NumberNode or type(loop.start_value_node.value) is not int:
+            return
+        if loop.step_value_node and (type(loop.step_value_node) is not NumberNode or
+                                     type(loop.step_value_node.value) is not int):
+            return
+        if len(region.writes[var_name]) != 1:
+            return
+
+        def reduce(node):
+            if type(node) is FuncDefNode:
+                return node
+            map_children(node, reduce)
+            if type(node) is BinOpNode and node.op_type == TT_POW and \
+                    type(node.left_node) is VarAccessNode and node.left_node.var_name == var_name and \
+                    type(node.right_node) is NumberNode and type(node.right_node.value) is int and \
+                    2 <= node.right_node.value <= MAX_REDUCED_EXPONENT:
+                product = node.left_node
+                for _ in range(node.right_node.value - 1):
+                    product = multiplication(product, node.left_node, node)
+                return product
+            return node
+        map_children(loop, reduce)
+
+    def find_invariants(self, loop, region: Region) -> dict:
+        """
+        Find the largest expressions in a loop that give the same value on every pass.
+
+        Args:
+            loop (Union[ForNode, WhileNode]): The loop.
+            region (Region): What the loop changes.
+
+        Returns:
+            dict: The first occurrence of each invariant, by its key.
+        """
+        invariants = {}
+        stack = [loop.body_node]
+        if type(loop) is WhileNode:
+            stack.append(loop.condition_node)
+        while stack:
+            node = stack.pop()
+            node_type = type(node)
+            if node_type is FuncDefNode:
+                continue
+            if node_type in (BinOpNode, UnaryOpNode, CallNode):
+                key = self.key(node, region)
+                if key and not self.key_names(key) & region.writes.keys():
+                    invariants.setdefault(key, node)
+                    continue
+            stack += children(node)
+        return invariants
+
+    def eliminate(self, loop, region: Region) -> bool:
+        """
+        Reuse the expressions computed again in the same pass through the body of a loop.
+
+        Only the statements of the body are considered, in the parts of them
+        that always run, and a statement assigning a variable anywhere but at
+        its top ends the reuse of every expression reading it.
+
+        Args:
+            loop (Union[ForNode, WhileNode]): The loop, with its invariants hoisted.
+            region (Region): What the loop changes.
+
+        Returns:
+            bool: Whether any expression is reused.
+        """
+        body = loop.body_node
+        statements = body.element_nodes if type(body) is ListNode else [body]
+        parents = {}
+        groups = []
+        open_groups: Dict[tuple, list] = {}
+
+        for statement in statements:
+            parent = body if type(body) is ListNode else loop
+            writes = set()
+            for node in walk(statement):
+                if type(node) in (VarAssignNode, ForNode) or (type(node) is FuncDefNode and node.var_name):
+                    writes.add(node.var_name)
+            nested_writes = writes - ({statement.var_name} if type(statement) is VarAssignNode else set())
+
+            if not nested_writes:
+                stack = [(statement, parent)]
+                while stack:
+                    node, parent = stack.pop()
+                    if type(node) in (BinOpNode, UnaryOpNode, CallNode):
+                        key = self.key(node, region)
+                        if key:
+                            parents[id(node)] = parent
+                            open_groups.setdefault(key, []).append(node)
+                    stack += [(child, node) for child in reversed(unconditional_children(node))]
+
+            for key in list(open_groups):
+                if self.key_names(key) & writes:
+                    groups.append(open_groups.pop(key))
+        groups += open_groups.values()
+
+        # Larger expressions first, so that the parts of one that is reused are not.
+        reused = False
+        dead = set()
+        for group in sorted(groups, key=lambda group: -sum(1 for _ in walk(group[0]))):
+            group = [node for node in group if id(node) not in dead]
+            if len(group) < 2:
+                continue
+            reused = True
+            var_name = self.hidden_name()
+            first, *rest = group
+            self.replace(parents[id(first)], first, SaveNode(var_name, first))
+            for node in rest:
+                dead.update(id(child) for child in walk(node))
+                self.replace(parents[id(node)], node, hidden_access(var_name, node))
+        return reused
+
+    @staticmethod
+    def replace(parent, child, node):
+        """Put a node in place of a child of parent."""
+        map_children(parent, lambda other: node if other is child else other)
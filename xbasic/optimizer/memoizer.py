@@ -0,0 +1,376 @@
+import hashlib
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Dict, Optional, Set
+
+from ..number import Number
+from ..string_value import String
+from ..utils.nodes import (
+    Node, NumberNode, StringNode, ListNode, VarAccessNode, VarAssignNode, BinOpNode, UnaryOpNode, IfNode, ForNode,
+    WhileNode, FuncDefNode, CallNode, ReturnNode, ContinueNode, BreakNode, SaveNode, InlineNode, MemoNode
+)
+from .inliner import inlinable
+from .loop_optimizer import PURE, builtin_effects, builtin_names, guarded, map_children, number_key
+
+# The most results a memoized function keeps. The least recently used one
+# is dropped to make room for a new one. 0 turns memoization off.
+memo_size = ContextVar('memo_size', default=1024)
+
+
+class Memo:
+    __slots__ = ('builtins', 'functions', 'size', 'results', 'hits', 'misses')
+
+    def __init__(self, builtins: list, functions: list, size: int):
+        """
+        The results of the calls of a function, by the values of their arguments.
+
+        Only calls whose arguments are all numbers and strings are looked up,
+        and only numbers and strings are stored. The other values can be
+        lists, which the caller or the function could change afterwards.
+
+        Args:
+            builtins (List[Tuple[str, str]]): Each variable assumed to be a built-in function, and the name of the function.
+            functions (List[Tuple[str, str]]): Each variable assumed to hold a function, and the name it
+                was stored as when it was defined.
+            size (int): The most results to keep.
+        """
+        self.builtins = builtins
+        self.functions = functions
+        self.size = size
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, args: list, symbols) -> Optional[tuple]:
+        """
+        Returns what the result of a call is stored under.
+
+        Args:
+            args (List[Value]): The arguments of the call.
+            symbols (SymbolTable): The symbol table of the context the function is called in.
+
+        Returns:
+            Optional[tuple]: The key, or None if the call cannot be looked up.
+        """
+        if not self.size:
+            return None
+        key = []
+        for arg in args:
+            arg_type = type(arg)
+            if arg_type is not Number and arg_type is not String:
+                return None
+            key.append(number_key(arg.value) if arg_type is Number else arg.value)
+        if symbols.memo is self:
+            # Called by the function from a call checked already. It names no
+            # variable like one it relies on, so they are still the same.
+            return tuple(key)
+        for var_name, save_name in self.functions:
+            # A function calling itself finds a copy of itself, sharing this memo.
+            if getattr(symbols.get(var_name), 'memo', None) is not self and \
+                    not inlinable(symbols, var_name, save_name):
+                return None
+        if self.builtins and not guarded(symbols, self.builtins, ()):
+            return None
+        return tuple(key)
+
+    def get(self, key: tuple):
+        """
+        Looks up the result of a call, counting a hit or a miss.
+
+        Args:
+            key (tuple): The key of the call.
+
+        Returns:
+            Optional[Value]: The result, or None if it is not stored.
+        """
+        value = self.results.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.results.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: tuple, value):
+        """
+        Stores the result of a call, if it is a number or a string.
+
+        Args:
+            key (tuple): The key of the call.
+            value (Value): The result.
+        """
+        if type(value) is Number or type(value) is String:
+            self.results[key] = value.copy()
+            if len(self.results) > self.size:
+                self.results.popitem(last=False)
+
+
+def memoize(function, builtins: list, functions: list):
+    """
+    Gives a function a new Memo of the size memo_size is set to.
+
+    Args:
+        function (Function): The function.
+        builtins (List[Tuple[str, str]]): Each variable assumed to be a built-in function, and the name of the function.
+        functions (List[Tuple[str, str]]): Each variable assumed to hold a function, and the name it
+            was stored as when it was defined.
+
+    Returns:
+        Function: The function.
+    """
+    function.memo = Memo(builtins, functions, memo_size.get())
+    return function
+
+
+def fingerprint(node) -> tuple:
+    """
+    Describes a node and the nodes below it, so that equal trees compare equal wherever they were parsed.
+
+    Args:
+        node: The node.
+
+    Returns:
+        tuple: The description.
+    """
+    if isinstance(node, Node):
+        slots = [slot for cls in type(node).__mro__ if cls is not Node for slot in getattr(cls, '__slots__', ())]
+        return (type(node).__name__, *(fingerprint(getattr(node, slot)) for slot in slots))
+    if isinstance(node, (list, tuple)):
+        return tuple(map(fingerprint, node))
+    return node
+
+
+class Pure:
+    __slots__ = ('func_def', 'save_name', 'saved', 'builtins', 'callees', 'local_names', 'expensive')
+
+    def __init__(self, func_def: FuncDefNode, save_name: str, saved: bool):
+        """
+        A function whose value only depends on its arguments, if the functions it calls are pure too.
+
+        Args:
+            func_def (FuncDefNode): The definition of the function.
+            save_name (str): The name the function is stored as when it is defined.
+            saved (bool): Whether the definition already stores it, for the Inliner.
+        """
+        self.func_def = func_def
+        self.save_name = save_name
+        self.saved = saved
+        self.builtins: Dict[str, str] = {}
+        self.callees: Set[str] = set()
+        self.local_names: Set[str] = set(func_def.arg_names)
+        self.expensive = False
+
+
+class Memoizer:
+    """
+    Makes functions that only compute a value from their arguments remember it.
+
+    A named FN is pure when it is the only definition of its name in the
+    program and its body reads no variable but its parameters and the
+    variables it assigned before, and calls nothing but PURE built-in
+    functions and pure FNs. Without reading the variables of its caller or
+    calling a function that does something else, it gives the same value
+    every time it is called with the same arguments. Its parameters and
+    variables must not be named like the functions the functions it calls
+    rely on, which would find them instead.
+
+    A pure function that calls an FN or loops is wrapped in a MemoNode, so
+    that it stores its results in a Memo and looks them up before running
+    its body. The others would spend as much looking their results up as
+    computing them. Each pure function relied on is stored under a name
+    made from its definition, which the Memo checks it still calls.
+    """
+
+    def __init__(self):
+        self.builtins = builtin_names()
+        self.definitions: Dict[str, list] = {}
+        self.functions: Dict[str, Pure] = {}
+
+    def memoize(self, node):
+        """
+        Memoize the pure functions defined in a node.
+
+        Args:
+            node: The node. It may be changed in place.
+
+        Returns:
+            The node to use in its place.
+        """
+        saved = {}
+
+        def collect(child):
+            if type(child) is FuncDefNode and child.var_name:
+                self.definitions.setdefault(child.var_name, []).append(child)
+            elif type(child) is SaveNode and type(child.node) is FuncDefNode:
+                saved[id(child.node)] = child.var_name
+            map_children(child, collect, functions=True)
+            return child
+        collect(node)
+
+        for func_name, func_defs in self.definitions.items():
+            function = self.pure(func_defs[0], saved.get(id(func_defs[0]))) if len(func_defs) == 1 else None
+            if function:
+                self.functions[func_name] = function
+
+        # Drop the functions calling one that is not pure, or naming a
+        # variable like one they rely on, until none is left to drop.
+        changed = True
+        while changed:
+            changed = False
+            for func_name, function in list(self.functions.items()):
+                names = self.relies_on(func_name)
+                if names is None or names & function.local_names:
+                    del self.functions[func_name]
+                    changed = True
+
+        memoized = {func_name for func_name, function in self.functions.items() if function.expensive}
+        if not memoized:
+            return node
+        needed = set(memoized)
+        for func_name in memoized:
+            needed |= self.relies_on(func_name) & self.functions.keys()
+        return self.rewrite(node, memoized, needed)
+
+    def pure(self, func_def: FuncDefNode, save_name: Optional[str]) -> Optional[Pure]:
+        """
+        Check whether a function is pure, as far as its own body tells.
+
+        Args:
+            func_def (FuncDefNode): The definition of the function.
+            save_name (str, optional): The name the Inliner stores the function as, if it does.
+
+        Returns:
+            Optional[Pure]: The function, or None if it is not pure.
+        """
+        if save_name is None:
+            description = repr(fingerprint(func_def)).encode()
+            function = Pure(func_def, f'@{func_def.var_name}#{hashlib.sha1(description).hexdigest()[:16]}', False)
+        else:
+            function = Pure(func_def, save_name, True)
+        if self.check(func_def.body_node, frozenset(func_def.arg_names), function) is None:
+            return None
+        return function
+
+    def check(self, node, assigned: frozenset, function: Pure) -> Optional[frozenset]:
+        """
+        Check that a node of the body of a function reads and calls nothing a pure function may not.
+
+        Args:
+            node: The node.
+            assigned (frozenset): The variables certainly assigned by the function before the node runs.
+            function (Pure): What the function relies on, noted as the node is checked.
+
+        Returns:
+            Optional[frozenset]: The variables certainly assigned after the node, or None if it is not pure.
+        """
+        node_type = type(node)
+        if node_type in (NumberNode, StringNode, ContinueNode, BreakNode):
+            return assigned
+        if node_type is VarAccessNode:
+            return assigned if node.var_name in assigned else None
+        if node_type is VarAssignNode:
+            assigned = self.check(node.value_node, assigned, function)
+            function.local_names.add(node.var_name)
+            return None if assigned is None else assigned | {node.var_name}
+        if node_type is ListNode or node_type is BinOpNode or node_type is UnaryOpNode or node_type is ReturnNode:
+            nodes = (
+                node.element_nodes if node_type is ListNode else
+                (node.left_node, node.right_node) if node_type is BinOpNode else
+                (node.node,) if node_type is UnaryOpNode else
+                (node.node_to_return,) if node.node_to_return else ()
+            )
+            for child in nodes:
+                assigned = self.check(child, assigned, function)
+                if assigned is None:
+                    return None
+            return assigned
+        if node_type is IfNode:
+            # Which case runs is not known, so nothing they assign counts after.
+            cases = [child for case in node.cases for child in case[:2]] + \
+                ([node.else_case[0]] if node.else_case else [])
+            if any(self.check(child, assigned, function) is None for child in cases):
+                return None
+            return assigned
+        if node_type is ForNode or node_type is WhileNode:
+            function.expensive = True
+            if node_type is ForNode:
+                for child in (node.start_value_node, node.end_value_node, node.step_value_node):
+                    if child:
+                        assigned = self.check(child, assigned, function)
+                        if assigned is None:
+                            return None
+                function.local_names.add(node.var_name)
+                body_assigned = assigned | {node.var_name}
+            else:
+                assigned = self.check(node.condition_node, assigned, function)
+                if assigned is None:
+                    return None
+                body_assigned = assigned
+            return None if self.check(node.body_node, body_assigned, function) is None else assigned
+        if node_type is CallNode or node_type is InlineNode:
+            call_node = node if node_type is CallNode else node.call_node
+            if type(call_node.node_to_call) is not VarAccessNode or call_node.node_to_call.var_name in assigned:
+                return None
+            var_name = call_node.node_to_call.var_name
+            if var_name in self.definitions:
+                function.callees.add(var_name)
+                # An inlined call is about as cheap as the body of the function.
+                function.expensive = function.expensive or node_type is CallNode
+            elif var_name in self.builtins and builtin_effects(self.builtins[var_name]) == PURE:
+                function.builtins[var_name] = self.builtins[var_name]
+            else:
+                return None
+            for arg_node in call_node.arg_nodes:
+                assigned = self.check(arg_node, assigned, function)
+                if assigned is None:
+                    return None
+            return assigned
+        return None
+
+    def relies_on(self, func_name: str) -> Optional[Set[str]]:
+        """
+        Returns the variables calling a pure function reads, through the functions it calls.
+
+        Args:
+            func_name (str): The name of the function.
+
+        Returns:
+            Optional[Set[str]]: The variables, or None if a function it calls is not pure.
+        """
+        names = set()
+        pending = [func_name]
+        while pending:
+            function = self.functions.get(pending.pop())
+            if function is None:
+                return None
+            names |= function.builtins.keys()
+            pending += function.callees - names
+            names |= function.callees
+        return names
+
+    def rewrite(self, node, memoized: Set[str], needed: Set[str]):
+        """
+        Wrap the definitions of memoized functions in a MemoNode, and store the functions they rely on.
+
+        Args:
+            node: The node.
+            memoized (Set[str]): The functions to memoize.
+            needed (Set[str]): The functions to store under their save name.
+
+        Returns:
+            The node to use in its place.
+        """
+        map_children(node, lambda child: self.rewrite(child, memoized, needed), functions=True)
+        if type(node) is not FuncDefNode or node.var_name not in needed or \
+                self.functions[node.var_name].func_def is not node:
+            return node
+
+        function = self.functions[node.var_name]
+        if node.var_name in memoized:
+            names = self.relies_on(node.var_name)
+            node = MemoNode(
+                node,
+                sorted((var_name, self.builtins[var_name]) for var_name in names - self.functions.keys()),
+                sorted((var_name, self.functions[var_name].save_name) for var_name in names & self.functions.keys())
+            )
+        return node if function.saved else SaveNode(function.save_name, node)
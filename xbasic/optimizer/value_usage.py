@@ -0,0 +1,96 @@
+class ValueUsage:
+    """
+    Marks the lists and loops whose values are thrown away, so they are never built.
+
+    A value is thrown away when it is a statement of a block whose value is,
+    the body of a multi-line FN or of a loop or IF case that gives null, or
+    the program itself when whoever runs it does not use its value. Such a
+    ListNode, a block or a list literal, gets should_return_null: its
+    elements are evaluated in order as before, but it gives null instead of
+    a List. Such a loop gets should_return_null too, like a loop written as a
+    block, and does not collect the values of its body.
+
+    Loops and lists whose value is used, like a loop in an expression, are
+    left as they are.
+    """
+
+    def mark(self, node, used: bool = True):
+        """
+        Mark a node and the nodes below it.
+
+        Args:
+            node: The node to mark. It is changed in place.
+            used (bool, optional): Whether the value of the node is used. Defaults to True.
+        """
+        method = getattr(self, f'mark_{type(node).__name__}', None)
+        if method:
+            method(node, used)
+
+    ###################################
+
+    def mark_ListNode(self, node, used: bool):
+        if not used:
+            node.should_return_null = True
+        for element_node in node.element_nodes:
+            self.mark(element_node, used)
+
+    def mark_VarAssignNode(self, node, used: bool):
+        self.mark(node.value_node)
+
+    def mark_BinOpNode(self, node, used: bool):
+        self.mark(node.left_node)
+        self.mark(node.right_node)
+
+    def mark_UnaryOpNode(self, node, used: bool):
+        self.mark(node.node)
+
+    def mark_IfNode(self, node, used: bool):
+        for condition, expr, should_return_null in node.cases:
+            self.mark(condition)
+            self.mark(expr, used and not should_return_null)
+        if node.else_case:
+            expr, should_return_null = node.else_case
+            self.mark(expr, used and not should_return_null)
+
+    def mark_ForNode(self, node, used: bool):
+        if not used:
+            node.should_return_null = True
+        self.mark(node.start_value_node)
+        self.mark(node.end_value_node)
+        if node.step_value_node:
+            self.mark(node.step_value_node)
+        self.mark(node.body_node, not node.should_return_null)
+
+    def mark_WhileNode(self, node, used: bool):
+        if not used:
+            node.should_return_null = True
+        self.mark(node.condition_node)
+        self.mark(node.body_node, not node.should_return_null)
+
+    def mark_FuncDefNode(self, node, used: bool):
+        self.mark(node.body_node, node.should_auto_return)
+
+    def mark_CallNode(self, node, used: bool):
+        self.mark(node.node_to_call)
+        for arg_node in node.arg_nodes:
+            self.mark(arg_node)
+
+    def mark_ReturnNode(self, node, used: bool):
+        if node.node_to_return:
+            self.mark(node.node_to_return)
+
+    def mark_HoistNode(self, node, used: bool):
+        for _, expr in node.invariants:
+            self.mark(expr)
+        self.mark(node.loop_node, used)
+        self.mark(node.original_node, used)
+
+    def mark_SaveNode(self, node, used: bool):
+        self.mark(node.node)
+
+    def mark_MemoNode(self, node, used: bool):
+        self.mark(node.node)
+
+    def mark_InlineNode(self, node, used: bool):
+        self.mark(node.call_node)
+        self.mark(node.body_node, used)
@@ -1,22 +1,66 @@
 from .utils.token_list import *
-from .utils.parse_result import ParseResult
+from .utils.parse_result import ParseResult, ParseError
 from .error_handler.error import InvalidSyntaxError
 from .utils.nodes import *
-from typing import List
+from typing import List, Union
 from .utils.token import Token
-
+from .utils.token_buffer import TokenBuffer
+
+# Precedence of the binary operators, from the loosest to the tightest binding.
+# Operators of the same precedence are left-associative, except for '^'.
+PREC_LOGIC = 1
+PREC_COMPARISON = 2
+PREC_ARITH = 3
+PREC_TERM = 4
+PREC_POWER = 5
+
+OPERATOR_PRECEDENCE = {
+    TT_EE: PREC_COMPARISON,
+    TT_NE: PREC_COMPARISON,
+    TT_LT: PREC_COMPARISON,
+    TT_GT: PREC_COMPARISON,
+    TT_LTE: PREC_COMPARISON,
+    TT_GTE: PREC_COMPARISON,
+    TT_PLUS: PREC_ARITH,
+    TT_MINUS: PREC_ARITH,
+    TT_MUL: PREC_TERM,
+    TT_DIV: PREC_TERM,
+    TT_POW: PREC_POWER,
+}
+
+KEYWORD_PRECEDENCE = {
+    KW_AND: PREC_LOGIC,
+    KW_OR: PREC_LOGIC,
+}
+
+# The tokens an expression or a statement can start with, used to look ahead
+# instead of parsing speculatively.
+EXPRESSION_START_TYPES = frozenset((
+    TT_INT, TT_FLOAT, TT_STRING, TT_IDENTIFIER, TT_PLUS, TT_MINUS, TT_LPAREN, TT_LSQUARE
+))
+EXPRESSION_START_KEYWORDS = frozenset((
+    KW_NUM, KW_TEXT, KW_LIST, KW_NOT, KW_IF, KW_FOR, KW_WHILE, KW_FN
+))
+STATEMENT_START_KEYWORDS = EXPRESSION_START_KEYWORDS | {KW_RETURN, KW_CONTINUE, KW_BREAK}
 
 class Parser:
-    def __init__(self, tokens: list):
+    def __init__(self, tokens: Union[List[Token], TokenBuffer]):
         """
         Initializes the parser with a list of tokens.
 
+        The grammar rules return the nodes they parse and raise a ParseError
+        carrying an InvalidSyntaxError when the tokens do not fit; parse()
+        turns the outcome into a ParseResult.
+
         Args:
-            tokens (List[Token]): The list of tokens to be parsed.
+            tokens (Union[List[Token], TokenBuffer]): The tokens to be parsed.
         """
         self.current_tok = None
-        self.tokens: List[Token] = tokens
+        self.tokens: Union[List[Token], TokenBuffer] = tokens
         self.tok_idx: int = -1
+        # The FOR and WHILE bodies around the current token, in the FN it is
+        # in, since only they can have a CONTINUE or BREAK.
+        self.loop_depth: int = 0
         self.advance()
 
     def advance(self) -> Token:
@@ -30,24 +74,42 @@ class Parser:
         self.update_current_tok()
         return self.current_tok
 
-    def reverse(self, amount: int = 1) -> Token:
+    def update_current_tok(self):
+        """Updates the current token."""
+        if 0 <= self.tok_idx < len(self.tokens):
+            self.current_tok = self.tokens[self.tok_idx]
+
+    def starts_expr(self) -> bool:
         """
-        Moves back by the specified amount of tokens.
+        Checks if the current token can start an expression.
 
-        Args:
-            amount (int): The number of tokens to move back.
+        Returns:
+            bool: True if the current token can start an expression, False otherwise.
+        """
+        tok = self.current_tok
+        return tok.type in EXPRESSION_START_TYPES or tok.keyword in EXPRESSION_START_KEYWORDS
+
+    def starts_statement(self) -> bool:
+        """
+        Checks if the current token can start a statement.
 
         Returns:
-            Token: The token after moving back.
+            bool: True if the current token can start a statement, False otherwise.
         """
-        self.tok_idx -= amount
-        self.update_current_tok()
-        return self.current_tok
+        tok = self.current_tok
+        return tok.type in EXPRESSION_START_TYPES or tok.keyword in STATEMENT_START_KEYWORDS
 
-    def update_current_tok(self):
-        """Updates the current token."""
-        if 0 <= self.tok_idx < len(self.tokens):
-            self.current_tok = self.tokens[self.tok_idx]
+    def syntax_error(self, details: str) -> ParseError:
+        """
+        Builds the error for an unexpected current token.
+
+        Args:
+            details (str): What was expected instead.
+
+        Returns:
+            ParseError: The error to raise.
+        """
+        return ParseError(InvalidSyntaxError(self.current_tok.pos_start, self.current_tok.pos_end, details))
 
     def parse(self) -> ParseResult:
         """
@@ -56,751 +118,525 @@ class Parser:
         Returns:
             ParseResult: The result of the parsing operation.
         """
-        res = self.statements()
-        if not res.error and self.current_tok.type != TT_EOF:
-            return res.failure(InvalidSyntaxError(
-                self.current_tok.pos_start, self.current_tok.pos_end,
-                "Token cannot appear after previous tokens"
-            ))
-        return res
+        try:
+            node = self.statements()
+            if self.current_tok.type != TT_EOF:
+                raise self.syntax_error("Token cannot appear after previous tokens")
+        except ParseError as e:
+            return ParseResult().failure(e.error)
+        return ParseResult().success(node)
 
     ###################################
 
-    def statements(self) -> ParseResult:
+    def statements(self) -> ListNode:
         """
         Parses a series of statements.
 
         Returns:
-            ParseResult: The result of parsing the statements.
+            ListNode: The statements.
         """
-        res = ParseResult()
         statements = []
-        pos_start = self.current_tok.pos_start.copy()
+        idx_start = self.current_tok.idx_start
 
         while self.current_tok.type == TT_NEWLINE:
-            res.register_advancement()
             self.advance()
 
-        statement = res.register(self.statement())
-        if res.error:
-            return res
-        statements.append(statement)
-
-        more_statements = True
+        statements.append(self.statement())
 
+        # Another statement follows only after a newline, and only if its first
+        # token can start one; any other token ends the list for the caller.
         while True:
             newline_count = 0
             while self.current_tok.type == TT_NEWLINE:
-                res.register_advancement()
                 self.advance()
                 newline_count += 1
-            if newline_count == 0:
-                more_statements = False
-
-            if not more_statements:
+            if newline_count == 0 or not self.starts_statement():
                 break
-            statement = res.try_register(self.statement())
-            if not statement:
-                self.reverse(res.to_reverse_count)
-                more_statements = False
-                continue
-            statements.append(statement)
-
-        return res.success(ListNode(
+
+            statements.append(self.statement())
+
+        return ListNode(
             statements,
-            pos_start,
-            self.current_tok.pos_end.copy()
-        ))
+            self.current_tok.source,
+            idx_start,
+            self.current_tok.idx_end
+        )
 
-    def statement(self) -> ParseResult:
+    def statement(self):
         """
         Parses a single statement.
 
         Returns:
-            ParseResult: The result of parsing the statement.
+            Node: The statement.
         """
-        res = ParseResult()
-        pos_start = self.current_tok.pos_start.copy()
+        tok = self.current_tok
+        idx_start = tok.idx_start
 
-        if self.current_tok.matches(TT_KEYWORD, 'RETURN'):
-            res.register_advancement()
+        if tok.keyword == KW_RETURN:
             self.advance()
 
-            expr = res.try_register(self.expr())
-            if not expr:
-                self.reverse(res.to_reverse_count)
-            return res.success(ReturnNode(expr, pos_start, self.current_tok.pos_start.copy()))
+            expr = self.expr() if self.starts_expr() else None
+            return ReturnNode(expr, self.current_tok.source, idx_start, self.current_tok.idx_start)
 
-        if self.current_tok.matches(TT_KEYWORD, 'CONTINUE'):
-            res.register_advancement()
+        if tok.keyword == KW_CONTINUE:
+            if not self.loop_depth:
+                raise self.syntax_error("'CONTINUE' outside of a loop")
             self.advance()
-            return res.success(ContinueNode(pos_start, self.current_tok.pos_start.copy()))
+            return ContinueNode(self.current_tok.source, idx_start, self.current_tok.idx_start)
 
-        if self.current_tok.matches(TT_KEYWORD, 'BREAK'):
-            res.register_advancement()
+        if tok.keyword == KW_BREAK:
+            if not self.loop_depth:
+                raise self.syntax_error("'BREAK' outside of a loop")
             self.advance()
-            return res.success(BreakNode(pos_start, self.current_tok.pos_start.copy()))
-
-        expr = res.register(self.expr())
-        if res.error:
-            return res.failure(InvalidSyntaxError(
-                self.current_tok.pos_start, self.current_tok.pos_end,
+            return BreakNode(self.current_tok.source, idx_start, self.current_tok.idx_start)
+
+        idx = self.tok_idx
+        try:
+            return self.expr()
+        except ParseError:
+            # An expression that fails on its first token is reported as a
+            # missing statement; any later failure is reported as it is.
+            if self.tok_idx != idx:
+                raise
+            raise self.syntax_error(
                 "Expected 'RETURN', 'CONTINUE', 'BREAK', 'IF', 'FOR', 'WHILE', 'FN', num, identifier, "
                 "'+', '-', '(', '[' or 'not'"
-            ))
-        return res.success(expr)
+            )
 
-    def expr(self) -> ParseResult:
+    def expr(self):
         """
         Parses an expression.
 
         Returns:
-            ParseResult: The result of parsing the expression.
+            Node: The expression.
         """
-        res = ParseResult()
-
-        if (self.current_tok.matches(TT_KEYWORD, 'num') or self.current_tok.matches(TT_KEYWORD, 'text')
-                or self.current_tok.matches(TT_KEYWORD, 'list')):
+        if self.current_tok.keyword in (KW_NUM, KW_TEXT, KW_LIST):
             dtype = self.current_tok.value
-
-            res.register_advancement()
             self.advance()
 
             if self.current_tok.type != TT_IDENTIFIER:
-                return res.failure(InvalidSyntaxError(
-                    self.current_tok.pos_start, self.current_tok.pos_end,
-                    "Expected identifier"
-                ))
+                raise self.syntax_error("Expected identifier")
 
             var_name = self.current_tok
-            res.register_advancement()
             self.advance()
 
             if self.current_tok.type != TT_EQ:
-                return res.failure(InvalidSyntaxError(
-                    self.current_tok.pos_start, self.current_tok.pos_end,
-                    "Expected '='"
-                ))
+                raise self.syntax_error("Expected '='")
 
-            res.register_advancement()
             self.advance()
-            expr = res.register(self.expr())
-            if res.error:
-                return res
-            return res.success(VarAssignNode(var_name, expr, dtype))
-
-        node = res.register(self.bin_op(self.comp_expr, ((TT_KEYWORD, 'and'), (TT_KEYWORD, 'or'))))
-        if res.error:
-            return res.failure(InvalidSyntaxError(
-                self.current_tok.pos_start, self.current_tok.pos_end,
+            return VarAssignNode(var_name, self.expr(), dtype)
+
+        idx = self.tok_idx
+        try:
+            return self.operation(PREC_LOGIC)
+        except ParseError:
+            if self.tok_idx != idx:
+                raise
+            raise self.syntax_error(
                 "Expected 'VAR', 'IF', 'FOR', 'WHILE', 'FN', int, float, identifier, '+', '-', '(', '[' or 'not'"
-            ))
-
-        return res.success(node)
-
-    def comp_expr(self) -> ParseResult:
-        """
-        Parses a comparison expression.
-
-        Returns:
-            ParseResult: The result of parsing the comparison expression.
-        """
-        res = ParseResult()
-
-        if self.current_tok.matches(TT_KEYWORD, 'not'):
-            op_tok = self.current_tok
-            res.register_advancement()
-            self.advance()
-
-            node = res.register(self.comp_expr())
-            if res.error:
-                return res
-            return res.success(UnaryOpNode(op_tok, node))
-
-        node = res.register(self.bin_op(self.arith_expr, (TT_EE, TT_NE, TT_LT, TT_GT, TT_LTE, TT_GTE)))
-
-        if res.error:
-            return res.failure(InvalidSyntaxError(
-                self.current_tok.pos_start, self.current_tok.pos_end,
-                "Expected int, float, identifier, '+', '-', '(', '[', 'IF', 'FOR', 'WHILE', 'FN' or 'not'"
-            ))
-
-        return res.success(node)
+            )
 
-    def arith_expr(self) -> ParseResult:
+    def operation(self, precedence: int):
         """
-        Parses an arithmetic expression.
+        Parses unary and binary operations by precedence climbing.
 
-        Returns:
-            ParseResult: The result of parsing the arithmetic expression.
-        """
-        return self.bin_op(self.term, (TT_PLUS, TT_MINUS))
+        Only operators in OPERATOR_PRECEDENCE or KEYWORD_PRECEDENCE that bind at
+        least as tightly as the given precedence are consumed. A whole chain of
+        operators is parsed in one loop instead of one call per grammar level.
 
-    def term(self) -> ParseResult:
-        """
-        Parses a term in an arithmetic expression.
+        Args:
+            precedence (int): The loosest precedence to consume.
 
         Returns:
-            ParseResult: The result of parsing the term.
-        """
-        return self.bin_op(self.factor, (TT_MUL, TT_DIV))
-
-    def factor(self):
+            Node: The parsed node.
         """
-        Parses a factor in an arithmetic expression.
-        """
-        res = ParseResult()
         tok = self.current_tok
 
-        if tok.type in (TT_PLUS, TT_MINUS):
-            res.register_advancement()
+        if tok.keyword == KW_NOT and precedence <= PREC_COMPARISON:
+            self.advance()
+            left = UnaryOpNode(tok, self.operation(PREC_COMPARISON))
+        elif tok.type == TT_PLUS or tok.type == TT_MINUS:
             self.advance()
-            factor = res.register(self.factor())
-            if res.error:
-                return res
-            return res.success(UnaryOpNode(tok, factor))
+            left = UnaryOpNode(tok, self.operation(PREC_POWER))
+        else:
+            if tok.type == TT_INT or tok.type == TT_FLOAT:
+                self.advance()
+                left = NumberNode(tok.value, tok.source, tok.idx_start, tok.idx_end)
+            elif tok.type == TT_IDENTIFIER:
+                self.advance()
+                left = VarAccessNode(tok)
+            elif tok.type == TT_STRING:
+                self.advance()
+                left = StringNode(tok.value, tok.source, tok.idx_start, tok.idx_end)
+            else:
+                idx = self.tok_idx
+                try:
+                    left = self.atom()
+                except ParseError:
+                    if precedence > PREC_COMPARISON or self.tok_idx != idx:
+                        raise
+                    raise self.syntax_error(
+                        "Expected int, float, identifier, '+', '-', '(', '[', 'IF', 'FOR', 'WHILE', 'FN' or 'not'"
+                    )
+
+            if self.current_tok.type == TT_LPAREN:
+                left = self.call_expr(left)
 
-        return self.power()
+        while True:
+            op_tok = self.current_tok
+            if op_tok.type == TT_KEYWORD:
+                op_precedence = KEYWORD_PRECEDENCE.get(op_tok.keyword)
+            else:
+                op_precedence = OPERATOR_PRECEDENCE.get(op_tok.type)
+            if op_precedence is None or op_precedence < precedence:
+                return left
+
+            self.advance()
+            right = self.operation(op_precedence if op_precedence == PREC_POWER else op_precedence + 1)
+            left = BinOpNode(left, op_tok, right)
 
-    def power(self) -> ParseResult:
+    def call_expr(self, node) -> CallNode:
         """
-        Parses an expression involving exponentiation.
+        Parses the argument list of a call.
+
+        Args:
+            node (Node): The node being called.
 
         Returns:
-            ParseResult: The result of parsing the expression.
+            CallNode: The call.
         """
-        return self.bin_op(self.call, (TT_POW,), self.factor)
-
-    def call(self) -> ParseResult:
-        res = ParseResult()
-        atom = res.register(self.atom())
-        if res.error:
-            return res
+        self.advance()
+        arg_nodes = []
 
-        if self.current_tok.type == TT_LPAREN:
-            res.register_advancement()
+        if self.current_tok.type == TT_RPAREN:
             self.advance()
-            arg_nodes = []
+        else:
+            idx = self.tok_idx
+            try:
+                arg_nodes.append(self.expr())
+            except ParseError:
+                if self.tok_idx != idx:
+                    raise
+                raise self.syntax_error(
+                    "Expected ')', 'VAR', 'IF', 'FOR', 'WHILE', 'FN', int, float, identifier, '+', '-', '(', "
+                    "'[' or 'not'"
+                )
 
-            if self.current_tok.type == TT_RPAREN:
-                res.register_advancement()
+            while self.current_tok.type == TT_COMMA:
                 self.advance()
-            else:
-                arg_nodes.append(res.register(self.expr()))
-                if res.error:
-                    return res.failure(InvalidSyntaxError(
-                        self.current_tok.pos_start, self.current_tok.pos_end,
-                        "Expected ')', 'VAR', 'IF', 'FOR', 'WHILE', 'FN', int, float, identifier, '+', '-', '(', "
-                        "'[' or 'not'"
-                    ))
-
-                while self.current_tok.type == TT_COMMA:
-                    res.register_advancement()
-                    self.advance()
+                arg_nodes.append(self.expr())
 
-                    arg_nodes.append(res.register(self.expr()))
-                    if res.error:
-                        return res
-
-                if self.current_tok.type != TT_RPAREN:
-                    return res.failure(InvalidSyntaxError(
-                        self.current_tok.pos_start, self.current_tok.pos_end,
-                        f"Expected ',' or ')'"
-                    ))
+            if self.current_tok.type != TT_RPAREN:
+                raise self.syntax_error(f"Expected ',' or ')'")
 
-                res.register_advancement()
-                self.advance()
-            return res.success(CallNode(atom, arg_nodes))
-        return res.success(atom)
+            self.advance()
+        return CallNode(node, arg_nodes)
 
-    def atom(self) -> ParseResult:
-        res = ParseResult()
+    def atom(self):
         tok = self.current_tok
 
         if tok.type in (TT_INT, TT_FLOAT, TT_STRING, TT_IDENTIFIER):
-            res.register_advancement()
             self.advance()
-            return res.success(
-                NumberNode(tok) if tok.type in (TT_INT, TT_FLOAT)
-                else StringNode(tok) if tok.type == TT_STRING
+            return (
+                NumberNode(tok.value, tok.source, tok.idx_start, tok.idx_end) if tok.type in (TT_INT, TT_FLOAT)
+                else StringNode(tok.value, tok.source, tok.idx_start, tok.idx_end) if tok.type == TT_STRING
                 else VarAccessNode(tok)
             )
 
         if tok.type == TT_LPAREN:
-            res.register_advancement()
             self.advance()
-            expr = res.register(self.expr())
-            if res.error:
-                return res
+            expr = self.expr()
             if self.current_tok.type == TT_RPAREN:
-                res.register_advancement()
                 self.advance()
-                return res.success(expr)
-            return res.failure(InvalidSyntaxError(
-                self.current_tok.pos_start, self.current_tok.pos_end,
-                "Expected ')'"
-            ))
-
-        expr_dict = {
-            'IF': self.if_expr,
-            'FOR': self.for_expr,
-            'WHILE': self.while_expr,
-            'FN': self.func_def,
-        }
+                return expr
+            raise self.syntax_error("Expected ')'")
 
         if tok.type == TT_LSQUARE:
-            result = res.register(self.list_expr())
-        elif tok.type == TT_KEYWORD and tok.value in expr_dict:
-            result = res.register(expr_dict[tok.value]())
-        else:
-            return res.failure(InvalidSyntaxError(
-                tok.pos_start, tok.pos_end,
-                "Expected int, float, identifier, '+', '-', '(', '[', IF', 'FOR', 'WHILE', 'FN'"
-            ))
-
-        if res.error:
-            return res
-        return res.success(result)
-
-    def list_expr(self) -> ParseResult:
-        res = ParseResult()
+            return self.list_expr()
+        if tok.keyword == KW_IF:
+            return self.if_expr()
+        if tok.keyword == KW_FOR:
+            return self.for_expr()
+        if tok.keyword == KW_WHILE:
+            return self.while_expr()
+        if tok.keyword == KW_FN:
+            return self.func_def()
+
+        raise self.syntax_error("Expected int, float, identifier, '+', '-', '(', '[', IF', 'FOR', 'WHILE', 'FN'")
+
+    def list_expr(self) -> ListNode:
         element_nodes = []
-        pos_start = self.current_tok.pos_start.copy()
+        idx_start = self.current_tok.idx_start
 
         if self.current_tok.type != TT_LSQUARE:
-            return res.failure(InvalidSyntaxError(
-                self.current_tok.pos_start, self.current_tok.pos_end,
-                f"Expected '['"
-            ))
+            raise self.syntax_error(f"Expected '['")
 
-        res.register_advancement()
         self.advance()
 
         if self.current_tok.type == TT_RSQUARE:
-            res.register_advancement()
             self.advance()
         else:
-            element_nodes.append(res.register(self.expr()))
-            if res.error:
-                return res.failure(InvalidSyntaxError(
-                    self.current_tok.pos_start, self.current_tok.pos_end,
+            idx = self.tok_idx
+            try:
+                element_nodes.append(self.expr())
+            except ParseError:
+                if self.tok_idx != idx:
+                    raise
+                raise self.syntax_error(
                     "Expected ']', 'VAR', 'IF', 'FOR', 'WHILE', 'FN', int, float, identifier, '+', '-', '(', "
                     "'[' or 'not'"
-                ))
+                )
 
             while self.current_tok.type == TT_COMMA:
-                res.register_advancement()
                 self.advance()
-
-                element_nodes.append(res.register(self.expr()))
-                if res.error:
-                    return res
+                element_nodes.append(self.expr())
 
             if self.current_tok.type != TT_RSQUARE:
-                return res.failure(InvalidSyntaxError(
-                    self.current_tok.pos_start, self.current_tok.pos_end,
-                    f"Expected ',' or ']'"
-                ))
+                raise self.syntax_error(f"Expected ',' or ']'")
 
-            res.register_advancement()
             self.advance()
 
-        return res.success(ListNode(
+        return ListNode(
             element_nodes,
-            pos_start,
-            self.current_tok.pos_end.copy()
-        ))
-
-    def if_expr(self):
-        res = ParseResult()
-        all_cases = res.register(self.if_expr_cases('IF'))
-        if res.error:
-            return res
-        cases, else_case = all_cases
-        return res.success(IfNode(cases, else_case))
+            self.current_tok.source,
+            idx_start,
+            self.current_tok.idx_end
+        )
+
+    def if_expr(self) -> IfNode:
+        cases, else_case = self.if_expr_cases(KW_IF)
+        return IfNode(cases, else_case)
 
     def if_expr_b(self):
-        return self.if_expr_cases('ELIF')
+        return self.if_expr_cases(KW_ELIF)
 
     def if_expr_c(self):
-        res = ParseResult()
         else_case = None
 
-        if self.current_tok.matches(TT_KEYWORD, 'ELSE'):
-            res.register_advancement()
+        if self.current_tok.keyword == KW_ELSE:
             self.advance()
 
             if self.current_tok.type == TT_NEWLINE:
-                res.register_advancement()
                 self.advance()
 
-                statements = res.register(self.statements())
-                if res.error:
-                    return res
+                statements = self.statements()
                 else_case = (statements, True)
 
-                if self.current_tok.matches(TT_KEYWORD, 'END'):
-                    res.register_advancement()
+                if self.current_tok.keyword == KW_END:
                     self.advance()
                 else:
-                    return res.failure(InvalidSyntaxError(
-                        self.current_tok.pos_start, self.current_tok.pos_end,
-                        "Expected 'END'"
-                    ))
+                    raise self.syntax_error("Expected 'END'")
             else:
-                expr = res.register(self.statement())
-                if res.error:
-                    return res
+                expr = self.statement()
                 else_case = (expr, False)
 
-        return res.success(else_case)
+        return else_case
 
     def if_expr_b_or_c(self):
-        res = ParseResult()
         cases, else_case = [], None
 
-        if self.current_tok.matches(TT_KEYWORD, 'ELIF'):
-            all_cases = res.register(self.if_expr_b())
-            if res.error:
-                return res
-            cases, else_case = all_cases
+        if self.current_tok.keyword == KW_ELIF:
+            cases, else_case = self.if_expr_b()
         else:
-            else_case = res.register(self.if_expr_c())
-            if res.error:
-                return res
+            else_case = self.if_expr_c()
 
-        return res.success((cases, else_case))
+        return cases, else_case
 
     def if_expr_cases(self, case_keyword):
-        res = ParseResult()
         cases = []
         else_case = None
 
-        if not self.current_tok.matches(TT_KEYWORD, case_keyword):
-            return res.failure(InvalidSyntaxError(
-                self.current_tok.pos_start, self.current_tok.pos_end,
-                f"Expected '{case_keyword}'"
-            ))
+        if self.current_tok.keyword != case_keyword:
+            raise self.syntax_error(f"Expected '{case_keyword.name}'")
 
-        res.register_advancement()
         self.advance()
 
-        condition = res.register(self.expr())
-        if res.error:
-            return res
+        condition = self.expr()
 
-        if not self.current_tok.matches(TT_KEYWORD, 'THEN'):
-            return res.failure(InvalidSyntaxError(
-                self.current_tok.pos_start, self.current_tok.pos_end,
-                f"Expected 'THEN'"
-            ))
+        if self.current_tok.keyword != KW_THEN:
+            raise self.syntax_error(f"Expected 'THEN'")
 
-        res.register_advancement()
         self.advance()
 
         if self.current_tok.type == TT_NEWLINE:
-            res.register_advancement()
             self.advance()
 
-            statements = res.register(self.statements())
-            if res.error:
-                return res
+            statements = self.statements()
             cases.append((condition, statements, True))
 
-            if self.current_tok.matches(TT_KEYWORD, 'END'):
-                res.register_advancement()
+            if self.current_tok.keyword == KW_END:
                 self.advance()
             else:
-                all_cases = res.register(self.if_expr_b_or_c())
-                if res.error:
-                    return res
-                new_cases, else_case = all_cases
+                new_cases, else_case = self.if_expr_b_or_c()
                 cases.extend(new_cases)
         else:
-            expr = res.register(self.statement())
-            if res.error:
-                return res
+            expr = self.statement()
             cases.append((condition, expr, False))
 
-            all_cases = res.register(self.if_expr_b_or_c())
-            if res.error:
-                return res
-            new_cases, else_case = all_cases
+            new_cases, else_case = self.if_expr_b_or_c()
             cases.extend(new_cases)
 
-        return res.success((cases, else_case))
-
-    def for_expr(self):
-        res = ParseResult()
+        return cases, else_case
 
-        if not self.current_tok.matches(TT_KEYWORD, 'FOR'):
-            return res.failure(InvalidSyntaxError(
-                self.current_tok.pos_start, self.current_tok.pos_end,
-                f"Expected 'FOR'"
-            ))
+    def for_expr(self) -> ForNode:
+        if self.current_tok.keyword != KW_FOR:
+            raise self.syntax_error(f"Expected 'FOR'")
 
-        res.register_advancement()
         self.advance()
 
         if self.current_tok.type != TT_IDENTIFIER:
-            return res.failure(InvalidSyntaxError(
-                self.current_tok.pos_start, self.current_tok.pos_end,
-                f"Expected identifier"
-            ))
+            raise self.syntax_error(f"Expected identifier")
 
         var_name = self.current_tok
-        res.register_advancement()
         self.advance()
 
         if self.current_tok.type != TT_EQ:
-            return res.failure(InvalidSyntaxError(
-                self.current_tok.pos_start, self.current_tok.pos_end,
-                f"Expected '='"
-            ))
+            raise self.syntax_error(f"Expected '='")
 
-        res.register_advancement()
         self.advance()
 
-        start_value = res.register(self.expr())
-        if res.error:
-            return res
+        start_value = self.expr()
 
-        if not self.current_tok.matches(TT_KEYWORD, 'TO'):
-            return res.failure(InvalidSyntaxError(
-                self.current_tok.pos_start, self.current_tok.pos_end,
-                f"Expected 'TO'"
-            ))
+        if self.current_tok.keyword != KW_TO:
+            raise self.syntax_error(f"Expected 'TO'")
 
-        res.register_advancement()
         self.advance()
 
-        end_value = res.register(self.expr())
-        if res.error:
-            return res
+        end_value = self.expr()
 
-        if self.current_tok.matches(TT_KEYWORD, 'STEP'):
-            res.register_advancement()
+        if self.current_tok.keyword == KW_STEP:
             self.advance()
-
-            step_value = res.register(self.expr())
-            if res.error:
-                return res
+            step_value = self.expr()
         else:
             step_value = None
 
-        if not self.current_tok.matches(TT_KEYWORD, 'THEN'):
-            return res.failure(InvalidSyntaxError(
-                self.current_tok.pos_start, self.current_tok.pos_end,
-                f"Expected 'THEN'"
-            ))
+        if self.current_tok.keyword != KW_THEN:
+            raise self.syntax_error(f"Expected 'THEN'")
 
-        res.register_advancement()
         self.advance()
+        self.loop_depth += 1
 
         if self.current_tok.type == TT_NEWLINE:
-            res.register_advancement()
             self.advance()
 
-            body = res.register(self.statements())
-            if res.error:
-                return res
+            body = self.statements()
+            self.loop_depth -= 1
 
-            if not self.current_tok.matches(TT_KEYWORD, 'END'):
-                return res.failure(InvalidSyntaxError(
-                    self.current_tok.pos_start, self.current_tok.pos_end,
-                    f"Expected 'END'"
-                ))
+            if self.current_tok.keyword != KW_END:
+                raise self.syntax_error(f"Expected 'END'")
 
-            res.register_advancement()
             self.advance()
 
-            return res.success(ForNode(var_name, start_value, end_value, step_value, body, True))
+            return ForNode(var_name, start_value, end_value, step_value, body, True)
 
-        body = res.register(self.statement())
-        if res.error:
-            return res
+        body = self.statement()
+        self.loop_depth -= 1
 
-        return res.success(ForNode(var_name, start_value, end_value, step_value, body, False))
+        return ForNode(var_name, start_value, end_value, step_value, body, False)
 
-    def while_expr(self):
-        res = ParseResult()
+    def while_expr(self) -> WhileNode:
+        if self.current_tok.keyword != KW_WHILE:
+            raise self.syntax_error(f"Expected 'WHILE'")
 
-        if not self.current_tok.matches(TT_KEYWORD, 'WHILE'):
-            return res.failure(InvalidSyntaxError(
-                self.current_tok.pos_start, self.current_tok.pos_end,
-                f"Expected 'WHILE'"
-            ))
-
-        res.register_advancement()
         self.advance()
 
-        condition = res.register(self.expr())
-        if res.error:
-            return res
+        condition = self.expr()
 
-        if not self.current_tok.matches(TT_KEYWORD, 'THEN'):
-            return res.failure(InvalidSyntaxError(
-                self.current_tok.pos_start, self.current_tok.pos_end,
-                f"Expected 'THEN'"
-            ))
+        if self.current_tok.keyword != KW_THEN:
+            raise self.syntax_error(f"Expected 'THEN'")
 
-        res.register_advancement()
         self.advance()
+        self.loop_depth += 1
 
         if self.current_tok.type == TT_NEWLINE:
-            res.register_advancement()
             self.advance()
 
-            body = res.register(self.statements())
-            if res.error:
-                return res
+            body = self.statements()
+            self.loop_depth -= 1
 
-            if not self.current_tok.matches(TT_KEYWORD, 'END'):
-                return res.failure(InvalidSyntaxError(
-                    self.current_tok.pos_start, self.current_tok.pos_end,
-                    f"Expected 'END'"
-                ))
+            if self.current_tok.keyword != KW_END:
+                raise self.syntax_error(f"Expected 'END'")
 
-            res.register_advancement()
             self.advance()
 
-            return res.success(WhileNode(condition, body, True))
-
-        body = res.register(self.statement())
-        if res.error:
-            return res
+            return WhileNode(condition, body, True)
 
-        return res.success(WhileNode(condition, body, False))
+        body = self.statement()
+        self.loop_depth -= 1
 
-    def func_def(self):
-        res = ParseResult()
+        return WhileNode(condition, body, False)
 
-        if not self.current_tok.matches(TT_KEYWORD, 'FN'):
-            return res.failure(InvalidSyntaxError(
-                self.current_tok.pos_start, self.current_tok.pos_end,
-                f"Expected 'FN'"
-            ))
+    def func_def(self) -> FuncDefNode:
+        if self.current_tok.keyword != KW_FN:
+            raise self.syntax_error(f"Expected 'FN'")
 
-        res.register_advancement()
         self.advance()
 
         if self.current_tok.type == TT_IDENTIFIER:
             var_name_tok = self.current_tok
-            res.register_advancement()
             self.advance()
             if self.current_tok.type != TT_LPAREN:
-                return res.failure(InvalidSyntaxError(
-                    self.current_tok.pos_start, self.current_tok.pos_end,
-                    f"Expected '('"
-                ))
+                raise self.syntax_error(f"Expected '('")
         else:
             var_name_tok = None
             if self.current_tok.type != TT_LPAREN:
-                return res.failure(InvalidSyntaxError(
-                    self.current_tok.pos_start, self.current_tok.pos_end,
-                    f"Expected identifier or '('"
-                ))
+                raise self.syntax_error(f"Expected identifier or '('")
 
-        res.register_advancement()
         self.advance()
         arg_name_toks = []
 
         if self.current_tok.type == TT_IDENTIFIER:
             arg_name_toks.append(self.current_tok)
-            res.register_advancement()
             self.advance()
 
             while self.current_tok.type == TT_COMMA:
-                res.register_advancement()
                 self.advance()
 
                 if self.current_tok.type != TT_IDENTIFIER:
-                    return res.failure(InvalidSyntaxError(
-                        self.current_tok.pos_start, self.current_tok.pos_end,
-                        f"Expected identifier"
-                    ))
+                    raise self.syntax_error(f"Expected identifier")
 
                 arg_name_toks.append(self.current_tok)
-                res.register_advancement()
                 self.advance()
 
             if self.current_tok.type != TT_RPAREN:
-                return res.failure(InvalidSyntaxError(
-                    self.current_tok.pos_start, self.current_tok.pos_end,
-                    f"Expected ',' or ')'"
-                ))
+                raise self.syntax_error(f"Expected ',' or ')'")
         else:
             if self.current_tok.type != TT_RPAREN:
-                return res.failure(InvalidSyntaxError(
-                    self.current_tok.pos_start, self.current_tok.pos_end,
-                    f"Expected identifier or ')'"
-                ))
+                raise self.syntax_error(f"Expected identifier or ')'")
 
-        res.register_advancement()
         self.advance()
 
         if self.current_tok.type == TT_ARROW:
-            res.register_advancement()
             self.advance()
 
-            body = res.register(self.expr())
-            if res.error:
-                return res
+            loop_depth, self.loop_depth = self.loop_depth, 0
+            body = self.expr()
+            self.loop_depth = loop_depth
 
-            return res.success(FuncDefNode(
+            return FuncDefNode(
                 var_name_tok,
                 arg_name_toks,
                 body,
                 True
-            ))
+            )
 
         if self.current_tok.type != TT_NEWLINE:
-            return res.failure(InvalidSyntaxError(
-                self.current_tok.pos_start, self.current_tok.pos_end,
-                f"Expected '->' or NEWLINE"
-            ))
+            raise self.syntax_error(f"Expected '->' or NEWLINE")
 
-        res.register_advancement()
         self.advance()
 
-        body = res.register(self.statements())
-        if res.error:
-            return res
+        loop_depth, self.loop_depth = self.loop_depth, 0
+        body = self.statements()
+        self.loop_depth = loop_depth
 
-        if not self.current_tok.matches(TT_KEYWORD, 'END'):
-            return res.failure(InvalidSyntaxError(
-                self.current_tok.pos_start, self.current_tok.pos_end,
-                f"Expected 'END'"
-            ))
+        if self.current_tok.keyword != KW_END:
+            raise self.syntax_error(f"Expected 'END'")
 
-        res.register_advancement()
         self.advance()
 
-        return res.success(FuncDefNode(
+        return FuncDefNode(
             var_name_tok,
             arg_name_toks,
             body,
             False
-        ))
-
-    ###################################
-
-    def bin_op(self, func_a, ops, func_b=None):
-        if func_b is None:
-            func_b = func_a
-
-        res = ParseResult()
-        left = res.register(func_a())
-        if res.error:
-            return res
-
-        while self.current_tok.type in ops or (self.current_tok.type, self.current_tok.value) in ops:
-            op_tok = self.current_tok
-            res.register_advancement()
-            self.advance()
-            right = res.register(func_b())
-            if res.error:
-                return res
-            left = BinOpNode(left, op_tok, right)
-
-        return res.success(left)
+        )
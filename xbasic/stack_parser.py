@@ -0,0 +1,593 @@
+import gc
+from typing import List, Union
+
+from .parser import Parser, PREC_LOGIC, PREC_COMPARISON, PREC_POWER, OPERATOR_PRECEDENCE, KEYWORD_PRECEDENCE
+from .utils.nodes import *
+from .utils.parse_result import ParseResult, ParseError
+from .utils.token import Token
+from .utils.token_buffer import TokenBuffer
+from .utils.token_list import *
+
+# The nesting depth StackParser accepts unless told otherwise.
+DEFAULT_MAX_DEPTH = 10000
+
+# Yielded by a rule to tell the driver that it opens a new level of nesting.
+NESTED = object()
+
+
+class StackParser(Parser):
+    def __init__(self, tokens: Union[List[Token], TokenBuffer], max_depth: int = DEFAULT_MAX_DEPTH):
+        """
+        A parser that keeps its own stack instead of using Python's.
+
+        It accepts the same language and builds the same trees and errors as
+        Parser, but each grammar rule is a generator that yields the rules it
+        needs parsed and is sent back their results, or has their ParseError
+        thrown into it. parse() runs them from a list, so nesting costs a
+        suspended generator on the heap rather than Python stack frames, and
+        input nested far deeper than the recursion limit parses in time and
+        memory linear in its depth.
+
+        Every expression, and every operand of a unary or binary operator,
+        opens a level of nesting. Going deeper than max_depth fails with an
+        InvalidSyntaxError at the first token of the offending expression.
+
+        Only parse() should be called on a StackParser; the rules themselves
+        return generators.
+
+        Args:
+            tokens (Union[List[Token], TokenBuffer]): The tokens to be parsed.
+            max_depth (int, optional): The deepest nesting accepted. Defaults to DEFAULT_MAX_DEPTH.
+        """
+        super().__init__(tokens)
+        self.max_depth: int = max_depth
+
+    def parse(self) -> ParseResult:
+        """
+        Parses the tokens into an abstract syntax tree (AST).
+
+        Returns:
+            ParseResult: The result of the parsing operation.
+        """
+        # Nothing built while parsing forms a cycle, but the suspended rules and
+        # the nodes are all tracked by the garbage collector, which would keep
+        # rescanning them as they pile up on deep input.
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            node = self.drive(self.statements())
+            if self.current_tok.type != TT_EOF:
+                raise self.syntax_error("Token cannot appear after previous tokens")
+        except ParseError as e:
+            return ParseResult().failure(e.error)
+        finally:
+            if enabled:
+                gc.enable()
+        return ParseResult().success(node)
+
+    def drive(self, rule):
+        """
+        Runs a rule and every rule it asks for, without recursing.
+
+        A ParseError raised by a rule is thrown into the rule that asked for
+        it, as if it had called it. Exceeding max_depth ends the whole parse.
+
+        Args:
+            rule (Generator): The rule to run.
+
+        Returns:
+            The value the rule returns.
+        """
+        stack = [rule]
+        nested = [False]
+        depth = 0
+        value = None
+        error = None
+
+        while True:
+            try:
+                if error is None:
+                    step = stack[-1].send(value)
+                else:
+                    step = stack[-1].throw(error)
+            except StopIteration as done:
+                value, error = done.value, None
+            except ParseError as e:
+                value, error = None, e
+            else:
+                value = None
+                if step is NESTED:
+                    depth += 1
+                    if depth > self.max_depth:
+                        raise self.syntax_error(f"Nesting exceeds the maximum depth of {self.max_depth}")
+                    nested[-1] = True
+                else:
+                    stack.append(step)
+                    nested.append(False)
+                continue
+
+            stack.pop()
+            if nested.pop():
+                depth -= 1
+            if not stack:
+                if error is not None:
+                    raise error
+                return value
+
+    ###################################
+
+    def statements(self):
+        statements = []
+        idx_start = self.current_tok.idx_start
+
+        while self.current_tok.type == TT_NEWLINE:
+            self.advance()
+
+        statements.append((yield self.statement()))
+
+        # Another statement follows only after a newline, and only if its first
+        # token can start one; any other token ends the list for the caller.
+        while True:
+            newline_count = 0
+            while self.current_tok.type == TT_NEWLINE:
+                self.advance()
+                newline_count += 1
+            if newline_count == 0 or not self.starts_statement():
+                break
+
+            statements.append((yield self.statement()))
+
+        return ListNode(
+            statements,
+            self.current_tok.source,
+            idx_start,
+            self.current_tok.idx_end
+        )
+
+    def statement(self):
+        tok = self.current_tok
+        idx_start = tok.idx_start
+
+        if tok.keyword == KW_RETURN:
+            self.advance()
+
+            expr = (yield self.expr()) if self.starts_expr() else None
+            return ReturnNode(expr, self.current_tok.source, idx_start, self.current_tok.idx_start)
+
+        if tok.keyword == KW_CONTINUE:
+            if not self.loop_depth:
+                raise self.syntax_error("'CONTINUE' outside of a loop")
+            self.advance()
+            return ContinueNode(self.current_tok.source, idx_start, self.current_tok.idx_start)
+
+        if tok.keyword == KW_BREAK:
+            if not self.loop_depth:
+                raise self.syntax_error("'BREAK' outside of a loop")
+            self.advance()
+            return BreakNode(self.current_tok.source, idx_start, self.current_tok.idx_start)
+
+        idx = self.tok_idx
+        try:
+            return (yield self.expr())
+        except ParseError:
+            # An expression that fails on its first token is reported as a
+            # missing statement; any later failure is reported as it is.
+            if self.tok_idx != idx:
+                raise
+            raise self.syntax_error(
+                "Expected 'RETURN', 'CONTINUE', 'BREAK', 'IF', 'FOR', 'WHILE', 'FN', num, identifier, "
+                "'+', '-', '(', '[' or 'not'"
+            )
+
+    def expr(self):
+        yield NESTED
+        if self.current_tok.keyword in (KW_NUM, KW_TEXT, KW_LIST):
+            dtype = self.current_tok.value
+            self.advance()
+
+            if self.current_tok.type != TT_IDENTIFIER:
+                raise self.syntax_error("Expected identifier")
+
+            var_name = self.current_tok
+            self.advance()
+
+            if self.current_tok.type != TT_EQ:
+                raise self.syntax_error("Expected '='")
+
+            self.advance()
+            return VarAssignNode(var_name, (yield self.expr()), dtype)
+
+        idx = self.tok_idx
+        try:
+            return (yield self.operation(PREC_LOGIC, False))
+        except ParseError:
+            if self.tok_idx != idx:
+                raise
+            raise self.syntax_error(
+                "Expected 'VAR', 'IF', 'FOR', 'WHILE', 'FN', int, float, identifier, '+', '-', '(', '[' or 'not'"
+            )
+
+    def operation(self, precedence: int, nested: bool = True):
+        if nested:
+            yield NESTED
+        tok = self.current_tok
+
+        if tok.keyword == KW_NOT and precedence <= PREC_COMPARISON:
+            self.advance()
+            left = UnaryOpNode(tok, (yield self.operation(PREC_COMPARISON)))
+        elif tok.type == TT_PLUS or tok.type == TT_MINUS:
+            self.advance()
+            left = UnaryOpNode(tok, (yield self.operation(PREC_POWER)))
+        else:
+            if tok.type == TT_INT or tok.type == TT_FLOAT:
+                self.advance()
+                left = NumberNode(tok.value, tok.source, tok.idx_start, tok.idx_end)
+            elif tok.type == TT_IDENTIFIER:
+                self.advance()
+                left = VarAccessNode(tok)
+            elif tok.type == TT_STRING:
+                self.advance()
+                left = StringNode(tok.value, tok.source, tok.idx_start, tok.idx_end)
+            else:
+                idx = self.tok_idx
+                try:
+                    left = (yield self.atom())
+                except ParseError:
+                    if precedence > PREC_COMPARISON or self.tok_idx != idx:
+                        raise
+                    raise self.syntax_error(
+                        "Expected int, float, identifier, '+', '-', '(', '[', 'IF', 'FOR', 'WHILE', 'FN' or 'not'"
+                    )
+
+            if self.current_tok.type == TT_LPAREN:
+                left = (yield self.call_expr(left))
+
+        while True:
+            op_tok = self.current_tok
+            if op_tok.type == TT_KEYWORD:
+                op_precedence = KEYWORD_PRECEDENCE.get(op_tok.keyword)
+            else:
+                op_precedence = OPERATOR_PRECEDENCE.get(op_tok.type)
+            if op_precedence is None or op_precedence < precedence:
+                return left
+
+            self.advance()
+            right = (yield self.operation(op_precedence if op_precedence == PREC_POWER else op_precedence + 1))
+            left = BinOpNode(left, op_tok, right)
+
+    def call_expr(self, node):
+        self.advance()
+        arg_nodes = []
+
+        if self.current_tok.type == TT_RPAREN:
+            self.advance()
+        else:
+            idx = self.tok_idx
+            try:
+                arg_nodes.append((yield self.expr()))
+            except ParseError:
+                if self.tok_idx != idx:
+                    raise
+                raise self.syntax_error(
+                    "Expected ')', 'VAR', 'IF', 'FOR', 'WHILE', 'FN', int, float, identifier, '+', '-', '(', "
+                    "'[' or 'not'"
+                )
+
+            while self.current_tok.type == TT_COMMA:
+                self.advance()
+                arg_nodes.append((yield self.expr()))
+
+            if self.current_tok.type != TT_RPAREN:
+                raise self.syntax_error("Expected ',' or ')'")
+
+            self.advance()
+        return CallNode(node, arg_nodes)
+
+    def atom(self):
+        tok = self.current_tok
+
+        if tok.type in (TT_INT, TT_FLOAT, TT_STRING, TT_IDENTIFIER):
+            self.advance()
+            return (
+                NumberNode(tok.value, tok.source, tok.idx_start, tok.idx_end) if tok.type in (TT_INT, TT_FLOAT)
+                else StringNode(tok.value, tok.source, tok.idx_start, tok.idx_end) if tok.type == TT_STRING
+                else VarAccessNode(tok)
+            )
+
+        if tok.type == TT_LPAREN:
+            self.advance()
+            expr = (yield self.expr())
+            if self.current_tok.type == TT_RPAREN:
+                self.advance()
+                return expr
+            raise self.syntax_error("Expected ')'")
+
+        if tok.type == TT_LSQUARE:
+            return (yield self.list_expr())
+        if tok.keyword == KW_IF:
+            return (yield self.if_expr())
+        if tok.keyword == KW_FOR:
+            return (yield self.for_expr())
+        if tok.keyword == KW_WHILE:
+            return (yield self.while_expr())
+        if tok.keyword == KW_FN:
+            return (yield self.func_def())
+
+        raise self.syntax_error("Expected int, float, identifier, '+', '-', '(', '[', IF', 'FOR', 'WHILE', 'FN'")
+
+    def list_expr(self):
+        element_nodes = []
+        idx_start = self.current_tok.idx_start
+
+        if self.current_tok.type != TT_LSQUARE:
+            raise self.syntax_error("Expected '['")
+
+        self.advance()
+
+        if self.current_tok.type == TT_RSQUARE:
+            self.advance()
+        else:
+            idx = self.tok_idx
+            try:
+                element_nodes.append((yield self.expr()))
+            except ParseError:
+                if self.tok_idx != idx:
+                    raise
+                raise self.syntax_error(
+                    "Expected ']', 'VAR', 'IF', 'FOR', 'WHILE', 'FN', int, float, identifier, '+', '-', '(', "
+                    "'[' or 'not'"
+                )
+
+            while self.current_tok.type == TT_COMMA:
+                self.advance()
+                element_nodes.append((yield self.expr()))
+
+            if self.current_tok.type != TT_RSQUARE:
+                raise self.syntax_error("Expected ',' or ']'")
+
+            self.advance()
+
+        return ListNode(
+            element_nodes,
+            self.current_tok.source,
+            idx_start,
+            self.current_tok.idx_end
+        )
+
+    def if_expr(self):
+        cases, else_case = (yield self.if_expr_cases(KW_IF))
+        return IfNode(cases, else_case)
+
+    def if_expr_b(self):
+        return (yield self.if_expr_cases(KW_ELIF))
+
+    def if_expr_c(self):
+        else_case = None
+
+        if self.current_tok.keyword == KW_ELSE:
+            self.advance()
+
+            if self.current_tok.type == TT_NEWLINE:
+                self.advance()
+
+                statements = (yield self.statements())
+                else_case = (statements, True)
+
+                if self.current_tok.keyword == KW_END:
+                    self.advance()
+                else:
+                    raise self.syntax_error("Expected 'END'")
+            else:
+                expr = (yield self.statement())
+                else_case = (expr, False)
+
+        return else_case
+
+    def if_expr_b_or_c(self):
+        cases, else_case = [], None
+
+        if self.current_tok.keyword == KW_ELIF:
+            cases, else_case = (yield self.if_expr_b())
+        else:
+            else_case = (yield self.if_expr_c())
+
+        return cases, else_case
+
+    def if_expr_cases(self, case_keyword):
+        cases = []
+        else_case = None
+
+        if self.current_tok.keyword != case_keyword:
+            raise self.syntax_error(f"Expected '{case_keyword.name}'")
+
+        self.advance()
+
+        condition = (yield self.expr())
+
+        if self.current_tok.keyword != KW_THEN:
+            raise self.syntax_error("Expected 'THEN'")
+
+        self.advance()
+
+        if self.current_tok.type == TT_NEWLINE:
+            self.advance()
+
+            statements = (yield self.statements())
+            cases.append((condition, statements, True))
+
+            if self.current_tok.keyword == KW_END:
+                self.advance()
+            else:
+                new_cases, else_case = (yield self.if_expr_b_or_c())
+                cases.extend(new_cases)
+        else:
+            expr = (yield self.statement())
+            cases.append((condition, expr, False))
+
+            new_cases, else_case = (yield self.if_expr_b_or_c())
+            cases.extend(new_cases)
+
+        return cases, else_case
+
+    def for_expr(self):
+        if self.current_tok.keyword != KW_FOR:
+            raise self.syntax_error("Expected 'FOR'")
+
+        self.advance()
+
+        if self.current_tok.type != TT_IDENTIFIER:
+            raise self.syntax_error("Expected identifier")
+
+        var_name = self.current_tok
+        self.advance()
+
+        if self.current_tok.type != TT_EQ:
+            raise self.syntax_error("Expected '='")
+
+        self.advance()
+
+        start_value = (yield self.expr())
+
+        if self.current_tok.keyword != KW_TO:
+            raise self.syntax_error("Expected 'TO'")
+
+        self.advance()
+
+        end_value = (yield self.expr())
+
+        if self.current_tok.keyword == KW_STEP:
+            self.advance()
+            step_value = (yield self.expr())
+        else:
+            step_value = None
+
+        if self.current_tok.keyword != KW_THEN:
+            raise self.syntax_error("Expected 'THEN'")
+
+        self.advance()
+        self.loop_depth += 1
+
+        if self.current_tok.type == TT_NEWLINE:
+            self.advance()
+
+            body = (yield self.statements())
+            self.loop_depth -= 1
+
+            if self.current_tok.keyword != KW_END:
+                raise self.syntax_error("Expected 'END'")
+
+            self.advance()
+
+            return ForNode(var_name, start_value, end_value, step_value, body, True)
+
+        body = (yield self.statement())
+        self.loop_depth -= 1
+
+        return ForNode(var_name, start_value, end_value, step_value, body, False)
+
+    def while_expr(self):
+        if self.current_tok.keyword != KW_WHILE:
+            raise self.syntax_error("Expected 'WHILE'")
+
+        self.advance()
+
+        condition = (yield self.expr())
+
+        if self.current_tok.keyword != KW_THEN:
+            raise self.syntax_error("Expected 'THEN'")
+
+        self.advance()
+        self.loop_depth += 1
+
+        if self.current_tok.type == TT_NEWLINE:
+            self.advance()
+
+            body = (yield self.statements())
+            self.loop_depth -= 1
+
+            if self.current_tok.keyword != KW_END:
+                raise self.syntax_error("Expected 'END'")
+
+            self.advance()
+
+            return WhileNode(condition, body, True)
+
+        body = (yield self.statement())
+        self.loop_depth -= 1
+
+        return WhileNode(condition, body, False)
+
+    def func_def(self):
+        if self.current_tok.keyword != KW_FN:
+            raise self.syntax_error("Expected 'FN'")
+
+        self.advance()
+
+        if self.current_tok.type == TT_IDENTIFIER:
+            var_name_tok = self.current_tok
+            self.advance()
+            if self.current_tok.type != TT_LPAREN:
+                raise self.syntax_error("Expected '('")
+        else:
+            var_name_tok = None
+            if self.current_tok.type != TT_LPAREN:
+                raise self.syntax_error("Expected identifier or '('")
+
+        self.advance()
+        arg_name_toks = []
+
+        if self.current_tok.type == TT_IDENTIFIER:
+            arg_name_toks.append(self.current_tok)
+            self.advance()
+
+            while self.current_tok.type == TT_COMMA:
+                self.advance()
+
+                if self.current_tok.type != TT_IDENTIFIER:
+                    raise self.syntax_error("Expected identifier")
+
+                arg_name_toks.append(self.current_tok)
+                self.advance()
+
+            if self.current_tok.type != TT_RPAREN:
+                raise self.syntax_error("Expected ',' or ')'")
+        else:
+            if self.current_tok.type != TT_RPAREN:
+                raise self.syntax_error("Expected identifier or ')'")
+
+        self.advance()
+
+        if self.current_tok.type == TT_ARROW:
+            self.advance()
+
+            loop_depth, self.loop_depth = self.loop_depth, 0
+            body = (yield self.expr())
+            self.loop_depth = loop_depth
+
+            return FuncDefNode(
+                var_name_tok,
+                arg_name_toks,
+                body,
+                True
+            )
+
+        if self.current_tok.type != TT_NEWLINE:
+            raise self.syntax_error("Expected '->' or NEWLINE")
+
+        self.advance()
+
+        loop_depth, self.loop_depth = self.loop_depth, 0
+        body = (yield self.statements())
+        self.loop_depth = loop_depth
+
+        if self.current_tok.keyword != KW_END:
+            raise self.syntax_error("Expected 'END'")
+
+        self.advance()
+
+        return FuncDefNode(
+            var_name_tok,
+            arg_name_toks,
+            body,
+            False
+        )
@@ -0,0 +1,87 @@
+from typing import List, TextIO
+
+from .fast_lexer import FastLexer
+from .utils.source_file import StreamSource
+from .utils.token import Token
+from .utils.token_buffer import TokenBuffer
+from .utils.token_list import TT_EOF
+
+
+class StreamLexer:
+    def __init__(self, fn: str, file: TextIO):
+        """
+        Lexes a file a line at a time, as the parser asks for tokens.
+
+        The lexer is indexed like a list of tokens, so a Parser can read from it
+        directly. Tokens the parser is done with can be released to free them.
+        A string running over several lines is lexed once it is closed.
+
+        Args:
+            fn (str): The name of the file.
+            file (TextIO): The file object to read from.
+        """
+        self.fn = fn
+        self.source = StreamSource(fn, file)
+        self.tokens: List[Token] = []
+        self.released = 0
+        self.pending = ''
+        self.pending_start = 0
+        self.done = False
+        self.error = None
+
+    def __len__(self) -> int:
+        """
+        Returns the number of tokens lexed so far, plus one while the file is not
+        finished, so the parser always asks for the token after the last one.
+        """
+        return self.released + len(self.tokens) + (0 if self.done else 1)
+
+    def __getitem__(self, i: int) -> Token:
+        """
+        Returns the token at an index, lexing further lines until it is read.
+
+        Args:
+            i (int): The index of the token, counted from the start of the file.
+
+        Returns:
+            Token: The token at the index.
+        """
+        while i - self.released >= len(self.tokens) and not self.done:
+            self.lex_line()
+        return self.tokens[i - self.released]
+
+    def release(self, idx: int):
+        """
+        Frees the tokens before an index.
+
+        Args:
+            idx (int): The index of the first token that is still needed.
+        """
+        del self.tokens[:idx - self.released]
+        self.released = idx
+
+    def lex_line(self):
+        """Reads the next line of the file and appends its tokens."""
+        line = self.source.read_line()
+        text = self.pending + line
+        final = not line.endswith('\n')
+
+        buffer = TokenBuffer(self.source)
+        lexer = FastLexer(self.fn, text, self.source, self.pending_start)
+        error, end = lexer.scan(buffer, final=final)
+        self.tokens.extend(buffer)
+
+        if error:
+            # Let the parser run into the end of the input; the error is
+            # reported in place of anything it finds there. An error after a
+            # '!' may end on the next line, which its message shows.
+            self.error = error
+            self.source.read_line()
+            idx = self.pending_start + end
+            self.tokens.append(Token(TT_EOF, None, self.source, idx, idx + 1))
+            self.done = True
+        elif final:
+            self.done = True
+        else:
+            self.pending = text[end:]
+            self.pending_start += end
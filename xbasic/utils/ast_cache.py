@@ -0,0 +1,204 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Optional
+
+from .. import __version__
+
+CACHE_DIR_NAME = '__bsxcache__'
+CACHE_SUFFIX = '.ast'
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+# Bump whenever the layout of the nodes, tokens or SourceFile changes, so that
+# entries written by an older parser are never loaded.
+CACHE_MAGIC = 3
+
+
+class AstCache:
+    # The extension of the entries and the version of their layout. Caches of
+    # other compiled forms of a program override these.
+    suffix = CACHE_SUFFIX
+    magic = CACHE_MAGIC
+
+    def __init__(self, directory: str, max_bytes: int = MAX_CACHE_BYTES):
+        """
+        A directory of parsed programs, keyed by a hash of their source.
+
+        Like __pycache__, a script's cache lives next to it in a __bsxcache__
+        directory, or in XBASIC_CACHE_DIR if that is set. XBASIC_NO_CACHE turns
+        caching off. The cache is only an optimization: any error reading or
+        writing it is treated as a miss.
+
+        Entries are written to a temporary file and renamed into place, so
+        several processes can fill the same cache at once and a reader never
+        sees half an entry. When the directory grows past max_bytes the least
+        recently used entries are removed.
+
+        Args:
+            directory (str): The cache directory. It is created on the first write.
+            max_bytes (int, optional): The size the entries are kept under.
+                Defaults to MAX_CACHE_BYTES.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def for_file(cls, fn: str) -> Optional['AstCache']:
+        """
+        Returns the cache for a script, if it should be cached.
+
+        Args:
+            fn (str): The path of the script.
+
+        Returns:
+            Optional[AstCache]: The cache, or None if fn is not a file or caching is off.
+        """
+        if os.environ.get('XBASIC_NO_CACHE') or not os.path.isfile(fn):
+            return None
+        directory = os.environ.get('XBASIC_CACHE_DIR')
+        if not directory:
+            directory = os.path.join(os.path.dirname(os.path.abspath(fn)), CACHE_DIR_NAME)
+        return cls(directory)
+
+    @classmethod
+    def key(cls, fn: str, text: str, value_used: bool = True) -> str:
+        """
+        Computes the key of a program.
+
+        The file name is part of the key since positions in the tree refer to it,
+        and the version of the optimizer and whether the value of the program is
+        used since the tree is stored optimized.
+
+        Args:
+            fn (str): The name of the file.
+            text (str): The source of the program.
+            value_used (bool, optional): Whether the value of the program is used. Defaults to True.
+
+        Returns:
+            str: The hex digest identifying the program.
+        """
+        from ..optimizer import VERSION as OPTIMIZER_VERSION
+        digest = hashlib.sha256(
+            f'{__version__}\0{cls.magic}\0{OPTIMIZER_VERSION}\0{int(value_used)}\0{fn}\0'.encode()
+        )
+        digest.update(text.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    @staticmethod
+    def dumps(node) -> bytes:
+        """
+        Serializes an entry.
+
+        Args:
+            node (ListNode): The tree of a program.
+
+        Returns:
+            bytes: The data of the entry.
+        """
+        return pickle.dumps(node, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def loads(data: bytes):
+        """
+        Deserializes an entry.
+
+        Args:
+            data (bytes): The data of the entry.
+
+        Returns:
+            ListNode: The tree of the program.
+        """
+        return pickle.loads(data)
+
+    def path(self, key: str) -> str:
+        """
+        Returns the path of the entry for a key.
+
+        Args:
+            key (str): The key of the program.
+
+        Returns:
+            str: The path of the entry.
+        """
+        return os.path.join(self.directory, key + self.suffix)
+
+    def load(self, fn: str, text: str, value_used: bool = True):
+        """
+        Loads the tree of a program, if it is cached.
+
+        Args:
+            fn (str): The name of the file.
+            text (str): The source of the program.
+            value_used (bool, optional): Whether the value of the program is used. Defaults to True.
+
+        Returns:
+            Optional[ListNode]: The tree of the program, or None if it is not cached.
+        """
+        path = self.path(self.key(fn, text, value_used))
+        try:
+            with open(path, 'rb') as f:
+                node = self.loads(f.read())
+            os.utime(path)
+        except Exception:
+            return None
+        return node
+
+    def store(self, fn: str, text: str, node, value_used: bool = True):
+        """
+        Stores the tree of a program.
+
+        Args:
+            fn (str): The name of the file.
+            text (str): The source of the program.
+            node (ListNode): The tree of the program.
+            value_used (bool, optional): Whether the value of the program is used. Defaults to True.
+        """
+        try:
+            data = self.dumps(node)
+        except (RecursionError, ValueError):
+            return
+
+        tmp = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, self.path(self.key(fn, text, value_used)))
+            tmp = None
+            self.evict()
+        except OSError:
+            pass
+        finally:
+            if tmp is not None:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+
+    def evict(self):
+        """Removes the least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(self.suffix):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
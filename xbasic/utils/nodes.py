@@ -1,74 +1,156 @@
-from typing import List, Union
+from typing import List, Optional, Union
 
 from .position import Position
+from .source_file import SourceFile
 from .token import Token
+from .token_list import TT_KEYWORD, TokenType, Keyword, KEYWORDS
 
 
-class NumberNode:
-    def __init__(self, tok):
+def op_name(op_type: TokenType, op_keyword: Keyword) -> str:
+    """
+    Names an operator the way its token is printed.
+
+    Args:
+        op_type (TokenType): The type of the operator token.
+        op_keyword (Keyword): The keyword of the operator token, or 0.
+
+    Returns:
+        str: The name of the operator.
+    """
+    if op_type == TT_KEYWORD:
+        return f'KEYWORD:{KEYWORDS[op_keyword - 1]}'
+    return op_type.name
+
+
+class Node:
+    """
+    Base class for the nodes of the abstract syntax tree (AST).
+
+    Nodes are slotted and only store offsets into their SourceFile; positions
+    are looked up when an interpreter value or an error asks for them. They
+    keep no tokens: literals store their value, names their string and
+    operators the type and keyword of their token.
+
+    Attributes:
+        source (SourceFile): The file the node was parsed from.
+        idx_start (int): The offset at which the node starts.
+        idx_end (int): The offset just past the end of the node.
+    """
+    __slots__ = ('source', 'idx_start', 'idx_end')
+
+    @property
+    def pos_start(self) -> Position:
+        """Position: The start position of the node."""
+        return self.source.position(self.idx_start)
+
+    @property
+    def pos_end(self) -> Position:
+        """Position: The end position of the node."""
+        return self.source.end_position(self.idx_end)
+
+    def span(self, start, end):
+        """
+        Sets the node to span from the start of one token or node to the end of another.
+
+        Args:
+            start (Union[Token, Node]): The token or node the span starts with.
+            end (Union[Token, Node]): The token or node the span ends with.
+        """
+        self.source = start.source
+        self.idx_start = start.idx_start
+        self.idx_end = end.idx_end
+
+
+class NumberNode(Node):
+    __slots__ = ('value',)
+
+    def __init__(self, value: Union[int, float], source: SourceFile, idx_start: int, idx_end: int):
         """
         Represents a number node in the abstract syntax tree (AST).
 
         Args:
-            tok (Token): The token representing the number.
+            value (Union[int, float]): The value of the number.
+            source (SourceFile): The file the number was parsed from.
+            idx_start (int): The offset at which the number starts.
+            idx_end (int): The offset just past the end of the number.
         """
-        self.tok = tok
+        self.value: Union[int, float] = value
 
-        self.pos_start = self.tok.pos_start
-        self.pos_end = self.tok.pos_end
+        self.source = source
+        self.idx_start = idx_start
+        self.idx_end = idx_end
 
     def __repr__(self):
-        return f'{self.tok}'
+        return f'{"FLOAT" if isinstance(self.value, float) else "INT"}:{self.value}'
 
 
-class StringNode:
-    def __init__(self, tok):
+class StringNode(Node):
+    __slots__ = ('value',)
+
+    def __init__(self, value: str, source: SourceFile, idx_start: int, idx_end: int):
         """
         Represents a string node in the abstract syntax tree (AST).
 
         Args:
-            tok (Token): The token representing the string.
+            value (str): The value of the string.
+            source (SourceFile): The file the string was parsed from.
+            idx_start (int): The offset at which the string starts.
+            idx_end (int): The offset just past the end of the string.
         """
-        self.tok = tok
+        self.value: str = value
 
-        self.pos_start = self.tok.pos_start
-        self.pos_end = self.tok.pos_end
+        self.source = source
+        self.idx_start = idx_start
+        self.idx_end = idx_end
 
     def __repr__(self):
-        return f'{self.tok}'
+        return f'STRING:{self.value}'
+
 
+class ListNode(Node):
+    __slots__ = ('element_nodes', 'should_return_null')
 
-class ListNode:
-    def __init__(self, element_nodes: List[Union[NumberNode, StringNode]], pos_start: Position, pos_end: Position):
+    def __init__(self, element_nodes: List[Union[NumberNode, StringNode]], source: SourceFile, idx_start: int,
+                 idx_end: int):
         """
         Represents a list node in the abstract syntax tree (AST).
 
         Args:
             element_nodes (list): List of element nodes.
-            pos_start (Position): The start position of the list.
-            pos_end (Position): The end position of the list.
+            source (SourceFile): The file the list was parsed from.
+            idx_start (int): The offset at which the list starts.
+            idx_end (int): The offset just past the end of the list.
+
+        Attributes:
+            should_return_null (bool): Whether the list should return null after
+                evaluating its elements, because its value is never used.
         """
         self.element_nodes: List[Union[NumberNode, StringNode]] = element_nodes
-        self.pos_start = pos_start
-        self.pos_end = pos_end
+        self.should_return_null = False
+        self.source = source
+        self.idx_start = idx_start
+        self.idx_end = idx_end
+
 
+class VarAccessNode(Node):
+    __slots__ = ('var_name',)
 
-class VarAccessNode:
-    def __init__(self, var_name_tok):
+    def __init__(self, var_name_tok: Token):
         """
         Represents a variable access node in the abstract syntax tree (AST).
 
         Args:
             var_name_tok (Token): The token representing the variable name.
         """
-        self.var_name_tok = var_name_tok
+        self.var_name: str = var_name_tok.value
+
+        self.span(var_name_tok, var_name_tok)
 
-        self.pos_start = self.var_name_tok.pos_start
-        self.pos_end = self.var_name_tok.pos_end
 
+class VarAssignNode(Node):
+    __slots__ = ('var_name', 'value_node', 'dtype')
 
-class VarAssignNode:
-    def __init__(self, var_name_tok, value_node: Union[NumberNode, StringNode, ListNode], dtype: str):
+    def __init__(self, var_name_tok: Token, value_node: Union[NumberNode, StringNode, ListNode], dtype: str):
         """
         Represents a variable assignment node in the abstract syntax tree (AST).
 
@@ -77,16 +159,18 @@ class VarAssignNode:
             value_node: The value assigned to the variable.
             dtype: The data type of the variable.
         """
-        self.var_name_tok = var_name_tok
+        self.var_name: str = var_name_tok.value
         self.value_node: Union[NumberNode, StringNode, ListNode] = value_node
         self.dtype: str = dtype
 
-        self.pos_start = self.var_name_tok.pos_start
-        self.pos_end = self.value_node.pos_end
+        self.span(var_name_tok, value_node)
 
 
-class BinOpNode:
-    def __init__(self, left_node: Union[NumberNode, StringNode], op_tok, right_node: Union[NumberNode, StringNode]):
+class BinOpNode(Node):
+    __slots__ = ('left_node', 'op_type', 'op_keyword', 'right_node')
+
+    def __init__(self, left_node: Union[NumberNode, StringNode], op_tok: Token,
+                 right_node: Union[NumberNode, StringNode]):
         """
         Represents a binary operation node in the abstract syntax tree (AST).
 
@@ -96,18 +180,20 @@ class BinOpNode:
             right_node: The right operand node.
         """
         self.left_node: Union[NumberNode, StringNode] = left_node
-        self.op_tok = op_tok
+        self.op_type: TokenType = op_tok.type
+        self.op_keyword: Keyword = op_tok.keyword
         self.right_node: Union[NumberNode, StringNode] = right_node
 
-        self.pos_start = self.left_node.pos_start
-        self.pos_end = self.right_node.pos_end
+        self.span(left_node, right_node)
 
     def __repr__(self) -> str:
-        return f'({self.left_node}, {self.op_tok}, {self.right_node})'
+        return f'({self.left_node}, {op_name(self.op_type, self.op_keyword)}, {self.right_node})'
+
 
+class UnaryOpNode(Node):
+    __slots__ = ('op_type', 'op_keyword', 'node')
 
-class UnaryOpNode:
-    def __init__(self, op_tok, node):
+    def __init__(self, op_tok: Token, node):
         """
         Represents a unary operation node in the abstract syntax tree (AST).
 
@@ -115,17 +201,19 @@ class UnaryOpNode:
             op_tok (Token): The token representing the operator.
             node: The operand node.
         """
-        self.op_tok = op_tok
+        self.op_type: TokenType = op_tok.type
+        self.op_keyword: Keyword = op_tok.keyword
         self.node = node
 
-        self.pos_start = self.op_tok.pos_start
-        self.pos_end = node.pos_end
+        self.span(op_tok, node)
 
     def __repr__(self):
-        return f'({self.op_tok}, {self.node})'
+        return f'({op_name(self.op_type, self.op_keyword)}, {self.node})'
 
 
-class IfNode:
+class IfNode(Node):
+    __slots__ = ('cases', 'else_case')
+
     def __init__(self, cases, else_case):
         """
         Represents an if statement node in the abstract syntax tree (AST).
@@ -137,12 +225,14 @@ class IfNode:
         self.cases = cases
         self.else_case = else_case
 
-        self.pos_start = self.cases[0][0].pos_start
-        self.pos_end = (self.else_case or self.cases[len(self.cases) - 1])[0].pos_end
+        self.span(self.cases[0][0], (self.else_case or self.cases[len(self.cases) - 1])[0])
+
 
+class ForNode(Node):
+    __slots__ = ('var_name', 'start_value_node', 'end_value_node', 'step_value_node', 'body_node',
+                 'should_return_null')
 
-class ForNode:
-    def __init__(self, var_name_tok, start_value_node, end_value_node, step_value_node, body_node,
+    def __init__(self, var_name_tok: Token, start_value_node, end_value_node, step_value_node, body_node,
                  should_return_null: bool):
         """
         Represents a for loop node in the abstract syntax tree (AST).
@@ -155,18 +245,19 @@ class ForNode:
             body_node: The body node of the loop.
             should_return_null (bool): Whether the loop should return null.
         """
-        self.var_name_tok = var_name_tok
+        self.var_name: str = var_name_tok.value
         self.start_value_node = start_value_node
         self.end_value_node = end_value_node
         self.step_value_node = step_value_node
         self.body_node = body_node
         self.should_return_null = should_return_null
 
-        self.pos_start = self.var_name_tok.pos_start
-        self.pos_end = self.body_node.pos_end
+        self.span(var_name_tok, body_node)
 
 
-class WhileNode:
+class WhileNode(Node):
+    __slots__ = ('condition_node', 'body_node', 'should_return_null')
+
     def __init__(self, condition_node, body_node, should_return_null: bool):
         """
         Represents a while loop node in the abstract syntax tree (AST).
@@ -180,36 +271,38 @@ class WhileNode:
         self.body_node = body_node
         self.should_return_null = should_return_null
 
-        self.pos_start = self.condition_node.pos_start
-        self.pos_end = self.body_node.pos_end
+        self.span(condition_node, body_node)
+
 
+class FuncDefNode(Node):
+    __slots__ = ('var_name', 'arg_names', 'body_node', 'should_auto_return')
 
-class FuncDefNode:
-    def __init__(self, var_name_tok: Token, arg_name_toks: list, body_node, should_auto_return: bool):
+    def __init__(self, var_name_tok: Optional[Token], arg_name_toks: List[Token], body_node,
+                 should_auto_return: bool):
         """
         Represents a function definition node in the abstract syntax tree (AST).
 
         Args:
-            var_name_tok (Token): The token representing the function name.
+            var_name_tok (Token): The token representing the function name, or None.
             arg_name_toks (list): List of tokens representing argument names.
             body_node: The body node of the function.
             should_auto_return (bool): Whether the function should auto return.
         """
-        self.var_name_tok: Token = var_name_tok
-        self.arg_name_toks: list = arg_name_toks
+        self.var_name: Optional[str] = var_name_tok.value if var_name_tok else None
+        self.arg_names: List[str] = [arg_name_tok.value for arg_name_tok in arg_name_toks]
         self.body_node = body_node
         self.should_auto_return: bool = should_auto_return
-        if self.var_name_tok:
-            self.pos_start = self.var_name_tok.pos_start
-        elif len(self.arg_name_toks) > 0:
-            self.pos_start = self.arg_name_toks[0].pos_start
+        if var_name_tok:
+            self.span(var_name_tok, body_node)
+        elif len(arg_name_toks) > 0:
+            self.span(arg_name_toks[0], body_node)
         else:
-            self.pos_start = self.body_node.pos_start
+            self.span(body_node, body_node)
 
-        self.pos_end = self.body_node.pos_end
 
+class CallNode(Node):
+    __slots__ = ('node_to_call', 'arg_nodes')
 
-class CallNode:
     def __init__(self, node_to_call, arg_nodes: list):
         """
         Represents a function call node in the abstract syntax tree (AST).
@@ -221,50 +314,227 @@ class CallNode:
         self.node_to_call = node_to_call
         self.arg_nodes = arg_nodes
 
-        self.pos_start = self.node_to_call.pos_start
         if len(self.arg_nodes) > 0:
-            self.pos_end = self.arg_nodes[len(self.arg_nodes) - 1].pos_end
+            self.span(node_to_call, self.arg_nodes[len(self.arg_nodes) - 1])
         else:
-            self.pos_end = self.node_to_call.pos_end
+            self.span(node_to_call, node_to_call)
 
 
-class ReturnNode:
-    def __init__(self, node_to_return, pos_start: Position, pos_end: Position):
+class ReturnNode(Node):
+    __slots__ = ('node_to_return',)
+
+    def __init__(self, node_to_return, source: SourceFile, idx_start: int, idx_end: int):
         """
         Represents a return statement node in the abstract syntax tree (AST).
 
         Args:
             node_to_return: The node to return.
-            pos_start (Position): The start position of the return statement.
-            pos_end (Position): The end position of the return statement.
+            source (SourceFile): The file the return statement was parsed from.
+            idx_start (int): The offset at which the return statement starts.
+            idx_end (int): The offset just past the end of the return statement.
         """
         self.node_to_return = node_to_return
 
-        self.pos_start = pos_start
-        self.pos_end = pos_end
+        self.source = source
+        self.idx_start = idx_start
+        self.idx_end = idx_end
+
 
+class ContinueNode(Node):
+    __slots__ = ()
 
-class ContinueNode:
-    def __init__(self, pos_start: Position, pos_end: Position):
+    def __init__(self, source: SourceFile, idx_start: int, idx_end: int):
         """
         Represents a continue statement node in the abstract syntax tree (AST).
 
         Args:
-            pos_start (Position): The start position of the continue statement.
-            pos_end (Position): The end position of the continue statement.
+            source (SourceFile): The file the continue statement was parsed from.
+            idx_start (int): The offset at which the continue statement starts.
+            idx_end (int): The offset just past the end of the continue statement.
         """
-        self.pos_start = pos_start
-        self.pos_end = pos_end
+        self.source = source
+        self.idx_start = idx_start
+        self.idx_end = idx_end
 
 
-class BreakNode:
-    def __init__(self, pos_start: Position, pos_end: Position):
+class BreakNode(Node):
+    __slots__ = ()
+
+    def __init__(self, source: SourceFile, idx_start: int, idx_end: int):
         """
         Represents a break statement node in the abstract syntax tree (AST).
 
         Args:
-            pos_start (Position): The start position of the break statement.
-            pos_end (Position): The end position of the break statement.
+            source (SourceFile): The file the break statement was parsed from.
+            idx_start (int): The offset at which the break statement starts.
+            idx_end (int): The offset just past the end of the break statement.
+        """
+        self.source = source
+        self.idx_start = idx_start
+        self.idx_end = idx_end
+
+
+class HoistNode(Node):
+    __slots__ = ('loop_node', 'original_node', 'invariants', 'builtins', 'operands')
+
+    def __init__(self, loop_node, original_node, invariants: list, builtins: list, operands: list):
+        """
+        Represents a loop whose invariant expressions are computed once, before it starts.
+
+        The optimizer creates these for loops it can speed up. loop_node reads
+        the values of the invariants from variables no program can name, and
+        is only run when the assumptions it was optimized under hold when the
+        loop starts: builtins are still bound to the built-in functions they
+        were assumed to be, no variable in operands holds a list, and every
+        invariant could be computed. Otherwise original_node is run instead.
+
+        Args:
+            loop_node (Union[ForNode, WhileNode]): The optimized loop.
+            original_node (Union[ForNode, WhileNode]): The loop as it was written.
+            invariants (List[Tuple[str, Node]]): The name the value of each invariant is stored as, and the invariant.
+            builtins (List[Tuple[str, str]]): Each variable assumed to be a built-in function, and the name of the function.
+            operands (List[str]): The variables assumed not to hold lists.
+        """
+        self.loop_node = loop_node
+        self.original_node = original_node
+        self.invariants = invariants
+        self.builtins = builtins
+        self.operands = operands
+        self.span(original_node, original_node)
+
+    def __repr__(self):
+        return f"HOIST:{', '.join(var_name for var_name, _ in self.invariants)}"
+
+
+class SaveNode(Node):
+    __slots__ = ('var_name', 'node')
+
+    def __init__(self, var_name: str, node):
+        """
+        Represents an expression whose value is stored to be reused, without a type check.
+
+        Args:
+            var_name (str): The name to store the value as.
+            node: The expression.
         """
-        self.pos_start = pos_start
-        self.pos_end = pos_end
+        self.var_name: str = var_name
+        self.node = node
+        self.span(node, node)
+
+
+class InlineNode(Node):
+    __slots__ = ('call_node', 'save_name', 'param_names', 'body_node', 'builtins', 'operands')
+
+    def __init__(self, call_node, save_name: str, param_names: list, body_node, builtins: list, operands: list):
+        """
+        Represents a call of a small function whose body is evaluated in place of the call.
+
+        The optimizer creates these for calls of functions whose body is an
+        expression without effects. The function and the arguments are
+        evaluated like in call_node, then the arguments are stored as
+        param_names, which body_node reads instead of the parameters. The body
+        is only evaluated when the function called is the one the FN stored as
+        save_name, builtins are still bound to the built-in functions they were
+        assumed to be and no variable in operands holds a list. If it fails,
+        or the assumptions do not hold, the function is called instead.
+
+        Args:
+            call_node (CallNode): The call.
+            save_name (str): The name the function was stored as when it was defined.
+            param_names (List[str]): The name each argument is stored as.
+            body_node: The body of the function, reading param_names.
+            builtins (List[Tuple[str, str]]): Each variable assumed to be a built-in function, and the name of the function.
+            operands (List[str]): The variables assumed not to hold lists.
+        """
+        self.call_node = call_node
+        self.save_name: str = save_name
+        self.param_names = param_names
+        self.body_node = body_node
+        self.builtins = builtins
+        self.operands = operands
+        self.span(call_node, call_node)
+
+    def __repr__(self):
+        return f"INLINE:{self.call_node.node_to_call.var_name}"
+
+
+class MemoNode(Node):
+    __slots__ = ('node', 'builtins', 'functions')
+
+    def __init__(self, node: FuncDefNode, builtins: list, functions: list):
+        """
+        Represents the definition of a function that remembers the results of its calls.
+
+        The optimizer creates these for functions that only compute a value
+        from their arguments. The function defined by node is given a Memo,
+        which only looks results up while builtins are still bound to the
+        built-in functions they were assumed to be and each variable in
+        functions holds the function the FN stored under the paired name.
+
+        Args:
+            node (FuncDefNode): The definition.
+            builtins (List[Tuple[str, str]]): Each variable assumed to be a built-in function, and the name of the function.
+            functions (List[Tuple[str, str]]): Each variable assumed to hold a function, and the name it
+                was stored as when it was defined.
+        """
+        self.node = node
+        self.builtins = builtins
+        self.functions = functions
+        self.span(node, node)
+
+    def __repr__(self):
+        return f"MEMO:{self.node.var_name}"
+
+
+def copy_tree(node: Node) -> Node:
+    """
+    Copies a tree of nodes like copy.deepcopy, but without recursing, so trees of any depth can be copied.
+
+    Nodes reached more than once are copied once. The SourceFile, and the
+    values that are neither nodes nor lists and tuples of them, are shared.
+
+    Args:
+        node (Node): The root of the tree.
+
+    Returns:
+        Node: The root of the copy.
+    """
+    def nodes_in(value, found: list):
+        if isinstance(value, Node):
+            found.append(value)
+        elif type(value) is list or type(value) is tuple:
+            for item in value:
+                nodes_in(item, found)
+
+    def copied(value):
+        if isinstance(value, Node):
+            return copies[id(value)]
+        if type(value) is list:
+            return [copied(item) for item in value]
+        if type(value) is tuple:
+            return tuple(copied(item) for item in value)
+        return value
+
+    # The slots of each type of node, those of Node included.
+    slots = {}
+    copies = {}
+    originals = []
+    stack = [node]
+    while stack:
+        original = stack.pop()
+        if id(original) in copies:
+            continue
+        node_type = type(original)
+        if node_type not in slots:
+            slots[node_type] = [slot for cls in node_type.__mro__ for slot in getattr(cls, '__slots__', ())]
+        copies[id(original)] = object.__new__(node_type)
+        originals.append(original)
+        for slot in slots[node_type]:
+            nodes_in(getattr(original, slot, None), stack)
+
+    for original in originals:
+        copy = copies[id(original)]
+        for slot in slots[type(original)]:
+            if hasattr(original, slot):
+                setattr(copy, slot, copied(getattr(original, slot)))
+    return copies[id(node)]
@@ -10,13 +10,11 @@ class ParseResult:
             The count of advances registered during
             the last parsing step.
             advance_count (int): The total count of advances registered during parsing.
-            to_reverse_count (int): The count of advances to reverse in case of failure.
         """
         self.error = None
         self.node = None
         self.last_registered_advance_count = 0
         self.advance_count = 0
-        self.to_reverse_count = 0
 
     def register_advancement(self):
         """Registers an advancement in parsing."""
@@ -39,21 +37,6 @@ class ParseResult:
             self.error = res.error
         return res.node
 
-    def try_register(self, res):
-        """
-        Tries to register the result of a parsing operation, handling errors.
-
-        Args:
-            res (ParseResult): The result of the parsing operation to try to register.
-
-        Returns:
-            The resulting node of the parsing operation if successful, otherwise None.
-        """
-        if res.error:
-            self.to_reverse_count = res.advance_count
-            return None
-        return self.register(res)
-
     def success(self, node) -> 'ParseResult':
         """
         Marks the parsing operation as successful.
@@ -80,3 +63,19 @@ class ParseResult:
         if not self.error or self.last_registered_advance_count == 0:
             self.error = error
         return self
+
+
+class ParseError(Exception):
+    def __init__(self, error):
+        """
+        Raised by the rules of the parser to abandon a parse.
+
+        The rules return nodes and only build an error when parsing fails,
+        so no result object is allocated for the common, successful case.
+        Parser.parse catches it and returns a failed ParseResult.
+
+        Args:
+            error (InvalidSyntaxError): The error to report.
+        """
+        super().__init__(error)
+        self.error = error
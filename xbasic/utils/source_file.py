@@ -0,0 +1,255 @@
+from bisect import bisect_right
+from typing import Dict, List, Set, TextIO, Tuple
+
+from .position import Position
+
+# The most positions each cache of a file keeps. A position is found again
+# with one bisect of the line starts, so a full cache is simply emptied.
+MAX_CACHED_POSITIONS = 4096
+
+
+class SourceFile:
+    def __init__(self, fn: str, text: str):
+        """
+        Represents a file being interpreted, indexed by line.
+
+        Tokens and nodes only keep integer offsets into the text. Line and column
+        numbers are derived from the precomputed line-start offsets when a
+        Position is actually needed, e.g. for an error message.
+
+        Args:
+            fn (str): The name of the file.
+            text (str): The full text of the file.
+        """
+        self.fn = fn
+        self.text = text
+        self.line_starts: List[int] = [0]
+        self.comment_newlines: Set[int] = set()
+        self.positions: Dict[int, Position] = {}
+        self.end_positions: Dict[int, Position] = {}
+
+        find = text.find
+        idx = find('\n')
+        while idx != -1:
+            self.line_starts.append(idx + 1)
+            idx = find('\n', idx + 1)
+
+    def __getstate__(self) -> dict:
+        """Leaves the cached positions out when the file is pickled."""
+        state = self.__dict__.copy()
+        state['positions'] = {}
+        state['end_positions'] = {}
+        return state
+
+    def line_col(self, idx: int) -> Tuple[int, int]:
+        """
+        Finds the line and column of an offset.
+
+        Args:
+            idx (int): The offset into the text.
+
+        Returns:
+            Tuple[int, int]: The zero-based line and column numbers.
+        """
+        ln = bisect_right(self.line_starts, idx) - 1
+        return ln, idx - self.line_starts[ln]
+
+    def position(self, idx: int) -> Position:
+        """
+        Returns the position of the character at an offset.
+
+        Positions are shared between everything that asks for the same offset,
+        so they must not be advanced in place. Up to MAX_CACHED_POSITIONS of
+        them are kept.
+
+        Args:
+            idx (int): The offset into the text.
+
+        Returns:
+            Position: The position at the offset.
+        """
+        pos = self.positions.get(idx)
+        if pos is None:
+            ln, col = self.line_col(idx)
+            pos = self.remember(self.positions, idx, Position(idx, ln, col, self.fn, self.text))
+        return pos
+
+    def end_position(self, idx: int) -> Position:
+        """
+        Returns the position just past the character at idx - 1.
+
+        This is where a token ending at idx leaves off. It differs from
+        position(idx) after a newline: a newline token ends on its own line,
+        whereas the newline closing a comment moves on to the next one.
+
+        Args:
+            idx (int): The offset just past the end of a token or node.
+
+        Returns:
+            Position: The position at the offset.
+        """
+        pos = self.end_positions.get(idx)
+        if pos is None:
+            if 0 < idx <= len(self.text) and self.text[idx - 1] == '\n' \
+                    and idx - 1 not in self.comment_newlines:
+                ln, col = self.line_col(idx - 1)
+                pos = Position(idx, ln, col + 1, self.fn, self.text)
+            else:
+                pos = self.position(idx)
+            self.remember(self.end_positions, idx, pos)
+        return pos
+
+    @staticmethod
+    def remember(cache: Dict[int, Position], idx: int, pos: Position) -> Position:
+        """
+        Stores a position in a cache, emptying it first if it is full.
+
+        Args:
+            cache (Dict[int, Position]): The positions or end_positions of the file.
+            idx (int): The offset of the position.
+            pos (Position): The position.
+
+        Returns:
+            Position: The position.
+        """
+        if len(cache) >= MAX_CACHED_POSITIONS:
+            cache.clear()
+        cache[idx] = pos
+        return pos
+
+    def replace(self, idx_start: int, idx_end: int, text: str) -> 'SourceFile':
+        """
+        Builds the SourceFile for this file with a range of its text replaced.
+
+        Line starts and comment newlines outside the range are carried over
+        and shifted, so only the inserted text has to be searched for lines.
+        Comment newlines inside the inserted text are not known until it is
+        lexed.
+
+        Args:
+            idx_start (int): The offset of the first replaced character.
+            idx_end (int): The offset just past the last replaced character.
+            text (str): The text to insert in place of the range.
+
+        Returns:
+            SourceFile: The edited file.
+        """
+        delta = len(text) - (idx_end - idx_start)
+        source = SourceFile.__new__(SourceFile)
+        source.fn = self.fn
+        source.text = self.text[:idx_start] + text + self.text[idx_end:]
+        source.positions = {}
+        source.end_positions = {}
+        source.comment_newlines = {
+            idx if idx < idx_start else idx + delta
+            for idx in self.comment_newlines
+            if idx < idx_start or idx >= idx_end
+        }
+
+        line_starts = self.line_starts[:bisect_right(self.line_starts, idx_start)]
+        find = text.find
+        idx = find('\n')
+        while idx != -1:
+            line_starts.append(idx_start + idx + 1)
+            idx = find('\n', idx + 1)
+        line_starts.extend(
+            idx + delta for idx in self.line_starts[bisect_right(self.line_starts, idx_end):]
+        )
+        source.line_starts = line_starts
+        return source
+
+
+class StreamPosition(Position):
+    def __init__(self, idx: int, ln: int, col: int, source: 'StreamSource'):
+        """
+        A Position in a file that is still being read.
+
+        The text of the file is only joined when an error message asks for it.
+
+        Args:
+            idx (int): The index of the position.
+            ln (int): The line number of the position.
+            col (int): The column number of the position.
+            source (StreamSource): The file the position is in.
+        """
+        self.idx = idx
+        self.ln = ln
+        self.col = col
+        self.fn = source.fn
+        self.source = source
+
+    @property
+    def ftxt(self) -> str:
+        """str: The text of the file read so far."""
+        return self.source.text
+
+    def copy(self) -> 'StreamPosition':
+        return StreamPosition(self.idx, self.ln, self.col, self.source)
+
+
+class StreamSource(SourceFile):
+    def __init__(self, fn: str, file: TextIO):
+        """
+        Represents a file that is read a line at a time while it is interpreted.
+
+        The lines read so far are kept, since functions defined early in the
+        file may still need their positions for an error message, but they are
+        only joined into one text when a message is actually built.
+
+        Args:
+            fn (str): The name of the file.
+            file (TextIO): The file object to read lines from.
+        """
+        self.fn = fn
+        self.file = file
+        self.lines: List[str] = []
+        self.length = 0
+        self.line_starts: List[int] = [0]
+        self.comment_newlines: Set[int] = set()
+        self.positions: Dict[int, Position] = {}
+        self.end_positions: Dict[int, Position] = {}
+        self.joined = ''
+
+    @property
+    def text(self) -> str:
+        """str: The text of the file read so far."""
+        if len(self.joined) != self.length:
+            self.joined = ''.join(self.lines)
+        return self.joined
+
+    def read_line(self) -> str:
+        """
+        Reads the next line of the file.
+
+        Returns:
+            str: The line, with its newline, or '' at the end of the file.
+        """
+        line = self.file.readline()
+        if line:
+            self.lines.append(line)
+            self.length += len(line)
+            if line[-1] == '\n':
+                self.line_starts.append(self.length)
+        return line
+
+    def position(self, idx: int) -> Position:
+        pos = self.positions.get(idx)
+        if pos is None:
+            ln, col = self.line_col(idx)
+            pos = self.remember(self.positions, idx, StreamPosition(idx, ln, col, self))
+        return pos
+
+    def end_position(self, idx: int) -> Position:
+        pos = self.end_positions.get(idx)
+        if pos is None:
+            if 0 < idx <= self.length:
+                ln, col = self.line_col(idx - 1)
+                after_newline = self.lines[ln][col] == '\n' and idx - 1 not in self.comment_newlines
+            else:
+                after_newline = False
+            if after_newline:
+                pos = StreamPosition(idx, ln, col + 1, self)
+            else:
+                pos = self.position(idx)
+            self.remember(self.end_positions, idx, pos)
+        return pos
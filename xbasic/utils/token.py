@@ -1,31 +1,46 @@
+from .token_list import TT_KEYWORD, KEYWORD_IDS
+
+
 class Token:
-    def __init__(self, type_: str, value=None, pos_start=None, pos_end=None):
+    __slots__ = ('type', 'keyword', 'value', 'source', 'idx_start', 'idx_end')
+
+    def __init__(self, type_: int, value=None, source=None, idx_start: int = 0, idx_end: int = None):
         """
         Represents a token in the source code.
 
+        Keyword tokens also carry their Keyword number, so the parser can test
+        for a keyword with a single integer comparison.
+
         Args:
-            type_ (str): The type of the token.
+            type_ (TokenType): The type of the token.
             value (str, optional): The value of the token. Defaults to None.
-            pos_start (Position, optional): The starting position of the token. Defaults to None.
-            pos_end (Position, optional): The ending position of the token. Defaults to None.
+            source (SourceFile, optional): The file the token was read from. Defaults to None.
+            idx_start (int, optional): The offset of the first character of the token. Defaults to 0.
+            idx_end (int, optional): The offset just past the token. Defaults to idx_start + 1.
         """
         self.type = type_
+        self.keyword = KEYWORD_IDS.get(value, 0) if type_ == TT_KEYWORD else 0
         self.value = value
+        self.source = source
+        self.idx_start = idx_start
+        self.idx_end = idx_start + 1 if idx_end is None else idx_end
 
-        if pos_start:
-            self.pos_start = pos_start.copy()
-            self.pos_end = pos_start.copy()
-            self.pos_end.advance()
+    @property
+    def pos_start(self):
+        """Position: The starting position of the token."""
+        return self.source.position(self.idx_start)
 
-        if pos_end:
-            self.pos_end = pos_end.copy()
+    @property
+    def pos_end(self):
+        """Position: The ending position of the token."""
+        return self.source.end_position(self.idx_end)
 
-    def matches(self, type_: str, value) -> bool:
+    def matches(self, type_: int, value) -> bool:
         """
         Checks if the token matches the given type and value.
 
         Args:
-            type_ (str): The type to match.
+            type_ (TokenType): The type to match.
             value: The value to match.
 
         Returns:
@@ -41,5 +56,5 @@ class Token:
             str: The string representation of the token.
         """
         if self.value:
-            return f'{self.type}:{self.value}'
-        return f'{self.type}'
+            return f'{self.type.name}:{self.value}'
+        return self.type.name
@@ -0,0 +1,87 @@
+from array import array
+from typing import Iterator, List
+
+from .source_file import SourceFile
+from .token import Token
+from .token_list import TokenType, Keyword
+
+TOKEN_TYPES = (None,) + tuple(TokenType)
+KEYWORD_TYPES = (0,) + tuple(Keyword)
+
+
+class TokenBuffer:
+    __slots__ = ('source', 'kinds', 'keywords', 'values', 'starts', 'ends')
+
+    def __init__(self, source: SourceFile):
+        """
+        Stores the tokens of a whole file in parallel arrays.
+
+        A list of Token objects costs well over a hundred bytes per token. The
+        buffer keeps one byte for the kind, one for the keyword number, two
+        offsets and a reference to the value, which is None for most tokens
+        and an interned string for identifiers and keywords.
+
+        Indexing the buffer returns a Token view of the stored token, so it can
+        be handed to anything that expects a list of tokens.
+
+        Args:
+            source (SourceFile): The file the tokens were read from.
+        """
+        self.source = source
+        self.kinds = array('B')
+        self.keywords = array('B')
+        self.values: list = []
+        self.starts = array('L')
+        self.ends = array('L')
+
+    def append(self, kind: int, keyword: int, value, idx_start: int, idx_end: int):
+        """
+        Adds a token to the end of the buffer.
+
+        Args:
+            kind (TokenType): The type of the token.
+            keyword (Keyword): The keyword number of the token, or 0.
+            value: The value of the token.
+            idx_start (int): The offset of the first character of the token.
+            idx_end (int): The offset just past the token.
+        """
+        self.kinds.append(kind)
+        self.keywords.append(keyword)
+        self.values.append(value)
+        self.starts.append(idx_start)
+        self.ends.append(idx_end)
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __getitem__(self, i: int) -> Token:
+        """
+        Builds a Token view of the token at an index.
+
+        Args:
+            i (int): The index of the token.
+
+        Returns:
+            Token: The token at the index.
+        """
+        tok = Token.__new__(Token)
+        tok.type = TOKEN_TYPES[self.kinds[i]]
+        tok.keyword = KEYWORD_TYPES[self.keywords[i]]
+        tok.value = self.values[i]
+        tok.source = self.source
+        tok.idx_start = self.starts[i]
+        tok.idx_end = self.ends[i]
+        return tok
+
+    def __iter__(self) -> Iterator[Token]:
+        for i in range(len(self.kinds)):
+            yield self[i]
+
+    def tokens(self) -> List[Token]:
+        """
+        Builds Token views of every token in the buffer.
+
+        Returns:
+            List[Token]: The tokens in the buffer.
+        """
+        return list(self)
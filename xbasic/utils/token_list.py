@@ -1,30 +1,67 @@
 import string
+from enum import IntEnum
+
+
+class TokenType(IntEnum):
+    """
+    The kinds of token produced by the lexers.
+
+    Kinds are small integers so that the parser compares them cheaply and a
+    TokenBuffer can store them in a byte array.
+    """
+    INT = 1
+    FLOAT = 2
+    STRING = 3
+    IDENTIFIER = 4
+    KEYWORD = 5
+    PLUS = 6
+    MINUS = 7
+    MUL = 8
+    DIV = 9
+    POW = 10
+    EQ = 11
+    LPAREN = 12
+    RPAREN = 13
+    LSQUARE = 14
+    RSQUARE = 15
+    EE = 16
+    NE = 17
+    LT = 18
+    GT = 19
+    LTE = 20
+    GTE = 21
+    COMMA = 22
+    ARROW = 23
+    NEWLINE = 24
+    EOF = 25
+
+
+TT_INT = TokenType.INT
+TT_FLOAT = TokenType.FLOAT
+TT_STRING = TokenType.STRING
+TT_IDENTIFIER = TokenType.IDENTIFIER
+TT_KEYWORD = TokenType.KEYWORD
+TT_PLUS = TokenType.PLUS
+TT_MINUS = TokenType.MINUS
+TT_MUL = TokenType.MUL
+TT_DIV = TokenType.DIV
+TT_POW = TokenType.POW
+TT_EQ = TokenType.EQ
+TT_LPAREN = TokenType.LPAREN
+TT_RPAREN = TokenType.RPAREN
+TT_LSQUARE = TokenType.LSQUARE
+TT_RSQUARE = TokenType.RSQUARE
+TT_EE = TokenType.EE
+TT_NE = TokenType.NE
+TT_LT = TokenType.LT
+TT_GT = TokenType.GT
+TT_LTE = TokenType.LTE
+TT_GTE = TokenType.GTE
+TT_COMMA = TokenType.COMMA
+TT_ARROW = TokenType.ARROW
+TT_NEWLINE = TokenType.NEWLINE
+TT_EOF = TokenType.EOF
 
-TT_INT = 'INT'
-TT_FLOAT = 'FLOAT'
-TT_STRING = 'STRING'
-TT_IDENTIFIER = 'IDENTIFIER'
-TT_KEYWORD = 'KEYWORD'
-TT_PLUS = 'PLUS'
-TT_MINUS = 'MINUS'
-TT_MUL = 'MUL'
-TT_DIV = 'DIV'
-TT_POW = 'POW'
-TT_EQ = 'EQ'
-TT_LPAREN = 'LPAREN'
-TT_RPAREN = 'RPAREN'
-TT_LSQUARE = 'LSQUARE'
-TT_RSQUARE = 'RSQUARE'
-TT_EE = 'EE'
-TT_NE = 'NE'
-TT_LT = 'LT'
-TT_GT = 'GT'
-TT_LTE = 'LTE'
-TT_GTE = 'GTE'
-TT_COMMA = 'COMMA'
-TT_ARROW = 'ARROW'
-TT_NEWLINE = 'NEWLINE'
-TT_EOF = 'EOF'
 
 KEYWORDS = [
     'num',
@@ -49,6 +86,56 @@ KEYWORDS = [
 ]
 
 
+class Keyword(IntEnum):
+    """
+    The keywords of the language, numbered in the order of KEYWORDS.
+
+    Tokens that are not keywords have keyword 0.
+    """
+    NUM = 1
+    TEXT = 2
+    LIST = 3
+    AND = 4
+    OR = 5
+    NOT = 6
+    IF = 7
+    ELIF = 8
+    ELSE = 9
+    FOR = 10
+    TO = 11
+    STEP = 12
+    WHILE = 13
+    FN = 14
+    THEN = 15
+    END = 16
+    RETURN = 17
+    CONTINUE = 18
+    BREAK = 19
+
+
+KW_NUM = Keyword.NUM
+KW_TEXT = Keyword.TEXT
+KW_LIST = Keyword.LIST
+KW_AND = Keyword.AND
+KW_OR = Keyword.OR
+KW_NOT = Keyword.NOT
+KW_IF = Keyword.IF
+KW_ELIF = Keyword.ELIF
+KW_ELSE = Keyword.ELSE
+KW_FOR = Keyword.FOR
+KW_TO = Keyword.TO
+KW_STEP = Keyword.STEP
+KW_WHILE = Keyword.WHILE
+KW_FN = Keyword.FN
+KW_THEN = Keyword.THEN
+KW_END = Keyword.END
+KW_RETURN = Keyword.RETURN
+KW_CONTINUE = Keyword.CONTINUE
+KW_BREAK = Keyword.BREAK
+
+KEYWORD_IDS = {keyword: Keyword(i) for i, keyword in enumerate(KEYWORDS, 1)}
+
+
 DIGITS = '0123456789'
 LETTERS = string.ascii_letters
 LETTERS_DIGITS = LETTERS + DIGITS
@@ -0,0 +1,5 @@
+from .cache import BytecodeCache
+from .code import CodeObject
+from .compiler import Compiler
+from .disassembler import disassemble
+from .machine import VM, VMFunction
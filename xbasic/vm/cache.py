@@ -0,0 +1,14 @@
+from ..utils.ast_cache import AstCache
+
+
+class BytecodeCache(AstCache):
+    """
+    A directory of compiled programs, kept next to the cached trees.
+
+    Entries hold the CodeObject of a program, so running an unchanged script
+    skips lexing, parsing and compiling.
+    """
+    suffix = '.bxc'
+
+    # Bump whenever the instructions or the layout of CodeObject change.
+    magic = 6
@@ -0,0 +1,122 @@
+from typing import List, Optional, Tuple
+
+from ..optimizer.loop_optimizer import number_key
+from ..utils.position import Position
+from ..utils.source_file import SourceFile
+
+
+class CodeObject:
+    def __init__(self, name: str, source: SourceFile, arg_names: List[str] = (), should_auto_return: bool = False):
+        """
+        The bytecode of a program or a function body.
+
+        Alongside the instructions, the line table keeps the span of the node
+        each instruction was compiled from, as offsets into the source. The
+        positions of the values an instruction creates and of the errors it
+        reports are looked up there, so tracebacks point at the source just
+        like the Interpreter's. Code objects pickle without their resolved
+        positions and can be cached.
+
+        Args:
+            name (str): The name of the function, or '<program>'.
+            source (SourceFile): The file the code was compiled from.
+            arg_names (List[str], optional): The argument names of the function.
+            should_auto_return (bool, optional): Whether the function returns the value of its body.
+        """
+        self.name = name
+        self.source = source
+        self.arg_names = list(arg_names)
+        self.should_auto_return = should_auto_return
+        self.code: List[int] = []
+        self.consts: list = []
+        self.names: List[str] = []
+        self.spans: List[Tuple[int, int]] = []
+        self.resolved: Optional[List[Tuple[Position, Position]]] = None
+        self.const_indexes: dict = {}
+
+    def __getstate__(self) -> dict:
+        """Leaves the resolved positions and compile-time lookups out when the code is pickled."""
+        state = self.__dict__.copy()
+        state['resolved'] = None
+        state['const_indexes'] = {}
+        return state
+
+    def emit(self, op: int, arg: int, idx_start: int, idx_end: int) -> int:
+        """
+        Appends an instruction.
+
+        Args:
+            op (int): The opcode.
+            arg (int): The argument.
+            idx_start (int): The offset at which the node of the instruction starts.
+            idx_end (int): The offset just past the end of the node.
+
+        Returns:
+            int: The pc of the instruction.
+        """
+        pc = len(self.code)
+        self.code += (op, arg)
+        self.spans.append((idx_start, idx_end))
+        return pc
+
+    def const(self, value) -> int:
+        """
+        Returns the index of a constant, adding it if it is new.
+
+        Args:
+            value: The constant.
+
+        Returns:
+            int: The index of the constant in consts.
+        """
+        key = number_key(value)
+        if key not in self.const_indexes:
+            self.const_indexes[key] = len(self.consts)
+            self.consts.append(value)
+        return self.const_indexes[key]
+
+    def name_index(self, name: str) -> int:
+        """
+        Returns the index of a variable name, adding it if it is new.
+
+        Args:
+            name (str): The variable name.
+
+        Returns:
+            int: The index of the name in names.
+        """
+        if name not in self.names:
+            self.names.append(name)
+        return self.names.index(name)
+
+    def positions(self) -> List[Tuple[Position, Position]]:
+        """
+        Returns the start and end position of each instruction, indexed by pc.
+
+        Returns:
+            List[Tuple[Position, Position]]: The positions, with each pair
+                stored at the pc of the instruction and the one after it.
+        """
+        if self.resolved is None:
+            position, end_position = self.source.position, self.source.end_position
+            resolved = []
+            for idx_start, idx_end in self.spans:
+                pos = (position(idx_start), end_position(idx_end))
+                resolved += (pos, pos)
+            self.resolved = resolved
+        return self.resolved
+
+    def line(self, pc: int) -> int:
+        """
+        Returns the line an instruction was compiled from.
+
+        Args:
+            pc (int): The pc of the instruction.
+
+        Returns:
+            int: The one-based line number.
+        """
+        return self.source.line_col(self.spans[pc // 2][0])[0] + 1
+
+    def __repr__(self) -> str:
+        return f'<code {self.name}>'
@@ -0,0 +1,264 @@
+import gc
+
+from ..optimizer.loop_optimizer import breaks_loop
+from ..utils.nodes import CallNode
+from ..utils.token_list import *
+from .code import CodeObject
+from .opcodes import *
+
+# The BINARY_OP argument of each operator token type and keyword.
+OPERATOR_ARGS = {
+    TT_PLUS: BINARY_METHODS.index('added_to'),
+    TT_MINUS: BINARY_METHODS.index('subbed_by'),
+    TT_MUL: BINARY_METHODS.index('multed_by'),
+    TT_DIV: BINARY_METHODS.index('dived_by'),
+    TT_POW: BINARY_METHODS.index('powed_by'),
+    TT_EE: BINARY_METHODS.index('get_comparison_eq'),
+    TT_NE: BINARY_METHODS.index('get_comparison_ne'),
+    TT_LT: BINARY_METHODS.index('get_comparison_lt'),
+    TT_GT: BINARY_METHODS.index('get_comparison_gt'),
+    TT_LTE: BINARY_METHODS.index('get_comparison_lte'),
+    TT_GTE: BINARY_METHODS.index('get_comparison_gte'),
+}
+
+KEYWORD_ARGS = {
+    KW_AND: BINARY_METHODS.index('anded_by'),
+    KW_OR: BINARY_METHODS.index('ored_by'),
+}
+
+
+class Compiler:
+    """
+    Compiles the AST from Parser.parse into CodeObjects for the VM.
+
+    Every node leaves exactly one value on the stack, like every visit of the
+    Interpreter returns one. Function bodies are compiled into code objects
+    of their own, stored as constants of the code defining them. Node classes
+    without a compile method are compiled to an INTERPRET instruction.
+    """
+
+    def __init__(self):
+        self.function_depth = 0
+
+    def compile_program(self, node) -> CodeObject:
+        """
+        Compile a program.
+
+        Args:
+            node (ListNode): The program.
+
+        Returns:
+            CodeObject: The code of the program.
+        """
+        # Nothing compiled forms a cycle, but the collector would keep
+        # rescanning the tree and the code piling up on a large program.
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            code = CodeObject('<program>', node.source)
+            self.compile(node, code)
+            code.emit(HALT, 0, node.idx_start, node.idx_end)
+        finally:
+            if enabled:
+                gc.enable()
+        return code
+
+    def compile(self, node, code: CodeObject):
+        """
+        Append the instructions of a node to a code object.
+
+        Args:
+            node: The node to compile.
+            code (CodeObject): The code to append to.
+        """
+        method = getattr(self, f'compile_{type(node).__name__}', self.compile_with_interpreter)
+        method(node, code)
+
+    ###################################
+
+    @staticmethod
+    def compile_with_interpreter(node, code: CodeObject):
+        code.emit(INTERPRET, code.const(node), node.idx_start, node.idx_end)
+
+    @staticmethod
+    def compile_NumberNode(node, code: CodeObject):
+        code.emit(LOAD_NUMBER, code.const(node.value), node.idx_start, node.idx_end)
+
+    @staticmethod
+    def compile_StringNode(node, code: CodeObject):
+        code.emit(LOAD_STRING, code.const(node.value), node.idx_start, node.idx_end)
+
+    def compile_ListNode(self, node, code: CodeObject):
+        if node.should_return_null:
+            # A block whose value is never used only runs its statements.
+            for element_node in node.element_nodes:
+                self.compile(element_node, code)
+                code.emit(POP_TOP, 0, node.idx_start, node.idx_end)
+            code.emit(LOAD_NULL, 0, node.idx_start, node.idx_end)
+            return
+        for element_node in node.element_nodes:
+            self.compile(element_node, code)
+        code.emit(BUILD_LIST, len(node.element_nodes), node.idx_start, node.idx_end)
+
+    @staticmethod
+    def compile_VarAccessNode(node, code: CodeObject):
+        code.emit(LOAD_NAME, code.name_index(node.var_name), node.idx_start, node.idx_end)
+
+    def compile_VarAssignNode(self, node, code: CodeObject):
+        self.compile(node.value_node, code)
+        code.emit(STORE_NAME, code.const((node.var_name, node.dtype)), node.idx_start, node.idx_end)
+
+    def compile_BinOpNode(self, node, code: CodeObject):
+        self.compile(node.left_node, code)
+        self.compile(node.right_node, code)
+        arg = KEYWORD_ARGS.get(node.op_keyword)
+        if arg is None:
+            arg = OPERATOR_ARGS[node.op_type]
+        code.emit(BINARY_OP, arg, node.idx_start, node.idx_end)
+
+    def compile_UnaryOpNode(self, node, code: CodeObject):
+        self.compile(node.node, code)
+        if node.op_type == TT_MINUS:
+            op = UNARY_NEG
+        elif node.op_keyword == KW_NOT:
+            op = UNARY_NOT
+        else:
+            op = UNARY_POS
+        code.emit(op, 0, node.idx_start, node.idx_end)
+
+    def compile_IfNode(self, node, code: CodeObject):
+        exits = []
+
+        for condition, expr, should_return_null in node.cases:
+            self.compile(condition, code)
+            next_case = code.emit(POP_JUMP_IF_FALSE, 0, node.idx_start, node.idx_end)
+            self.compile_branch(expr, should_return_null, node, code)
+            exits.append(code.emit(JUMP, 0, node.idx_start, node.idx_end))
+            code.code[next_case + 1] = len(code.code)
+
+        if node.else_case:
+            expr, should_return_null = node.else_case
+            self.compile_branch(expr, should_return_null, node, code)
+        else:
+            code.emit(LOAD_NULL, 0, node.idx_start, node.idx_end)
+
+        for pc in exits:
+            code.code[pc + 1] = len(code.code)
+
+    def compile_branch(self, expr, should_return_null: bool, node, code: CodeObject):
+        """
+        Compile the body of a case of an IF.
+
+        Args:
+            expr: The body.
+            should_return_null (bool): Whether the IF gives null instead of the value of the body.
+            node (IfNode): The IF.
+            code (CodeObject): The code to append to.
+        """
+        self.compile(expr, code)
+        if should_return_null:
+            code.emit(POP_TOP, 0, node.idx_start, node.idx_end)
+            code.emit(LOAD_NULL, 0, node.idx_start, node.idx_end)
+
+    def compile_ForNode(self, node, code: CodeObject):
+        if breaks_loop(node.body_node):
+            # CONTINUE and BREAK are left to the Interpreter, with their loop.
+            return self.compile_with_interpreter(node, code)
+        self.compile(node.start_value_node, code)
+        self.compile(node.end_value_node, code)
+        if node.step_value_node:
+            self.compile(node.step_value_node, code)
+        else:
+            code.emit(LOAD_NUMBER, code.const(1), node.idx_start, node.idx_end)
+        code.emit(FOR_PREP, code.name_index(node.var_name), node.idx_start, node.idx_end)
+
+        loop = code.emit(FOR_ITER, 0, node.idx_start, node.idx_end)
+        self.compile(node.body_node, code)
+        self.compile_loop_append(node, code)
+        code.emit(JUMP, loop, node.idx_start, node.idx_end)
+        code.code[loop + 1] = len(code.code)
+        code.emit(LOOP_END, int(node.should_return_null), node.idx_start, node.idx_end)
+
+    def compile_WhileNode(self, node, code: CodeObject):
+        if breaks_loop(node.body_node):
+            return self.compile_with_interpreter(node, code)
+        code.emit(SETUP_LOOP, 0, node.idx_start, node.idx_end)
+
+        loop = len(code.code)
+        self.compile(node.condition_node, code)
+        done = code.emit(POP_JUMP_IF_FALSE, 0, node.idx_start, node.idx_end)
+        self.compile(node.body_node, code)
+        self.compile_loop_append(node, code)
+        code.emit(JUMP, loop, node.idx_start, node.idx_end)
+        code.code[done + 1] = len(code.code)
+        code.emit(LOOP_END, int(node.should_return_null), node.idx_start, node.idx_end)
+
+    @staticmethod
+    def compile_loop_append(node, code: CodeObject):
+        """
+        Compile the end of an iteration of a loop, which collects the value of the body.
+
+        Args:
+            node (ForNode or WhileNode): The loop. Its value is not collected if it gives null.
+            code (CodeObject): The code to append to.
+        """
+        code.emit(POP_TOP if node.should_return_null else LOOP_APPEND, 0, node.idx_start, node.idx_end)
+
+    def compile_HoistNode(self, node, code: CodeObject):
+        code.emit(PREPARE_LOOP, code.const(node), node.idx_start, node.idx_end)
+        original = code.emit(POP_JUMP_IF_FALSE, 0, node.idx_start, node.idx_end)
+        self.compile(node.loop_node, code)
+        done = code.emit(JUMP, 0, node.idx_start, node.idx_end)
+        code.code[original + 1] = len(code.code)
+        self.compile(node.original_node, code)
+        code.code[done + 1] = len(code.code)
+
+    def compile_SaveNode(self, node, code: CodeObject):
+        self.compile(node.node, code)
+        code.emit(SAVE_NAME, code.name_index(node.var_name), node.idx_start, node.idx_end)
+
+    def compile_FuncDefNode(self, node, code: CodeObject):
+        body = CodeObject(node.var_name or '<anonymous>', node.source, node.arg_names, node.should_auto_return)
+        self.function_depth += 1
+        try:
+            self.compile(node.body_node, body)
+        finally:
+            self.function_depth -= 1
+        body.emit(RETURN_AUTO, 0, node.body_node.idx_start, node.body_node.idx_end)
+        code.emit(MAKE_FUNCTION, code.const((node.var_name, body)), node.idx_start, node.idx_end)
+
+    def compile_MemoNode(self, node, code: CodeObject):
+        self.compile(node.node, code)
+        code.emit(MEMOIZE, code.const(node), node.idx_start, node.idx_end)
+
+    def compile_CallNode(self, node, code: CodeObject):
+        self.compile(node.node_to_call, code)
+        for arg_node in node.arg_nodes:
+            self.compile(arg_node, code)
+        code.emit(CALL, len(node.arg_nodes), node.idx_start, node.idx_end)
+
+    def compile_InlineNode(self, node, code: CodeObject):
+        call_node = node.call_node
+        body = CodeObject(f'<inlined {call_node.node_to_call.var_name}>', node.source)
+        self.compile(node.body_node, body)
+        body.emit(HALT, 0, node.body_node.idx_start, node.body_node.idx_end)
+
+        code.emit(INLINE_GUARD, code.const(node), node.idx_start, node.idx_end)
+        self.compile(call_node.node_to_call, code)
+        for arg_node in call_node.arg_nodes:
+            self.compile(arg_node, code)
+        code.emit(CALL_INLINE, code.const((node, body)), node.idx_start, node.idx_end)
+        code.emit(CALL, len(call_node.arg_nodes), node.idx_start, node.idx_end)
+
+    def compile_ReturnNode(self, node, code: CodeObject):
+        if self.function_depth and type(node.node_to_return) is CallNode:
+            call_node = node.node_to_return
+            self.compile(call_node.node_to_call, code)
+            for arg_node in call_node.arg_nodes:
+                self.compile(arg_node, code)
+            code.emit(TAIL_CALL, len(call_node.arg_nodes), call_node.idx_start, call_node.idx_end)
+        elif node.node_to_return:
+            self.compile(node.node_to_return, code)
+        else:
+            code.emit(LOAD_NULL, 0, node.idx_start, node.idx_end)
+        code.emit(RETURN_VALUE, 0, node.idx_start, node.idx_end)
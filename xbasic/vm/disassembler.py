@@ -0,0 +1,63 @@
+from .code import CodeObject
+from .opcodes import *
+
+
+def describe(code: CodeObject, op: int, arg: int) -> str:
+    """
+    Explains the argument of an instruction.
+
+    Args:
+        code (CodeObject): The code the instruction is in.
+        op (int): The opcode.
+        arg (int): The argument.
+
+    Returns:
+        str: What the argument stands for, or '' if it needs no explanation.
+    """
+    if op in (LOAD_NUMBER, LOAD_STRING, PREPARE_LOOP, INLINE_GUARD, MEMOIZE, INTERPRET):
+        return repr(code.consts[arg])
+    if op in (LOAD_NAME, SAVE_NAME, FOR_PREP):
+        return code.names[arg]
+    if op == STORE_NAME:
+        var_name, dtype = code.consts[arg]
+        return f'{dtype} {var_name}'
+    if op in (MAKE_FUNCTION, CALL_INLINE):
+        return repr(code.consts[arg][1])
+    if op == BINARY_OP:
+        return BINARY_METHODS[arg]
+    if op in JUMPS:
+        return f'to {arg}'
+    return ''
+
+
+def disassemble(code: CodeObject) -> str:
+    """
+    Lists the instructions of a code object and of the functions it defines.
+
+    Each line shows the source line an instruction was compiled from when it
+    changes, the pc, the opcode, the argument and what the argument stands for.
+
+    Args:
+        code (CodeObject): The code to list.
+
+    Returns:
+        str: The listing.
+    """
+    lines = [f'Disassembly of {code!r}:']
+    nested = []
+    last_line = None
+    for pc in range(0, len(code.code), 2):
+        op, arg = code.code[pc], code.code[pc + 1]
+        line = code.line(pc)
+        lines.append(
+            f"{line if line != last_line else '':>4} {pc:>6} {OPNAMES[op]:<18}{arg:>4}"
+            f"  {describe(code, op, arg)}".rstrip()
+        )
+        last_line = line
+        if op == MAKE_FUNCTION:
+            nested.append(code.consts[arg][1])
+
+    for body in nested:
+        lines.append('')
+        lines.append(disassemble(body))
+    return '\n'.join(lines)
@@ -0,0 +1,388 @@
+from ..error_handler.rterror import RTError
+from ..error_handler.rtresult import RTResult, RuntimeFailure, FunctionReturn
+from ..function import Function, full_tracebacks
+from ..Interpreter import Interpreter
+from ..list import List
+from ..number import Number
+from ..optimizer.inliner import inlinable, bind
+from ..optimizer.loop_optimizer import prepare
+from ..optimizer.memoizer import memoize
+from ..string_value import String
+from .code import CodeObject
+from .opcodes import *
+
+# The most function calls that can be in progress at once. Calls do not
+# recurse in Python, so without a limit runaway recursion would only stop
+# when memory runs out.
+MAX_CALL_DEPTH = 10000
+
+
+class VMFunction(Function):
+    def __init__(self, name: str, code: CodeObject):
+        """
+        A function defined by code running in the VM.
+
+        Args:
+            name (str): The name of the function.
+            code (CodeObject): The code of the function body.
+        """
+        super().__init__(name, None, code.arg_names, code.should_auto_return)
+        self.code = code
+
+    def execute(self, args: list):
+        """
+        Execute the function with the given arguments in a VM of its own.
+
+        Args:
+            args (List[Value]): The arguments to pass to the function.
+
+        Returns:
+            RTResult: The result of executing the function.
+        """
+        res = RTResult()
+
+        memo = self.memo
+        key = memo and memo.key(args, self.context.symbol_table)
+        if key is not None:
+            value = memo.get(key)
+            if value is not None:
+                return res.success(value)
+
+        exec_ctx = self.generate_new_context()
+        exec_ctx.symbol_table.memo = key is not None and memo or None
+        res.register(self.check_and_populate_args(self.arg_names, args, exec_ctx))
+        if res.should_return():
+            return res
+
+        value, error = VM().execute(self.code, exec_ctx, in_function=True)
+        if error:
+            return res.failure(error)
+        if key is not None:
+            memo.put(key, value)
+        return res.success(value)
+
+    def copy(self) -> 'VMFunction':
+        """
+        Create a copy of the function.
+
+        Returns:
+            VMFunction: The copy of the function.
+        """
+        copy = VMFunction(self.name, self.code)
+        copy.memo = self.memo
+        copy.set_context(self.context)
+        copy.set_pos(self.pos_start, self.pos_end)
+        return copy
+
+
+class LoopState:
+    __slots__ = ('elements', 'var_name', 'values', 'counter')
+
+    def __init__(self):
+        """The values a running FOR or WHILE loop keeps on the stack."""
+        self.elements = []
+
+
+class Frame:
+    __slots__ = ('code', 'context', 'stack', 'pc', 'call_pos', 'memo', 'key')
+
+    def __init__(self, code: CodeObject, context, call_pos=None, memo=None, key=None):
+        """
+        A call of a code object in progress.
+
+        Args:
+            code (CodeObject): The code being run.
+            context (Context): The context it runs in.
+            call_pos (tuple, optional): The start and end position of the call,
+                or None for the program.
+            memo (Memo, optional): The memo to store the value returned in.
+            key (tuple, optional): The key to store it under, or None.
+        """
+        self.code = code
+        self.context = context
+        self.stack = []
+        self.pc = 0
+        self.call_pos = call_pos
+        self.memo = memo
+        self.key = key
+
+
+class VM:
+    """
+    Runs CodeObjects in a single dispatch loop.
+
+    Values are the same Number, String, List and function objects the
+    Interpreter uses, so built-in functions and errors behave identically.
+    Calls of functions defined in the VM push a Frame instead of recursing in
+    Python.
+    """
+
+    def execute(self, code: CodeObject, context, in_function: bool = False) -> tuple:
+        """
+        Run code in a context.
+
+        Args:
+            code (CodeObject): The code of a program or function body.
+            context (Context): The context to run it in.
+            in_function (bool, optional): Whether the code is the body of a
+                function being called. Defaults to False.
+
+        Returns:
+            tuple: A tuple containing the result value and error, if any. A
+                RETURN outside of a function gives neither.
+        """
+        check_dtype = Interpreter.check_dtype
+        for_range = Interpreter.for_range
+        tail_calls = not full_tracebacks.get()
+        frames = []
+        frame = Frame(code, context)
+
+        while True:
+            # (Re)load the state of the current frame into locals.
+            code_object = frame.code
+            code = code_object.code
+            consts = code_object.consts
+            names = code_object.names
+            positions = code_object.positions()
+            stack = frame.stack
+            push = stack.append
+            pop = stack.pop
+            context = frame.context
+            symbol_table = context.symbol_table
+            pc = frame.pc
+
+            while True:
+                op = code[pc]
+                arg = code[pc + 1]
+
+                if op == LOAD_NAME:
+                    var_name = names[arg]
+                    value = symbol_table.get(var_name)
+                    pos_start, pos_end = positions[pc]
+                    if not value:
+                        return None, RTError(pos_start, pos_end, f"'{var_name}' is not defined", context)
+                    push(value.copy().set_pos(pos_start, pos_end).set_context(context))
+
+                elif op == LOAD_NUMBER:
+                    pos_start, pos_end = positions[pc]
+                    push(Number(consts[arg]).set_context(context).set_pos(pos_start, pos_end))
+
+                elif op == BINARY_OP:
+                    right = pop()
+                    result, error = getattr(stack[-1], BINARY_METHODS[arg])(right)
+                    if error:
+                        return None, error
+                    pos_start, pos_end = positions[pc]
+                    stack[-1] = result.set_pos(pos_start, pos_end)
+
+                elif op == POP_JUMP_IF_FALSE:
+                    if not pop().is_true():
+                        pc = arg
+                        continue
+
+                elif op == JUMP:
+                    pc = arg
+                    continue
+
+                elif op == STORE_NAME:
+                    var_name, dtype = consts[arg]
+                    value = stack[-1]
+                    error = check_dtype(value, dtype)
+                    if error:
+                        pos_start, pos_end = positions[pc]
+                        return None, RTError(pos_start, pos_end, error, context)
+                    symbol_table.set(var_name, value)
+
+                elif op == FOR_ITER:
+                    state = stack[-1]
+                    i = next(state.values, None)
+                    if i is None:
+                        pc = arg
+                        continue
+                    # One Number counts in place, like in visit_ForNode.
+                    counter = state.counter
+                    counter.value = i
+                    symbol_table.symbols[state.var_name] = counter
+
+                elif op == LOOP_APPEND:
+                    value = pop()
+                    stack[-1].elements.append(value)
+
+                elif op == CALL or op == TAIL_CALL:
+                    args = stack[len(stack) - arg:]
+                    del stack[len(stack) - arg:]
+                    pos_start, pos_end = positions[pc]
+                    value_to_call = pop().copy().set_pos(pos_start, pos_end)
+
+                    if type(value_to_call) is VMFunction:
+                        tail_call = op == TAIL_CALL and tail_calls
+                        if tail_call:
+                            exec_ctx = value_to_call.generate_tail_context(context)
+                        else:
+                            memo = value_to_call.memo
+                            key = memo and memo.key(args, value_to_call.context.symbol_table)
+                            if key is not None:
+                                value = memo.get(key)
+                                if value is not None:
+                                    push(value.copy().set_pos(pos_start, pos_end).set_context(context))
+                                    pc += 2
+                                    continue
+                            exec_ctx = value_to_call.generate_new_context()
+                            exec_ctx.symbol_table.memo = key is not None and memo or None
+                        if len(args) != len(value_to_call.arg_names):
+                            return None, value_to_call.check_args(value_to_call.arg_names, args).error
+                        value_to_call.populate_args(value_to_call.arg_names, args, exec_ctx)
+
+                        if tail_call:
+                            # The RETURN_VALUE after this call is never reached,
+                            # so the function returns straight to the caller,
+                            # and its value is the one to remember.
+                            frame = Frame(value_to_call.code, exec_ctx, frame.call_pos, frame.memo, frame.key)
+                            break
+
+                        if len(frames) >= MAX_CALL_DEPTH:
+                            raise RecursionError('maximum recursion depth exceeded')
+                        frame.pc = pc + 2
+                        frames.append(frame)
+                        frame = Frame(value_to_call.code, exec_ctx, positions[pc], memo, key)
+                        break
+
+                    res = value_to_call.execute(args)
+                    if res.error:
+                        return None, res.error
+                    push(res.value.copy().set_pos(pos_start, pos_end).set_context(context))
+
+                elif op == RETURN_AUTO or op == RETURN_VALUE:
+                    value = pop()
+                    if op == RETURN_AUTO:
+                        value = (value if code_object.should_auto_return else None) or Number.null
+                    if frame.key is not None:
+                        frame.memo.put(frame.key, value)
+                    if frame.call_pos is None:
+                        return (value if in_function or op == RETURN_AUTO else None), None
+
+                    pos_start, pos_end = frame.call_pos
+                    frame = frames.pop()
+                    frame.stack.append(value.copy().set_pos(pos_start, pos_end).set_context(frame.context))
+                    break
+
+                elif op == LOAD_STRING:
+                    pos_start, pos_end = positions[pc]
+                    push(String(consts[arg]).set_context(context).set_pos(pos_start, pos_end))
+
+                elif op == LOAD_NULL:
+                    push(Number.null)
+
+                elif op == POP_TOP:
+                    pop()
+
+                elif op == SAVE_NAME:
+                    symbol_table.set(names[arg], stack[-1])
+
+                elif op == BUILD_LIST:
+                    elements = stack[len(stack) - arg:]
+                    del stack[len(stack) - arg:]
+                    pos_start, pos_end = positions[pc]
+                    push(List(elements).set_context(context).set_pos(pos_start, pos_end))
+
+                elif op == UNARY_NEG or op == UNARY_NOT:
+                    if op == UNARY_NEG:
+                        number, error = stack[-1].multed_by(Number(-1))
+                    else:
+                        number, error = stack[-1].notted()
+                    if error:
+                        return None, error
+                    pos_start, pos_end = positions[pc]
+                    stack[-1] = number.set_pos(pos_start, pos_end)
+
+                elif op == UNARY_POS:
+                    pos_start, pos_end = positions[pc]
+                    stack[-1].set_pos(pos_start, pos_end)
+
+                elif op == SETUP_LOOP:
+                    push(LoopState())
+
+                elif op == FOR_PREP:
+                    step_value = pop()
+                    end_value = pop()
+                    start_value = pop()
+                    state = LoopState()
+                    state.var_name = names[arg]
+                    state.values = iter(for_range(start_value.value, end_value.value, step_value.value))
+                    state.counter = Number(start_value.value)
+                    push(state)
+
+                elif op == PREPARE_LOOP:
+                    push(Number.true if prepare(consts[arg], context) else Number.false)
+
+                elif op == LOOP_END:
+                    state = pop()
+                    if arg:
+                        push(Number.null)
+                    else:
+                        pos_start, pos_end = positions[pc]
+                        push(List(state.elements).set_context(context).set_pos(pos_start, pos_end))
+
+                elif op == MAKE_FUNCTION:
+                    func_name, body = consts[arg]
+                    pos_start, pos_end = positions[pc]
+                    func_value = VMFunction(func_name, body).set_context(context).set_pos(pos_start, pos_end)
+                    if func_name:
+                        symbol_table.set(func_name, func_value)
+                    push(func_value)
+
+                elif op == MEMOIZE:
+                    node = consts[arg]
+                    memoize(stack[-1], node.builtins, node.functions)
+
+                elif op == INLINE_GUARD:
+                    node = consts[arg]
+                    inline = inlinable(symbol_table, node.call_node.node_to_call.var_name, node.save_name)
+                    push(Number.true if inline else Number.false)
+
+                elif op == CALL_INLINE:
+                    # The stack holds the flag INLINE_GUARD pushed, the function
+                    # and the arguments. The CALL after this one calls it when
+                    # the body is not evaluated, or fails.
+                    node, body = consts[arg]
+                    args = stack[len(stack) - len(node.param_names):]
+                    flag_index = len(stack) - len(args) - 2
+                    if stack[flag_index] is Number.true and \
+                            bind(symbol_table, node.param_names, args, node.builtins, node.operands):
+                        try:
+                            value, error = self.execute(body, context)
+                        except RuntimeFailure:
+                            # Raised again by the call.
+                            value = error = None
+                        if value is not None and not error:
+                            del stack[flag_index:]
+                            pos_start, pos_end = positions[pc]
+                            push(value.copy().set_pos(pos_start, pos_end).set_context(context))
+                            pc += 4
+                            continue
+                    del stack[flag_index]
+
+                elif op == HALT:
+                    return pop(), None
+
+                elif op == INTERPRET:
+                    try:
+                        value = Interpreter().visit(consts[arg], context)
+                    except RuntimeFailure as e:
+                        return None, e.error
+                    except FunctionReturn as ret:
+                        # Return the way RETURN_VALUE does.
+                        if frame.key is not None:
+                            frame.memo.put(frame.key, ret.value)
+                        if frame.call_pos is None:
+                            return (ret.value if in_function else None), None
+                        pos_start, pos_end = frame.call_pos
+                        frame = frames.pop()
+                        frame.stack.append(ret.value.copy().set_pos(pos_start, pos_end).set_context(frame.context))
+                        break
+                    push(value)
+
+                else:
+                    raise Exception(f'Unknown opcode {op} at {pc} in {code_object}')
+
+                pc += 2
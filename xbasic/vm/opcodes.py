@@ -0,0 +1,72 @@
+"""
+The instructions of the xbasic virtual machine.
+
+Code is a flat list of integers holding an opcode and its argument in turn,
+so the instruction at pc is code[pc] and its argument code[pc + 1]. Jump
+targets are such pcs. Instructions that take no argument are given 0.
+"""
+
+# Values
+LOAD_NUMBER = 1         # Push Number(consts[arg])
+LOAD_STRING = 2         # Push String(consts[arg])
+LOAD_NULL = 3           # Push Number.null
+LOAD_NAME = 4           # Push a copy of the variable names[arg]
+STORE_NAME = 5          # Assign the top of the stack to the (name, dtype) in consts[arg], leaving it there
+BUILD_LIST = 6          # Replace the top arg values with a List of them
+POP_TOP = 7             # Discard the top of the stack
+SAVE_NAME = 8           # Assign the top of the stack to the hidden variable names[arg], leaving it there
+
+# Operators
+BINARY_OP = 10          # Replace the top two values with left.<BINARY_METHODS[arg]>(right)
+UNARY_NEG = 11          # Negate the top of the stack
+UNARY_NOT = 12          # Replace the top of the stack with its logical not
+UNARY_POS = 13          # Move the top of the stack to the position of the operator
+
+# Control flow
+JUMP = 20               # Continue at arg
+POP_JUMP_IF_FALSE = 21  # Pop the top of the stack and continue at arg if it is not true
+
+# Loops
+SETUP_LOOP = 30         # Push the state of a WHILE loop
+FOR_PREP = 31           # Replace start, end and step with the state of a FOR loop over names[arg]
+FOR_ITER = 32           # Assign the next number to the loop variable, or continue at arg when done
+LOOP_APPEND = 33        # Pop the value of the loop body and add it to the loop's elements
+LOOP_END = 34           # Replace the loop state with its List of elements, or Number.null if arg is set
+PREPARE_LOOP = 35       # Push whether the hoisted values of the HoistNode in consts[arg] could be computed
+
+# Functions
+MAKE_FUNCTION = 40      # Push the function of the FuncDef in consts[arg], assigning it if it is named
+CALL = 41               # Call the value below the top arg values with them as arguments
+RETURN_VALUE = 42       # Return the top of the stack from the function
+RETURN_AUTO = 43        # Return from the end of a function body
+HALT = 44               # Return the top of the stack from the program
+INLINE_GUARD = 45       # Push whether the call of the InlineNode in consts[arg] is of the function inlined
+CALL_INLINE = 46        # Evaluate the inlined body in consts[arg] in place of the CALL after it,
+                        # if the flag below the call allows
+TAIL_CALL = 47          # Call like CALL, running a function defined in the VM in the frame of the caller
+MEMOIZE = 48            # Give the function on top of the stack a Memo for the MemoNode in consts[arg]
+
+# Anything else
+INTERPRET = 50          # Push the value of the node consts[arg], evaluated by the Interpreter
+
+# The method of the left operand each BINARY_OP argument calls.
+BINARY_METHODS = (
+    'added_to',
+    'subbed_by',
+    'multed_by',
+    'dived_by',
+    'powed_by',
+    'get_comparison_eq',
+    'get_comparison_ne',
+    'get_comparison_lt',
+    'get_comparison_gt',
+    'get_comparison_lte',
+    'get_comparison_gte',
+    'anded_by',
+    'ored_by',
+)
+
+# Instructions whose argument is a pc.
+JUMPS = {JUMP, POP_JUMP_IF_FALSE, FOR_ITER}
+
+OPNAMES = {value: name for name, value in list(globals().items()) if name.isupper() and isinstance(value, int)}